@@ -0,0 +1,93 @@
+"""
+Broker HTTP Benchmark
+Cycle wall-time of per-call requests.request (old safe_request) vs the pooled
+broker_client against a local mock mStock server.
+
+The mock adds a fixed delay to every NEW connection to stand in for the
+TCP+TLS handshake that a real HTTPS call pays (plain HTTP on localhost has
+almost none), plus a small per-request service time.
+
+Usage: python _dev_tools/bench_broker_http.py [symbols] [handshake_ms]
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from broker_http import BrokerHTTPClient, DEFAULT_HEADERS
+
+HANDSHAKE_MS = 40
+SERVICE_MS = 2
+
+
+class MockMStock(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    disable_nagle_algorithm = True  # headers and body are separate writes
+
+    def setup(self):
+        time.sleep(HANDSHAKE_MS / 1000.0)  # emulated TCP+TLS handshake per connection
+        super().setup()
+
+    def do_GET(self):
+        time.sleep(SERVICE_MS / 1000.0)
+        body = json.dumps({"status": "success", "data": {"NSE:X": {"last_price": 100.0}}}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def legacy_request(method, url, **kwargs):
+    """What safe_request did before: fresh connection, headers rebuilt per call."""
+    print(f"DEBUG REQ: {method} {url}", file=open(os.devnull, "w"))
+    headers = dict(DEFAULT_HEADERS)
+    headers.update(kwargs.pop("headers", {}))
+    return requests.request(method=method, url=url, headers=headers, timeout=(5, 15), **kwargs)
+
+
+def run_cycle(do_request, base, symbols):
+    """One engine cycle: a quote and a history call per symbol, plus orders/positions."""
+    start = time.perf_counter()
+    for i in range(symbols):
+        do_request("GET", f"{base}/openapi/typea/instruments/quote/ohlc", params={"i": f"NSE:S{i}"})
+        do_request("GET", f"{base}/openapi/typea/instruments/historical/NSE/{i}/15minute")
+    do_request("GET", f"{base}/openapi/typea/orders")
+    do_request("GET", f"{base}/openapi/typea/portfolio/holdings")
+    return time.perf_counter() - start
+
+
+def main():
+    global HANDSHAKE_MS
+    symbols = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    if len(sys.argv) > 2:
+        HANDSHAKE_MS = float(sys.argv[2])
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MockMStock)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+
+    client = BrokerHTTPClient(pool_size=10)
+    print(f"symbols={symbols} calls/cycle={2 * symbols + 2} handshake={HANDSHAKE_MS}ms service={SERVICE_MS}ms")
+    for name, fn in (("requests.request (old)", legacy_request), ("broker_client (pooled)", client.request)):
+        times = [run_cycle(fn, base, symbols) for _ in range(3)]
+        print(f"{name:<24} cycle wall-time: best {min(times) * 1000:8.1f} ms | mean {sum(times) / len(times) * 1000:8.1f} ms")
+
+    print("\nPer-endpoint latency (pooled client):")
+    for ep, snap in client.latency_stats().items():
+        print(f"  {ep:<24} n={snap['count']:<4} p50<={snap['p50_ms']}ms p95<={snap['p95_ms']}ms max={snap['max_ms']}ms")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Log Pipeline Benchmark
+Producer-side cost of log_ok() with the previous synchronous BotManager capture
+(print + open/append/close + queue per line) vs the LogPipeline hand-off.
+
+A slow disk is simulated by sleeping in every capture-file write.
+
+Usage: python _dev_tools/bench_log_pipeline.py [lines] [disk_ms]
+"""
+
+import io
+import os
+import queue
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import kickstart
+from log_pipeline import LogPipeline
+
+
+def make_sync_capture(path, disk_delay):
+    q = queue.Queue(maxsize=200)
+
+    def log_capture(msg):
+        entry = f"[{datetime.now().strftime('%H:%M:%S')}] {msg.strip()}"
+        print(entry)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(f"{entry}\n")
+            time.sleep(disk_delay)
+        if q.full():
+            q.get_nowait()
+        q.put(entry)
+    return log_capture
+
+
+def make_pipeline(path, disk_delay):
+    pipeline = LogPipeline()
+    q = queue.Queue(maxsize=200)
+
+    def write_file(lines):
+        with open(path, "a", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+            time.sleep(disk_delay)
+
+    def publish(lines):
+        for line in lines:
+            if q.full():
+                q.get_nowait()
+            q.put_nowait(line)
+
+    pipeline.add_sink("console", lambda lines: sys.stdout.write("\n".join(lines) + "\n"))
+    pipeline.add_sink("file", write_file)
+    pipeline.add_sink("memory", publish)
+    pipeline.start()
+    return pipeline
+
+
+def measure(callback, lines):
+    kickstart.set_log_callback(callback)
+    samples = []
+    for i in range(lines):
+        start = time.perf_counter()
+        kickstart.log_ok(f"📈 SYM{i % 50} RSI=41.2 price=1234.5 tick {i}")
+        samples.append(time.perf_counter() - start)
+    kickstart.set_log_callback(None)
+    samples.sort()
+    return sum(samples), samples[len(samples) // 2], samples[int(len(samples) * 0.99)]
+
+
+def main():
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    disk_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 2.0
+    disk_delay = disk_ms / 1000.0
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp, redirect_stdout(io.StringIO()):
+        results["synchronous"] = measure(make_sync_capture(os.path.join(tmp, "sync.txt"), disk_delay), lines)
+        pipeline = make_pipeline(os.path.join(tmp, "async.txt"), disk_delay)
+        results["pipeline"] = measure(pipeline.submit, lines)
+        drain_start = time.perf_counter()
+        pipeline.flush(timeout=60)
+        drain = time.perf_counter() - drain_start
+        pipeline.stop()
+        snap = pipeline.snapshot()
+
+    print(f"lines={lines} simulated disk write={disk_ms} ms")
+    for name, (total, p50, p99) in results.items():
+        print(f"{name:<12} producer total: {total * 1000:9.1f} ms | "
+              f"p50 {p50 * 1e6:8.1f} us | p99 {p99 * 1e6:8.1f} us")
+    print(f"pipeline drain after producer: {drain * 1000:.1f} ms | batches={snap['batches']} "
+          f"max_batch={snap['max_batch']} dropped={snap['dropped']}")
+
+
+if __name__ == "__main__":
+    main()
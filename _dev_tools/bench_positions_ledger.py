@@ -0,0 +1,82 @@
+"""
+Positions Ledger Benchmark
+get_open_positions() on a synthetic trades table (default 1M rows):
+full GROUP BY over trades (previous query) vs the maintained positions ledger.
+Also times the ledger rebuild and the extra cost the ledger adds to insert_trade.
+
+Usage: python _dev_tools/bench_positions_ledger.py [rows] [symbols]
+"""
+
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.trades_db import TradesDatabase
+
+
+def synthetic_trades(rows, symbols, seed=42):
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1, 9, 15)
+    held = {}
+    for i in range(rows):
+        symbol = f"SYM{rng.randrange(symbols)}"
+        exchange = "NSE" if rng.random() < 0.8 else "BSE"
+        broker = "PAPER" if rng.random() < 0.3 else "mstock"
+        key = (symbol, exchange, broker)
+        price = round(rng.uniform(50, 5000), 2)
+        if held.get(key, 0) > 0 and rng.random() < 0.45:
+            action, qty = "SELL", rng.randint(1, held[key])
+            held[key] -= qty
+        else:
+            action, qty = "BUY", rng.randint(1, 20)
+            held[key] = held.get(key, 0) + qty
+        stamp = (start + timedelta(seconds=30 * i)).isoformat()
+        yield (stamp, symbol, exchange, action, qty, price, qty * price, qty * price + 20.0, "RSI", broker)
+
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - start) / repeat, result
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    symbols = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+
+    with tempfile.TemporaryDirectory() as tmp, redirect_stdout(io.StringIO()) as quiet:
+        db = TradesDatabase(os.path.join(tmp, "trades.db"))
+        load_start = time.perf_counter()
+        db.conn.executemany("""
+            INSERT INTO trades (timestamp, symbol, exchange, action, quantity, price,
+                                gross_amount, net_amount, strategy, broker)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, synthetic_trades(rows, symbols))
+        db.conn.commit()
+        load = time.perf_counter() - load_start
+
+        rebuild, ledger_rows = timed(db.rebuild_positions, 1)
+        mismatches = db.verify_positions()
+        scan, legacy = timed(lambda: db._aggregate_open_positions(False), 3)
+        ledger, current = timed(lambda: db.get_open_positions(False), 50)
+        insert, _ = timed(lambda: db.insert_trade("SYM1", "NSE", "BUY", 1, 100.0, 100.0, 1.0, 101.0), 200)
+        db.close()
+
+    print(f"trades={rows:,} symbols={symbols} (bulk load {load:.1f}s)")
+    print(f"open positions: legacy={len(legacy)} ledger={len(current)} verify mismatches={len(mismatches)}")
+    print(f"GROUP BY over trades : {scan * 1000:9.2f} ms / call")
+    print(f"positions ledger     : {ledger * 1000:9.2f} ms / call  ({scan / ledger:,.0f}x)")
+    print(f"ledger rebuild       : {rebuild * 1000:9.2f} ms ({ledger_rows} rows)")
+    print(f"insert_trade + ledger: {insert * 1000:9.2f} ms / trade")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Positions Merge Benchmark
+Cost of merge_positions_and_orders() with 500 holdings (+ today's orders),
+per-row logging (DEBUG, the previous behaviour) vs the summarized INFO path.
+
+The log callback mimics BotManager.log_capture (console print + append to a
+file + bounded queue per message), which is what the API launcher installs.
+
+Usage: python _dev_tools/bench_positions_merge.py [holdings]
+"""
+
+import io
+import logging
+import os
+import queue
+import sys
+import tempfile
+import time
+from contextlib import redirect_stderr, redirect_stdout
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import kickstart
+
+
+class FakeResponse:
+    status_code = 200
+    text = ""
+
+    def __init__(self, payload):
+        self._payload = payload
+
+    def json(self):
+        return self._payload
+
+
+def make_broker(holdings):
+    rows = [{"tradingsymbol": f"SYM{i}", "quantity": 10 + i % 7, "used_quantity": i % 3, "price": 100.0 + i,
+             "last_price": 101.0 + i, "pnl": 5.0, "exchange": "NSE"} for i in range(holdings)]
+    orders = [{"tradingsymbol": f"SYM{i}", "exchange": "NSE", "transaction_type": "BUY" if i % 2 else "SELL",
+               "quantity": 1, "average_price": 100.0, "status": "COMPLETE"} for i in range(0, holdings, 5)]
+
+    def fake_request(method, url, **kwargs):
+        if url.endswith("/portfolio/holdings"):
+            return FakeResponse({"data": rows})
+        if url.endswith("/portfolio/positions"):
+            return FakeResponse({"data": []})
+        return FakeResponse({"data": orders})
+    return fake_request
+
+
+def make_capture(path):
+    q = queue.Queue(maxsize=200)
+
+    def log_capture(msg):
+        entry = f"[{datetime.now().strftime('%H:%M:%S')}] {msg.strip()}"
+        print(entry)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(f"{entry}\n")
+        if q.full():
+            q.get_nowait()
+        q.put(entry)
+    return log_capture
+
+
+def run(level, repeat):
+    logging.getLogger().setLevel(level)
+    with tempfile.TemporaryDirectory() as tmp:
+        kickstart.set_log_callback(make_capture(os.path.join(tmp, "debug_log_capture.txt")))
+        sink = io.StringIO()
+        with redirect_stdout(sink), redirect_stderr(io.StringIO()):
+            start = time.perf_counter()
+            for _ in range(repeat):
+                merged = kickstart.merge_positions_and_orders()
+            elapsed = (time.perf_counter() - start) / repeat
+        lines = sink.getvalue().count("\n") / repeat
+    kickstart.set_log_callback(None)
+    return elapsed, lines, len(merged)
+
+
+def main():
+    holdings = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    kickstart.safe_request = make_broker(holdings)
+    kickstart.settings = None
+    kickstart.db = None
+    kickstart.state_mgr = None
+    kickstart.OFFLINE["active"] = False
+    kickstart.ACCESS_TOKEN = kickstart.ACCESS_TOKEN or "bench"
+
+    print(f"holdings={holdings}")
+    for name, level in (("per-row (DEBUG)", logging.DEBUG), ("summary (INFO)", logging.INFO)):
+        elapsed, lines, active = run(level, repeat=5)
+        print(f"{name:<18} merge: {elapsed * 1000:8.2f} ms | log lines/merge: {lines:6.0f} | active={active}")
+    print(f"summary record: {kickstart.LAST_MERGE_SUMMARY}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+RSI Kernel Benchmark
+Per-symbol RSI cost of the old pandas loop vs rsi_kernel (400 and 5,000 bars).
+
+Usage: python _dev_tools/bench_rsi_kernel.py
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import rsi_kernel
+
+
+def legacy_tv_rma(series: pd.Series, length: int) -> pd.Series:
+    """The pre-kernel implementation (per-element pandas indexing)."""
+    x = pd.to_numeric(series, errors="coerce")
+    alpha = 1.0 / float(length)
+    sma = x.rolling(length, min_periods=length).mean()
+    rma = pd.Series(np.nan, index=x.index)
+    first = sma.first_valid_index()
+    if first is None:
+        return rma
+    rma.loc[first] = sma.loc[first]
+    for i in range(x.index.get_loc(first) + 1, len(x)):
+        rma.iloc[i] = alpha * x.iloc[i] + (1 - alpha) * rma.iloc[i - 1]
+    return rma
+
+
+def legacy_tv_rsi_with_last_price(hist_close: pd.Series, last_price: float, length: int = 14) -> float:
+    adj = hist_close.copy()
+    adj.iloc[-1] = float(last_price)
+    ch = pd.to_numeric(adj, errors="coerce").diff()
+    up = legacy_tv_rma(ch.clip(lower=0), length)
+    down = legacy_tv_rma((-ch).clip(lower=0), length)
+    rsi = 100 - (100 / (1 + up / down))
+    rsi = rsi.where(down != 0, 100.0).where(up != 0, 0.0)
+    return float(rsi.dropna().iloc[-1])
+
+
+def _time(fn, repeat):
+    fn()  # warm-up (numba compile, pandas caches)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    rng = np.random.default_rng(42)
+    print(f"numba available: {rsi_kernel.NUMBA_AVAILABLE}")
+    print(f"{'bars':>6} | {'legacy (ms)':>12} | {'kernel (ms)':>12} | {'speedup':>8}")
+    for bars in (400, 5000):
+        close = pd.Series(1500 + np.cumsum(rng.normal(0, 1.5, bars)))
+        ltp = float(close.iloc[-1]) + 0.5
+        assert legacy_tv_rsi_with_last_price(close, ltp) == rsi_kernel.rsi_last(close.to_numpy(), 14, ltp)
+
+        legacy = _time(lambda: legacy_tv_rsi_with_last_price(close, ltp), repeat=3 if bars > 1000 else 10)
+        kernel = _time(lambda: rsi_kernel.rsi_last(close.to_numpy(), 14, ltp), repeat=200)
+        print(f"{bars:>6} | {legacy * 1000:>12.3f} | {kernel * 1000:>12.3f} | {legacy / kernel:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+SQLite Concurrency Benchmark
+One engine-like writer (insert_trade) plus dashboard/API-like readers hitting
+trades.db at the same time, for:
+  legacy  - one connection shared by every thread, default rollback journal
+  tuned   - per-thread pooled connections, WAL + synchronous=NORMAL (sqlite_pool)
+
+Usage: python _dev_tools/bench_sqlite_concurrency.py [seconds] [readers] [preload_rows] [writes_per_sec]
+       writes_per_sec=0 writes as fast as possible (stress)
+"""
+
+import io
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from contextlib import redirect_stdout
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.trades_db import TradesDatabase
+
+
+class SharedConnectionDatabase(TradesDatabase):
+    """The previous setup: a single check_same_thread=False connection, no pragmas."""
+
+    def __init__(self, db_path):
+        self._shared = sqlite3.connect(db_path, check_same_thread=False)
+        self._shared.row_factory = sqlite3.Row
+        super().__init__(db_path)
+
+    @property
+    def conn(self):
+        return self._shared
+
+    def close(self):
+        self._shared.close()
+
+
+def preload(db, rows, seed=3):
+    rng = random.Random(seed)
+    now = datetime.now()
+    data = []
+    for i in range(rows):
+        action = "BUY" if rng.random() < 0.55 else "SELL"
+        qty, price = rng.randint(1, 20), round(rng.uniform(50, 5000), 2)
+        stamp = (now - timedelta(seconds=20 * (rows - i))).isoformat()
+        pnl = round(rng.uniform(-500, 800), 2) if action == "SELL" else None
+        data.append((stamp, f"SYM{rng.randrange(300)}", "NSE", action, qty, price, qty * price,
+                     qty * price + 20, 20.0, "RSI", rng.choice(["mstock", "PAPER"]), pnl, pnl))
+    db.conn.executemany("""
+        INSERT INTO trades (timestamp, symbol, exchange, action, quantity, price, gross_amount,
+                            net_amount, total_fees, strategy, broker, pnl_gross, pnl_net)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, data)
+    db.conn.commit()
+    db.rebuild_positions()
+
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * pct))]
+
+
+def run(db, seconds, readers, write_rate):
+    stop = threading.Event()
+    write_lat, read_lat, errors = [], [], []
+
+    def writer():
+        rng = random.Random(1)
+        interval = 1.0 / write_rate if write_rate else 0.0
+        while not stop.is_set():
+            if interval:
+                stop.wait(interval)
+            start = time.perf_counter()
+            try:
+                db.insert_trade(f"SYM{rng.randrange(300)}", "NSE", rng.choice(["BUY", "SELL"]), 1, 100.0,
+                                100.0, 1.0, 101.0)
+                write_lat.append(time.perf_counter() - start)
+            except Exception as e:
+                errors.append(f"write: {e}")
+
+    def reader(seed):
+        rng = random.Random(seed)
+        calls = [
+            lambda: db.get_open_positions(is_paper=False),
+            lambda: db.get_recent_trades(limit=100, is_paper=False),
+            lambda: db.get_today_trades(is_paper=False),
+            lambda: db.get_performance_summary(days=1),
+        ]
+        while not stop.is_set():
+            start = time.perf_counter()
+            try:
+                rng.choice(calls)()
+                read_lat.append(time.perf_counter() - start)
+            except Exception as e:
+                errors.append(f"read: {e}")
+
+    threads = [threading.Thread(target=writer)] + [threading.Thread(target=reader, args=(i,)) for i in range(readers)]
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+    return write_lat, read_lat, errors
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 5
+    readers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    rows = int(sys.argv[3]) if len(sys.argv) > 3 else 100_000
+    write_rate = float(sys.argv[4]) if len(sys.argv) > 4 else 20
+
+    rate = f"{write_rate:.0f}/s" if write_rate else "unthrottled"
+    print(f"{seconds:.0f}s, 1 writer ({rate}) + {readers} readers, {rows:,} preloaded trades")
+    for name, factory in (("legacy", SharedConnectionDatabase), ("tuned", TradesDatabase)):
+        with tempfile.TemporaryDirectory() as tmp:
+            with redirect_stdout(io.StringIO()):
+                db = factory(os.path.join(tmp, "trades.db"))
+                preload(db, rows)
+                write_lat, read_lat, errors = run(db, seconds, readers, write_rate)
+                db.close()
+        print(f"{name:<7} writes/s {len(write_lat) / seconds:8.0f} (p99 {percentile(write_lat, 0.99) * 1000:7.2f} ms) | "
+              f"reads/s {len(read_lat) / seconds:8.0f} (p50 {percentile(read_lat, 0.5) * 1000:7.2f} ms, "
+              f"p99 {percentile(read_lat, 0.99) * 1000:7.2f} ms) | errors {len(errors)}")
+        if errors:
+            print(f"        first error: {errors[0]}")
+
+
+if __name__ == "__main__":
+    main()
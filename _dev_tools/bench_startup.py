@@ -0,0 +1,69 @@
+"""
+Startup Benchmark
+Cold start of the headless engine in fresh interpreters: ``python -X importtime``
+for importing headless_launcher (total and the slowest modules by cumulative
+time), then kickstart.initialize() broken down by Engine step.
+
+Usage: python _dev_tools/bench_startup.py [runs] [top]
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+INIT_SNIPPET = (
+    "import io, json, sys, time, contextlib\n"
+    "with contextlib.redirect_stdout(io.StringIO()):\n"
+    "    import kickstart\n"
+    "    t = time.perf_counter()\n"
+    "    kickstart.initialize()\n"
+    "    total = (time.perf_counter() - t) * 1000\n"
+    "print(json.dumps({'total': total, 'steps': kickstart.ENGINE.init_ms}))\n"
+)
+
+
+def import_profile(module):
+    """{module: cumulative us} from one ``-X importtime`` run."""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], cwd=ROOT,
+                          capture_output=True, text=True)
+    profile = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        profile.setdefault(name.strip(), int(cumulative))
+    return profile
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    top = int(sys.argv[2]) if len(sys.argv) > 2 else 12
+
+    profiles = [import_profile("headless_launcher") for _ in range(runs)]
+    totals = [p.get("headless_launcher", 0) / 1000 for p in profiles]
+    last = profiles[-1]
+    print(f"import headless_launcher: median {statistics.median(totals):.0f} ms "
+          f"(min {min(totals):.0f}, max {max(totals):.0f}, {runs} runs)")
+    print(f"yfinance imported: {'yes' if 'yfinance' in last else 'no'}")
+    print("slowest top-level imports (cumulative, last run):")
+    roots = {name: us for name, us in last.items() if "." not in name and name != "headless_launcher"}
+    for name, us in sorted(roots.items(), key=lambda kv: -kv[1])[:top]:
+        print(f"  {name:<28} {us / 1000:8.1f} ms")
+
+    proc = subprocess.run([sys.executable, "-c", INIT_SNIPPET], cwd=ROOT, capture_output=True, text=True)
+    if proc.returncode != 0:
+        print(f"❌ initialize() failed: {proc.stderr.strip().splitlines()[-1:]}")
+        return 1
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    print(f"kickstart.initialize(): {result['total']:.0f} ms")
+    for step, ms in result["steps"].items():
+        print(f"  {step:<28} {ms:8.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -28,10 +28,11 @@ try:
         
     print("\nSending Test Log...")
     log_ok("TEST LOGGER MESSAGE 123")
+    bot_manager.log_pipeline.flush(timeout=2.0)
     
-    # Check Queue
-    q_items = list(bot_manager.log_queue.queue)
-    print(f"\nQueue contains {len(q_items)} items.")
+    # Check log store
+    q_items = bot_manager.get_logs(limit=bot_manager.log_store.capacity)
+    print(f"\nLog store contains {len(q_items)} items.")
     
     found = False
     for item in q_items:
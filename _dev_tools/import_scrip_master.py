@@ -0,0 +1,43 @@
+"""
+Scrip master importer
+Imports a downloaded scrip master CSV (see tests/download_scrip_master.py)
+into the instrument index the bot resolves tokens from, and optionally
+looks up a few symbols.
+
+Usage: python _dev_tools/import_scrip_master.py --csv nse_master.csv [--index database/instruments.db] [--lookup RELIANCE:NSE,EMBASSY:BSE]
+"""
+
+import argparse
+import os
+import sys
+from datetime import date
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from instrument_index import DEFAULT_PATH, InstrumentIndex, parse_scrip_master
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import the scrip master into the instrument index")
+    parser.add_argument("--csv", required=True, help="scrip master CSV file")
+    parser.add_argument("--index", default=DEFAULT_PATH, help="instrument index file")
+    parser.add_argument("--lookup", help="SYMBOL:EXCHANGE pairs to resolve, comma separated")
+    args = parser.parse_args()
+
+    with open(args.csv, encoding="utf-8") as f:
+        rows = parse_scrip_master(f.read())
+    if not rows:
+        print("❌ No instruments found in the CSV")
+        return 1
+
+    index = InstrumentIndex(args.index)
+    count = index.import_rows(rows, date.today())
+    print(f"📇 {count:,} instruments written to {args.index}")
+    for pair in filter(None, (args.lookup or "").split(",")):
+        symbol, _, exchange = pair.partition(":")
+        print(f"   {exchange or 'NSE'}:{symbol} -> {index.token(symbol, exchange or 'NSE')}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,52 @@
+"""
+Positions Ledger maintenance
+Rebuild or verify the `positions` table that TradesDatabase maintains from
+insert_trade. Run `rebuild` after editing the trades table by hand (e.g.
+fix scripts, manual deletes); `verify` compares it with a full GROUP BY.
+
+Usage: python _dev_tools/positions_ledger.py {verify,rebuild} [--db database/trades.db]
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.trades_db import TradesDatabase
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild or verify the open-positions ledger")
+    parser.add_argument("command", choices=["verify", "rebuild"])
+    parser.add_argument("--db", default="database/trades.db", help="path to trades.db")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        print(f"❌ Database not found at {args.db}")
+        return 1
+
+    db = TradesDatabase(args.db)
+    try:
+        if args.command == "rebuild":
+            db.rebuild_positions()
+
+        mismatches = db.verify_positions()
+        if not mismatches:
+            print("✅ Positions ledger matches the trades table")
+            return 0
+
+        print(f"❌ {len(mismatches)} ledger mismatches:")
+        for m in mismatches:
+            book = "PAPER" if m["is_paper"] else "LIVE"
+            print(f"   {m['symbol']}:{m['exchange']} [{book}] {', '.join(m['fields'])}")
+            print(f"      trades: {m['expected']}")
+            print(f"      ledger: {m['ledger']}")
+        print("ℹ️ Run with 'rebuild' to recompute the ledger from trades")
+        return 2
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
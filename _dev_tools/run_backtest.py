@@ -0,0 +1,65 @@
+"""
+Backtest runner
+Replays local candles (<candles>/<EXCHANGE>/<SYMBOL>_<timeframe>.csv|.parquet,
+or the candle warehouse the live bot fills)
+through the live decision rules for the configured stocks and prints a summary.
+Stocks and capital/risk settings come from settings.json, or from
+config_table.csv with --csv. --db writes the trade log to a trades database.
+
+Usage: python _dev_tools/run_backtest.py --candles data/candles | --warehouse database/candles [--csv config_table.csv] [--db backtest.db] [--no-risk]
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backtest_engine import Backtester, CandleStore, MarketFrame, stocks_from_csv, write_trades
+from candle_warehouse import CandleWarehouse
+from settings_manager import SettingsManager
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay stored candles through the trading rules")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--candles", help="candle store root directory")
+    source.add_argument("--warehouse", help="candle warehouse root (e.g. database/candles)")
+    parser.add_argument("--csv", help="stock configs from config_table.csv instead of settings.json")
+    parser.add_argument("--settings", default="settings.json", help="settings file (capital / risk)")
+    parser.add_argument("--db", help="write the trade log to this trades database")
+    parser.add_argument("--no-risk", action="store_true", help="disable RiskManager stop-loss / profit target")
+    args = parser.parse_args()
+
+    settings = SettingsManager(args.settings)
+    stocks = stocks_from_csv(args.csv) if args.csv else settings.get_stock_configs()
+    stocks = [s for s in stocks if s.get("enabled", False)]
+    if not stocks:
+        print("❌ No enabled stocks configured")
+        return 1
+
+    store = CandleWarehouse(args.warehouse) if args.warehouse else CandleStore(args.candles)
+    frame = MarketFrame.from_store(store, stocks)
+    missing = len(stocks) - len(frame.keys)
+    print(f"📊 {len(frame.keys)} symbols x {len(frame.timeline):,} bars"
+          + (f" ({missing} without stored candles)" if missing else ""))
+    if not frame.keys:
+        return 1
+
+    result = Backtester(stocks, settings, use_risk=not args.no_risk).run(frame)
+    for name, value in result.summary().items():
+        print(f"   {name:<18} {value}")
+
+    if args.db:
+        from database.trades_db import TradesDatabase
+        db = TradesDatabase(os.path.abspath(args.db))
+        try:
+            write_trades(db, result.trades)
+            print(f"📝 {len(result.trades)} trades written to {args.db}")
+        finally:
+            db.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+"""
+Parameter sweep runner
+Backtests a grid (or random sample) of RSI buy/sell thresholds, profit
+targets and timeframes over the stored candles in a process pool, writes
+every result to a columnar file and prints the best combinations by net
+P&L after fees.
+
+Usage: python _dev_tools/run_sweep.py --candles data/candles | --warehouse database/candles --buy 25,30,35 --sell 65,70,75 [--target 5,10] [--timeframe 15T,1H] [--samples 50] [--per-symbol] [--workers 4] [--out sweep.npz]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import backtest_sweep
+from backtest_engine import CandleStore, stocks_from_csv
+from candle_warehouse import CandleWarehouse
+from settings_manager import SettingsManager
+
+
+def _values(text, cast=float):
+    return [cast(v) for v in text.split(",")] if text else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parallel RSI / profit-target parameter sweep")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--candles", help="candle store root directory")
+    source.add_argument("--warehouse", help="candle warehouse root (e.g. database/candles)")
+    parser.add_argument("--csv", help="stock configs from config_table.csv instead of settings.json")
+    parser.add_argument("--settings", default="settings.json", help="settings file (capital / risk)")
+    parser.add_argument("--buy", help="buy RSI values, comma separated")
+    parser.add_argument("--sell", help="sell RSI values, comma separated")
+    parser.add_argument("--target", help="profit target %% values, comma separated")
+    parser.add_argument("--timeframe", default="15T", help="timeframes, comma separated")
+    parser.add_argument("--samples", type=int, help="random sample of N combinations instead of the full grid")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--per-symbol", action="store_true", help="backtest each symbol on its own")
+    parser.add_argument("--workers", type=int, help="worker processes (default: CPU count, 1 = in-process)")
+    parser.add_argument("--no-risk", action="store_true", help="disable RiskManager stop-loss / profit target")
+    parser.add_argument("--out", default="sweep_results.npz", help="results file (.npz, or .parquet)")
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    settings = SettingsManager(args.settings)
+    stocks = stocks_from_csv(args.csv) if args.csv else settings.get_stock_configs()
+    stocks = [s for s in stocks if s.get("enabled", False)]
+    if not stocks:
+        print("❌ No enabled stocks configured")
+        return 1
+
+    timeframes = _values(args.timeframe, str)
+    space = {name: values for name, values in (("buy_rsi", _values(args.buy)), ("sell_rsi", _values(args.sell)),
+                                               ("profit_target_pct", _values(args.target)),
+                                               ("timeframe", timeframes if len(timeframes) > 1 else None))
+             if values}
+    combos = (backtest_sweep.random_samples(space, args.samples, args.seed) if args.samples
+              else backtest_sweep.grid(space))
+    print(f"🔎 {len(combos)} combinations x {len(stocks)} stocks"
+          + (" (per symbol)" if args.per_symbol else ""))
+
+    store = CandleWarehouse(args.warehouse) if args.warehouse else CandleStore(args.candles)
+    with tempfile.TemporaryDirectory(prefix="sweep_") as directory:
+        frames = backtest_sweep.prepare_frames(store, stocks, timeframes)
+        backtest_sweep.SharedFrames.publish(frames, directory)
+        for tf, frame in frames.items():
+            print(f"📊 {tf}: {len(frame.keys)} symbols x {len(frame.timeline):,} bars")
+        df = backtest_sweep.run_sweep(directory, stocks, combos, settings.settings, per_symbol=args.per_symbol,
+                                      workers=args.workers, use_risk=not args.no_risk,
+                                      default_timeframe=timeframes[0])
+
+    path = backtest_sweep.write_results(df, args.out)
+    print(f"📝 {len(df)} results written to {path} in {df.attrs['elapsed_s']}s")
+    print(backtest_sweep.rank(df, top=args.top).drop(columns=["task"]).to_string(index=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -9,6 +9,7 @@ def sync_trades():
     print("🔄 Starting Trade Sync (Broker -> DB)...")
     
     # 1. Ensure Authentication
+    kickstart.initialize()
     if not kickstart.ACCESS_TOKEN:
         print("🔑 refreshing token...")
         if not kickstart.handle_token_exception_and_refresh_token():
@@ -15,10 +15,9 @@ print("🚀 Starting Connectivity Verification...")
 sys.path.append(os.getcwd())
 
 try:
-    # Import specific components from kickstart to avoid auto-running main setup if possible
-    # But kickstart has top-level code. We must be careful.
-    # We will import the module, hoping it doesn't crash on import.
+    # Importing kickstart has no side effects; initialize() loads settings, credentials and the DB
     import kickstart
+    kickstart.initialize()
     print("✅ kickstart module imported successfully.")
 except Exception as e:
     print(f"❌ Failed to import kickstart: {e}")
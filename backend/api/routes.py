@@ -1,7 +1,9 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Header, Request
+from fastapi.responses import StreamingResponse
 from backend.bot_manager import bot_manager
 from backend.auth import (
     get_current_user, 
+    get_stream_user,
     authenticate_user, 
     create_access_token, 
     Token, 
@@ -9,7 +11,7 @@ from backend.auth import (
     ACCESS_TOKEN_EXPIRE_MINUTES
 )
 from typing import List, Optional
-from datetime import timedelta
+from datetime import datetime, timedelta
 import sys
 import os
 
@@ -19,7 +21,8 @@ sys.path.append(os.getcwd())
 # Try to import DB for positions
 try:
     from database.trades_db import TradesDatabase
-    db = TradesDatabase()
+    # API only reads: mode=ro WAL connections, never blocking the engine's writes
+    db = TradesDatabase(readonly=True)
     DB_AVAILABLE = True
 except ImportError:
     DB_AVAILABLE = False
@@ -34,6 +37,22 @@ except ImportError:
     SETTINGS_AVAILABLE = False
     print("⚠️ Settings module not found for API.")
 
+from backend.query_cache import QueryCache
+from backend.event_stream import sse_events
+
+# Dashboard polls are served from here until the trades table changes
+api_cache = QueryCache(
+    version_fn=db.get_data_version if DB_AVAILABLE else (lambda: None),
+    ttl=float(settings.get("app_settings.api_cache_ttl_seconds", 10)) if SETTINGS_AVAILABLE else 10.0,
+)
+
+
+def _records(df) -> List[dict]:
+    """DataFrame -> JSON-safe list of dicts (NaN -> None)"""
+    if df is None or df.empty:
+        return []
+    return df.astype(object).where(df.notna(), None).to_dict("records")
+
 router = APIRouter()
 
 
@@ -86,9 +105,43 @@ def get_status(current_user: str = Depends(get_current_user)):
 
 
 @router.get("/logs")
-def get_logs(limit: int = 50, current_user: str = Depends(get_current_user)):
-    """Get recent log entries"""
-    return {"logs": bot_manager.get_logs(limit)}
+def get_logs(limit: int = 50, since: Optional[int] = None, level: Optional[str] = None,
+             symbol: Optional[str] = None, current_user: str = Depends(get_current_user)):
+    """
+    Get log entries. Latest ``limit`` by default; with ``since`` (a record id)
+    the next ``limit`` after it, so ``cursor`` can be passed back to page forward.
+    """
+    limit = max(1, min(limit, 1000))
+    records = bot_manager.query_logs(limit=limit, since=since, level=level, symbol=symbol)
+    cursor = records[-1]["id"] if records else (since if since is not None else bot_manager.log_store.last_id)
+    return {"logs": [r["message"] for r in records], "records": records, "cursor": cursor}
+
+
+def _stream_snapshot() -> dict:
+    """Initial/reset state for a stream client; later changes arrive as events"""
+    positions = []
+    if DB_AVAILABLE:
+        try:
+            positions = api_cache.get(("positions", False), lambda: db.get_open_positions(is_paper=False))
+        except Exception as e:
+            print(f"⚠️ Stream snapshot positions failed: {e}")
+    return {"status": bot_manager.get_status(), "positions": positions, "logs": bot_manager.get_logs(50)}
+
+
+@router.get("/stream")
+async def stream_events(request: Request, since: Optional[int] = None,
+                        last_event_id: Optional[int] = Header(None),
+                        current_user: str = Depends(get_stream_user)):
+    """
+    Server-Sent Events: log, status, cycle and positions events with sequence ids.
+    Resume with ?since=<seq> (or EventSource's Last-Event-ID header).
+    """
+    resume = since if since is not None else last_event_id
+    return StreamingResponse(
+        sse_events(bot_manager.event_bus, resume, _stream_snapshot, request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.get("/positions")
@@ -98,7 +151,7 @@ def get_positions(current_user: str = Depends(get_current_user)):
         return {"error": "Database not available", "positions": []}
     
     try:
-        positions = db.get_open_positions(is_paper=False)
+        positions = api_cache.get(("positions", False), lambda: db.get_open_positions(is_paper=False))
         return {"count": len(positions), "positions": positions}
     except Exception as e:
         return {"error": str(e), "positions": []}
@@ -111,7 +164,9 @@ def get_pnl(current_user: str = Depends(get_current_user)):
         return {"error": "Database not available", "pnl": 0, "trades_count": 0}
     
     try:
-        today_trades = db.get_today_trades(is_paper=False)
+        today = datetime.now().date().isoformat()
+        today_trades = api_cache.get(("today_trades", today, False),
+                                     lambda: _records(db.get_today_trades(is_paper=False)))
         total_pnl = sum(t.get('pnl_net', 0) if t.get('pnl_net') is not None else 0 for t in today_trades if t.get('action') == 'SELL')
         profitable_trades = sum(1 for t in today_trades if t.get('action') == 'SELL' and (t.get('pnl_net', 0) or 0) > 0)
         
@@ -133,7 +188,8 @@ def get_trade_history(days: int = 7, current_user: str = Depends(get_current_use
     
     try:
         # Get trade history from database
-        trades = db.get_recent_trades(limit=100, is_paper=False)
+        trades = api_cache.get(("recent_trades", 100, False),
+                               lambda: db.get_recent_trades(limit=100, is_paper=False))
         
         # Build cumulative P&L series for charts
         pnl_series = []
@@ -172,7 +228,7 @@ def get_capital(current_user: str = Depends(get_current_user)):
         # Calculate deployed capital from open positions
         deployed = 0
         if DB_AVAILABLE:
-            positions = db.get_open_positions(is_paper=False)
+            positions = api_cache.get(("positions", False), lambda: db.get_open_positions(is_paper=False))
             deployed = sum(
                 p.get('avg_entry_price', 0) * p.get('net_quantity', 0) 
                 for p in positions
@@ -222,13 +278,14 @@ def debug_test_log(current_user: str = Depends(get_current_user)):
         from kickstart import log_ok
         
         log_ok(f"DEBUG LOG from API (User: {current_user})")
-        
-        queue_size = bot_manager.log_queue.qsize()
-        queue_content = list(bot_manager.log_queue.queue)[-5:]
+        bot_manager.log_pipeline.flush(timeout=1.0)
         
         return {
-            "QUEUE_SIZE": queue_size,
-            "QUEUE_CONTENT": queue_content,
+            "LOG_STORE_SIZE": len(bot_manager.log_store),
+            "LOG_STORE_CONTENT": bot_manager.get_logs(5),
+            "LOG_STORE": bot_manager.log_store.stats,
+            "LOG_PIPELINE": bot_manager.get_log_stats(),
+            "EVENT_STREAM": {"last_seq": bot_manager.event_bus.last_seq, **bot_manager.event_bus.stats},
             "BOT_MANAGER_ID": id(bot_manager),
             "AUTHENTICATED_USER": current_user
         }
@@ -5,7 +5,7 @@ Provides JWT token-based authentication for secure API access
 
 from datetime import datetime, timedelta
 from typing import Optional
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import JWTError, jwt
 from passlib.context import CryptContext
@@ -173,3 +173,29 @@ async def get_current_user_optional(
         return None
     
     return token_data.username
+
+
+# Streaming endpoints: browser EventSource cannot set headers, so the token
+# may also arrive as ?token=...
+async def get_stream_user(
+    token: Optional[str] = Query(None),
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(
+        HTTPBearer(auto_error=False)
+    )
+) -> str:
+    """
+    Authentication dependency for Server-Sent Events.
+    Accepts a Bearer header or a ``token`` query parameter.
+
+    Raises:
+        HTTPException: If no valid token is supplied
+    """
+    raw = credentials.credentials if credentials is not None else token
+    token_data = decode_token(raw) if raw else None
+    if token_data is None or (token_data.exp and token_data.exp < datetime.utcnow()):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired authentication token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return token_data.username
@@ -1,7 +1,6 @@
 import threading
 import time
 import logging
-import queue
 from datetime import datetime
 import traceback
 import sys
@@ -10,8 +9,13 @@ import os
 # Add project root to path to import kickstart
 sys.path.append(os.getcwd())
 
+from log_pipeline import LogPipeline
+from log_store import LogStore
+from backend.event_stream import event_bus
+
 try:
-    from kickstart import run_cycle, set_log_callback, request_stop, reset_stop_flag, setup_logging
+    from kickstart import (build_engine_scheduler, run_scheduled_cycle, set_log_callback, request_stop,
+                           reset_stop_flag, setup_logging, CYCLE_TIMINGS)
     KICKSTART_AVAILABLE = True
 except ImportError:
     KICKSTART_AVAILABLE = False
@@ -33,10 +37,26 @@ class BotManager:
         self.running = False
         self.thread = None
         self.stop_event = threading.Event()
-        self.log_queue = queue.Queue(maxsize=200) # Keep last 200 logs in memory
+        self.log_store = LogStore(capacity=2000) # Structured records for /api/logs (cursor + filters)
+        self.capture_path = "debug_log_capture.txt"
+        self.echo_console = True
+
+        # Log lines are handed to a background writer; the trading thread never
+        # touches the console, the capture file or the log store itself.
+        self.log_pipeline = LogPipeline(name="bot-log-writer")
+        self.log_pipeline.add_sink("console", self._write_console)
+        self.log_pipeline.add_sink("file", self._write_capture_file)
+        self.log_pipeline.add_sink("memory", self._publish_lines)
+        # Push channel for /api/stream: log lines, status changes, cycles, position deltas
+        self.event_bus = event_bus
+        self.log_pipeline.add_sink("stream", self._stream_lines)
+        self.log_pipeline.start()
         self.status = "STOPPED" # STOPPED, RUNNING, ERROR
         self.last_cycle_time = None
+        self.scheduler = None # EngineScheduler of the running loop (next wakes)
         self.start_time = None
+        self._positions = {}          # "SYMBOL:EXCHANGE" -> last published position
+        self._positions_version = None
         
         # Hook into kickstart logging
         if KICKSTART_AVAILABLE:
@@ -45,22 +65,63 @@ class BotManager:
         self.initialized = True
 
     def log_capture(self, msg):
-        """Callback to capture logs from kickstart"""
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        log_entry = f"[{timestamp}] {msg.strip()}"
-        
+        """Callback to capture logs from kickstart (non-blocking, see LogPipeline)"""
+        self.log_pipeline.submit(msg)
+
+    def _write_console(self, lines):
         # Print to console for dev visibility
-        print(log_entry)
-        
+        if self.echo_console:
+            sys.stdout.write("\n".join(lines) + "\n")
+            sys.stdout.flush()
+
+    def _write_capture_file(self, lines):
+        with open(self.capture_path, "a", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+
+    def _publish_lines(self, lines):
+        """Append to the in-memory log store; returns records overwritten by the ring."""
+        return self.log_store.extend(lines)
+
+    def _stream_lines(self, lines):
+        for line in lines:
+            self.event_bus.publish("log", line)
+
+    def _set_status(self, status):
+        self.status = status
         try:
-            with open("debug_log_capture.txt", "a", encoding="utf-8") as f:
-                f.write(f"{log_entry}\n")
-            
-            if self.log_queue.full():
-                self.log_queue.get_nowait()
-            self.log_queue.put(log_entry)
+            self.event_bus.publish("status", self.get_status())
         except Exception as e:
-            print(f"❌ log_capture Queue Error: {e}")
+            print(f"⚠️ Status event failed: {e}")
+
+    def _publish_cycle(self, tick=None):
+        """Cycle-complete event, then position deltas if the trades table changed"""
+        self.event_bus.publish("cycle", {
+            "last_cycle": self.last_cycle_time.isoformat() if self.last_cycle_time else None,
+            "timings": dict(CYCLE_TIMINGS),
+            "timeframes": sorted(tick.timeframes) if tick else None,
+            "risk": tick.risk if tick else None,
+            "next_wakes": self.scheduler.next_wakes() if self.scheduler else {},
+        })
+        self._publish_position_deltas()
+
+    def _publish_position_deltas(self):
+        """Publish only changed/closed positions; skipped while the trades version is unchanged"""
+        trades_db = getattr(sys.modules.get("kickstart"), "db", None)
+        if trades_db is None:
+            return
+        version = trades_db.get_data_version()
+        if version is not None and version == self._positions_version:
+            return
+        current = {f"{p['symbol']}:{p['exchange']}": p for p in trades_db.get_open_positions(is_paper=False)}
+        changed = {k: v for k, v in current.items() if self._positions.get(k) != v}
+        removed = [k for k in self._positions if k not in current]
+        self._positions, self._positions_version = current, version
+        if changed or removed:
+            self.event_bus.publish("positions", {"changed": changed, "removed": removed})
+
+    def get_log_stats(self):
+        """Back-pressure counters for the log pipeline (dropped / evicted / sink errors)"""
+        return self.log_pipeline.snapshot()
 
     def start_bot(self):
         try:
@@ -87,8 +148,8 @@ class BotManager:
             set_log_callback(self.log_capture)
 
             self.running = True
-            self.status = "RUNNING"
             self.start_time = datetime.now()
+            self._set_status("RUNNING")
             
             # Reset kickstart stop flag if it controls internal state
             reset_stop_flag()
@@ -110,7 +171,7 @@ class BotManager:
                  with open("panic.log", "a") as f: f.write(f"{datetime.now()} - {msg}\n")
             except: pass
             self.running = False
-            self.status = "ERROR"
+            self._set_status("ERROR")
             return {"status": "error", "message": str(e)}
 
     def stop_bot(self):
@@ -118,7 +179,7 @@ class BotManager:
             return {"status": "error", "message": "Bot is not running"}
 
         self.log_capture("🛑 Stop Command Received...")
-        self.status = "STOPPING"
+        self._set_status("STOPPING")
         self.stop_event.set()
         
         # Signal kickstart directly
@@ -126,34 +187,35 @@ class BotManager:
         
         # Thread will join in the background or logic will break loop
         self.running = False
-        self.status = "STOPPED"
+        self._set_status("STOPPED")
         self.log_capture("🛑 Bot Engine Stopped")
+        self.log_pipeline.flush(timeout=2.0)
         return {"status": "success", "message": "Bot stopped"}
 
     def _run_loop(self):
-        """Main Thread Loop"""
+        """Main Thread Loop: one cycle per scheduler tick (bar closes + risk cadence)"""
         try:
              with open("panic.log", "a") as f: f.write(f"{datetime.now()} - Thread STARTED\n")
         except: pass
 
-        while not self.stop_event.is_set():
+        self.scheduler = build_engine_scheduler()
+
+        def cycle(tick):
+            self.log_capture("💓 Bot Loop Heartbeat")
+            self.last_cycle_time = datetime.now()
+            # Run one trading cycle (only the timeframe groups whose bar closed)
+            run_scheduled_cycle(tick)
             try:
-                self.log_capture("💓 Bot Loop Heartbeat")
-                self.last_cycle_time = datetime.now()
-                # Run one trading cycle
-                run_cycle()
-                
-                # Sleep between cycles (prevent CPU spin)
-                # kickstart might have its own sleeps, but safely waiting here is good
-                for _ in range(50): # 5 seconds wait, interruptible
-                    if self.stop_event.is_set():
-                        break
-                    time.sleep(0.1)
-                    
+                self._publish_cycle(tick)
             except Exception as e:
-                self.log_capture(f"❌ CRITICAL ERROR in Bot Loop: {e}")
-                traceback.print_exc()
-                time.sleep(5) # Wait before retry on error
+                self.log_capture(f"⚠️ Stream publish failed: {e}")
+
+        def on_error(e):
+            self.log_capture(f"❌ CRITICAL ERROR in Bot Loop: {e}")
+            traceback.print_exc()
+            self.stop_event.wait(5) # Wait before retry on error
+
+        self.scheduler.run(cycle, self.stop_event.is_set, on_error)
 
     def get_status(self):
         uptime = "0s"
@@ -161,27 +223,25 @@ class BotManager:
             delta = datetime.now() - self.start_time
             uptime = str(delta).split('.')[0]
 
+        # In-memory counters: built on every status change, so no state-file I/O here
         from state_manager import state as state_mgr
-        counters = state_mgr.get_trade_counters()
+        counters = state_mgr.peek_trade_counters()
 
         return {
             "status": self.status,
             "running": self.running,
             "uptime": uptime,
             "last_cycle": self.last_cycle_time.isoformat() if self.last_cycle_time else None,
+            "next_wakes": self.scheduler.next_wakes() if self.scheduler else {},
             "counters": counters
         }
 
     def get_logs(self, limit=50):
         """Get recent logs"""
-        logs = []
-        try:
-            # We don't want to empty the queue, just read it
-            # This is a bit inefficient for a queue, but Python Queue doesn't support peeking
-            # For a production system we might use a list with a lock or deque
-            pass 
-        except:
-            pass
-        return list(self.log_queue.queue)[-limit:]
+        return [r["message"] for r in self.log_store.query(limit=limit)]
+
+    def query_logs(self, limit=50, since=None, level=None, symbol=None):
+        """Structured log records after cursor ``since`` filtered by level/symbol (oldest first)"""
+        return self.log_store.query(since=since, level=level, symbol=symbol, limit=limit)
 
 bot_manager = BotManager()
@@ -0,0 +1,116 @@
+"""
+Event Stream for ARUN Trading Bot API
+Sequence-numbered event bus (logs, positions, cycles, status) that the
+engine/log threads publish to and Server-Sent Events clients follow.
+"""
+
+import asyncio
+import json
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+DEFAULT_BACKLOG = 2000        # events kept for clients resuming from a sequence number
+KEEPALIVE_SECONDS = 15.0      # comment line sent when idle (keeps proxies from closing)
+
+
+class EventBus:
+    """
+    Bounded, in-memory event log. ``publish()`` is thread-safe and cheap;
+    async subscribers are woken through their own event loop.
+    A client that fell further behind than the backlog gets a ``reset``.
+    """
+
+    def __init__(self, backlog: int = DEFAULT_BACKLOG):
+        self._events: deque = deque(maxlen=backlog)
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Event]] = []
+        self.stats = {"published": 0, "resets": 0}
+
+    @property
+    def last_seq(self) -> int:
+        return self._seq
+
+    def publish(self, event_type: str, data: Any) -> int:
+        """Append an event; returns its sequence number."""
+        with self._lock:
+            self._seq += 1
+            self._events.append({"seq": self._seq, "type": event_type, "ts": time.time(), "data": data})
+            waiters, self._waiters = self._waiters, []
+            self.stats["published"] += 1
+            seq = self._seq
+        for loop, event in waiters:
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                pass  # loop already closed (client gone)
+        return seq
+
+    def since(self, seq: int) -> Tuple[List[dict], bool]:
+        """
+        Events after ``seq`` and whether some were already evicted
+        (the caller then needs a fresh snapshot).
+        """
+        with self._lock:
+            if not self._events or seq >= self._seq:
+                return [], False
+            oldest = self._events[0]["seq"]
+            gap = seq < oldest - 1
+            start = max(0, seq - oldest + 1)
+            return [self._events[i] for i in range(start, len(self._events))], gap
+
+    async def wait(self, seq: int, timeout: float) -> bool:
+        """Wait until an event newer than ``seq`` exists. False on timeout."""
+        event = asyncio.Event()
+        with self._lock:
+            if self._seq > seq:
+                return True
+            self._waiters.append((asyncio.get_running_loop(), event))
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            with self._lock:
+                self._waiters = [w for w in self._waiters if w[1] is not event]
+            return False
+
+
+def format_sse(event: dict) -> str:
+    """One SSE frame; ``id`` lets EventSource resume with Last-Event-ID."""
+    payload = json.dumps({"seq": event["seq"], "ts": event["ts"], "data": event["data"]}, default=str)
+    return f"id: {event['seq']}\nevent: {event['type']}\ndata: {payload}\n\n"
+
+
+async def sse_events(bus: EventBus, since: Optional[int],
+                     snapshot: Callable[[], Dict[str, Any]],
+                     is_disconnected: Callable[[], Awaitable[bool]],
+                     keepalive: float = KEEPALIVE_SECONDS):
+    """
+    SSE frames for one client. A new client (``since`` None) gets a
+    ``snapshot`` event and then live events; a resuming client gets the
+    missed events, or a ``reset`` snapshot if the backlog no longer covers them.
+    """
+    if since is None or since > bus.last_seq:
+        last = bus.last_seq
+        yield format_sse({"seq": last, "type": "snapshot", "ts": time.time(), "data": snapshot()})
+    else:
+        last = since
+
+    while not await is_disconnected():
+        events, gap = bus.since(last)
+        if gap:
+            bus.stats["resets"] += 1
+            last = bus.last_seq
+            yield format_sse({"seq": last, "type": "reset", "ts": time.time(), "data": snapshot()})
+            continue
+        for event in events:
+            last = event["seq"]
+            yield format_sse(event)
+        if not events and not await bus.wait(last, keepalive):
+            yield ": keepalive\n\n"
+
+
+# Shared bus for the API process
+event_bus = EventBus()
@@ -67,7 +67,8 @@ def read_root():
             "capital": "GET /api/capital",
             "start": "POST /api/control/start",
             "stop": "POST /api/control/stop",
-            "logs": "GET /api/logs"
+            "logs": "GET /api/logs",
+            "stream": "GET /api/stream (Server-Sent Events)"
         }
     }
 
@@ -98,6 +99,7 @@ async def shutdown_event():
     print("🛑 API Server Shutting Down...")
     if bot_manager.running:
         bot_manager.stop_bot()
+    bot_manager.log_pipeline.stop()
 
 
 # Rate limiting for critical endpoints
@@ -0,0 +1,77 @@
+"""
+Query Cache for ARUN Trading Bot API
+Short-TTL result cache for dashboard endpoints, invalidated as soon as the
+trades table changes, so N polling viewers cost one query per change.
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class QueryCache:
+    """
+    Caches ``compute()`` results per key.
+
+    An entry is served while it is younger than ``ttl`` seconds AND the data
+    version (``version_fn()``, e.g. the trades change counter) is unchanged.
+    A version of None (no counter available) falls back to TTL only.
+    Concurrent misses on the same key run ``compute()`` once (single-flight).
+    """
+
+    def __init__(self, version_fn: Callable[[], Optional[int]], ttl: float = 10.0):
+        self.version_fn = version_fn
+        self.ttl = ttl
+        self._entries: Dict[Hashable, Tuple[Optional[int], float, Any]] = {}
+        self._key_locks: Dict[Hashable, threading.Lock] = {}
+        self._guard = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "version_errors": 0}
+
+    def _current_version(self) -> Optional[int]:
+        try:
+            return self.version_fn()
+        except Exception:
+            self.stats["version_errors"] += 1
+            return None
+
+    def _fresh(self, entry, version) -> bool:
+        if entry is None:
+            return False
+        entry_version, stored_at, _ = entry
+        return entry_version == version and time.monotonic() - stored_at < self.ttl
+
+    def _lock_for(self, key) -> threading.Lock:
+        with self._guard:
+            lock = self._key_locks.get(key)
+            if lock is None:
+                lock = self._key_locks[key] = threading.Lock()
+            return lock
+
+    def get(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Cached result for ``key``, recomputed after a data change or TTL expiry."""
+        if self.ttl <= 0:
+            return compute()
+        version = self._current_version()
+        entry = self._entries.get(key)
+        if self._fresh(entry, version):
+            self.stats["hits"] += 1
+            return entry[2]
+
+        with self._lock_for(key):
+            # Another request may have refreshed it while we waited
+            entry = self._entries.get(key)
+            if self._fresh(entry, version):
+                self.stats["hits"] += 1
+                return entry[2]
+            self.stats["misses"] += 1
+            value = compute()
+            self._entries[key] = (version, time.monotonic(), value)
+            return value
+
+    def invalidate(self, key: Optional[Hashable] = None):
+        """Drop one key, or everything when ``key`` is None."""
+        with self._guard:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
@@ -0,0 +1,443 @@
+"""
+Backtest Engine for ARUN Trading Bot
+Replays stored candles through the live decision rules (trade_rules,
+RiskManager.evaluate_position, NiftySIPStrategy.should_buy) with the CNC fee
+model, producing trade logs in the TradesDatabase ``trades`` schema.
+"""
+
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+import rsi_kernel
+import trade_rules
+from risk_manager import RiskManager
+from strategies.nifty_sip import NiftySIPStrategy
+
+Key = Tuple[str, str]  # (symbol, exchange)
+
+# Column order of the trades table rows produced by a backtest
+TRADE_COLUMNS = (
+    "timestamp", "symbol", "exchange", "action", "quantity", "price",
+    "gross_amount", "brokerage_fee", "stt_fee", "exchange_fee",
+    "gst_fee", "sebi_fee", "stamp_duty_fee", "total_fees", "net_amount",
+    "strategy", "reason", "broker", "source", "rsi",
+    "pnl_gross", "pnl_net", "pnl_pct_gross", "pnl_pct_net",
+)
+FEE_COLUMNS = {
+    "brokerage": "brokerage_fee", "stt": "stt_fee", "exchange_charges": "exchange_fee",
+    "gst": "gst_fee", "sebi_charges": "sebi_fee", "stamp_duty": "stamp_duty_fee",
+}
+
+
+class StaticSettings:
+    """Dot-notation ``get()`` over a plain dict (SettingsManager stand-in for backtests)."""
+
+    def __init__(self, data: Optional[dict] = None):
+        self.settings = data or {}
+
+    def get(self, key_path: str, default=None):
+        value = self.settings
+        for key in key_path.split("."):
+            if isinstance(value, dict) and key in value:
+                value = value[key]
+            else:
+                return default
+        return value
+
+
+# ---------------- Candle Store ----------------
+
+class CandleStore:
+    """
+    Local candle files, one per symbol and timeframe:
+    ``<root>/<EXCHANGE>/<SYMBOL>_<timeframe>.parquet`` (or ``.csv``) with a
+    ``timestamp`` column and open/high/low/close[/volume].
+    Any object with the same ``load()`` can stand in (e.g. a broker history client).
+    """
+
+    EXTENSIONS = (".parquet", ".csv")
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def path_for(self, symbol: str, exchange: str, timeframe: str, ext: str = ".csv") -> str:
+        return os.path.join(self.root, exchange.upper(), f"{symbol.upper()}_{timeframe}{ext}")
+
+    def load(self, symbol: str, exchange: str, timeframe: str) -> Optional[pd.DataFrame]:
+        """Candles indexed by timestamp (ascending), or None if nothing is stored."""
+        for ext in self.EXTENSIONS:
+            path = self.path_for(symbol, exchange, timeframe, ext)
+            if os.path.exists(path):
+                df = pd.read_parquet(path) if ext == ".parquet" else pd.read_csv(path)
+                df["timestamp"] = pd.to_datetime(df["timestamp"])
+                return df.set_index("timestamp").sort_index()
+        return None
+
+    def save(self, symbol: str, exchange: str, timeframe: str, df: pd.DataFrame, fmt: str = "csv") -> str:
+        path = self.path_for(symbol, exchange, timeframe, f".{fmt}")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        out = df.rename_axis("timestamp").reset_index()
+        if fmt == "parquet":
+            out.to_parquet(path, index=False)
+        else:
+            out.to_csv(path, index=False)
+        return path
+
+
+class MarketFrame:
+    """
+    Candles of many symbols aligned on one timeline: ``close[S, T]`` (NaN where a
+    symbol has no bar) and ``rsi[S, T]``. RSI is precomputed once per symbol over
+    its own bars with rsi_kernel, the same kernel the live engine uses.
+    """
+
+    def __init__(self, keys: Sequence[Key], timeline: pd.DatetimeIndex, close: np.ndarray, rsi: np.ndarray):
+        self.keys = list(keys)
+        self.timeline = timeline
+        self.close = close
+        self.rsi = rsi
+
+    @classmethod
+    def from_candles(cls, candles: Dict[Key, pd.DataFrame], rsi_period: int = 14) -> "MarketFrame":
+        keys = [k for k, df in candles.items() if df is not None and not df.empty]
+        # datetime64[ns] ints whatever unit the index was built with (pandas 3 defaults to us)
+        stamps = [np.asarray(candles[k].index.values, dtype="datetime64[ns]").view(np.int64) for k in keys]
+        timeline_ns = np.unique(np.concatenate(stamps)) if stamps else np.empty(0, dtype=np.int64)
+        close = np.full((len(keys), len(timeline_ns)), np.nan)
+        rsi = np.full_like(close, np.nan)
+        for row, (key, ns) in enumerate(zip(keys, stamps)):
+            values = rsi_kernel.as_float_array(candles[key]["close"])
+            cols = np.searchsorted(timeline_ns, ns)
+            close[row, cols] = values
+            rsi[row, cols] = rsi_kernel.rsi(values, rsi_period)
+        return cls(keys, pd.DatetimeIndex(timeline_ns.view("datetime64[ns]")), close, rsi)
+
+    @classmethod
+    def from_store(cls, store, stocks: Sequence[dict], rsi_period: int = 14) -> "MarketFrame":
+        candles = {}
+        for stock in stocks:
+            rule = stock_rule(stock)
+            candles[rule["key"]] = store.load(rule["key"][0], rule["key"][1], rule["Timeframe"])
+        return cls.from_candles(candles, rsi_period)
+
+
+def stock_rule(stock: dict) -> dict:
+    """settings.json ``stocks`` entry -> the config_dict fields process_market_data reads."""
+    strategy = stock.get("strategy")
+    if not isinstance(strategy, str) or not strategy.strip():
+        strategy = "TRADE"
+    return {
+        "key": (str(stock.get("symbol", "")).upper(), str(stock.get("exchange", "NSE")).upper()),
+        "Timeframe": stock.get("timeframe", "15T"),
+        "RSI_Buy_Threshold": float(stock.get("buy_rsi", 30)),
+        "RSI_Sell_Threshold": float(stock.get("sell_rsi", 70)),
+        "Ignore_RSI": bool(stock.get("Ignore_RSI", False)),
+        "Quantity": int(stock.get("quantity", 0)),
+        "Strategy": strategy.upper(),
+    }
+
+
+def stocks_from_csv(csv_path: str) -> List[dict]:
+    """config_table.csv rows in settings.json ``stocks`` form."""
+    from settings_manager import SettingsManager
+    return [SettingsManager.csv_row_to_stock(row) for _, row in pd.read_csv(csv_path).iterrows()]
+
+
+# ---------------- Simulated Broker ----------------
+
+class SimBroker:
+    """
+    Fills market orders at the bar close and keeps the books the live engine
+    decides from: broker positions (weighted average price) and the
+    TradesDatabase positions ledger (average of buy prices, lifetime
+    total_invested) used by RiskManager and the capital check.
+    """
+
+    def __init__(self, cash: float = 0.0, broker_name: str = "BACKTEST"):
+        self.cash = cash
+        self.broker_name = broker_name
+        self.holdings: Dict[Key, List[float]] = {}  # key -> [qty, avg_price]
+        self.ledger: Dict[Key, List[float]] = {}  # key -> [net_qty, buy_count, buy_price_sum, total_invested]
+        self.last_buy: Dict[str, Tuple[float, float, int]] = {}  # symbol -> (price, net_amount, qty)
+        self.trades: List[tuple] = []
+        self._open_ledger = set()  # keys with net_qty > 0 (capital check sums only these)
+        self._held_symbols: Dict[str, int] = {}  # symbol -> exchanges holding it
+
+    def quantity(self, key: Key) -> int:
+        holding = self.holdings.get(key)
+        return int(holding[0]) if holding else 0
+
+    def avg_price(self, key: Key) -> float:
+        holding = self.holdings.get(key)
+        return holding[1] if holding else 0.0
+
+    def holds_symbol(self, symbol: str) -> bool:
+        return symbol in self._held_symbols
+
+    def ledger_entry(self, key: Key) -> Tuple[int, float]:
+        """(net_quantity, avg_entry_price) as get_open_positions reports them."""
+        net_qty, buy_count, buy_price_sum, _ = self.ledger.get(key, (0, 0, 0.0, 0.0))
+        return int(net_qty), (buy_price_sum / buy_count if buy_count else 0.0)
+
+    def used_capital(self) -> float:
+        """check_capital_safety: total_invested summed over open ledger positions."""
+        return sum(self.ledger[key][3] for key in self._open_ledger)
+
+    def execute(self, key: Key, side: str, qty: int, price: float, stamp: datetime,
+                strategy: str, reason: str, rsi: float = 0.0) -> tuple:
+        """Fill an order and append its trades-table row (rounded like the live trade logger)."""
+        symbol, exchange = key
+        side = side.upper()
+        price = round(price, 2)
+        gross = round(price * qty, 2)
+        fees, breakdown = trade_rules.cnc_fees(gross, side)
+        net = round(trade_rules.net_amount(gross, fees, side), 2)
+        fees = round(fees, 2)
+
+        pnl = {"pnl_gross": None, "pnl_net": None, "pnl_pct_gross": None, "pnl_pct_net": None}
+        ledger = self.ledger.setdefault(key, [0, 0, 0.0, 0.0])
+        holding = self.holdings.get(key)
+        if side == "BUY":
+            if holding:
+                total = holding[0] + qty
+                holding[1] = (holding[0] * holding[1] + qty * price) / total
+                holding[0] = total
+            else:
+                self.holdings[key] = [qty, price]
+                self._held_symbols[symbol] = self._held_symbols.get(symbol, 0) + 1
+            ledger[0] += qty
+            ledger[1] += 1
+            ledger[2] += price
+            ledger[3] += net
+            self.last_buy[symbol] = (price, net, qty)
+            self.cash -= net
+        else:
+            if symbol in self.last_buy:
+                buy_price, buy_net, buy_qty = self.last_buy[symbol]
+                pnl = trade_rules.trade_pnl(buy_price, buy_net, buy_qty, price, net, qty)
+            holding[0] -= qty
+            if holding[0] <= 0:
+                del self.holdings[key]
+                self._held_symbols[symbol] -= 1
+                if not self._held_symbols[symbol]:
+                    del self._held_symbols[symbol]
+            ledger[0] -= qty
+            self.cash += net
+        if ledger[0] > 0:
+            self._open_ledger.add(key)
+        else:
+            self._open_ledger.discard(key)
+
+        row = (stamp.isoformat(), symbol, exchange, side, qty, price, gross,
+               *(breakdown[name] for name in FEE_COLUMNS), fees, net,
+               strategy, reason, self.broker_name, "BACKTEST", float(rsi),
+               pnl["pnl_gross"], pnl["pnl_net"], pnl["pnl_pct_gross"], pnl["pnl_pct_net"])
+        self.trades.append(row)
+        return row
+
+
+# ---------------- Backtester ----------------
+
+class BacktestResult:
+    def __init__(self, trades: List[tuple], timeline: pd.DatetimeIndex, equity: np.ndarray,
+                 initial_capital: float, stats: dict):
+        self.trades = trades
+        self.timeline = timeline
+        self.equity = equity
+        self.initial_capital = initial_capital
+        self.stats = stats
+
+    def trades_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(self.trades, columns=list(TRADE_COLUMNS))
+
+    def summary(self) -> dict:
+        sells = [t for t in self.trades if t[3] == "SELL" and t[21] is not None]
+        wins = sum(1 for t in sells if t[21] > 0)
+        final = float(self.equity[-1]) if len(self.equity) else self.initial_capital
+        peak = np.maximum.accumulate(self.equity) if len(self.equity) else np.array([1.0])
+        drawdown = float(np.max((peak - self.equity) / peak) * 100) if len(self.equity) else 0.0
+        return {
+            "trades": len(self.trades),
+            "buys": sum(1 for t in self.trades if t[3] == "BUY"),
+            "sells": sum(1 for t in self.trades if t[3] == "SELL"),
+            "win_rate_pct": round(wins / len(sells) * 100, 2) if sells else 0.0,
+            "realized_pnl_net": round(sum(t[21] for t in sells), 2),
+            "total_fees": round(sum(t[13] for t in self.trades), 2),
+            "net_pnl": round(final - self.initial_capital, 2),
+            "final_equity": round(final, 2),
+            "return_pct": round((final / self.initial_capital - 1) * 100, 2) if self.initial_capital else 0.0,
+            "max_drawdown_pct": round(drawdown, 2),
+            **self.stats,
+        }
+
+
+class Backtester:
+    """
+    Bar-by-bar replay of one trading cycle per timestamp, in the live order:
+    RiskManager exits for open positions first, then each configured symbol
+    through the process_market_data rules (SIP / RSI sell / RSI buy with the
+    bot-capital and per-trade limits).
+
+    Only symbols that can act on a bar are visited: open positions, SIP
+    symbols, and symbols whose precomputed RSI meets their buy threshold.
+    Every other symbol would fall through process_market_data without an order.
+    """
+
+    def __init__(self, stocks: Sequence[dict], settings=None, broker: Optional[SimBroker] = None,
+                 use_risk: bool = True, quiet: bool = True):
+        self.quiet = quiet
+        self.settings = settings if settings is not None else StaticSettings()
+        self.rules = {}
+        for stock in stocks:
+            if stock.get("enabled", True):
+                rule = stock_rule(stock)
+                self.rules.setdefault(rule["key"], rule)
+        self.allocated_capital = float(self.settings.get("capital.allocated_limit", 50000.0))
+        self.per_trade_pct = float(self.settings.get("capital.per_trade_pct", 10.0))
+        self.never_sell_at_loss = self.settings.get("risk.never_sell_at_loss", False)
+        self.broker = broker or SimBroker(cash=self.allocated_capital)
+        self.risk = RiskManager(self.settings, None, None) if use_risk else None
+        self.sip = NiftySIPStrategy(self.settings)
+        self.stats = {"skipped_capital": 0, "skipped_limit": 0, "risk_exits": 0}
+        self._sip_days: Dict[Key, object] = {}
+        self._last_entry: Dict[Key, float] = {}
+
+    def run(self, frame: MarketFrame) -> BacktestResult:
+        # RiskManager logs every trigger; a replay would flood the console
+        previous = logging.root.manager.disable
+        if self.quiet:
+            logging.disable(logging.CRITICAL)
+        try:
+            return self._replay(frame)
+        finally:
+            logging.disable(previous)
+
+    def _replay(self, frame: MarketFrame) -> BacktestResult:
+        started = time.perf_counter()
+        rows = [i for i, key in enumerate(frame.keys) if key in self.rules]
+        keys = [frame.keys[i] for i in rows]
+        rules = [self.rules[k] for k in keys]
+        close = frame.close[rows]
+        rsi = frame.rsi[rows]
+        n_sym, n_bars = close.shape
+        initial_cash = self.broker.cash
+
+        # Vectorized pre-filter: bars on which a flat symbol could enter
+        buy_thr = np.array([r["RSI_Buy_Threshold"] for r in rules]).reshape(-1, 1)
+        ignore = np.array([r["Ignore_RSI"] for r in rules]).reshape(-1, 1)
+        sip = np.array([r["Strategy"] == "SIP" for r in rules]).reshape(-1, 1)
+        with np.errstate(invalid="ignore"):
+            active = (ignore | sip | (rsi <= buy_thr)) & np.isfinite(close)
+        bar_idx, sym_idx = np.nonzero(active.T)
+        bounds = np.searchsorted(bar_idx, np.arange(n_bars + 1))
+
+        stamps = frame.timeline.to_pydatetime()
+        last_price = np.full(n_sym, np.nan)
+        equity = np.empty(n_bars)
+        held = {s for s in range(n_sym) if self.broker.quantity(keys[s])}
+
+        for t in range(n_bars):
+            stamp = stamps[t]
+            if held:
+                prices = close[list(held), t]
+                for s, price in zip(list(held), prices):
+                    if price == price:
+                        last_price[s] = price
+                if self.risk:
+                    self._risk_exits(keys, close[:, t], rsi[:, t], held, stamp)
+            todo = set(sym_idx[bounds[t]:bounds[t + 1]].tolist())
+            todo.update(held)
+            for s in sorted(todo):
+                self._process(keys[s], rules[s], close[s, t], rsi[s, t], stamp)
+                if self.broker.quantity(keys[s]):
+                    held.add(s)
+                    last_price[s] = close[s, t]
+                else:
+                    held.discard(s)
+            equity[t] = self.broker.cash + sum(self.broker.quantity(keys[s]) * last_price[s] for s in held)
+
+        stats = dict(self.stats, bars=n_bars, symbols=n_sym,
+                     elapsed_ms=round((time.perf_counter() - started) * 1000, 1))
+        return BacktestResult(list(self.broker.trades), frame.timeline, equity, initial_cash, stats)
+
+    def _risk_exits(self, keys, prices, rsis, held, stamp):
+        """run_cycle's RiskManager pass over the ledger's open positions."""
+        for s in sorted(held):
+            price = prices[s]
+            net_qty, entry_price = self.broker.ledger_entry(keys[s])
+            if not price == price or net_qty <= 0 or entry_price <= 0:
+                continue
+            action = self.risk.evaluate_position(keys[s][0], keys[s][1], entry_price, net_qty, price)
+            if action:
+                qty = min(net_qty, self.broker.quantity(keys[s]))
+                if qty > 0:
+                    self.stats["risk_exits"] += 1
+                    self.broker.execute(keys[s], "SELL", qty, price, stamp, self.rules[keys[s]]["Strategy"],
+                                        action["reason"], rsis[s])
+                    if not self.broker.quantity(keys[s]):
+                        held.discard(s)
+
+    def _process(self, key: Key, rule: dict, price: float, rsi: float, stamp: datetime):
+        """process_market_data for one symbol at one bar (orders fill at ``price``)."""
+        if not np.isfinite(price):
+            return
+        if not rsi == rsi:
+            if not rule["Ignore_RSI"]:
+                return  # no RSI yet (warm-up), as when get_stabilized_rsi has no value
+            rsi = 50.0
+        qty = trade_rules.order_quantity(rule["Quantity"], price, self.settings)
+        strategy = rule["Strategy"]
+
+        available = self.broker.quantity(key)
+        if available > 0:
+            self._last_entry[key] = self.broker.avg_price(key)
+        entry_price = self._last_entry.get(key, 0.0)
+
+        if strategy == "SIP":
+            should_buy, reason = self.sip.should_buy(price, entry_price, now=stamp)
+            # One SIP order per day (the live engine skips while today's order exists)
+            if should_buy and self._sip_days.get(key) != stamp.date():
+                self._sip_days[key] = stamp.date()
+                self.broker.execute(key, "BUY", qty, price, stamp, strategy, reason, 0.0)
+            return
+
+        if available > 0 and entry_price > 0:
+            should_sell, reason = trade_rules.rsi_sell_decision(
+                strategy, rsi, rule["RSI_Sell_Threshold"], price, entry_price,
+                self.never_sell_at_loss if strategy == "TRADE" else False)
+            if should_sell:
+                sell_qty = max(0, min(qty, available))
+                if sell_qty > 0:
+                    self.broker.execute(key, "SELL", sell_qty, price, stamp, strategy, reason, rsi)
+                return
+
+        if self.broker.holds_symbol(key[0]):
+            return  # existing position on this or another exchange
+
+        if trade_rules.rsi_buy_signal(rsi, rule["RSI_Buy_Threshold"], rule["Ignore_RSI"]):
+            need_qty = qty - max(0, available)
+            if need_qty <= 0:
+                return
+            required = need_qty * price
+            if self.allocated_capital - self.broker.used_capital() < required:
+                self.stats["skipped_capital"] += 1
+            elif required > trade_rules.trade_limit(self.allocated_capital, self.per_trade_pct):
+                self.stats["skipped_limit"] += 1
+            else:
+                self.broker.execute(key, "BUY", need_qty, price, stamp, strategy,
+                                    f"RSI Buy Signal ({rsi:.1f} <= {rule['RSI_Buy_Threshold']})", rsi)
+
+
+def write_trades(db, trades: Sequence[tuple]) -> int:
+    """Bulk-insert backtest rows into a TradesDatabase and rebuild its positions ledger."""
+    placeholders = ", ".join("?" * len(TRADE_COLUMNS))
+    db.conn.executemany(f"INSERT INTO trades ({', '.join(TRADE_COLUMNS)}) VALUES ({placeholders})", trades)
+    db.conn.commit()
+    db.rebuild_positions()
+    return len(trades)
@@ -0,0 +1,205 @@
+"""
+Backtest Sweep for ARUN Trading Bot
+Grid / random parameter sweeps (RSI thresholds, profit target, timeframe)
+over backtest_engine in a process pool. Candle and RSI arrays are written
+once as .npy files that every worker memory-maps read-only, so tasks carry
+only their parameters.
+"""
+
+import copy
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from backtest_engine import Backtester, MarketFrame, StaticSettings
+
+# Parameters applied to every stock config, and those that live in settings.json
+STOCK_PARAMS = ("buy_rsi", "sell_rsi", "timeframe")
+SETTINGS_PARAMS = {
+    # process_market_data only computes Profit_Target; exits at a target come from RiskManager
+    "profit_target_pct": "risk_controls.default_profit_target_pct",
+    "stop_loss_pct": "risk_controls.default_stop_loss_pct",
+}
+RESULT_METRICS = ("trades", "win_rate_pct", "realized_pnl_net", "net_pnl", "total_fees",
+                  "return_pct", "max_drawdown_pct", "risk_exits")
+
+
+def _valid(params: dict) -> bool:
+    return not ("buy_rsi" in params and "sell_rsi" in params and params["buy_rsi"] >= params["sell_rsi"])
+
+
+def grid(space: Dict[str, Sequence]) -> List[dict]:
+    """Every combination of ``space`` values (buy >= sell combinations dropped)."""
+    names = list(space)
+    combos = (dict(zip(names, values)) for values in itertools.product(*(space[n] for n in names)))
+    return [c for c in combos if _valid(c)]
+
+
+def random_samples(space: Dict[str, Sequence], n: int, seed: int = 0) -> List[dict]:
+    """
+    Up to ``n`` distinct random combinations, drawn without building the full grid
+    (mixed-radix decode of sampled grid indices).
+    """
+    names = list(space)
+    sizes = [len(space[name]) for name in names]
+    total = int(np.prod(sizes, dtype=np.int64))
+    rng = np.random.default_rng(seed)
+    out, seen = [], set()
+    while len(out) < n and len(seen) < total:
+        for index in rng.choice(total, size=min(total, n * 2), replace=False):
+            if index in seen:
+                continue
+            seen.add(index)
+            combo, rest = {}, int(index)
+            for name, size in zip(reversed(names), reversed(sizes)):
+                rest, digit = divmod(rest, size)
+                combo[name] = space[name][digit]
+            combo = {name: combo[name] for name in names}
+            if _valid(combo):
+                out.append(combo)
+                if len(out) == n:
+                    break
+    return out
+
+
+# ---------------- Shared candle arrays ----------------
+
+class SharedFrames:
+    """
+    MarketFrames (one per timeframe) stored as ``<tf>_close.npy``, ``<tf>_rsi.npy``
+    and ``<tf>_timeline.npy`` plus ``keys.json`` in one directory. Workers load
+    them with ``mmap_mode="r"``: the OS page cache holds one copy for all processes.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        with open(os.path.join(directory, "keys.json"), encoding="utf-8") as f:
+            self.keys = {tf: [tuple(k) for k in keys] for tf, keys in json.load(f).items()}
+        self._frames: Dict[str, MarketFrame] = {}
+
+    @classmethod
+    def publish(cls, frames: Dict[str, MarketFrame], directory: str) -> "SharedFrames":
+        os.makedirs(directory, exist_ok=True)
+        for tf, frame in frames.items():
+            np.save(os.path.join(directory, f"{tf}_close.npy"), frame.close)
+            np.save(os.path.join(directory, f"{tf}_rsi.npy"), frame.rsi)
+            np.save(os.path.join(directory, f"{tf}_timeline.npy"),
+                    np.asarray(frame.timeline.values, dtype="datetime64[ns]").view(np.int64))
+        with open(os.path.join(directory, "keys.json"), "w", encoding="utf-8") as f:
+            json.dump({tf: frame.keys for tf, frame in frames.items()}, f)
+        return cls(directory)
+
+    def frame(self, timeframe: str) -> MarketFrame:
+        frame = self._frames.get(timeframe)
+        if frame is None:
+            path = lambda name: os.path.join(self.directory, f"{timeframe}_{name}.npy")
+            timeline = pd.DatetimeIndex(np.load(path("timeline")).view("datetime64[ns]"))
+            frame = MarketFrame(self.keys[timeframe], timeline,
+                                np.load(path("close"), mmap_mode="r"), np.load(path("rsi"), mmap_mode="r"))
+            self._frames[timeframe] = frame
+        return frame
+
+
+def prepare_frames(store, stocks: Sequence[dict], timeframes: Iterable[str],
+                   rsi_period: int = 14) -> Dict[str, MarketFrame]:
+    """One aligned MarketFrame per timeframe, loading every stock at that timeframe."""
+    return {tf: MarketFrame.from_store(store, [dict(s, timeframe=tf) for s in stocks], rsi_period)
+            for tf in timeframes}
+
+
+# ---------------- Workers ----------------
+
+_WORKER: dict = {}
+
+
+def _init_worker(directory: str, stocks: List[dict], settings: dict, use_risk: bool):
+    """Per-process setup: map the shared arrays once, keep the base configs."""
+    _WORKER.update(frames=SharedFrames(directory), stocks=stocks, settings=settings, use_risk=use_risk)
+
+
+def _with_overrides(settings: dict, params: dict) -> StaticSettings:
+    data = copy.deepcopy(settings)
+    for name, key_path in SETTINGS_PARAMS.items():
+        if name in params:
+            node = data
+            *parents, leaf = key_path.split(".")
+            for key in parents:
+                node = node.setdefault(key, {})
+            node[leaf] = params[name]
+    return StaticSettings(data)
+
+
+def _run_task(task) -> dict:
+    task_id, params, symbol, default_tf = task
+    stocks = [dict(s, **{k: params[k] for k in STOCK_PARAMS if k in params})
+              for s in _WORKER["stocks"] if symbol is None or s.get("symbol", "").upper() == symbol]
+    frame = _WORKER["frames"].frame(params.get("timeframe", default_tf))
+    result = Backtester(stocks, _with_overrides(_WORKER["settings"], params),
+                        use_risk=_WORKER["use_risk"]).run(frame)
+    summary = result.summary()
+    row = {"task": task_id, **params, "symbol": symbol or "*"}
+    row.update({m: summary[m] for m in RESULT_METRICS})
+    return row
+
+
+def run_sweep(frames_dir: str, stocks: Sequence[dict], combos: Sequence[dict], settings: Optional[dict] = None,
+              per_symbol: bool = False, workers: Optional[int] = None, use_risk: bool = True,
+              default_timeframe: str = "15T") -> pd.DataFrame:
+    """
+    Backtest every combination. ``per_symbol=False`` runs each combination as one
+    portfolio (shared bot capital); ``True`` runs each symbol on its own, for
+    per-symbol tuning. ``workers`` <= 1 runs in-process.
+    """
+    stocks = [s for s in stocks if s.get("enabled", True)]
+    settings = settings or {}
+    symbols = sorted({s["symbol"].upper() for s in stocks}) if per_symbol else [None]
+    tasks = [(i, combo, symbol, default_timeframe)
+             for i, (combo, symbol) in enumerate(itertools.product(combos, symbols))]
+
+    started = time.perf_counter()
+    initargs = (frames_dir, list(stocks), settings, use_risk)
+    if workers is not None and workers <= 1:
+        _init_worker(*initargs)
+        rows = [_run_task(t) for t in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=initargs) as pool:
+            chunk = max(1, len(tasks) // ((workers or os.cpu_count() or 1) * 4))
+            rows = list(pool.map(_run_task, tasks, chunksize=chunk))
+    df = pd.DataFrame(rows)
+    df.attrs["elapsed_s"] = round(time.perf_counter() - started, 2)
+    return df
+
+
+# ---------------- Results ----------------
+
+def write_results(df: pd.DataFrame, path: str) -> str:
+    """Columnar results file: Parquet for ``.parquet`` (needs pyarrow), else one array per column in ``.npz``."""
+    if path.endswith(".parquet"):
+        df.to_parquet(path, index=False)
+    else:
+        np.savez_compressed(path, **{col: df[col].to_numpy() if pd.api.types.is_numeric_dtype(df[col])
+                                     else df[col].astype(str).to_numpy(dtype=str) for col in df.columns})
+        if not path.endswith(".npz"):
+            path += ".npz"
+    return path
+
+
+def read_results(path: str) -> pd.DataFrame:
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path)
+    with np.load(path) as data:
+        return pd.DataFrame({name: data[name] for name in data.files})
+
+
+def rank(df: pd.DataFrame, by: str = "net_pnl", top: int = 10) -> pd.DataFrame:
+    """Best ``top`` combinations by net P&L after fees (best per symbol in per-symbol sweeps)."""
+    ordered = df.sort_values([by, "max_drawdown_pct"], ascending=[False, True])
+    if "symbol" in ordered and (ordered["symbol"] != "*").any():
+        ordered = ordered.groupby("symbol", sort=False).head(1)
+    return ordered.head(top).reset_index(drop=True)
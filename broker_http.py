@@ -0,0 +1,192 @@
+"""
+Broker HTTP Client for ARUN Trading Bot
+Pooled keep-alive session for all mStock API traffic, with per-endpoint
+timeouts, transport retries and latency histograms.
+"""
+
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Browser-like headers (avoid 403 Forbidden / WAF blocks). Set once on the session.
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Accept": "application/json, text/plain, */*",
+    "Accept-Language": "en-US,en;q=0.9",
+    "Accept-Encoding": "gzip, deflate, br",
+    "Connection": "keep-alive",
+    "Sec-Ch-Ua": '"Not_A Brand";v="8", "Chromium";v="120", "Google Chrome";v="120"',
+    "Sec-Ch-Ua-Mobile": "?0",
+    "Sec-Ch-Ua-Platform": '"Windows"',
+    "Sec-Fetch-Dest": "empty",
+    "Sec-Fetch-Mode": "cors",
+    "Sec-Fetch-Site": "same-site"
+}
+
+DEFAULT_TIMEOUT = (5, 15)  # (connect, read) seconds
+
+# Endpoint prefix -> (connect, read) timeout. Longest matching prefix wins.
+ENDPOINT_TIMEOUTS = {
+    "instruments/quote": (3, 8),
+    "instruments/historical": (5, 30),
+    "orders": (5, 10),
+    "portfolio": (5, 15),
+    "connect": (5, 15),
+    "session": (5, 15),
+}
+
+# Latency histogram bucket upper bounds (milliseconds)
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, float("inf"))
+
+
+def endpoint_of(url: str) -> str:
+    """
+    Stable endpoint name for a broker URL, without exchange/token/ids.
+    .../openapi/typea/instruments/historical/NSE/2885/15minute -> instruments/historical
+    """
+    path = urlsplit(url).path
+    if "/typea/" in path:
+        path = path.split("/typea/", 1)[1]
+    parts = [p for p in path.strip("/").split("/") if p]
+    return "/".join(parts[:2]) or "/"
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram (thread-safe)."""
+
+    def __init__(self):
+        self.counts = [0] * len(LATENCY_BUCKETS_MS)
+        self.count = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, ms: float, error: bool = False):
+        with self._lock:
+            for i, bound in enumerate(LATENCY_BUCKETS_MS):
+                if ms <= bound:
+                    self.counts[i] += 1
+                    break
+            self.count += 1
+            self.total_ms += ms
+            self.max_ms = max(self.max_ms, ms)
+            if error:
+                self.errors += 1
+
+    def percentile(self, pct: float) -> float:
+        """Upper bucket bound containing the given percentile (0 if empty)."""
+        with self._lock:
+            if not self.count:
+                return 0.0
+            target = self.count * pct / 100.0
+            seen = 0
+            for bound, c in zip(LATENCY_BUCKETS_MS, self.counts):
+                seen += c
+                if seen >= target:
+                    return min(bound, self.max_ms)
+            return self.max_ms
+
+    def snapshot(self) -> Dict:
+        p50 = self.percentile(50)
+        p95 = self.percentile(95)
+        with self._lock:
+            return {
+                "count": self.count,
+                "errors": self.errors,
+                "avg_ms": round(self.total_ms / self.count, 2) if self.count else 0.0,
+                "max_ms": round(self.max_ms, 2),
+                "p50_ms": round(p50, 2),
+                "p95_ms": round(p95, 2),
+                "buckets": {
+                    ("inf" if b == float("inf") else str(b)): c
+                    for b, c in zip(LATENCY_BUCKETS_MS, self.counts)
+                },
+            }
+
+
+class BrokerHTTPClient:
+    """
+    Shared requests.Session for the broker API.
+    Connections are pooled and kept alive, so only the first call to a host
+    pays the TCP+TLS handshake. Connect errors and 502/503/504 on idempotent
+    methods are retried by urllib3; order POSTs are never re-sent.
+    """
+
+    def __init__(self, pool_size: int = 20, retries: int = 2, backoff: float = 0.2):
+        self._lock = threading.Lock()
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self.session: Optional[requests.Session] = None
+        self.configure(pool_size=pool_size, retries=retries, backoff=backoff)
+
+    def configure(self, pool_size: int = 20, retries: int = 2, backoff: float = 0.2):
+        """(Re)build the pooled session. Safe to call after settings load."""
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=0,
+            status=retries,
+            backoff_factor=backoff,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset({"GET", "HEAD", "OPTIONS"}),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=retry)
+        session = requests.Session()
+        session.headers.update(DEFAULT_HEADERS)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        with self._lock:
+            old, self.session = self.session, session
+            self.pool_size = pool_size
+            self.retries = retries
+        if old is not None:
+            old.close()
+
+    def timeout_for(self, endpoint: str):
+        best = None
+        for prefix in ENDPOINT_TIMEOUTS:
+            if endpoint.startswith(prefix) and (best is None or len(prefix) > len(best)):
+                best = prefix
+        return ENDPOINT_TIMEOUTS[best] if best else DEFAULT_TIMEOUT
+
+    def _histogram(self, endpoint: str) -> LatencyHistogram:
+        hist = self.histograms.get(endpoint)
+        if hist is None:
+            with self._lock:
+                hist = self.histograms.setdefault(endpoint, LatencyHistogram())
+        return hist
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Same contract as ``requests.request``; exceptions propagate to the caller.
+        Per-call headers are merged over the session's default headers.
+        """
+        endpoint = endpoint_of(url)
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout_for(endpoint)
+        start = time.perf_counter()
+        error = True
+        try:
+            resp = self.session.request(method=method, url=url, **kwargs)
+            error = resp.status_code >= 400
+            return resp
+        finally:
+            self._histogram(endpoint).record((time.perf_counter() - start) * 1000.0, error=error)
+
+    def latency_stats(self) -> Dict[str, Dict]:
+        """Per-endpoint latency histogram snapshots."""
+        return {ep: h.snapshot() for ep, h in list(self.histograms.items())}
+
+    def reset_stats(self):
+        with self._lock:
+            self.histograms = {}
+
+
+# Global instance
+broker_client = BrokerHTTPClient()
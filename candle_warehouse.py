@@ -0,0 +1,278 @@
+"""
+Candle Warehouse for ARUN Trading Bot
+On-disk OHLCV history partitioned by exchange / symbol / timeframe / month so
+restarts, rescans and backtests read stored bars instead of re-downloading
+them. Each month is two raw little-endian files read with np.memmap:
+``<YYYY-MM>.ts`` (int64 UTC nanoseconds) and ``<YYYY-MM>.ohlcv`` (float64,
+5 per bar).
+"""
+
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+COLUMNS = ("open", "high", "low", "close", "volume")
+IST = "Asia/Kolkata"
+DEFAULT_ROOT = "database/candles"
+
+Fetch = Callable[[Optional[datetime]], Optional[pd.DataFrame]]
+
+
+def _to_utc_ns(index) -> np.ndarray:
+    """Timestamps -> int64 UTC nanoseconds (naive timestamps are taken as UTC)."""
+    idx = pd.DatetimeIndex(index)
+    if idx.tz is not None:
+        idx = idx.tz_convert("UTC").tz_localize(None)
+    return np.asarray(idx.values, dtype="datetime64[ns]").view(np.int64)
+
+
+def _bound_ns(value) -> Optional[int]:
+    if value is None:
+        return None
+    return int(_to_utc_ns([pd.Timestamp(value)])[0])
+
+
+def _normalize(df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+    """Any candle frame (mStock lower-case, Yahoo title-case) -> sorted, de-duplicated (ts, ohlcv)."""
+    cols = {str(c).lower(): c for c in df.columns}
+    values = np.full((len(df), len(COLUMNS)), np.nan)
+    for i, name in enumerate(COLUMNS):
+        if name in cols:
+            values[:, i] = pd.to_numeric(df[cols[name]], errors="coerce").to_numpy(dtype=np.float64)
+    ts = _to_utc_ns(df.index)
+    order = np.argsort(ts, kind="stable")
+    ts, values = ts[order], values[order]
+    # Duplicate timestamps in one batch: the last row wins
+    keep = np.append(ts[1:] != ts[:-1], True)
+    return ts[keep], values[keep]
+
+
+class CandleWarehouse:
+    """
+    Append-only candle store. ``ingest()`` de-duplicates on timestamp: bars
+    already stored are updated in place (a forming bar gets its final values),
+    later bars are appended, and only back-filled history rewrites a month.
+    Reads map the month files and slice the requested range with searchsorted.
+    """
+
+    def __init__(self, root: str = DEFAULT_ROOT):
+        self.root = root
+        self._lock = threading.RLock()  # writes, and each month's map-and-copy in the read paths
+        self.stats = {"bars_written": 0, "bars_updated": 0, "rewrites": 0, "fetches": 0}
+
+    @classmethod
+    def from_settings(cls, settings=None) -> Optional["CandleWarehouse"]:
+        """
+        Warehouse at ``app_settings.candle_warehouse_dir`` (DEFAULT_ROOT when
+        unset), or None when the setting is empty (warehouse disabled).
+        ``settings``: any object with ``get(path, default)``; the shared
+        SettingsManager when omitted.
+        """
+        if settings is None:
+            try:
+                from settings_manager import settings
+            except Exception:
+                settings = None
+        root = settings.get("app_settings.candle_warehouse_dir", DEFAULT_ROOT) if settings else DEFAULT_ROOT
+        return cls(root) if root else None
+
+    # ---------------- Layout ----------------
+
+    def series_dir(self, symbol: str, exchange: str, timeframe: str) -> str:
+        return os.path.join(self.root, exchange.upper(), symbol.upper().replace("/", "_"), timeframe)
+
+    def months(self, symbol: str, exchange: str, timeframe: str) -> List[str]:
+        directory = self.series_dir(symbol, exchange, timeframe)
+        if not os.path.isdir(directory):
+            return []
+        return sorted(name[:-3] for name in os.listdir(directory) if name.endswith(".ts"))
+
+    def _paths(self, directory: str, month: str) -> Tuple[str, str]:
+        return os.path.join(directory, f"{month}.ts"), os.path.join(directory, f"{month}.ohlcv")
+
+    def _map(self, directory: str, month: str, mode: str = "r") -> Tuple[np.ndarray, np.ndarray]:
+        ts_path, ohlcv_path = self._paths(directory, month)
+        # Bars are complete once their ts entry exists (ohlcv is always written first)
+        n = min(os.path.getsize(ts_path) // 8, os.path.getsize(ohlcv_path) // (8 * len(COLUMNS)))
+        if n == 0:
+            return np.empty(0, np.int64), np.empty((0, len(COLUMNS)))
+        return (np.memmap(ts_path, dtype="<i8", mode=mode, shape=(n,)),
+                np.memmap(ohlcv_path, dtype="<f8", mode=mode, shape=(n, len(COLUMNS))))
+
+    # ---------------- Writes ----------------
+
+    def ingest(self, symbol: str, exchange: str, timeframe: str, df: Optional[pd.DataFrame]) -> int:
+        """Store ``df`` (timestamp index, OHLC[V] columns); returns the number of new bars."""
+        if df is None or df.empty:
+            return 0
+        ts, values = _normalize(df)
+        months = ts.astype("datetime64[ns]").astype("datetime64[M]").astype(str)
+        directory = self.series_dir(symbol, exchange, timeframe)
+        added = 0
+        with self._lock:
+            os.makedirs(directory, exist_ok=True)
+            for month in np.unique(months):
+                part = months == month
+                added += self._ingest_month(directory, month, ts[part], values[part])
+        self.stats["bars_written"] += added
+        return added
+
+    def _ingest_month(self, directory: str, month: str, ts: np.ndarray, values: np.ndarray) -> int:
+        ts_path, ohlcv_path = self._paths(directory, month)
+        if not os.path.exists(ts_path):
+            return self._append(ts_path, ohlcv_path, ts, values)
+
+        stored_ts, stored_values = self._map(directory, month, mode="r+")
+        exists = np.zeros(len(ts), dtype=bool)
+        if len(stored_ts):
+            pos = np.minimum(np.searchsorted(stored_ts, ts), len(stored_ts) - 1)
+            exists = stored_ts[pos] == ts
+        if exists.any():
+            stored_values[pos[exists]] = values[exists]
+            stored_values.flush()
+            self.stats["bars_updated"] += int(exists.sum())
+        ts, values = ts[~exists], values[~exists]
+        if not len(ts):
+            return 0
+        if not len(stored_ts) or ts[0] > stored_ts[-1]:
+            del stored_ts, stored_values
+            return self._append(ts_path, ohlcv_path, ts, values)
+
+        # Back-fill inside the month: rewrite it merged, swapped in atomically
+        merged_ts = np.concatenate([stored_ts, ts])
+        order = np.argsort(merged_ts, kind="stable")
+        merged_values = np.concatenate([stored_values, values])[order]
+        del stored_ts, stored_values
+        for path, data in ((ohlcv_path, merged_values.astype("<f8")), (ts_path, merged_ts[order].astype("<i8"))):
+            data.tofile(path + ".tmp")
+            os.replace(path + ".tmp", path)
+        self.stats["rewrites"] += 1
+        return len(ts)
+
+    @staticmethod
+    def _append(ts_path: str, ohlcv_path: str, ts: np.ndarray, values: np.ndarray) -> int:
+        with open(ohlcv_path, "ab") as f:
+            f.write(np.ascontiguousarray(values, dtype="<f8").tobytes())
+        with open(ts_path, "ab") as f:
+            f.write(np.ascontiguousarray(ts, dtype="<i8").tobytes())
+        return len(ts)
+
+    # ---------------- Reads ----------------
+
+    def read_arrays(self, symbol: str, exchange: str, timeframe: str,
+                    start=None, end=None) -> Tuple[np.ndarray, np.ndarray]:
+        """``(ts, ohlcv)`` for ``start <= ts <= end``: int64 UTC ns and float64 ``[N, 5]``."""
+        directory = self.series_dir(symbol, exchange, timeframe)
+        lo, hi = _bound_ns(start), _bound_ns(end)
+        lo_month = None if lo is None else str(np.datetime64(lo, "ns").astype("datetime64[M]"))
+        hi_month = None if hi is None else str(np.datetime64(hi, "ns").astype("datetime64[M]"))
+        ts_parts, value_parts = [], []
+        for month in self.months(symbol, exchange, timeframe):
+            if (lo_month and month < lo_month) or (hi_month and month > hi_month):
+                continue
+            # Map and copy under the write lock: a back-fill swaps the two files one after the other
+            with self._lock:
+                ts, values = self._map(directory, month)
+                i = 0 if lo is None else np.searchsorted(ts, lo, side="left")
+                j = len(ts) if hi is None else np.searchsorted(ts, hi, side="right")
+                if j > i:
+                    ts_parts.append(np.array(ts[i:j]))
+                    value_parts.append(np.array(values[i:j]))
+        if not ts_parts:
+            return np.empty(0, np.int64), np.empty((0, len(COLUMNS)))
+        return np.concatenate(ts_parts), np.concatenate(value_parts)
+
+    def read(self, symbol: str, exchange: str, timeframe: str, start=None, end=None,
+             tz: Optional[str] = IST, columns=COLUMNS) -> pd.DataFrame:
+        """Candles as a DataFrame indexed by ``timestamp`` in ``tz`` (``None``: naive UTC)."""
+        ts, values = self.read_arrays(symbol, exchange, timeframe, start, end)
+        index = pd.DatetimeIndex(ts.view("datetime64[ns]"), name="timestamp")
+        if tz:
+            index = index.tz_localize("UTC").tz_convert(tz)
+        df = pd.DataFrame(values, index=index, columns=list(COLUMNS))
+        return df[list(columns)]
+
+    def load(self, symbol: str, exchange: str, timeframe: str) -> Optional[pd.DataFrame]:
+        """CandleStore-compatible read for backtests: IST wall-clock index, or None if empty."""
+        df = self.read(symbol, exchange, timeframe)
+        if df.empty:
+            return None
+        df.index = df.index.tz_localize(None)
+        return df
+
+    def last_timestamp(self, symbol: str, exchange: str, timeframe: str) -> Optional[pd.Timestamp]:
+        directory = self.series_dir(symbol, exchange, timeframe)
+        for month in reversed(self.months(symbol, exchange, timeframe)):
+            with self._lock:
+                ts, _ = self._map(directory, month)
+                last = int(ts[-1]) if len(ts) else None
+            if last is not None:
+                return pd.Timestamp(last, tz="UTC")
+        return None
+
+    # ---------------- Read-through ----------------
+
+    def _coverage(self, directory: str) -> Dict[str, int]:
+        try:
+            with open(os.path.join(directory, "coverage.json"), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def read_through(self, symbol: str, exchange: str, timeframe: str, fetch: Fetch, start=None,
+                     max_age: Optional[timedelta] = None, tz: Optional[str] = IST,
+                     columns=COLUMNS) -> Optional[pd.DataFrame]:
+        """
+        Stored candles from ``start``, topped up from the source first:
+        - nothing stored, ``start`` before the stored coverage, or the last stored bar
+          before ``start``: ``fetch(None)`` (full lookback)
+        - otherwise, unless the last bar is younger than ``max_age``: ``fetch(last_stored_ts)``
+          and, if that leaves a gap after the last stored bar, a full fetch.
+        A failed fetch falls back to whatever is stored. Returns None when nothing is.
+        """
+        directory = self.series_dir(symbol, exchange, timeframe)
+        start_ns = _bound_ns(start)
+        last = self.last_timestamp(symbol, exchange, timeframe)
+        covered_from = self._coverage(directory).get("from")
+
+        if last is None or (start_ns is not None and (covered_from is None or start_ns < covered_from
+                                                      or last.value < start_ns)):
+            self._fetch_full(symbol, exchange, timeframe, fetch, start_ns)
+        elif max_age is None or pd.Timestamp.now(tz="UTC") - last > max_age:
+            since = last.tz_convert(IST).to_pydatetime()
+            self.stats["fetches"] += 1
+            new = fetch(since)
+            if new is not None and not new.empty and _to_utc_ns(new.index[:1])[0] > last.value:
+                self._fetch_full(symbol, exchange, timeframe, fetch, start_ns)
+            else:
+                self.ingest(symbol, exchange, timeframe, new)
+
+        df = self.read(symbol, exchange, timeframe, start=start, tz=tz, columns=columns)
+        return None if df.empty else df
+
+    def _fetch_full(self, symbol, exchange, timeframe, fetch: Fetch, start_ns: Optional[int]):
+        self.stats["fetches"] += 1
+        df = fetch(None)
+        if df is None or df.empty:
+            return
+        self.ingest(symbol, exchange, timeframe, df)
+        directory = self.series_dir(symbol, exchange, timeframe)
+        first = int(_to_utc_ns(df.index).min())
+        with open(os.path.join(directory, "coverage.json"), "w", encoding="utf-8") as f:
+            json.dump({"from": first if start_ns is None else min(first, start_ns)}, f)
+
+
+def yahoo_period(since: Optional[datetime], default: str) -> str:
+    """Smallest Yahoo ``range`` that reaches back to ``since`` (``default`` for a full fetch)."""
+    if since is None:
+        return default
+    days = (datetime.now(since.tzinfo) - since).days + 1
+    for period, span in (("5d", 5), ("1mo", 28), ("3mo", 90), ("6mo", 180), ("1y", 365), ("2y", 730), ("5y", 1825)):
+        if days <= span:
+            return period
+    return "max"
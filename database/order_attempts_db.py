@@ -10,21 +10,28 @@ from datetime import datetime
 from typing import Optional, Dict, Any, List
 import json
 
+try:
+    from database.sqlite_pool import SQLiteConnectionPool
+except ImportError:  # run as a script from inside database/
+    from sqlite_pool import SQLiteConnectionPool
+
 
 class OrderAttemptsDB:
     """Database for tracking all order attempts and trading decisions"""
     
     def __init__(self, db_path: str = "database/order_attempts.db"):
         self.db_path = db_path
-        self.conn = None
+        self.pool = SQLiteConnectionPool(db_path)
         self.create_tables()
     
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """The calling thread's connection"""
+        return self.pool.connection()
+    
     def connect(self):
-        """Create database connection"""
-        if self.conn is None:
-            self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
-            self.conn.row_factory = sqlite3.Row
-        return self.conn
+        """Create database connection (per thread, WAL - see sqlite_pool)"""
+        return self.pool.connection()
     
     def create_tables(self):
         """Create order attempts table with comprehensive tracking"""
@@ -95,6 +102,12 @@ class OrderAttemptsDB:
             ON order_attempts(status)
         """)
         
+        # Status-filtered "latest N" and the skip/failure summaries
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_status_timestamp
+            ON order_attempts(status, timestamp)
+        """)
+        
         conn.commit()
     
     def log_attempt(
@@ -272,10 +285,8 @@ class OrderAttemptsDB:
         }
     
     def close(self):
-        """Close database connection"""
-        if self.conn:
-            self.conn.close()
-            self.conn = None
+        """Close database connections (all threads)"""
+        self.pool.close_all()
 
 
 # Convenience functions for quick logging
@@ -0,0 +1,107 @@
+"""
+SQLite Connection Pool for ARUN Trading Bot
+Per-thread connections opened with the bot's performance profile
+(WAL journal, synchronous=NORMAL, page cache and mmap sizing).
+"""
+
+import os
+import pathlib
+import sqlite3
+import threading
+from typing import Dict, Optional, Sequence, Tuple
+
+# WAL lets the dashboard/API read while the engine writes; NORMAL skips the
+# per-commit fsync (still crash-safe in WAL, only the last commits can roll back
+# on power loss). Negative cache_size is KiB.
+DEFAULT_PRAGMAS: Tuple[Tuple[str, object], ...] = (
+    ("journal_mode", "WAL"),
+    ("synchronous", "NORMAL"),
+    ("cache_size", -16000),
+    ("mmap_size", 256 * 1024 * 1024),
+    ("temp_store", "MEMORY"),
+    ("busy_timeout", 5000),
+)
+
+
+# Read-only connections cannot (and need not) change the journal mode: the
+# writer already switched the file to WAL, which is what lets them read freely.
+READONLY_PRAGMAS: Tuple[Tuple[str, object], ...] = (
+    ("query_only", "ON"),
+    ("cache_size", -16000),
+    ("mmap_size", 256 * 1024 * 1024),
+    ("temp_store", "MEMORY"),
+    ("busy_timeout", 5000),
+)
+
+
+def apply_pragmas(conn: sqlite3.Connection, pragmas: Sequence[Tuple[str, object]] = DEFAULT_PRAGMAS):
+    """Apply ``PRAGMA name = value`` for each entry (names/values are trusted constants)."""
+    for name, value in pragmas:
+        conn.execute(f"PRAGMA {name} = {value}")
+
+
+class SQLiteConnectionPool:
+    """
+    One connection per thread for a database file.
+    SQLite connections are not safe to share between threads that use them
+    at the same time; this gives the engine thread, dashboard threads and
+    API workers their own, while WAL keeps readers from blocking the writer.
+    ``readonly=True`` opens ``mode=ro`` connections (API / dashboard readers).
+    """
+
+    def __init__(self, db_path: str, pragmas: Optional[Sequence[Tuple[str, object]]] = None,
+                 row_factory=sqlite3.Row, readonly: bool = False):
+        self.db_path = db_path
+        self.readonly = readonly
+        if pragmas is None:
+            pragmas = READONLY_PRAGMAS if readonly else DEFAULT_PRAGMAS
+        self.pragmas = tuple(pragmas)
+        self.row_factory = row_factory
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: Dict[int, sqlite3.Connection] = {}
+
+    def connection(self) -> sqlite3.Connection:
+        """This thread's connection, opened (and tuned) on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            return conn
+        # check_same_thread=False only so close_all() can close it from another thread
+        if self.readonly:
+            uri = f"{pathlib.Path(os.path.abspath(self.db_path)).as_uri()}?mode=ro"
+            conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+            # Autocommit: no implicit transaction can pin a reader to an old snapshot
+            conn.isolation_level = None
+        else:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.row_factory = self.row_factory
+        apply_pragmas(conn, self.pragmas)
+        self._local.conn = conn
+        with self._lock:
+            self._prune_dead_threads()
+            self._connections[threading.get_ident()] = conn
+        return conn
+
+    def _prune_dead_threads(self):
+        alive = {t.ident for t in threading.enumerate()}
+        for ident in [i for i in self._connections if i not in alive]:
+            try:
+                self._connections.pop(ident).close()
+            except Exception:
+                pass
+
+    @property
+    def size(self) -> int:
+        """Open connections (one per thread that touched the database)."""
+        return len(self._connections)
+
+    def close_all(self):
+        """Close every pooled connection; threads reopen on next use."""
+        with self._lock:
+            for conn in self._connections.values():
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+            self._connections.clear()
+        self._local = threading.local()
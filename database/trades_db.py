@@ -9,28 +9,66 @@ from datetime import datetime, timedelta
 from typing import List, Dict, Optional
 import pandas as pd
 
+try:
+    from database.sqlite_pool import SQLiteConnectionPool
+except ImportError:  # run as a script from inside database/
+    from sqlite_pool import SQLiteConnectionPool
+
 
 class TradesDatabase:
     """
     Simple SQLite database for logging trades
     """
     
-    def __init__(self, db_path: str = "database/trades.db"):
+    def __init__(self, db_path: str = "database/trades.db", readonly: bool = False):
         self.db_path = db_path
+        self.readonly = readonly
         
         # Create database directory if it doesn't exist
         os.makedirs(os.path.dirname(db_path), exist_ok=True)
         
-        # Initialize database
-        self.conn = sqlite3.connect(db_path, check_same_thread=False)
-        self.conn.row_factory = sqlite3.Row  # Return rows as dictionaries
+        if readonly:
+            # Readers (API) never create or migrate the schema; a missing or
+            # pre-upgrade file gets one writer-mode open first
+            if not self._schema_current(db_path):
+                TradesDatabase(db_path).pool.close_all()
+            self.pool = SQLiteConnectionPool(db_path, readonly=True)
+            print(f"✅ Database opened read-only: {db_path}")
+            return
+        
+        # Initialize database: one tuned connection per thread (WAL, see sqlite_pool)
+        self.pool = SQLiteConnectionPool(db_path)  # rows behave like dictionaries
         # self.cursor removed to prevent recursive cursor usage
         
         # Create tables
         self._create_tables()
         self._run_migrations()
+        if self._ledger_created:
+            self.rebuild_positions()
         print(f"✅ Database initialized: {db_path} (v2 with get_recent_trades)")
     
+    REQUIRED_TABLES = ("trades", "positions", "table_versions")
+
+    @classmethod
+    def _schema_current(cls, db_path: str) -> bool:
+        """True if ``db_path`` exists and already has the tables the read-only API queries."""
+        if not os.path.exists(db_path):
+            return False
+        try:
+            conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+            try:
+                names = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            return False
+        return all(table in names for table in cls.REQUIRED_TABLES)
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """The calling thread's connection"""
+        return self.pool.connection()
+
     def _create_tables(self):
         """
         Create trades table if it doesn't exist
@@ -85,6 +123,60 @@ class TradesDatabase:
                 ON trades(action, timestamp)
             """)
 
+            # Date-window queries (history / today / recent) and the P&L summary;
+            # the latter is fully answered from the index (covering)
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_trades_timestamp
+                ON trades(timestamp, broker)
+            """)
+
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_trades_action_pnl
+                ON trades(action, timestamp, pnl_net, pnl_gross, total_fees)
+            """)
+
+            # Open-positions ledger, maintained by insert_trade (see get_open_positions)
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'positions'")
+            self._ledger_created = cursor.fetchone() is None
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS positions (
+                    symbol TEXT NOT NULL,
+                    exchange TEXT NOT NULL,
+                    is_paper INTEGER NOT NULL,
+                    net_quantity INTEGER NOT NULL DEFAULT 0,
+                    buy_count INTEGER NOT NULL DEFAULT 0,
+                    buy_price_sum REAL NOT NULL DEFAULT 0,
+                    total_invested REAL NOT NULL DEFAULT 0,
+                    first_buy_time TEXT,
+                    strategy TEXT,
+                    broker TEXT,
+                    updated_at TEXT,
+                    PRIMARY KEY (symbol, exchange, is_paper)
+                )
+            """)
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_positions_open
+                ON positions(is_paper, net_quantity)
+            """)
+
+            # Change counter bumped by triggers on every trades write (any process,
+            # any code path); readers use it to invalidate cached query results
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS table_versions (
+                    name TEXT PRIMARY KEY,
+                    version INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            cursor.execute("INSERT OR IGNORE INTO table_versions (name, version) VALUES ('trades', 0)")
+            for event in ("INSERT", "UPDATE", "DELETE"):
+                cursor.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS trades_version_{event.lower()}
+                    AFTER {event} ON trades
+                    BEGIN
+                        UPDATE table_versions SET version = version + 1 WHERE name = 'trades';
+                    END
+                """)
+
             # Create system_control table for inter-process communication
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS system_control (
@@ -123,6 +215,21 @@ class TradesDatabase:
         finally:
             cursor.close()
 
+    def get_data_version(self, table: str = "trades") -> int:
+        """
+        Change counter for ``table`` (increments on every insert/update/delete).
+        None if the database predates the counter (opened read-only, not migrated).
+        """
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute("SELECT version FROM table_versions WHERE name = ?", (table,))
+            row = cursor.fetchone()
+            return row['version'] if row else None
+        except sqlite3.OperationalError:
+            return None
+        finally:
+            cursor.close()
+
     def _run_migrations(self):
         """
         Run schema migrations for existing databases
@@ -229,18 +336,100 @@ class TradesDatabase:
                 strategy, reason, broker, source, rsi,
                 pnl_gross, pnl_net, pnl_pct_gross, pnl_pct_net
             ))
+            trade_id = cursor.lastrowid
+            self._apply_to_ledger(cursor, timestamp, symbol, exchange, action, quantity,
+                                  price, net_amount, strategy, broker)
             
             self.conn.commit()
-            trade_id = cursor.lastrowid
             print(f"✅ Trade logged: {action} {symbol} @ ₹{price} (ID: {trade_id})")
             return trade_id
+        except Exception:
+            # Trade row and ledger update commit together or not at all
+            self.conn.rollback()
+            raise
         finally:
             cursor.close()
     
-    def get_open_positions(self, is_paper: bool = False) -> List[Dict]:
+    def _apply_to_ledger(self, cursor, timestamp, symbol, exchange, action, quantity,
+                         price, net_amount, strategy, broker):
         """
-        Get all open positions (bought but not yet sold)
-        Filter by paper/real trades to avoid mixing
+        Fold one trade into the positions ledger (caller commits).
+        Trades with a NULL broker match neither book, as in the GROUP BY it replaces.
+        """
+        if broker is None:
+            return
+        is_buy = action.upper() == 'BUY'
+        cursor.execute("""
+            INSERT INTO positions (
+                symbol, exchange, is_paper, net_quantity, buy_count, buy_price_sum,
+                total_invested, first_buy_time, strategy, broker, updated_at
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(symbol, exchange, is_paper) DO UPDATE SET
+                net_quantity = net_quantity + excluded.net_quantity,
+                buy_count = buy_count + excluded.buy_count,
+                buy_price_sum = buy_price_sum + excluded.buy_price_sum,
+                total_invested = total_invested + excluded.total_invested,
+                first_buy_time = COALESCE(MIN(first_buy_time, excluded.first_buy_time),
+                                          first_buy_time, excluded.first_buy_time),
+                strategy = excluded.strategy,
+                broker = excluded.broker,
+                updated_at = excluded.updated_at
+        """, (
+            symbol, exchange, 1 if broker == 'PAPER' else 0,
+            quantity if is_buy else -quantity,
+            1 if is_buy else 0,
+            price if is_buy else 0,
+            net_amount if is_buy else 0,
+            timestamp if is_buy else None,
+            strategy, broker, timestamp
+        ))
+
+    def rebuild_positions(self) -> int:
+        """
+        Recompute the positions ledger from the full trades table.
+        Use after editing trades outside insert_trade. Returns ledger row count.
+        """
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute("DELETE FROM positions")
+            # strategy/broker/updated_at come from each group's latest trade
+            cursor.execute("""
+                INSERT INTO positions (
+                    symbol, exchange, is_paper, net_quantity, buy_count, buy_price_sum,
+                    total_invested, first_buy_time, strategy, broker, updated_at
+                )
+                SELECT g.symbol, g.exchange, g.is_paper, g.net_quantity, g.buy_count, g.buy_price_sum,
+                       g.total_invested, g.first_buy_time, t.strategy, t.broker, t.timestamp
+                FROM (
+                    SELECT symbol, exchange,
+                           CASE WHEN broker = 'PAPER' THEN 1 ELSE 0 END as is_paper,
+                           SUM(CASE WHEN action = 'BUY' THEN quantity ELSE -quantity END) as net_quantity,
+                           SUM(CASE WHEN action = 'BUY' THEN 1 ELSE 0 END) as buy_count,
+                           TOTAL(CASE WHEN action = 'BUY' THEN price END) as buy_price_sum,
+                           TOTAL(CASE WHEN action = 'BUY' THEN net_amount END) as total_invested,
+                           MIN(CASE WHEN action = 'BUY' THEN timestamp END) as first_buy_time,
+                           MAX(id) as last_id
+                    FROM trades
+                    WHERE broker IS NOT NULL
+                    GROUP BY symbol, exchange, is_paper
+                ) g
+                JOIN trades t ON t.id = g.last_id
+            """)
+            self.conn.commit()
+            cursor.execute("SELECT COUNT(*) FROM positions")
+            count = cursor.fetchone()[0]
+            print(f"✅ Positions ledger rebuilt: {count} symbol/exchange rows")
+            return count
+        except Exception:
+            self.conn.rollback()
+            raise
+        finally:
+            cursor.close()
+
+    def _aggregate_open_positions(self, is_paper: bool = False) -> List[Dict]:
+        """
+        Open positions by scanning the whole trades table (pre-ledger query).
+        Kept as the reference for verify_positions().
         """
         broker_filter = "broker = 'PAPER'" if is_paper else "broker != 'PAPER'"
 
@@ -261,6 +450,59 @@ class TradesDatabase:
         cursor = self.conn.cursor()
         try:
             cursor.execute(query)
+            return [dict(row) for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+
+    def verify_positions(self, tolerance: float = 1e-6) -> List[Dict]:
+        """
+        Compare the ledger against a full GROUP BY over trades (both books).
+        Returns the mismatching rows (empty list = ledger is consistent).
+        """
+        mismatches = []
+        for is_paper in (False, True):
+            expected = {(p['symbol'], p['exchange']): p for p in self._aggregate_open_positions(is_paper)}
+            actual = {(p['symbol'], p['exchange']): p for p in self.get_open_positions(is_paper)}
+            for key in sorted(set(expected) | set(actual)):
+                exp, act = expected.get(key), actual.get(key)
+                fields = []
+                if exp is None or act is None:
+                    fields = ['missing']
+                else:
+                    if exp['net_quantity'] != act['net_quantity']:
+                        fields.append('net_quantity')
+                    if exp['first_buy_time'] != act['first_buy_time']:
+                        fields.append('first_buy_time')
+                    for field in ('avg_entry_price', 'total_invested'):
+                        a, b = exp[field], act[field]
+                        if (a is None) != (b is None) or (a is not None and abs(a - b) > tolerance * max(1.0, abs(a))):
+                            fields.append(field)
+                if fields:
+                    mismatches.append({'symbol': key[0], 'exchange': key[1], 'is_paper': is_paper,
+                                       'fields': fields, 'expected': exp, 'ledger': act})
+        return mismatches
+
+    def get_open_positions(self, is_paper: bool = False) -> List[Dict]:
+        """
+        Get all open positions (bought but not yet sold)
+        Filter by paper/real trades to avoid mixing
+        Reads the positions ledger: O(open positions), not O(trade history).
+        """
+        query = """
+            SELECT symbol, exchange,
+                   net_quantity,
+                   CASE WHEN buy_count > 0 THEN buy_price_sum / buy_count END as avg_entry_price,
+                   first_buy_time,
+                   total_invested,
+                   strategy,
+                   broker
+            FROM positions
+            WHERE is_paper = ? AND net_quantity > 0
+        """
+        
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(query, (1 if is_paper else 0,))
             positions = []
             for row in cursor.fetchall():
                 positions.append(dict(row))
@@ -268,15 +510,23 @@ class TradesDatabase:
         finally:
             cursor.close()
     
+    @staticmethod
+    def _window_start(days: int) -> str:
+        """
+        ISO lower bound for "last N days". Compared directly against the stored
+        isoformat timestamps so the timestamp indexes can be used (no datetime()).
+        """
+        return (datetime.now() - timedelta(days=days)).isoformat()
+
     def get_trade_history(self, days: int = 30, symbol: Optional[str] = None) -> pd.DataFrame:
         """
         Get trade history as pandas DataFrame
         """
         query = """
             SELECT * FROM trades
-            WHERE datetime(timestamp) >= datetime('now', ?)
+            WHERE timestamp >= ?
         """
-        params = [f'-{days} days']
+        params = [self._window_start(days)]
         
         if symbol:
             query += " AND symbol = ?"
@@ -292,15 +542,16 @@ class TradesDatabase:
         """
         Get today's trades
         """
-        today = datetime.now().date().isoformat()
+        today = datetime.now().date()
         broker_filter = "broker = 'PAPER'" if is_paper else "broker != 'PAPER'"
 
+        # [today, tomorrow) range instead of DATE(timestamp) = today (index-friendly)
         query = f"""
             SELECT * FROM trades
-            WHERE DATE(timestamp) = ? AND {broker_filter}
+            WHERE timestamp >= ? AND timestamp < ? AND {broker_filter}
             ORDER BY timestamp DESC
         """
-        params = [today]
+        params = [today.isoformat(), (today + timedelta(days=1)).isoformat()]
         return pd.read_sql_query(query, self.conn, params=params)
 
     def get_recent_trades(self, limit: int = 10, is_paper: bool = None) -> List[Dict]:
@@ -330,10 +581,25 @@ class TradesDatabase:
         """
         Get performance metrics
         """
-        # Get all completed trades (buy-sell pairs)
-        df = self.get_trade_history(days)
+        # Completed trades are the SELLs; aggregated from idx_trades_action_pnl alone
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute("""
+                SELECT COUNT(*) as total_trades,
+                       COALESCE(SUM(pnl_net > 0), 0) as winning_trades,
+                       COALESCE(SUM(pnl_net < 0), 0) as losing_trades,
+                       TOTAL(pnl_gross) as gross_profit,
+                       TOTAL(total_fees) as total_fees,
+                       TOTAL(pnl_net) as net_profit
+                FROM trades
+                WHERE action = 'SELL' AND timestamp >= ?
+            """, (self._window_start(days),))
+            row = cursor.fetchone()
+        finally:
+            cursor.close()
         
-        if df.empty:
+        total_trades = row['total_trades']
+        if total_trades == 0:
             return {
                 'total_trades': 0,
                 'winning_trades': 0,
@@ -345,26 +611,18 @@ class TradesDatabase:
                 'avg_profit_per_trade': 0
             }
         
-        # Calculate metrics
-        sells = df[df['action'] == 'SELL']
-        
-        total_trades = len(sells)
-        winning_trades = len(sells[sells['pnl_net'] > 0])
-        losing_trades = len(sells[sells['pnl_net'] < 0])
-        win_rate = (winning_trades / total_trades * 100) if total_trades > 0 else 0
-        
-        gross_profit = sells['pnl_gross'].sum() if 'pnl_gross' in sells.columns else 0
-        total_fees = sells['total_fees'].sum()
-        net_profit = sells['pnl_net'].sum() if 'pnl_net' in sells.columns else 0
-        avg_profit = net_profit / total_trades if total_trades > 0 else 0
+        winning_trades = row['winning_trades']
+        win_rate = winning_trades / total_trades * 100
+        net_profit = row['net_profit']
+        avg_profit = net_profit / total_trades
         
         return {
             'total_trades': total_trades,
             'winning_trades': winning_trades,
-            'losing_trades': losing_trades,
+            'losing_trades': row['losing_trades'],
             'win_rate': round(win_rate, 2),
-            'gross_profit': round(gross_profit, 2),
-            'total_fees': round(total_fees, 2),
+            'gross_profit': round(row['gross_profit'], 2),
+            'total_fees': round(row['total_fees'], 2),
             'net_profit': round(net_profit, 2),
             'avg_profit_per_trade': round(avg_profit, 2)
         }
@@ -384,14 +642,18 @@ class TradesDatabase:
     
     def close(self):
         """
-        Close database connection
+        Close database connections (all threads)
         """
-        self.conn.close()
+        self.pool.close_all()
         print("✅ Database connection closed")
 
 
-# Global database instance
-db = TradesDatabase()
+# Global database instance, opened on first access (``from database.trades_db import db``)
+def __getattr__(name):
+    if name == "db":
+        globals()["db"] = TradesDatabase()
+        return globals()["db"]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 if __name__ == "__main__":
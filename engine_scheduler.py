@@ -0,0 +1,172 @@
+"""
+Engine Scheduler for ARUN Trading Bot
+Decides when the engine wakes and what each wake covers: strategy
+evaluation per timeframe group at bar close (plus a settle delay for the
+broker to publish the closed candle), and RiskManager checks on their own,
+faster cadence. Bars that end with the session (daily bars, the last
+intraday bar) are evaluated shortly before the close, while orders can
+still be placed. Every launcher drives run_cycle through EngineScheduler.run.
+"""
+
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime, time as dtime, timedelta
+from typing import Callable, Dict, FrozenSet, Iterable, Optional, Tuple
+
+SESSION_OPEN = dtime(9, 15)
+SESSION_CLOSE = dtime(15, 30)
+MAX_CLOSED_DAYS = 15  # longest run of closed days next_bar_close looks across
+
+
+@dataclass(frozen=True)
+class Tick:
+    """One engine wake: timeframe groups whose bar just closed, and whether risk checks are due."""
+    timeframes: FrozenSet[str] = field(default_factory=frozenset)
+    risk: bool = False
+
+    def __bool__(self):
+        return bool(self.timeframes) or self.risk
+
+
+SessionFn = Callable[[date], Optional[Tuple[datetime, datetime]]]
+
+
+def _regular_session(now: datetime) -> SessionFn:
+    """09:15-15:30 every day, in ``now``'s timezone (used when no calendar is given)."""
+    def session(d: date):
+        day = now.replace(year=d.year, month=d.month, day=d.day, second=0, microsecond=0)
+        return (day.replace(hour=SESSION_OPEN.hour, minute=SESSION_OPEN.minute),
+                day.replace(hour=SESSION_CLOSE.hour, minute=SESSION_CLOSE.minute))
+    return session
+
+
+def next_bar_close(now: datetime, frame_minutes: int, session: Optional[SessionFn] = None) -> datetime:
+    """
+    First bar close strictly after ``now``. Intraday bars are aligned to the
+    session open (the last bar of the day is cut at the session close); daily
+    bars close at the session close. ``session(date)`` gives that day's
+    (open, close) or None when closed (e.g. MarketCalendar.session, so
+    holidays are skipped and special sessions get their own bars); without
+    it every day trades 09:15-15:30.
+    """
+    session = session or _regular_session(now)
+    frame = timedelta(minutes=frame_minutes)
+    d = now.date()
+    for _ in range(MAX_CLOSED_DAYS):
+        hours = session(d)
+        d += timedelta(days=1)
+        if not hours or now >= hours[1]:
+            continue
+        session_open, session_close = hours
+        if frame_minutes >= 1440:
+            return session_close
+        if now < session_open:
+            return min(session_open + frame, session_close)
+        close = session_open + ((now - session_open) // frame + 1) * frame
+        return min(close, session_close)
+    return now + frame  # no session found: fall back to one frame ahead
+
+
+def next_evaluation(now: datetime, frame_minutes: int, settle: timedelta, close_lead: timedelta,
+                    session: Optional[SessionFn] = None) -> datetime:
+    """
+    When a timeframe group is next evaluated; always inside a session. Bars
+    closing mid-session are evaluated at close + ``settle``. A bar that ends
+    with the session (every daily bar, the last intraday bar of the day) would
+    only close once the market has shut, so it is evaluated ``close_lead``
+    before the close on its forming values instead (or skipped if an earlier
+    bar close already falls after that moment).
+    """
+    session = session or _regular_session(now)
+    for _ in range(MAX_CLOSED_DAYS):
+        close = next_bar_close(now, frame_minutes, session)
+        hours = session(close.date())
+        if not hours or close < hours[1]:
+            return close + settle
+        at = max(hours[0], hours[1] - close_lead)
+        if now < at:
+            return at
+        now = hours[1]
+    return now + timedelta(minutes=frame_minutes)
+
+
+class EngineScheduler:
+    """
+    Tracks the next wake per timeframe group and for risk checks.
+    ``timeframes`` is called on every poll, so groups follow config changes;
+    a group seen for the first time (and the first risk check) is due at once.
+    """
+
+    def __init__(self, timeframes: Callable[[], Iterable[str]], frame_minutes: Callable[[str], int],
+                 settle_seconds: float = 3.0, risk_interval_seconds: float = 10.0,
+                 clock: Optional[Callable[[], datetime]] = None, session: Optional[SessionFn] = None,
+                 close_lead_seconds: float = 300.0):
+        self.timeframes = timeframes
+        self.frame_minutes = frame_minutes
+        self.settle = timedelta(seconds=settle_seconds)
+        self.risk_interval = timedelta(seconds=risk_interval_seconds)
+        self.close_lead = timedelta(seconds=close_lead_seconds)  # session-end bars: evaluated this long before the close
+        self.clock = clock or datetime.now
+        self.session = session  # day -> (open, close) or None; default 09:15-15:30 daily
+        self.next_eval: Dict[str, datetime] = {}
+        self.next_risk: Optional[datetime] = None
+        self.stats = {"ticks": 0, "evaluations": 0, "risk_checks": 0}
+
+    def due(self, now: Optional[datetime] = None) -> Tick:
+        """Groups/risk due at ``now``; their next wakes are scheduled as they are handed out."""
+        now = now or self.clock()
+        active = set(self.timeframes())
+        for tf in list(self.next_eval):
+            if tf not in active:
+                del self.next_eval[tf]
+        due_tfs = frozenset(tf for tf in active if tf not in self.next_eval or now >= self.next_eval[tf])
+        for tf in due_tfs:
+            self.next_eval[tf] = next_evaluation(now, self.frame_minutes(tf), self.settle, self.close_lead,
+                                                 self.session)
+        risk = self.next_risk is None or now >= self.next_risk
+        if risk:
+            self.next_risk = now + self.risk_interval
+        tick = Tick(due_tfs, risk)
+        if tick:
+            self.stats["ticks"] += 1
+            self.stats["evaluations"] += len(due_tfs)
+            self.stats["risk_checks"] += int(risk)
+        return tick
+
+    def expedite(self, timeframe: str, at: datetime):
+        """Evaluate ``timeframe`` again at ``at`` if that is before its next bar close (e.g. a late bar)."""
+        current = self.next_eval.get(timeframe)
+        if current is not None and at < current:
+            self.next_eval[timeframe] = at
+
+    def next_wake(self) -> Optional[datetime]:
+        wakes = list(self.next_eval.values()) + ([self.next_risk] if self.next_risk else [])
+        return min(wakes) if wakes else None
+
+    def next_wakes(self) -> Dict[str, str]:
+        """Next wake per group (and ``risk``) as ISO strings, for status endpoints."""
+        wakes = {tf: at.isoformat() for tf, at in sorted(self.next_eval.items())}
+        if self.next_risk:
+            wakes["risk"] = self.next_risk.isoformat()
+        return wakes
+
+    def run(self, cycle: Callable[[Tick], None], should_stop: Callable[[], bool],
+            on_error: Optional[Callable[[Exception], None]] = None, poll_seconds: float = 0.2):
+        """
+        Loop until ``should_stop()``: run ``cycle(tick)`` for each due tick and
+        sleep until the next wake in ``poll_seconds`` slices (stop stays responsive).
+        """
+        while not should_stop():
+            try:
+                tick = self.due()
+                if tick:
+                    cycle(tick)
+            except Exception as e:
+                if on_error is None:
+                    raise
+                on_error(e)
+            wake = self.next_wake()
+            remaining = (wake - self.clock()).total_seconds() if wake else poll_seconds
+            while remaining > 0 and not should_stop():
+                time.sleep(min(poll_seconds, remaining))
+                remaining -= poll_seconds
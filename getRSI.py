@@ -1,9 +1,9 @@
 # pip install yfinance pandas numpy pytz
 
-import yfinance as yf
 import pandas as pd
 import numpy as np
 import pytz
+import rsi_kernel
 from datetime import time as dtime
 from typing import Optional
 
@@ -11,29 +11,11 @@ IST = pytz.timezone("Asia/Kolkata")
 
 def _tv_rma(src: pd.Series, length: int) -> pd.Series:
     x = pd.to_numeric(src, errors="coerce")
-    alpha = 1.0 / float(length)
-    sma = x.rolling(length, min_periods=length).mean()
-    rma = pd.Series(np.nan, index=x.index)
-    first = sma.first_valid_index()
-    if first is None:
-        return rma
-    rma.loc[first] = sma.loc[first]
-    for i in range(x.index.get_loc(first) + 1, len(x)):
-        rma.iloc[i] = alpha * x.iloc[i] + (1.0 - alpha) * rma.iloc[i - 1]
-    return rma
+    return pd.Series(rsi_kernel.rma(x.to_numpy(dtype=np.float64), length), index=x.index)
 
 def tv_rsi_series(close: pd.Series, length: int = 14) -> pd.Series:
     c = pd.to_numeric(close, errors="coerce")
-    ch = c.diff()
-    gain = ch.clip(lower=0)
-    loss = (-ch).clip(lower=0)
-    up = _tv_rma(gain, length)
-    down = _tv_rma(loss, length)
-    rs = up / down
-    rsi = 100.0 - (100.0 / (1.0 + rs))
-    rsi = rsi.where(down != 0, 100.0)
-    rsi = rsi.where(up != 0, 0.0)
-    return rsi
+    return pd.Series(rsi_kernel.rsi(c.to_numpy(dtype=np.float64), length), index=c.index)
 
 def _filter_session(df: pd.DataFrame) -> pd.DataFrame:
     # Keep only 09:15–15:30 IST like TradingView’s NSE session
@@ -96,6 +78,7 @@ def calculate_intraday_rsi_tv(
         lookback = "6mo" if _is_daily_interval(interval) else "60d"  # Yahoo intraday limit ~60 days
 
     try:
+        import yfinance as yf  # imported on first Yahoo fetch, not with the engine
         from utils import get_yfinance_session, yf_rate_limit, fetch_yahoo_history_direct
         yf_rate_limit(0.5) # Spacing out requests even with session
         session = get_yfinance_session()
@@ -29,29 +29,26 @@ def run_headless():
     logging.info(f"🕒 Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     logging.info("========================================")
 
-    # 2. Reset Stop Flag (Cold Start)
+    # 2. Engine setup (settings, DB, managers, stocks) + Reset Stop Flag (Cold Start)
+    kickstart.initialize()
     kickstart.reset_stop_flag()
-    kickstart.initialize_stock_configs()
 
-    # 3. Main Engine Loop
+    # 3. Main Engine Loop (bar-close scheduler)
+    def on_error(e):
+        logging.error(f"❌ Engine Cycle Error: {e}")
+        import traceback
+        logging.error(traceback.format_exc())
+
+    def should_stop():
+        # Check for remote stop from GUI
+        if state_mgr.is_stop_requested():
+            logging.info("🛑 Remote STOP detected from State File. Shuting down...")
+            return True
+        return False
+
     try:
         logging.info("🏁 Entering Main Engine Loop...")
-        while True:
-            # Check for remote stop from GUI
-            if state_mgr.is_stop_requested():
-                logging.info("🛑 Remote STOP detected from State File. Shuting down...")
-                break
-
-            # Execute cycle
-            try:
-                kickstart.run_cycle()
-            except Exception as e:
-                logging.error(f"❌ Engine Cycle Error: {e}")
-                import traceback
-                logging.error(traceback.format_exc())
-
-            # High-frequency heartbeat wait
-            time.sleep(1) 
+        kickstart.build_engine_scheduler().run(kickstart.run_scheduled_cycle, should_stop, on_error)
 
     except KeyboardInterrupt:
         logging.info("🛑 Headless Engine stopped by user (KeyboardInterrupt).")
@@ -0,0 +1,167 @@
+"""
+Instrument Index for ARUN Trading Bot
+Local copy of the mStock scrip master so symbol -> instrument token lookups
+never need the network. The CSV is imported into a small SQLite file once a
+day and loaded at startup into a dict keyed by (exchange, symbol).
+"""
+
+import csv
+import io
+import os
+import sqlite3
+import threading
+import time
+from datetime import date
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_PATH = "database/instruments.db"
+
+# Scrip master column names seen across mStock / Kite-style exports
+TOKEN_COLUMNS = ("instrument_token", "token", "symboltoken", "exchange_token")
+SYMBOL_COLUMNS = ("tradingsymbol", "trading_symbol", "symbol")
+EXCHANGE_COLUMNS = ("exchange", "exch_seg", "exch")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS instruments (
+    exchange TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    token TEXT NOT NULL,
+    name TEXT,
+    instrument_type TEXT,
+    segment TEXT,
+    lot_size INTEGER,
+    tick_size REAL,
+    PRIMARY KEY (exchange, symbol)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+Row = Tuple[str, str, str, str, str, str, Optional[int], Optional[float]]
+
+
+def _pick(row: dict, names: Iterable[str]) -> str:
+    for name in names:
+        value = row.get(name)
+        if value not in (None, ""):
+            return str(value).strip()
+    return ""
+
+
+def _number(value, cast):
+    try:
+        return cast(float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_scrip_master(text: str) -> List[Row]:
+    """Scrip master CSV -> index rows. Lines without exchange, symbol or token are skipped."""
+    reader = csv.DictReader(io.StringIO(text.lstrip("\ufeff")))
+    reader.fieldnames = [str(f).strip().lower() for f in reader.fieldnames or []]
+    rows: Dict[Tuple[str, str], Row] = {}
+    for raw in reader:
+        exchange = _pick(raw, EXCHANGE_COLUMNS).upper()
+        symbol = _pick(raw, SYMBOL_COLUMNS).upper()
+        token = _pick(raw, TOKEN_COLUMNS)
+        if not exchange or not symbol or not token:
+            continue
+        row = (exchange, symbol, token, raw.get("name") or "", raw.get("instrument_type") or "",
+               raw.get("segment") or "", _number(raw.get("lot_size"), int), _number(raw.get("tick_size"), float))
+        rows[(exchange, symbol)] = row
+        # Equity series suffix (RELIANCE-EQ): the bot tracks the bare symbol
+        if symbol.endswith("-EQ"):
+            rows.setdefault((exchange, symbol[:-3]), (exchange, symbol[:-3]) + row[2:])
+    return list(rows.values())
+
+
+class InstrumentIndex:
+    """
+    In-memory (exchange, symbol) -> token map backed by a SQLite file.
+    ``refresh()`` re-imports the scrip master at most once per day; the new
+    file is built next to the old one and swapped in, so a failed download
+    or import keeps the previous index.
+    """
+
+    def __init__(self, path: str = DEFAULT_PATH):
+        self.path = path
+        self.tokens: Dict[Tuple[str, str], str] = {}
+        self.refreshed_on: Optional[date] = None
+        self.last_attempt: Optional[float] = None  # monotonic time of the last download attempt
+        self._refresh_lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.tokens)
+
+    def token(self, symbol: str, exchange: str) -> Optional[str]:
+        return self.tokens.get((exchange.upper(), symbol.upper()))
+
+    def load(self) -> int:
+        """Read the index file into memory; returns the number of instruments (0 if absent)."""
+        if not os.path.exists(self.path):
+            return 0
+        conn = sqlite3.connect(self.path)
+        try:
+            tokens = {(ex, sym): token for ex, sym, token in
+                      conn.execute("SELECT exchange, symbol, token FROM instruments")}
+            meta = dict(conn.execute("SELECT key, value FROM meta"))
+        except sqlite3.Error:
+            return 0
+        finally:
+            conn.close()
+        self.tokens = tokens
+        refreshed = meta.get("refreshed_on")
+        self.refreshed_on = date.fromisoformat(refreshed) if refreshed else None
+        return len(tokens)
+
+    def is_stale(self, today: date) -> bool:
+        return self.refreshed_on is None or self.refreshed_on < today
+
+    def should_refresh(self, today: date, retry_seconds: float = 900.0) -> bool:
+        """
+        True when a refresh() now would actually download: the index is stale,
+        no download is in flight and the retry window after a failed attempt is over.
+        """
+        if not self.is_stale(today) or self._refresh_lock.locked():
+            return False
+        return self.last_attempt is None or time.monotonic() - self.last_attempt >= retry_seconds
+
+    def import_rows(self, rows: List[Row], refreshed_on: date) -> int:
+        """Replace the index file with ``rows`` and load it."""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp = self.path + ".tmp"
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        conn = sqlite3.connect(tmp)
+        try:
+            conn.executescript(SCHEMA)
+            conn.executemany("INSERT OR REPLACE INTO instruments VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            conn.execute("INSERT INTO meta VALUES ('refreshed_on', ?)", (refreshed_on.isoformat(),))
+            conn.commit()
+        finally:
+            conn.close()
+        os.replace(tmp, self.path)
+        return self.load()
+
+    def refresh(self, download: Callable[[], Optional[str]], today: date, force: bool = False,
+                retry_seconds: float = 900.0) -> bool:
+        """
+        Download and import the scrip master if the index is older than ``today``
+        (a failed download is retried after ``retry_seconds``). Returns True when a
+        new index was loaded. Concurrent callers skip instead of waiting.
+        """
+        if not force and not self.should_refresh(today, retry_seconds):
+            return False
+        if not self._refresh_lock.acquire(blocking=False):
+            return False
+        try:
+            self.last_attempt = time.monotonic()
+            text = download()
+            rows = parse_scrip_master(text) if text else []
+            if not rows:
+                return False
+            self.import_rows(rows, today)
+            return True
+        finally:
+            self._refresh_lock.release()
@@ -12,7 +12,6 @@ if sys.stdout.encoding != 'utf-8':
         sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', errors='replace')
     except: pass
 
-from strategies.nifty_sip import NiftySIPStrategy
 print("✅ LOADED SENSEI V1 KICKSTART (Engine Online)")
 
 
@@ -45,9 +44,20 @@ import traceback
 import pytz
 import time
 import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Tuple, Optional
+from collections import OrderedDict
 from dataclasses import dataclass
 import numpy as np
+import rsi_kernel
+from broker_http import broker_client
+from positions_service import PositionsService, positions_for_symbol
+import trade_rules
+from candle_warehouse import CandleWarehouse, DEFAULT_ROOT as CANDLE_WAREHOUSE_ROOT
+from engine_scheduler import EngineScheduler
+from instrument_index import InstrumentIndex, DEFAULT_PATH as INSTRUMENT_INDEX_PATH
+from market_calendar import MarketCalendar, DEFAULT_PATH as MARKET_CALENDAR_PATH
 from getRSI import calculate_intraday_rsi_tv
 import logging
 from requests.exceptions import Timeout, ConnectionError, RequestException
@@ -64,14 +74,12 @@ except ImportError:
 
 # ---------------- New Module Imports (Phase 0A) ----------------
 try:
-    from settings_manager import SettingsManager
-    settings = SettingsManager() # Initialize Global Instance
-    settings.load()
+    from settings_manager import SettingsManager, SettingsSnapshot
     SETTINGS_AVAILABLE = True
 except ImportError:
     print("⚠️ settings_manager not found, using legacy config")
-    settings = None
     SETTINGS_AVAILABLE = False
+    SettingsSnapshot = None
 
 try:
     from database.trades_db import TradesDatabase
@@ -151,8 +159,12 @@ def set_log_callback(cb):
     _LOG_STATE["callback"] = cb
     logging.info(f"✅ LOG_CALLBACK set successfully")
 
-def log_ok(msg: str = "", *args, force: bool = False, **kwargs):
-    logging.info(msg)
+def log_ok(msg: str = "", *args, force: bool = False, data: Optional[dict] = None, **kwargs):
+    # ``data`` is attached as structured fields (JSONFormatter "data") for log aggregation
+    if data is not None:
+        logging.info(msg, extra={"extra_data": data})
+    else:
+        logging.info(msg)
     
     # Callback to UI if set
     callback = _LOG_STATE.get("callback")
@@ -166,6 +178,10 @@ def log_ok(msg: str = "", *args, force: bool = False, **kwargs):
     if LOG_SUPPRESS and not force:
         return
 
+def debug_enabled() -> bool:
+    """Per-row diagnostics are only built and emitted when the root logger is at DEBUG."""
+    return logging.getLogger().isEnabledFor(logging.DEBUG)
+
 def log_fetch(symbol_ex: str):
     if not LOG_SUPPRESS and is_market_open_now_ist():
         log_ok(f"🔍 Fetching → {symbol_ex}")
@@ -178,14 +194,31 @@ class InflightState:
 OFFLINE = {"active": False, "since": None}
 FETCH_INFLIGHT: Dict[str, bool] = {}
 CYCLE_QUOTES: Dict[str, Optional[dict]] = {}
-SYMBOL_LOCKS: Dict[str, bool] = {}  # Simplified to boolean for sync
+CYCLE_QUOTE_SOURCE: Dict[str, str] = {}  # "EX:SYMBOL" -> exchange that actually served the quote (REIT BSE fallback)
+CYCLE_QUOTE_MISSES: set = set()          # keys the batch call answered without data (skip per-symbol refetch)
+QUOTE_BATCH_SIZE = 50                    # instruments per multi-instrument OHLC request
+SYMBOL_LOCKS: Dict[str, threading.Lock] = {}  # Serializes decision/order logic per symbol
+_SYMBOL_LOCKS_GUARD = threading.Lock()
 FETCH_STATE: Dict[str, InflightState] = {}
 MISSING_TOKEN_LOGGED: Dict[str, bool] = {}
-CANDLE_CACHE: Dict[Tuple[str, str, str], pd.DataFrame] = {} # (symbol, exchange, timeframe) -> DataFrame
+CANDLE_CACHE: "OrderedDict[Tuple[str, str, str], pd.DataFrame]" = OrderedDict() # (symbol, exchange, timeframe) -> DataFrame, LRU order
+CANDLE_NEXT_FETCH: Dict[Tuple[str, str, str], datetime] = {} # earliest time a new bar can exist for the key
+CANDLE_CACHE_MAX_KEYS = 256   # LRU bound on (symbol, exchange, timeframe) entries
+CANDLE_CACHE_MAX_BARS = 400   # per-key bar limit
+CANDLE_RETRY_SECONDS = 45     # in-session retry while the broker has not published a closed bar
+CANDLE_CACHE_STATS = {"hits": 0, "partial_fetches": 0, "reseeds": 0, "gaps": 0, "evictions": 0}
+CANDLE_CACHE_LOCK = threading.RLock()  # guards CANDLE_CACHE/NEXT_FETCH/STATS; never held across a fetch
+CANDLE_WAREHOUSE: Optional[CandleWarehouse] = None  # on-disk history behind the seed fetch (app_settings.candle_warehouse_dir)
+INSTRUMENT_INDEX: Optional[InstrumentIndex] = None  # local scrip master, (exchange, symbol) -> token (app_settings.instrument_index_path)
+MARKET_CALENDAR = MarketCalendar()  # weekends only until the holiday table is loaded (app_settings.market_calendar_path)
+CYCLE_CANDLES: Dict[Tuple[str, str, str], Optional[pd.DataFrame]] = {}  # concurrent-mode prefetch results
+RSI_STATE: Dict[Tuple[str, str, str], "rsi_kernel.RSIState"] = {} # (symbol, exchange, timeframe) -> incremental RSI
+RSI_STATS = {"evaluations": 0, "reseeds": 0, "bars_advanced": 0, "validation_mismatches": 0}
+RSI_VALIDATION_TOLERANCE = 1e-6
 
 def reset_cycle_state():
     MISSING_TOKEN_LOGGED.clear()
-    CYCLE_QUOTES.clear()
+    reset_cycle_quotes()
 
 def log_missing_token_once(exchange: str, symbol: str, err: Exception):
     key = f"{exchange}:{symbol.upper()}"
@@ -217,7 +250,9 @@ def fetch_market_data_once(symbol: str, exchange: str) -> Tuple[Optional[dict],
     key = f"{exchange}:{symbol.upper()}"
     cached = CYCLE_QUOTES.get(key)
     if cached is not None:
-        return cached, exchange
+        return cached, CYCLE_QUOTE_SOURCE.get(key, exchange)
+    if key in CYCLE_QUOTE_MISSES:
+        return None, exchange
 
     st = ensure_inflight(key)
     if st.fetching:
@@ -250,6 +285,7 @@ def fetch_market_data_once(symbol: str, exchange: str) -> Tuple[Optional[dict],
                     st.result = (data.get("data") or {}).get(params["i"])
                     if st.result:
                         CYCLE_QUOTES[key] = st.result
+                        CYCLE_QUOTE_SOURCE[key] = ex
                         return st.result, ex
                 except ValueError:
                     pass
@@ -263,6 +299,115 @@ def fetch_market_data_once(symbol: str, exchange: str) -> Tuple[Optional[dict],
     finally:
         st.fetching = False
 
+def _parse_managed_key(key_str: str) -> Optional[Tuple[str, str]]:
+    """Managed holding keys are stored as "('SYM', 'EX')" or "SYM:EX"."""
+    try:
+        if ':' in key_str:
+            symbol, exchange = key_str.split(':', 1)
+        else:
+            import ast
+            symbol, exchange = ast.literal_eval(key_str)
+        return symbol.upper(), exchange.upper()
+    except Exception:
+        return None
+
+def symbol_timeframe(key) -> str:
+    """Strategy timeframe of a (symbol, exchange) key (config Timeframe, default 15T)."""
+    return config_dict.get(key, {}).get("Timeframe", "15T")
+
+def collect_cycle_quote_keys(timeframes=None, risk=True) -> list:
+    """
+    All (symbol, exchange) pairs that need a quote this cycle:
+    SYMBOLS_TO_TRACK + enabled Butler-managed holdings (limited to ``timeframes``
+    when given) + RiskManager DB positions (when ``risk``).
+    """
+    keys = []
+    seen = set()
+
+    def add(symbol, exchange, strategy=True):
+        if not symbol or not exchange:
+            return
+        if strategy and timeframes is not None and symbol_timeframe((symbol, exchange)) not in timeframes:
+            return
+        k = (symbol.upper(), exchange.upper())
+        if k not in seen and not k[0].startswith('^') and 'INDIAVIX' not in k[0]:
+            seen.add(k)
+            keys.append(k)
+
+    for symbol, ex in SYMBOLS_TO_TRACK:
+        add(symbol, ex)
+    if state_mgr:
+        managed = state_mgr.state.get('managed_holdings', {})
+        if isinstance(managed, dict):
+            for key_str, is_enabled in managed.items():
+                parsed = _parse_managed_key(key_str) if is_enabled else None
+                if parsed:
+                    add(*parsed)
+    if risk and risk_mgr and db:
+        try:
+            for pos in db.get_open_positions():
+                add(pos.get('symbol'), pos.get('exchange'), strategy=False)
+        except Exception as e:
+            log_ok(f"⚠️ Could not read open positions for quote batch: {e}")
+    return keys
+
+def prefetch_cycle_quotes(keys) -> int:
+    """
+    Fetch OHLC quotes for all ``keys`` in chunked multi-instrument requests
+    (``i=EX:SYM&i=EX:SYM...``) and pre-populate CYCLE_QUOTES.
+    REITs on NSE are requested on BSE and NSE, BSE preferred (same as
+    fetch_market_data_once). Keys a successful batch returned no data for are
+    remembered in CYCLE_QUOTE_MISSES; keys in failed batches are left for the
+    per-symbol path. Returns the number of quotes cached.
+    """
+    if is_offline() or not keys:
+        return 0
+
+    # key -> instrument strings to try, in priority order
+    wanted = {}
+    for symbol, exchange in keys:
+        key = f"{exchange}:{symbol}"
+        if key in CYCLE_QUOTES and CYCLE_QUOTES[key] is not None:
+            continue
+        if symbol in REIT_TOKEN_MAP and exchange == "NSE":
+            wanted[key] = [f"BSE:{symbol}", f"NSE:{symbol}"]
+        else:
+            wanted[key] = [f"{exchange}:{symbol}"]
+
+    instruments = list(dict.fromkeys(i for opts in wanted.values() for i in opts))
+    url = "https://api.mstock.trade/openapi/typea/instruments/quote/ohlc"
+    headers = {"Authorization": f"token {API_KEY}:{ACCESS_TOKEN}", "X-Mirae-Version": "1"}
+    found: Dict[str, dict] = {}
+    answered = set()
+    for start in range(0, len(instruments), QUOTE_BATCH_SIZE):
+        chunk = instruments[start:start + QUOTE_BATCH_SIZE]
+        resp = safe_request("GET", url, headers=headers, params=[("i", i) for i in chunk])
+        if resp is None or resp.status_code != 200:
+            if resp is not None:
+                log_ok(f"❌ Batch quote error {resp.status_code}: {resp.text[:200]}")
+            continue
+        try:
+            data = (resp.json() or {}).get("data") or {}
+        except ValueError:
+            continue
+        answered.update(chunk)
+        for inst in chunk:
+            if data.get(inst):
+                found[inst] = data[inst]
+
+    cached = 0
+    for key, options in wanted.items():
+        for inst in options:
+            if inst in found:
+                CYCLE_QUOTES[key] = found[inst]
+                CYCLE_QUOTE_SOURCE[key] = inst.split(":", 1)[0]
+                cached += 1
+                break
+        else:
+            if all(inst in answered for inst in options):
+                CYCLE_QUOTE_MISSES.add(key)
+    return cached
+
 INSUFFICIENT_HISTORY_TS: Dict[str, pd.Timestamp] = {}
 
 def should_log_insufficient_history(symbol: str, bar_ts: pd.Timestamp) -> bool:
@@ -272,11 +417,17 @@ def should_log_insufficient_history(symbol: str, bar_ts: pd.Timestamp) -> bool:
         return True
     return False
 
-def get_symbol_lock(symbol: str) -> bool:
-    return SYMBOL_LOCKS.setdefault(symbol, False)
+def get_symbol_lock(symbol: str) -> threading.Lock:
+    lock = SYMBOL_LOCKS.get(symbol)
+    if lock is None:
+        with _SYMBOL_LOCKS_GUARD:
+            lock = SYMBOL_LOCKS.setdefault(symbol, threading.Lock())
+    return lock
 
 def reset_cycle_quotes():
     CYCLE_QUOTES.clear()
+    CYCLE_QUOTE_SOURCE.clear()
+    CYCLE_QUOTE_MISSES.clear()
 
 def is_offline() -> bool:
     return bool(OFFLINE.get("active"))
@@ -293,35 +444,10 @@ def mark_online_if_needed():
         OFFLINE["since"] = None
 
 def safe_request(method, url, **kwargs):
-    print(f"DEBUG REQ: {method} {url}")
     try:
-        if "timeout" not in kwargs:
-            kwargs["timeout"] = (5, 15)
-            
-        # Standard browser-like headers to avoid 403 Forbidden/WAF blocks
-        default_headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-            "Accept": "application/json, text/plain, */*",
-            "Accept-Language": "en-US,en;q=0.9",
-            "Accept-Encoding": "gzip, deflate, br",
-            "Connection": "keep-alive",
-            "Sec-Ch-Ua": '"Not_A Brand";v="8", "Chromium";v="120", "Google Chrome";v="120"',
-            "Sec-Ch-Ua-Mobile": "?0",
-            "Sec-Ch-Ua-Platform": '"Windows"',
-            "Sec-Fetch-Dest": "empty",
-            "Sec-Fetch-Mode": "cors",
-            "Sec-Fetch-Site": "same-site"
-        }
-        
-        # Merge default headers with provided headers
-        if "headers" not in kwargs:
-            kwargs["headers"] = default_headers
-        else:
-            merged_headers = default_headers.copy()
-            merged_headers.update(kwargs["headers"])
-            kwargs["headers"] = merged_headers
-            
-        resp = requests.request(method=method, url=url, **kwargs)
+        # Pooled keep-alive session; browser-like default headers live on the session
+        # and per-endpoint timeouts apply unless the caller passes one.
+        resp = broker_client.request(method, url, **kwargs)
         
         # 403 Forbidden / 401 Unauthorized Handling (Auto-Login Trigger)
         if resp.status_code in [401, 403]:
@@ -334,7 +460,7 @@ def safe_request(method, url, **kwargs):
                         kwargs["headers"]["Authorization"] = f"token {API_KEY}:{ACCESS_TOKEN}"
                     # Retry once
                     log_ok("🔄 Retrying request with new token...")
-                    resp = requests.request(method=method, url=url, **kwargs)
+                    resp = broker_client.request(method, url, **kwargs)
             else:
                 log_ok(f"❌ AUTH ERROR: verifytotp returned {resp.status_code}")
 
@@ -361,38 +487,132 @@ def now_ist():
 
 # ---------------- Config & Auth ----------------
 
-# ---------------- Initialize Settings Manager Early (Phase 0A) ----------------
+# ---------------- Settings & Credentials ----------------
+# Populated by Engine.initialize() (see below), not at import
 settings = None
-if SETTINGS_AVAILABLE:
+API_KEY = API_SECRET = CLIENT_CODE = PASSWORD = ACCESS_TOKEN = None
+
+# Hot paths read SETTINGS_SNAPSHOT attributes; settings.get() stays for setup code
+SETTINGS_SNAPSHOT = SettingsSnapshot() if SettingsSnapshot else None
+_SNAPSHOT_SOURCE = {"settings": None, "version": None}  # what SETTINGS_SNAPSHOT was built from
+
+def refresh_settings_snapshot(check_file: bool = False):
+    """
+    Swap SETTINGS_SNAPSHOT when ``settings`` was replaced or saved/reloaded (its
+    version moved), or, with ``check_file``, edited on disk. The swap is one
+    global rebinding: a reader keeps the snapshot it already holds.
+    """
+    global SETTINGS_SNAPSHOT, ALLOCATED_CAPITAL
+    current = settings
+    if SettingsSnapshot is None:
+        return SETTINGS_SNAPSHOT
+    if check_file and isinstance(current, SettingsManager):
+        try:
+            if current.reload_if_changed():
+                log_ok("🔄 settings.json changed on disk - reloaded", force=True)
+        except Exception as e:
+            log_ok(f"⚠️ Settings file check failed: {e}")
+    version = getattr(current, "version", None)
+    if current is _SNAPSHOT_SOURCE["settings"] and version == _SNAPSHOT_SOURCE["version"]:
+        return SETTINGS_SNAPSHOT
+    if current is None:
+        snapshot = SettingsSnapshot()
+    elif isinstance(current, SettingsManager):
+        snapshot = current.snapshot()
+    else:
+        snapshot = SettingsSnapshot.build(current.get)
+    _SNAPSHOT_SOURCE.update(settings=current, version=version)
+    SETTINGS_SNAPSHOT = snapshot
+    if current is not None:
+        ALLOCATED_CAPITAL = snapshot.allocated_limit
+    return snapshot
+
+def _init_settings():
+    """SettingsManager plus the settings-driven knobs of already-imported services."""
+    global settings, ALLOCATED_CAPITAL, ENGINE_BEAT_SECONDS
+    settings = None
+    if SETTINGS_AVAILABLE:
+        try:
+            settings = SettingsManager()
+            settings.load()
+            log_ok("✅ Settings Manager initialized", force=True)
+        except Exception as e:
+            log_ok(f"⚠️ Settings Manager init failed: {e}", force=True)
+            settings = None
+    refresh_settings_snapshot()
+    if not settings:
+        return
+
     try:
-        settings = SettingsManager()
-        settings.load()
+        broker_client.configure(
+            pool_size=int(settings.get("broker.http_pool_size", 20)),
+            retries=int(settings.get("broker.http_retries", 2)),
+        )
     except Exception as e:
-        print(f"⚠️ Settings Manager early init failed: {e}")
+        print(f"⚠️ Broker HTTP client config failed, using defaults: {e}")
 
-# ---------------- Config & Auth ----------------
+    if state_mgr:
+        try:
+            state_mgr.configure(flush_interval_ms=int(settings.get("app_settings.state_flush_ms", 500)))
+        except Exception as e:
+            print(f"⚠️ State persistence config failed, using defaults: {e}")
+
+    positions_service.ttl = float(settings.get("app_settings.positions_ttl_seconds", 5))
+
+    try:
+        # Load User's "Safety Box" Limit
+        ALLOCATED_CAPITAL = float(settings.get("capital.allocated_limit", 50000.0))
+        log_ok(f"💰 Bot Capital Limit Set to: ₹{ALLOCATED_CAPITAL:,.2f}")
+        
+        # Load Engine Beat Setting
+        ENGINE_BEAT_SECONDS = float(settings.get("app_settings.engine_beat_seconds", 2.0))
+        log_ok(f"💓 Engine Beat Frequency: {ENGINE_BEAT_SECONDS}s")
+    except: pass
+
+def _init_credentials():
+    """Broker credentials: settings.json first, .env as fallback; legacy credentials.json token migration."""
+    global API_KEY, API_SECRET, CLIENT_CODE, PASSWORD, ACCESS_TOKEN
+    load_dotenv()
 
-load_dotenv()
+    # Prioritize settings.json, fallback to .env
+    API_KEY = settings.get_decrypted("broker.api_key") if settings else os.getenv('API_KEY')
+    API_SECRET = settings.get_decrypted("broker.api_secret") if settings else os.getenv('API_SECRET')
+    CLIENT_CODE = settings.get("broker.client_code") if settings else os.getenv('CLIENT_CODE')
+    PASSWORD = settings.get_decrypted("broker.password") if settings else os.getenv('PASSWORD')
 
-# Prioritize settings.json, fallback to .env
-API_KEY = settings.get_decrypted("broker.api_key") if settings else os.getenv('API_KEY')
-API_SECRET = settings.get_decrypted("broker.api_secret") if settings else os.getenv('API_SECRET')
-CLIENT_CODE = settings.get("broker.client_code") if settings else os.getenv('CLIENT_CODE')
-PASSWORD = settings.get_decrypted("broker.password") if settings else os.getenv('PASSWORD')
+    if not all([API_KEY, API_SECRET, CLIENT_CODE]):
+        log_ok("⚠️ Warning: Missing broker credentials. Please configure them in the Settings GUI.")
+        if not any([API_KEY, API_SECRET, CLIENT_CODE]):
+            log_ok("❌ Essential credentials missing. Bot will not be able to trade.")
 
-if not all([API_KEY, API_SECRET, CLIENT_CODE]):
-    log_ok("⚠️ Warning: Missing broker credentials. Please configure them in the Settings GUI.")
-    if not any([API_KEY, API_SECRET, CLIENT_CODE]):
-        log_ok("❌ Essential credentials missing. Bot will not be able to trade.")
+    # Consolidate Access Token
+    ACCESS_TOKEN = settings.get_decrypted("broker.access_token") if settings else None
+
+    # Migration Logic: If token is in credentials.json but not in settings, migrate it (Phase 0A Cleanup)
+    if not ACCESS_TOKEN and os.path.exists("credentials.json"):
+        try:
+            with open("credentials.json", "r") as f:
+                legacy_creds = json.load(f)
+                ACCESS_TOKEN = legacy_creds.get("mstock", {}).get("access_token")
+                if ACCESS_TOKEN and settings:
+                    settings.set("broker.access_token", ACCESS_TOKEN)
+                    log_ok("🔐 Migrated access token from credentials.json to encrypted settings.json")
+        except Exception as e:
+            log_ok(f"⚠️ Migration from credentials.json failed: {e}")
+
+    if not ACCESS_TOKEN:
+        log_ok("⚠️ Global Access Token is missing. Bot will not function until tokens are set in Settings.")
 
 EXCHANGES = ["NSE", "BSE"]
 
 # State Control
 STOP_REQUESTED = False
+STOP_EVENT = threading.Event()  # wakes a market-closed sleep on stop
 
 def request_stop():
     global STOP_REQUESTED
     STOP_REQUESTED = True
+    STOP_EVENT.set()
     if state_mgr:
         state_mgr.set_stop_requested(True)
     log_ok("🛑 STOP SIGNAL RECEIVED - Persisting and Stopping Engine...")
@@ -400,6 +620,7 @@ def request_stop():
 def reset_stop_flag():
     global STOP_REQUESTED
     STOP_REQUESTED = False
+    STOP_EVENT.clear()
     if state_mgr:
         state_mgr.set_stop_requested(False)
     log_ok("🔄 STOP FLAG RESET - Engine Ready.")
@@ -420,6 +641,7 @@ def reload_config():
             CLIENT_CODE = settings.get("broker.client_code")
             PASSWORD = settings.get_decrypted("broker.password")
             ACCESS_TOKEN = settings.get_decrypted("broker.access_token")
+            refresh_settings_snapshot()
             
             log_ok("✅ Configuration Reloaded Successfully")
             log_ok("✅ Configuration Reloaded Successfully")
@@ -434,17 +656,6 @@ RSI_PERIOD = 14
 ALLOCATED_CAPITAL = 50000.0 # Default Safety Limit (₹50k)
 ENGINE_BEAT_SECONDS = 2.0   # Default Beat Frequency
 
-if settings:
-    try:
-        # Load User's "Safety Box" Limit
-        ALLOCATED_CAPITAL = float(settings.get("capital.allocated_limit", 50000.0))
-        log_ok(f"💰 Bot Capital Limit Set to: ₹{ALLOCATED_CAPITAL:,.2f}")
-        
-        # Load Engine Beat Setting
-        ENGINE_BEAT_SECONDS = float(settings.get("app_settings.engine_beat_seconds", 2.0))
-        log_ok(f"💓 Engine Beat Frequency: {ENGINE_BEAT_SECONDS}s")
-    except: pass
-
 def check_capital_safety(required_amount):
     """
     Returns True if we have enough ALLOCATED funds for this trade.
@@ -480,34 +691,14 @@ def check_capital_safety(required_amount):
         log_ok(f"⚠️ Capital Check Error: {e}. Defaulting to Safe Mode (Block).")
         return False, 0.0
 
-# Consolidate Access Token
-ACCESS_TOKEN = settings.get_decrypted("broker.access_token") if settings else None
-
-# Migration Logic: If token is in credentials.json but not in settings, migrate it (Phase 0A Cleanup)
-if not ACCESS_TOKEN and os.path.exists("credentials.json"):
-    try:
-        with open("credentials.json", "r") as f:
-            legacy_creds = json.load(f)
-            ACCESS_TOKEN = legacy_creds.get("mstock", {}).get("access_token")
-            if ACCESS_TOKEN and settings:
-                settings.set("broker.access_token", ACCESS_TOKEN)
-                log_ok("🔐 Migrated access token from credentials.json to encrypted settings.json")
-    except Exception as e:
-        log_ok(f"⚠️ Migration from credentials.json failed: {e}")
-
 def fetch_market_data(symbol, exchange):
     # 1. 24/7 SIMULATION FALLBACK (Fabricated Data)
     # Check if we should simulate data (Paper Mode + API Failure/Market Closed)
     should_simulate = False
     
-    # Use global settings object instead of re-instantiating SettingsManager
-    if SETTINGS_AVAILABLE and settings:
-        try:
-            if settings.get("app_settings.paper_trading_mode", False):
-                should_simulate = True
-        except Exception as e:
-            # Silently fallback to no simulation if settings access fails
-            pass
+    # Use the engine's settings snapshot instead of re-instantiating SettingsManager
+    if SETTINGS_AVAILABLE and settings and SETTINGS_SNAPSHOT.paper_trading_mode:
+        should_simulate = True
 
     # Try Real API First
     if not is_offline():
@@ -725,7 +916,7 @@ def cancel_all_orders() -> int:
                     # Note: Type A cancel might differ slightly, using simplified payload for now
                     # requests.delete usually not used, usually POST for cancel endpoint in mStock
                     # Research suggests POST to /cancel with body
-                    requests.post(url, json=payload, headers=headers, timeout=5)
+                    broker_client.request("POST", url, json=payload, headers=headers, timeout=5)
                     count += 1
                 except Exception:
                     pass
@@ -741,7 +932,8 @@ def square_off_all_positions() -> int:
         return 0
 
     count = 0
-    positions = safe_get_live_positions_merged() 
+    # Exit acts on current positions, not the TTL-cached view
+    positions = positions_service.get(max_age=0)
     # This returns dict {symbol: details}
     
     for symbol_key, pos in positions.items():
@@ -768,7 +960,7 @@ def square_off_all_positions() -> int:
            # Assuming place_order handles instrument token lookup internally if not passed? 
            # No, it needs it. We must fetch.
            md, _ = fetch_market_data_once(symbol, exchange)
-           it = md.get("instrument_token") if md else None
+           it = instrument_token_for(symbol, exchange, md)
            
            if it:
                place_order(symbol, exchange, abs_qty, side, it, price=0)
@@ -807,7 +999,7 @@ def initialize_stock_configs():
                 
                 # Add to config dict
                 config_dict[(sym, ex)] = {
-                    "instrument_token": None, # Will be resolved dynamically
+                    "instrument_token": instrument_token_for(sym, ex), # None until the index knows it
                     "Timeframe": stock.get('timeframe', '15T'),
                     "RSI_Buy_Threshold": float(stock.get('buy_rsi', 30)),
                     "RSI_Sell_Threshold": float(stock.get('sell_rsi', 70)),
@@ -821,9 +1013,59 @@ def initialize_stock_configs():
     except Exception as e:
         log_ok(f"❌ Init Error: {e}")
 
+SCRIP_MASTER_URL = "https://api.mstock.trade/openapi/typea/instruments/scriptmaster"
+
+def instrument_token_for(symbol, exchange, market_data=None):
+    """Token from the local instrument index (no network); the quote's token otherwise."""
+    token = INSTRUMENT_INDEX.token(symbol, exchange) if INSTRUMENT_INDEX else None
+    if token:
+        return token
+    return market_data.get("instrument_token") if market_data else None
+
+def fill_config_tokens():
+    """Set config_dict tokens that are still missing from the instrument index."""
+    for (symbol, exchange), conf in list(config_dict.items()):
+        if not conf.get("instrument_token"):
+            conf["instrument_token"] = instrument_token_for(symbol, exchange)
+
+def download_scrip_master() -> Optional[str]:
+    """Scrip master CSV from mStock, or None."""
+    headers = {"Authorization": f"token {API_KEY}:{ACCESS_TOKEN}", "X-Mirae-Version": "1"}
+    resp = safe_request("GET", SCRIP_MASTER_URL, headers=headers, timeout=60)
+    if resp is not None and resp.status_code == 200:
+        return resp.text
+    if resp is not None:
+        log_ok(f"⚠️ Scrip master download failed: {resp.status_code}")
+    return None
+
+def refresh_instrument_index(background=True):
+    """
+    Re-import the scrip master once per (IST) day, in a daemon thread by default,
+    then fill in config_dict tokens that were still missing. Called every
+    scheduler tick: no thread is started while a download is in flight, during
+    the retry window after a failure, or before login.
+    """
+    if INSTRUMENT_INDEX is None or is_offline() or not ACCESS_TOKEN:
+        return
+    if not INSTRUMENT_INDEX.should_refresh(now_ist().date()):
+        return
+
+    def refresh():
+        try:
+            if INSTRUMENT_INDEX.refresh(download_scrip_master, now_ist().date()):
+                log_ok(f"📇 Instrument index refreshed: {len(INSTRUMENT_INDEX):,} instruments")
+                fill_config_tokens()
+        except Exception as e:
+            log_ok(f"⚠️ Instrument index refresh failed: {e}")
+
+    if background:
+        threading.Thread(target=refresh, name="instrument-index", daemon=True).start()
+    else:
+        refresh()
+
 def resolve_instrument_token(symbol, exchange):
     """
-    Fetch instrument_token dynamically using the Quote API
+    Instrument token: REIT map, then the local instrument index, then the Quote API
     """
     try:
         url = "https://api.mstock.trade/openapi/typea/instruments/quote/ohlc"
@@ -832,6 +1074,9 @@ def resolve_instrument_token(symbol, exchange):
         mstock_symbol = symbol.upper()
         if mstock_symbol in REIT_TOKEN_MAP:
             return REIT_TOKEN_MAP[mstock_symbol]
+        token = instrument_token_for(mstock_symbol, exchange)
+        if token:
+            return token
 
         params = {"i": f"{exchange}:{mstock_symbol}"}
         resp = safe_request("GET", url, headers=headers, params=params)
@@ -1108,7 +1353,7 @@ def handle_token_exception_and_refresh_token():
         session_url = "https://api.mstock.trade/openapi/typea/session/token"
         session_payload = {"api_key": API_KEY, "request_token": request_token, "checksum": checksum}
         session_headers = {"X-Mirae-Version": "1", "Content-Type": "application/x-www-form-urlencoded"}
-        session_resp = requests.post(session_url, data=session_payload, headers=session_headers, timeout=(5, 15))
+        session_resp = broker_client.request("POST", session_url, data=session_payload, headers=session_headers)
         if session_resp.status_code != 200:
             log_ok(f"❌ Session generation failed during token refresh: {session_resp.status_code}")
             return False
@@ -1129,78 +1374,132 @@ def handle_token_exception_and_refresh_token():
         log_ok(f"❌ Exception in token refresh: {e}")
         return False
 
-if not ACCESS_TOKEN:
-    if __name__ == "__main__":
-        if not handle_token_exception_and_refresh_token():
-            sys.exit(1)
-    else:
-        log_ok("⚠️ Global Access Token is missing. Bot will not function until tokens are set in Settings.")
-
 # Modified initialization to wait for SettingsManager
 SYMBOLS_TO_TRACK = []
 config_dict = {}
 
-# We cannot initialize SYMBOLS_TO_TRACK here because 'settings' might not be instantiated yet.
-# We will call initialize_stock_configs() after SettingsManager is ready (around line 1052).
-
-# ---------------- Initialize Other Modules (Phase 0A) ----------------
-if 'settings' not in globals() or settings is None:
-    settings = None
-if 'db' not in globals() or db is None:
-    db = None
+# ---------------- Engine Initialization (Phase 0A) ----------------
+# Nothing here runs at import: launchers call initialize() before starting the
+# engine, so importing kickstart for a helper stays cheap.
+db = None
 risk_mgr = None
 # state_mgr is imported at the top level from state_manager
 notifier = None
 
-if SETTINGS_AVAILABLE:
-    try:
-        settings = SettingsManager()
-        log_ok("✅ Settings Manager initialized", force=True)
-        # Initialize stocks after settings is ready
-        initialize_stock_configs()
-    except Exception as e:
-        log_ok(f"⚠️ Settings Manager init failed: {e}", force=True)
-        settings = None
+def risk_md_fetcher(s, e):
+    """RiskManager market data: (dict, exchange) tuple unwrapped, last_price mapped to lp."""
+    raw_md, _ = fetch_market_data_once(s, e)  # Served from the cycle's batch quotes
+    if not raw_md:
+        raw_md, _ = fetch_market_data(s, e)
+    if raw_md and "last_price" in raw_md:
+        raw_md = dict(raw_md)
+        raw_md["lp"] = raw_md["last_price"] # Map for RiskManager compatibility
+    return raw_md
+
+def _init_database():
+    global db
+    db = None
+    if DATABASE_AVAILABLE:
+        try:
+            db = TradesDatabase()
+            log_ok("✅ Trade Database initialized", force=True)
+        except Exception as e:
+            log_ok(f"⚠️ Database init failed: {e}", force=True)
+            db = None
 
-if DATABASE_AVAILABLE:
-    try:
-        db = TradesDatabase()
-        log_ok("✅ Trade Database initialized", force=True)
-    except Exception as e:
-        log_ok(f"⚠️ Database init failed: {e}", force=True)
-        db = None
+def _init_risk_manager():
+    global risk_mgr
+    risk_mgr = None
+    if RISK_MANAGER_AVAILABLE and db:
+        try:
+            risk_mgr = RiskManager(settings, db, risk_md_fetcher, state_manager=state_mgr)
+            log_ok("✅ Risk Manager initialized", force=True)
+        except Exception as e:
+            log_ok(f"⚠️ Risk Manager init failed: {e}", force=True)
+            risk_mgr = None
+    elif RISK_MANAGER_AVAILABLE and not db:
+        log_ok("⚠️ Risk Manager skipped (database not available)", force=True)
+
+def _init_storage():
+    """Candle warehouse, instrument index and market calendar (local files, no network)."""
+    global CANDLE_WAREHOUSE, INSTRUMENT_INDEX, MARKET_CALENDAR
+    # Candle warehouse: stored history survives restarts (empty dir setting disables it)
+    warehouse_dir = settings.get("app_settings.candle_warehouse_dir", CANDLE_WAREHOUSE_ROOT) if settings else CANDLE_WAREHOUSE_ROOT
+    CANDLE_WAREHOUSE = CandleWarehouse(warehouse_dir) if warehouse_dir else None
+
+    # Instrument index: tokens from the last imported scrip master (refreshed daily by the scheduler)
+    index_path = settings.get("app_settings.instrument_index_path", INSTRUMENT_INDEX_PATH) if settings else INSTRUMENT_INDEX_PATH
+    INSTRUMENT_INDEX = InstrumentIndex(index_path) if index_path else None
+    if INSTRUMENT_INDEX is not None:
+        try:
+            if INSTRUMENT_INDEX.load():
+                log_ok(f"✅ Instrument index loaded: {len(INSTRUMENT_INDEX):,} instruments ({INSTRUMENT_INDEX.refreshed_on})", force=True)
+        except Exception as e:
+            log_ok(f"⚠️ Instrument index load failed: {e}", force=True)
 
-if RISK_MANAGER_AVAILABLE and db:
+    # Market calendar: exchange holidays and special sessions
+    calendar_path = settings.get("app_settings.market_calendar_path", MARKET_CALENDAR_PATH) if settings else MARKET_CALENDAR_PATH
     try:
-        # RiskManager(settings, database, market_data_fetcher)
-        # Wrapper to handle (dict, exchange) tuple and key mapping (last_price -> lp)
-        def risk_md_fetcher(s, e):
-            raw_md, _ = fetch_market_data(s, e)
-            if raw_md and "last_price" in raw_md:
-                raw_md["lp"] = raw_md["last_price"] # Map for RiskManager compatibility
-            return raw_md
-            
-        risk_mgr = RiskManager(settings, db, risk_md_fetcher, state_manager=state_mgr)
-        log_ok("✅ Risk Manager initialized", force=True)
+        MARKET_CALENDAR = MarketCalendar.load(calendar_path)
+        log_ok(f"✅ Market calendar loaded: {len(MARKET_CALENDAR.holidays)} holidays, {len(MARKET_CALENDAR.special_sessions)} special sessions", force=True)
     except Exception as e:
-        log_ok(f"⚠️ Risk Manager init failed: {e}", force=True)
-        risk_mgr = None
-elif RISK_MANAGER_AVAILABLE and not db:
-    log_ok("⚠️ Risk Manager skipped (database not available)", force=True)
+        log_ok(f"⚠️ Market calendar load failed (weekends only): {e}", force=True)
 
-# state_mgr is already imported from state_manager module above
+def _init_strategies():
+    global sip_engine, notifier
+    # Initialize Strategy Engines
+    from strategies.nifty_sip import NiftySIPStrategy
+    sip_engine = NiftySIPStrategy(settings)
 
-# Initialize Strategy Engines
-sip_engine = NiftySIPStrategy(settings)
+    # Initialize Notification Manager
+    notifier = None
+    if NOTIFICATIONS_AVAILABLE and settings:
+        try:
+            notifier = NotificationManager(settings)
+            log_ok("✅ Notification Manager initialized", force=True)
+        except Exception as e:
+            log_ok(f"⚠️ Notification Manager failed: {e}", force=True)
 
-# Initialize Notification Manager
-if NOTIFICATIONS_AVAILABLE and settings:
-    try:
-        notifier = NotificationManager(settings)
-        log_ok("✅ Notification Manager initialized", force=True)
-    except Exception as e:
-        log_ok(f"⚠️ Notification Manager failed: {e}", force=True)
+class Engine:
+    """
+    One-time engine setup, in dependency order: settings, credentials, trade
+    database, RiskManager, local storage, stock configs, strategy/notification
+    managers. ``init_ms`` keeps each step's wall time for startup profiling.
+    """
 
+    STEPS = (
+        ("settings", _init_settings),
+        ("credentials", _init_credentials),
+        ("database", _init_database),
+        ("risk", _init_risk_manager),
+        ("storage", _init_storage),
+        ("stocks", initialize_stock_configs),
+        ("strategies", _init_strategies),
+    )
+
+    def __init__(self):
+        self.initialized = False
+        self.init_ms: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def initialize(self, force: bool = False) -> "Engine":
+        """Run the setup steps once (``force`` re-runs them); later calls return immediately."""
+        with self._lock:
+            if self.initialized and not force:
+                return self
+            for name, step in self.STEPS:
+                started = time.perf_counter()
+                step()
+                self.init_ms[name] = round((time.perf_counter() - started) * 1000, 2)
+            self.initialized = True
+            log_ok(f"⚙️ Engine initialized in {sum(self.init_ms.values()):.0f} ms", force=True)
+        return self
+
+ENGINE = Engine()
+
+def initialize(force: bool = False) -> Engine:
+    """Set up the engine once; every launcher calls this before using engine state."""
+    return ENGINE.initialize(force)
 
 def get_exchange_for_symbol(symbol: str) -> list[str]:
     sym = symbol.upper()
@@ -1215,7 +1514,7 @@ def get_exchange_for_symbol(symbol: str) -> list[str]:
 
 def get_positions():
     # Paper Trading Override
-    if settings and settings.get("app_settings.paper_trading_mode"):
+    if settings and SETTINGS_SNAPSHOT.paper_trading_mode:
         if not db:
             return {}
         try:
@@ -1253,8 +1552,10 @@ def get_positions():
         log_ok("⚠️ Offline mode - skipping positions fetch")
         return {}
     
-    log_ok(f"🔍 Fetching holdings from mStock API...")
-    log_ok(f"   Token present: {bool(ACCESS_TOKEN)}, API Key: {API_KEY[:10] if API_KEY else 'NONE'}...")
+    debug = debug_enabled()
+    if debug:
+        log_ok(f"🔍 Fetching holdings from mStock API...")
+        log_ok(f"   Token present: {bool(ACCESS_TOKEN)}, API Key: {API_KEY[:10] if API_KEY else 'NONE'}...")
     
     url = "https://api.mstock.trade/openapi/typea/portfolio/holdings"
     headers = {"Authorization": f"token {API_KEY}:{ACCESS_TOKEN}", "X-Mirae-Version": "1"}
@@ -1279,7 +1580,8 @@ def get_positions():
         state_mgr.mark_token_validated()
     pos_dict = {}
     
-    log_ok(f"📊 Holdings API returned {len(positions)} items")
+    if debug:
+        log_ok(f"📊 Holdings API returned {len(positions)} items")
     
     for pos in positions:
         sym = pos.get("tradingsymbol")
@@ -1289,7 +1591,8 @@ def get_positions():
         pnl = pos.get("pnl", 0)
         used_quantity = pos.get("used_quantity", 0)
         
-        log_ok(f"  → {sym}: qty={qty}, used={used_quantity}, available={qty - used_quantity}")
+        if debug:
+            log_ok(f"  → {sym}: qty={qty}, used={used_quantity}, available={qty - used_quantity}")
         
         # Show ALL positions with qty > 0 (don't filter by used_quantity)
         # Even if all shares are "used" in a pledge/order, we still want to see the position
@@ -1303,7 +1606,8 @@ def get_positions():
                 "exchange": pos.get("exchange") or pos.get("exchangeSegment") or "NSE"
             }
     
-    log_ok(f"📦 Returning {len(pos_dict)} positions after filtering")
+    if debug:
+        log_ok(f"📦 Returning {len(pos_dict)} positions after filtering")
     return pos_dict
 
 def safe_get_positions():
@@ -1323,7 +1627,7 @@ def safe_get_positions():
 
 def get_orders_today():
     # Paper Trading Override
-    if settings and settings.get("app_settings.paper_trading_mode"):
+    if settings and SETTINGS_SNAPSHOT.paper_trading_mode:
         if not db:
             return []
         try:
@@ -1379,7 +1683,9 @@ def get_intraday_positions():
     if is_offline() or not ACCESS_TOKEN:
         return {}
     
-    log_ok("🔍 Fetching active intraday positions from mStock API...")
+    debug = debug_enabled()
+    if debug:
+        log_ok("🔍 Fetching active intraday positions from mStock API...")
     url = "https://api.mstock.trade/openapi/typea/portfolio/positions"
     headers = {"Authorization": f"token {API_KEY}:{ACCESS_TOKEN}", "X-Mirae-Version": "1"}
     
@@ -1413,32 +1719,43 @@ def get_intraday_positions():
                 "exchange": (pos.get("exchange") or pos.get("exchangeSegment") or "NSE").upper()
             }
         
-        log_ok(f"✅ Found {len(pos_dict)} active intraday positions")
+        if debug:
+            log_ok(f"✅ Found {len(pos_dict)} active intraday positions")
         return pos_dict
     except Exception as e:
         log_ok(f"⚠️ Failed to fetch intraday positions: {e}")
         return {}
 
+LAST_MERGE_SUMMARY: Dict[str, object] = {}
+
 def merge_positions_and_orders():
     # log_ok("🔄 Merging Holdings and Today's Orders for live dashboard...")
+    # One summary record per merge; per-row detail only at DEBUG (see debug_enabled)
+    debug = debug_enabled()
+    merge_start = time.perf_counter()
+    counts = {"new_entries": 0, "synced": 0, "settling": 0, "closed": 0}
     holdings = get_positions()   # CNC/Settled
     intraday = get_intraday_positions() # MIS/Active
     executed = get_orders_today()
     
     # Fetch BOT-initiated positions from DB to tag them
     bot_keys = set()
+    db_by_key = {}
     if db:
         try:
             # Check paper/real mode from settings or logic
             is_paper = False 
-            if settings and settings.get("app_settings.paper_trading_mode"):
+            if settings and SETTINGS_SNAPSHOT.paper_trading_mode:
                 is_paper = True
             
             # Fetch DB positions
             db_positions = db.get_open_positions(is_paper=is_paper)
             for p in db_positions:
-                bot_keys.add((p['symbol'].upper(), p['exchange'].upper()))
-            log_ok(f"📌 Found {len(bot_keys)} bot-tracked positions in DB")
+                db_key = (p['symbol'].upper(), p['exchange'].upper())
+                bot_keys.add(db_key)
+                db_by_key.setdefault(db_key, p)
+            if debug:
+                log_ok(f"📌 Found {len(bot_keys)} bot-tracked positions in DB")
         except Exception as de:
             log_ok(f"⚠️ Error reading DB positions for tagging: {de}")
     
@@ -1521,7 +1838,8 @@ def merge_positions_and_orders():
         elif side == "SELL":
             n["net_qty"] -= qty
             
-        log_ok(f"  Today's Order: {side} {sym}:{ex} Qty: {qty} @ {avg}")
+        if debug:
+            log_ok(f"  Today's Order: {side} {sym}:{ex} Qty: {qty} @ {avg}")
 
     # 3. Apply net changes to holdings
     for key, n in net_changes.items():
@@ -1540,7 +1858,9 @@ def merge_positions_and_orders():
                     "pnl": 0.0,
                     "source": source
                 }
-                log_ok(f"  ⭐ New Entry Sync: {sym}:{ex} -> Net Qty today: {n['net_qty']}")
+                counts["new_entries"] += 1
+                if debug:
+                    log_ok(f"  ⭐ New Entry Sync: {sym}:{ex} -> Net Qty today: {n['net_qty']}")
         else:
             # Existing position updated today
             old_qty = merged[key]["qty"]
@@ -1549,7 +1869,9 @@ def merge_positions_and_orders():
             if source == "BOT":
                 merged[key]["source"] = "BOT"
             
-            log_ok(f"  🔄 Position Sync: {sym}:{ex} Qty changed {old_qty} -> {merged[key]['qty']}")
+            counts["synced"] += 1
+            if debug:
+                log_ok(f"  🔄 Position Sync: {sym}:{ex} Qty changed {old_qty} -> {merged[key]['qty']}")
             
     # 4. Integrate DB-tracked positions that are MISSING from the broker (T+1 Settlement Gap)
     # If it's in our DB as open, but not in holdings or today's orders, keep it alive in memory
@@ -1558,7 +1880,7 @@ def merge_positions_and_orders():
         if key not in merged:
             try:
                 # Find the specific position details from the DB list
-                pos_data = next((p for p in db_positions if p['symbol'].upper() == sym and p['exchange'].upper() == ex), None)
+                pos_data = db_by_key.get(key)
                 if pos_data:
                     merged[key] = {
                         "qty": int(pos_data['net_quantity']),
@@ -1568,17 +1890,31 @@ def merge_positions_and_orders():
                         "pnl": 0.0,
                         "source": "BOT (SETTLING)"
                     }
-                    log_ok(f"  🕒 T+1 Settlement Sync: {sym}:{ex} retained from Database")
+                    counts["settling"] += 1
+                    if debug:
+                        log_ok(f"  🕒 T+1 Settlement Sync: {sym}:{ex} retained from Database")
             except Exception as se:
                 log_ok(f"  ⚠️ Failed to retain DB position {sym}:{ex}: {se}")
 
     # 5. Remove closed positions
     to_delete = [k for k, v in merged.items() if v["qty"] <= 0]
     for k in to_delete:
-        log_ok(f"  🗑️ Position closed: {k[0]}:{k[1]}")
+        if debug:
+            log_ok(f"  🗑️ Position closed: {k[0]}:{k[1]}")
         del merged[k]
-            
-    log_ok(f"✅ Merged result: {len(merged)} active positions")
+    counts["closed"] = len(to_delete)
+
+    summary = {
+        "holdings": len(holdings), "intraday": len(intraday), "orders_today": len(executed),
+        "bot_tracked": len(bot_keys), **counts, "active": len(merged),
+        "ms": round((time.perf_counter() - merge_start) * 1000.0, 1),
+    }
+    LAST_MERGE_SUMMARY.clear()
+    LAST_MERGE_SUMMARY.update(summary)
+    log_ok(f"✅ Merged result: {len(merged)} active positions "
+           f"(holdings={summary['holdings']} intraday={summary['intraday']} orders={summary['orders_today']} "
+           f"new={counts['new_entries']} synced={counts['synced']} settling={counts['settling']} "
+           f"closed={counts['closed']}, {summary['ms']}ms)", data={"positions_merge": summary})
     
     # Update global cache for fetch_market_data fallback
     global live_positions
@@ -1586,17 +1922,31 @@ def merge_positions_and_orders():
     
     return merged
 
-def safe_get_live_positions_merged():
+def _load_merged_positions():
+    """PositionsService loader: merged view, or None if the broker calls failed."""
     try:
         return merge_positions_and_orders()
     except Exception as e:
         err_msg = str(e)
         if "TokenException" in err_msg or "invalid session" in err_msg:
             if handle_token_exception_and_refresh_token():
-                return merge_positions_and_orders()
-            return {}
+                try:
+                    return merge_positions_and_orders()
+                except Exception as e2:
+                    log_ok(f"❌ Position merge failed after token refresh: {e2}")
+            return None
         log_ok(f"❌ Position merge failed: {e}")
-        return {}
+        return None
+
+positions_service = PositionsService(_load_merged_positions)  # ttl from settings in _init_settings
+
+def safe_get_live_positions_merged():
+    """
+    Merged positions (holdings + intraday + today's orders + DB), shared by the
+    engine, RiskManager, state snapshots and the dashboard through a TTL,
+    single-flight cache. Treat the returned view as read-only.
+    """
+    return positions_service.get()
 live_positions = {}
 # Removed top-level safe_get_positions() to prevent import-time hangs
 
@@ -1604,35 +1954,71 @@ live_positions = {}
 
 def tv_rma(series: pd.Series, length: int) -> pd.Series:
     x = pd.to_numeric(series, errors="coerce")
-    alpha = 1.0 / float(length)
-    sma = x.rolling(length, min_periods=length).mean()
-    rma = pd.Series(np.nan, index=x.index)
-    first = sma.first_valid_index()
-    if first is None:
-        return rma
-    rma.loc[first] = sma.loc[first]
-    for i in range(x.index.get_loc(first) + 1, len(x)):
-        rma.iloc[i] = alpha * x.iloc[i] + (1 - alpha) * rma.iloc[i - 1]
-    return rma
+    return pd.Series(rsi_kernel.rma(x.to_numpy(dtype=np.float64), length), index=x.index)
 
 def tv_rsi(close: pd.Series, length: int = 14) -> pd.Series:
     c = pd.to_numeric(close, errors="coerce")
-    ch = c.diff()
-    gain = ch.clip(lower=0)
-    loss = (-ch).clip(lower=0)
-    avg_gain = tv_rma(gain, length)
-    avg_loss = tv_rma(loss, length)
-    rs = avg_gain / avg_loss
-    rsi = 100 - (100 / (1 + rs))
-    rsi = rsi.where(avg_loss != 0, 100.0)
-    rsi = rsi.where(avg_gain != 0, 0.0)
-    return rsi
+    return pd.Series(rsi_kernel.rsi(c.to_numpy(dtype=np.float64), length), index=c.index)
 
 def tv_rsi_with_last_price(hist_close: pd.Series, last_price: float, length: int = 14) -> float:
-    adj = hist_close.copy()
-    if last_price is not None and np.isfinite(last_price):
-        adj.iloc[-1] = float(last_price)
-    return float(tv_rsi(adj, length).dropna().iloc[-1])
+    c = pd.to_numeric(hist_close, errors="coerce").to_numpy(dtype=np.float64)
+    last = rsi_kernel.rsi_last(c, length, last_price)
+    if np.isnan(last):
+        # Gap in the data (or too few bars): fall back to the last valid value
+        if last_price is not None and np.isfinite(last_price) and len(c):
+            c = c.copy()
+            c[-1] = float(last_price)
+        valid = rsi_kernel.rsi(c, length)
+        valid = valid[~np.isnan(valid)]
+        if not len(valid):
+            raise ValueError("Insufficient history to seed RSI.")
+        last = valid[-1]
+    return float(last)
+
+def rsi_validation_enabled() -> bool:
+    """Validation mode: cross-check every incremental RSI against the full recompute."""
+    try:
+        return bool(settings and SETTINGS_SNAPSHOT.rsi_validation_mode)
+    except Exception:
+        return False
+
+def incremental_rsi_with_last_price(cache_key, df: pd.DataFrame, live_price, length: int = 14) -> float:
+    """
+    RSI for the forming (last) bar of ``df`` using the persistent RSI_STATE for ``cache_key``.
+    The state only advances when new bars close; the live price costs O(1).
+    Same result as tv_rsi_with_last_price(df['close'], live_price, length).
+    """
+    closes = pd.to_numeric(df["close"], errors="coerce").to_numpy(dtype=np.float64)
+    index = df.index.as_unit("ns") if hasattr(df.index, "as_unit") else df.index
+    stamps = np.asarray(index.asi8, dtype=np.int64)
+
+    prev = RSI_STATE.get(cache_key)
+    prev_bars = prev.bars if prev is not None else 0
+    state = rsi_kernel.sync_state(prev, closes[:-1], stamps[:-1], length)
+    if state is None:
+        # Not enough clean closed bars: full recompute handles gaps/fallbacks
+        RSI_STATE.pop(cache_key, None)
+        return tv_rsi_with_last_price(df["close"], live_price, length=length)
+    if state is not prev:
+        RSI_STATS["reseeds"] += 1
+        RSI_STATE[cache_key] = state
+    else:
+        RSI_STATS["bars_advanced"] += state.bars - prev_bars
+    RSI_STATS["evaluations"] += 1
+
+    price = live_price if live_price is not None and np.isfinite(live_price) else closes[-1]
+    value = state.what_if(price)
+
+    if rsi_validation_enabled():
+        full = tv_rsi_with_last_price(df["close"], live_price, length=length)
+        if not (abs(full - value) <= RSI_VALIDATION_TOLERANCE):
+            RSI_STATS["validation_mismatches"] += 1
+            log_ok(f"⚠️ RSI validation mismatch {cache_key}: incremental={value:.6f} full={full:.6f} (using full)")
+            RSI_STATE.pop(cache_key, None)
+            return full
+    if np.isnan(value):
+        return tv_rsi_with_last_price(df["close"], live_price, length=length)
+    return float(value)
 
 def compute_rsi(close_series, period=RSI_PERIOD):
     delta = close_series.diff()
@@ -1653,64 +2039,182 @@ def rsi_tradingview(close: pd.Series, length: int = 14) -> pd.Series:
     rsi = 100 - (100 / (1 + rs))
     return rsi
 
+def _candle_cache_put(cache_key, df: pd.DataFrame):
+    """Store ``df`` (trimmed to CANDLE_CACHE_MAX_BARS) as most recently used; evict LRU keys."""
+    if len(df) > CANDLE_CACHE_MAX_BARS:
+        df = df.tail(CANDLE_CACHE_MAX_BARS)
+    with CANDLE_CACHE_LOCK:
+        CANDLE_CACHE[cache_key] = df
+        CANDLE_CACHE.move_to_end(cache_key)
+        while len(CANDLE_CACHE) > CANDLE_CACHE_MAX_KEYS:
+            old_key, _ = CANDLE_CACHE.popitem(last=False)
+            CANDLE_NEXT_FETCH.pop(old_key, None)
+            RSI_STATE.pop(old_key, None)
+            CANDLE_CACHE_STATS["evictions"] += 1
+    return df
+
+def _schedule_next_candle_fetch(cache_key, df: pd.DataFrame, frame_minutes: int, now: datetime):
+    """
+    Next fetch is due when the stored last (forming) bar closes. If that moment
+    has already passed, the next bar is missing: in session the broker has not
+    published it yet, so retry after CANDLE_RETRY_SECONDS and wake the
+    scheduler for that group then (a full frame would keep the closed bar
+    "forming" until the next close); outside the session
+    retry after one frame (capped at 15 minutes) instead of every cycle.
+    """
+    frame = timedelta(minutes=frame_minutes)
+    due = df.index[-1].to_pydatetime() + frame
+    if due <= now:
+        if MARKET_CALENDAR.is_open(now):
+            due = now + min(frame, timedelta(seconds=CANDLE_RETRY_SECONDS))
+            if ENGINE_SCHEDULER is not None:
+                ENGINE_SCHEDULER.expedite(cache_key[2], due)  # re-evaluate once the bar is in
+        else:
+            due = now + min(frame, timedelta(minutes=15))
+    with CANDLE_CACHE_LOCK:
+        CANDLE_NEXT_FETCH[cache_key] = due
+
+def _reseed_candles(cache_key, symbol, exchange, timeframe, instrument_token, now, frame_minutes):
+    with CANDLE_CACHE_LOCK:
+        CANDLE_CACHE_STATS["reseeds"] += 1
+        CANDLE_CACHE.pop(cache_key, None)
+        RSI_STATE.pop(cache_key, None)
+    df = fetch_seed_candles(symbol, exchange, timeframe, instrument_token, now)
+    if df is None or df.empty:
+        with CANDLE_CACHE_LOCK:
+            CANDLE_NEXT_FETCH.pop(cache_key, None)
+        return None
+    df = _candle_cache_put(cache_key, df)
+    _schedule_next_candle_fetch(cache_key, df, frame_minutes, now)
+    return df
+
+def fetch_seed_candles(symbol, exchange, timeframe, instrument_token, now) -> Optional[pd.DataFrame]:
+    """
+    Seed history for the candle store: bars already in CANDLE_WAREHOUSE plus
+    only the bars since the last stored one (a full fetch when nothing usable
+    is stored). Without a warehouse this is the plain full fetch.
+    """
+    if CANDLE_WAREHOUSE is None:
+        return fetch_historical_data(symbol, exchange, timeframe, instrument_token)
+    try:
+        return CANDLE_WAREHOUSE.read_through(
+            symbol, exchange, timeframe,
+            lambda since: fetch_historical_data(symbol, exchange, timeframe, instrument_token, since=since),
+            start=now - timedelta(days=history_lookback_days(timeframe)),
+            columns=("open", "high", "low", "close"))
+    except Exception as e:
+        log_ok(f"⚠️ Candle warehouse read failed for {symbol}:{exchange} ({timeframe}): {e}")
+        return fetch_historical_data(symbol, exchange, timeframe, instrument_token)
+
+def store_candles(symbol, exchange, timeframe, df: pd.DataFrame):
+    """Persist freshly fetched bars to CANDLE_WAREHOUSE (best effort)."""
+    if CANDLE_WAREHOUSE is None:
+        return
+    try:
+        CANDLE_WAREHOUSE.ingest(symbol, exchange, timeframe, df)
+    except Exception as e:
+        log_ok(f"⚠️ Candle warehouse write failed for {symbol}:{exchange} ({timeframe}): {e}")
+
+def get_cached_candles(symbol, exchange, timeframe, instrument_token) -> Optional[pd.DataFrame]:
+    """
+    Bar-aligned candle store behind CANDLE_CACHE.
+    - Seed: one full history fetch per (symbol, exchange, timeframe).
+    - Between bar closes: served from memory, no API call (hit).
+    - After the stored forming bar closes: fetch only bars since the last stored
+      timestamp (partial fetch) and merge.
+    - If the partial fetch does not overlap the stored bars (gap), re-seed.
+    """
+    cache_key = (symbol, exchange, timeframe)
+    frame_minutes = frame_minutes_for(timeframe)
+    now = now_ist()
+    with CANDLE_CACHE_LOCK:
+        df = CANDLE_CACHE.get(cache_key)
+        if df is not None and not df.empty:
+            CANDLE_CACHE.move_to_end(cache_key)
+            due = CANDLE_NEXT_FETCH.get(cache_key)
+            if due is not None and now < due:
+                CANDLE_CACHE_STATS["hits"] += 1
+                return df
+            CANDLE_CACHE_STATS["partial_fetches"] += 1
+
+    if df is None or df.empty:
+        log_ok(f"🌡️ Seeding {CANDLE_CACHE_MAX_BARS}-bar RSI buffer for {symbol}:{exchange} ({timeframe})...")
+        return _reseed_candles(cache_key, symbol, exchange, timeframe, instrument_token, now, frame_minutes)
+
+    # Phase B: Incremental Update (only bars since the last stored one)
+    last_ts = df.index[-1]
+    try:
+        new_data = fetch_historical_data(symbol, exchange, timeframe, instrument_token,
+                                         since=last_ts.to_pydatetime())
+    except Exception as e:
+        log_ok(f"⚠️ Failed incremental update for {symbol}: {e}")
+        new_data = None
+
+    if new_data is None or new_data.empty:
+        _schedule_next_candle_fetch(cache_key, df, frame_minutes, now)
+        return df
+
+    if new_data.index[0] > last_ts:
+        with CANDLE_CACHE_LOCK:
+            CANDLE_CACHE_STATS["gaps"] += 1
+        log_ok(f"⚠️ Candle gap for {symbol}:{exchange} ({timeframe}) after {last_ts}, re-seeding.")
+        return _reseed_candles(cache_key, symbol, exchange, timeframe, instrument_token, now, frame_minutes)
+
+    store_candles(symbol, exchange, timeframe, new_data)
+    combined = pd.concat([df, new_data])
+    combined = combined[~combined.index.duplicated(keep='last')]
+    combined.sort_index(inplace=True)
+    combined = _candle_cache_put(cache_key, combined)
+    _schedule_next_candle_fetch(cache_key, combined, frame_minutes, now)
+    return combined
+
+def rsi_stabilization_enabled() -> bool:
+    return SETTINGS_SNAPSHOT.rsi_stabilization if settings else True
+
+def fetch_rsi_candles(symbol, exchange, timeframe, instrument_token) -> Optional[pd.DataFrame]:
+    """The candle I/O behind get_stabilized_rsi (candle store, or a full fetch when stabilization is off)."""
+    if rsi_stabilization_enabled():
+        return get_cached_candles(symbol, exchange, timeframe, instrument_token)
+    return fetch_historical_data(symbol, exchange, timeframe, instrument_token, days=None)
+
 def get_stabilized_rsi(symbol, exchange, timeframe, instrument_token, live_price=None):
     """
     RSI calculation with optional Stabilization (Phase A/B):
-    If stabilized=True: Uses memory buffer (CANDLE_CACHE) for precise RSI.
-    If stabilized=False: Performs a standard fetch of 100 bars for calculation.
+    If stabilized=True: Uses the bar-aligned candle store (CANDLE_CACHE) for precise RSI.
+    If stabilized=False: Performs a standard full fetch for every calculation.
+    Controlled by app_settings.rsi_stabilization (default on).
     """
-    from settings_manager import settings
-    # Force OFF for testing (was True)
-    use_stabilization = False 
-    if not use_stabilization:
+    cache_key = (symbol, exchange, timeframe)
+    # Concurrent cycle mode fetches candles ahead of the decision phase
+    if cache_key in CYCLE_CANDLES:
+        df = CYCLE_CANDLES.pop(cache_key)
+    else:
+        df = fetch_rsi_candles(symbol, exchange, timeframe, instrument_token)
+
+    if not rsi_stabilization_enabled():
         # Standard Fetch (Non-cached, lightweight)
-        df = fetch_historical_data(symbol, exchange, timeframe, instrument_token, days=None) 
         if df is None or df.empty:
             return None, None
         
-        # Local calculation using validated helpers
-        last_rsi = tv_rsi_with_last_price(df['close'], live_price, length=14)
+        # Local calculation on the persistent incremental RSI state
+        last_rsi = incremental_rsi_with_last_price(cache_key, df, live_price, length=14)
         ts = df.index[-1].strftime("%Y-%m-%d %H:%M:%S")
         return ts, last_rsi
 
     # --- Stabilized Cache Logic ---
-    cache_key = (symbol, exchange, timeframe)
-    df = CANDLE_CACHE.get(cache_key)
-    
-    if df is None:
-        log_ok(f"🌡️ Seeding 200+ bar RSI buffer for {symbol}:{exchange} ({timeframe})...")
-        df = fetch_historical_data(symbol, exchange, timeframe, instrument_token)
-        if df is not None and not df.empty:
-            CANDLE_CACHE[cache_key] = df
-        else:
-            return None, None
-    else:
-        # Phase B: Incremental Update (Smart Polling)
-        try:
-            new_data = fetch_historical_data(symbol, exchange, timeframe, instrument_token, days=2)
-            if new_data is not None and not new_data.empty:
-                combined = pd.concat([df, new_data])
-                combined = combined[~combined.index.duplicated(keep='last')]
-                combined.sort_index(inplace=True)
-                
-                if len(combined) > 400:
-                    combined = combined.tail(400)
-                
-                CANDLE_CACHE[cache_key] = combined
-        except Exception as e:
-            log_ok(f"⚠️ Failed incremental update for {symbol}: {e}")
-
-    # Final Calculation from Cache
-    current_df = CANDLE_CACHE.get(cache_key)
+    current_df = df
     if current_df is not None and not current_df.empty:
         try:
-            last_rsi = tv_rsi_with_last_price(current_df['close'], live_price, length=14)
+            last_rsi = incremental_rsi_with_last_price(cache_key, current_df, live_price, length=14)
             ts = current_df.index[-1].strftime("%Y-%m-%d %H:%M:%S")
             return ts, last_rsi
         except Exception as e:
             if "Insufficient history" in str(e):
                 log_ok(f"⚠️ Buffer too small for {symbol}, flushing cache to re-seed.")
-                CANDLE_CACHE.pop(cache_key, None)
+                with CANDLE_CACHE_LOCK:
+                    CANDLE_CACHE.pop(cache_key, None)
+                    CANDLE_NEXT_FETCH.pop(cache_key, None)
+                    RSI_STATE.pop(cache_key, None)
             return None, None
             
     return None, None
@@ -1758,11 +2262,14 @@ def floor_to_frame(dt, minutes):
     discard = (dt.minute % minutes) * 60 + dt.second
     return dt - timedelta(seconds=discard, microseconds=dt.microsecond)
 
-def build_last_nd_window_ist(days: int, frame_minutes: int):
+def build_last_nd_window_ist(days: int, frame_minutes: int, from_dt: Optional[datetime] = None):
     ist = pytz.timezone("Asia/Kolkata")
     now_ist = datetime.now(ist)
-    from_base = now_ist - timedelta(days=days)
-    from_dt = from_base.replace(hour=9, minute=15, second=0, microsecond=0)
+    if from_dt is None:
+        from_base = now_ist - timedelta(days=days)
+        from_dt = from_base.replace(hour=9, minute=15, second=0, microsecond=0)
+    else:
+        from_dt = from_dt.astimezone(ist)
     to_dt = floor_to_frame(now_ist, frame_minutes)
     from_encoded = quote(from_dt.strftime("%Y-%m-%d %H:%M:%S"))
     to_encoded = quote(to_dt.strftime("%Y-%m-%d %H:%M:%S"))
@@ -1772,77 +2279,40 @@ ist = pytz.timezone("Asia/Kolkata")
 
 def is_market_open_now_ist() -> bool:
     # 24/7 Override for Testing (ONLY if configured)
-    if settings and settings.get("app_settings.paper_trading_mode", False):
+    if settings and SETTINGS_SNAPSHOT.paper_trading_mode:
         return True
-
-    now = now_ist()
-    t = now.time()
-    
-    # Weekends
-    if now.weekday() >= 5: # Sat or Sun
-        return False
-        
-    start_time = dtime(9, 15)
-    end_time = dtime(15, 30) # 15:30
-    
-    return start_time <= t <= end_time
+    return MARKET_CALENDAR.is_open(now_ist())
 
 def is_trading_day(d: date) -> bool:
-    if d.weekday() >= 5:
-        return False
-    return True
+    return MARKET_CALENDAR.is_trading_day(d)
 
 def next_market_open_dt_ist(from_dt: Optional[datetime] = None) -> datetime:
-    now = from_dt.astimezone(ist) if from_dt else datetime.now(ist)
-    target_day = now.date()
-    if is_trading_day(target_day) and now.time() < OPEN_T:
-        target = datetime.combine(target_day, OPEN_T, ist)
-        return target
-    d = target_day
-    while True:
-        d += timedelta(days=1)
-        if is_trading_day(d):
-            return datetime.combine(d, OPEN_T, ist)
-
-OPEN_T = dtime(0, 0)
-CLOSE_T = dtime(23, 59)
+    """Next session open (holidays and special sessions included) after ``from_dt`` (default: now)."""
+    return MARKET_CALENDAR.next_open(from_dt or now_ist())
 
 def wait_for_market_open():
-    global LOG_SUPPRESS
-    LOG_SUPPRESS = True
-    try:
-        while not is_market_open_now_ist():
-            if STOP_REQUESTED:
-                log_ok("⏹ Cycle stopped by user during market wait.", force=True)
-                return
-            target = next_market_open_dt_ist()
-            now = now_ist()
-            remaining = int((target - now).total_seconds())
-            if remaining <= 0 or is_market_open_now_ist():
-                break
-            hh, rem = divmod(remaining, 3600)
-            mm, ss = divmod(rem, 60)
-            log_ok(
-                f"\n⏸️ Market closed — next open {target.strftime('%d-%b %H:%M IST')} | waiting {hh:02d}:{mm:02d}:{ss:02d}",
-                end="",
-                flush=True,
-                force=True,
-            )
-            
-            # Update state for heartbeat visibility
-            if state_mgr:
-                try:
-                    state_mgr.save()
-                except: pass
-                
-            time.sleep(1)
-        log_ok("\n🟢 Market open — resuming", flush=True, force=True)
-    finally:
-        LOG_SUPPRESS = False
+    """
+    Sleep until the next session opens: one log line, one state save and a
+    single wait that request_stop() cuts short.
+    """
+    if is_market_open_now_ist():
+        return
+    target = next_market_open_dt_ist()
+    hh, rem = divmod(max(0, int((target - now_ist()).total_seconds())), 3600)
+    log_ok(f"⏸️ Market closed — next open {target.strftime('%a %d-%b %H:%M IST')} | sleeping {hh:02d}:{rem // 60:02d}", force=True)
+    if state_mgr:
+        try:
+            state_mgr.save()
+        except Exception:
+            pass
+    if MARKET_CALENDAR.sleep_until_next_session(STOP_EVENT):
+        log_ok("🟢 Market open — resuming", force=True)
+    else:
+        log_ok("⏹ Cycle stopped by user during market wait.", force=True)
 
 def safe_place_order_when_open(symbol, exchange, qty, side, instrument_token, price=0, use_amo=False, rsi=0.0):
     if not is_market_open_now_ist():
-        log_ok(f"⏸️ Market closed: skip {side} {symbol}")
+        log_ok(f"⏸️ Market closed: skip {side} {symbol} (next open {next_market_open_dt_ist().strftime('%d-%b %H:%M IST')})")
         return False
         
     # print(f"{symbol}, {exchange}, {qty}, {side}")
@@ -1856,6 +2326,9 @@ def safe_place_order_when_open(symbol, exchange, qty, side, instrument_token, pr
     
     # Execute order placement
     order_success = place_order(symbol, exchange, qty, side, instrument_token, price=0, use_amo=use_amo)
+    if order_success:
+        ORDER_BOOK.record_placed(symbol, exchange, side, qty)
+        positions_service.invalidate()
     
     # ---------------- Trade Logging (Phase 0A) ----------------
     if order_success and db:
@@ -1867,30 +2340,9 @@ def safe_place_order_when_open(symbol, exchange, qty, side, instrument_token, pr
             # Calculate gross amount
             gross_amount = current_price * qty
             
-            # Calculate fees (mStock fee structure for CNC delivery)
-            brokerage = max(20, gross_amount * 0.0003)  # 0.03% or ₹20, whichever is higher
-            stt = gross_amount * 0.001 if side.upper() == "SELL" else 0  # 0.1% on sell only
-            exchange_fee = gross_amount * 0.0000345  # ~0.00345%
-            gst = brokerage * 0.18  # 18% on brokerage
-            sebi = gross_amount * 0.000001  # ₹10 per crore
-            stamp = gross_amount * 0.00015 if side.upper() == "BUY" else 0  # 0.015% on buy only
-            
-            total_fees = brokerage + stt + exchange_fee + gst + sebi + stamp
-            
-            # Calculate net amount
-            if side.upper() == "BUY":
-                net_amount = gross_amount + total_fees  # Cost = price + fees
-            else:  # SELL
-                net_amount = gross_amount - total_fees  # Proceeds = price - fees
-            
-            fee_breakdown = {
-                "brokerage": round(brokerage, 2),
-                "stt": round(stt, 2),
-                "exchange_charges": round(exchange_fee, 2),
-                "gst": round(gst, 2),
-                "sebi_charges": round(sebi, 2),
-                "stamp_duty": round(stamp, 2)
-            }
+            # Calculate fees (mStock fee structure for CNC delivery) and net amount
+            total_fees, fee_breakdown = trade_rules.cnc_fees(gross_amount, side)
+            net_amount = trade_rules.net_amount(gross_amount, total_fees, side)
             
             # Log trade to database
             trade_id = db.insert_trade(
@@ -1942,7 +2394,30 @@ execute_order = safe_place_order_when_open
 
 # ---------------- Market Data ----------------
 
-def fetch_historical_data(symbol, exchange, tf, instrument_token, days=None):
+HIST_TIMEFRAME_MAP = {
+    "1T": "1minute", "3T": "3minute", "5T": "5minute",
+    "10T": "10minute", "15T": "15minute", "30T": "30minute",
+    "1H": "60minute", "1D": "day"
+}
+FRAME_MINUTES_MAP = {
+    "1minute": 1, "3minute": 3, "5minute": 5,
+    "10minute": 10, "15minute": 15, "30minute": 30,
+    "60minute": 60, "day": 1440
+}
+
+def frame_minutes_for(tf: str) -> int:
+    """Bar length in minutes for a config timeframe (e.g. '15T' -> 15)."""
+    return FRAME_MINUTES_MAP.get(HIST_TIMEFRAME_MAP.get(tf, tf), 60)
+
+def history_lookback_days(tf: str) -> int:
+    """Default history window: a year of daily bars, 15 days of intraday bars."""
+    return 365 if HIST_TIMEFRAME_MAP.get(tf, tf) == "day" else 15
+
+def fetch_historical_data(symbol, exchange, tf, instrument_token, days=None, since=None):
+    """
+    Fetch OHLC candles from mStock. ``since`` (IST datetime) overrides the
+    ``days`` lookback so only bars from that timestamp onwards are returned.
+    """
     if is_offline():
         return None
 
@@ -1950,28 +2425,14 @@ def fetch_historical_data(symbol, exchange, tf, instrument_token, days=None):
         try:
             # Determine default lookback based on timeframe if not provided
             nonlocal days
-            timeframe_map = {
-                "1T": "1minute", "3T": "3minute", "5T": "5minute",
-                "10T": "10minute", "15T": "15minute", "30T": "30minute",
-                "1H": "60minute", "1D": "day"
-            }
-            api_timeframe = timeframe_map.get(tf, tf)
+            api_timeframe = HIST_TIMEFRAME_MAP.get(tf, tf)
             
             if days is None:
-                if api_timeframe == "day":
-                    days = 365
-                else:
-                    days = 15
+                days = history_lookback_days(tf)
 
-            # Correct frame_minutes lookup
-            frame_minutes_map = {
-                "1minute": 1, "3minute": 3, "5minute": 5,
-                "10minute": 10, "15minute": 15, "30minute": 30,
-                "60minute": 60, "day": 1440
-            }
-            frame_minutes = frame_minutes_map.get(api_timeframe, 60)
+            frame_minutes = FRAME_MINUTES_MAP.get(api_timeframe, 60)
 
-            from_encoded, to_encoded = build_last_nd_window_ist(days=days, frame_minutes=frame_minutes)
+            from_encoded, to_encoded = build_last_nd_window_ist(days=days, frame_minutes=frame_minutes, from_dt=since)
 
             # Fallback for REITs
             mstock_symbol = symbol.upper()
@@ -2033,67 +2494,126 @@ def fetch_historical_data(symbol, exchange, tf, instrument_token, days=None):
 
 # ---------------- Strategy ----------------
 
-def check_existing_orders(symbol: str, exchange: str, qty: int, side: str) -> bool:
-    if is_offline():
-        return False
+BLOCKING_ORDER_STATUSES = {"OPEN", "PENDING", "TRIGGERED"}
+
+class OrderBookSnapshot:
+    """
+    Cycle-scoped view of today's order book, fetched once per run_cycle.
+    Indexed by (symbol, exchange, side, status) -> [count, total_qty] so the
+    duplicate-order checks are dict lookups instead of scans of every order.
+    """
+
+    def __init__(self):
+        self.active = False
+        self.index: Dict[Tuple[str, str, str, str], list] = {}
+        self.exchanges: Dict[str, set] = {}
+
+    def load(self, orders: list):
+        self.index = {}
+        self.exchanges = {}
+        for o in orders:
+            qty = o.get("quantity", 0) if isinstance(o.get("quantity"), (int, float)) else 0
+            self.add(o.get("tradingsymbol"),
+                     o.get("exchange") or o.get("exchangeSegment") or "NSE",
+                     (o.get("transaction_type") or "").upper(),
+                     (o.get("status") or "").upper(),
+                     qty)
+        self.active = True
+
+    def add(self, symbol, exchange, side, status, qty):
+        entry = self.index.setdefault((symbol, exchange, side, status), [0, 0])
+        entry[0] += 1
+        entry[1] += qty
+        self.exchanges.setdefault(symbol, set()).add(exchange)
+
+    def record_placed(self, symbol: str, exchange: str, side: str, qty: int):
+        """Patch the snapshot with an order we just placed (blocks duplicates this cycle)."""
+        if self.active:
+            self.add(symbol, exchange, side.upper(), "PENDING", qty)
+
+    def clear(self):
+        self.active = False
+        self.index = {}
+        self.exchanges = {}
+
+    def filled_count(self) -> int:
+        """Number of filled orders (COMPLETE/TRADED) in the snapshot."""
+        return sum(v[0] for k, v in self.index.items() if k[3] in ("COMPLETE", "TRADED"))
+
+    def _blocking(self, symbol, exchanges, side):
+        count = qty = 0
+        for ex in exchanges:
+            for status in BLOCKING_ORDER_STATUSES:
+                entry = self.index.get((symbol, ex, side, status))
+                if entry:
+                    count += entry[0]
+                    qty += entry[1]
+        return count > 0, qty
+
+    def is_blocked(self, symbol: str, exchange: str, side: str) -> bool:
+        side = side.upper()
+        # BUY: the symbol on ANY exchange counts. SELL: only the same exchange (you sell where you hold).
+        exchanges = self.exchanges.get(symbol, ()) if side == "BUY" else (exchange,)
+        has_buy, total_buy_qty = self._blocking(symbol, exchanges, "BUY")
+        has_sell, total_sell_qty = self._blocking(symbol, exchanges, "SELL")
+
+        # If both buy and sell orders exist, allow buy orders only if total quantities match
+        if side == "BUY" and has_buy and has_sell:
+            return total_buy_qty != total_sell_qty
+        return has_buy if side == "BUY" else has_sell
+
+ORDER_BOOK = OrderBookSnapshot()
+ORDER_BOOK_STATE = {"filled": None}  # filled-order count seen by the previous cycle
+
+def fetch_order_book() -> Optional[list]:
+    """GET today's orders from mStock (None on failure)."""
     url = "https://api.mstock.trade/openapi/typea/orders"
     headers = {"Authorization": f"token {API_KEY}:{ACCESS_TOKEN}", "X-Mirae-Version": "1"}
     response = safe_request("GET", url, headers=headers)
     if response is None or response.status_code != 200:
+        return None
+    return (response.json() or {}).get("data", []) or []
+
+def refresh_order_book_snapshot() -> bool:
+    """Fetch the order book once for this cycle. On failure checks fall back to live fetches."""
+    ORDER_BOOK.clear()
+    if is_offline():
         return False
-    orders = (response.json() or {}).get("data", []) or []
-    
-    # Define blocking statuses
-    blocking = {"OPEN", "PENDING", "TRIGGERED"}
-    
-    # Track existence and quantities of buy and sell orders
-    has_buy = False
-    has_sell = False
-    total_buy_qty = 0
-    total_sell_qty = 0
-    for o in orders:
-        ord_symbol = o.get("tradingsymbol")
-        # SYMBOL-AWARE CHECK: If we are checking for a BUY, we block if ANY exchange has this symbol
-        # If we are checking for a SELL, it remains exchange-specific (as you can only sell where you hold)
-        is_same_symbol = (ord_symbol == symbol)
-        is_same_exchange = (o.get("exchange") or o.get("exchangeSegment") or "NSE") == exchange
-
-        # Important: For BUY, we care about the symbol anywhere. For SELL, we care about the specific exchange.
-        if is_same_symbol:
-            transaction_type = (o.get("transaction_type") or "").upper()
-            status = (o.get("status") or "").upper()
-            order_qty = o.get("quantity", 0) if isinstance(o.get("quantity"), (int, float)) else 0
-            
-            # If it's a SELL, we only block if it's the SAME exchange (standard behavior)
-            # If it's a BUY, we block if ANY exchange has a matching order for this symbol
-            if side.upper() == "BUY" or is_same_exchange:
-                if transaction_type == "BUY" and status in blocking:
-                    has_buy = True
-                    total_buy_qty += order_qty
-                elif transaction_type == "SELL" and status in blocking:
-                    has_sell = True
-                    total_sell_qty += order_qty
-    
-    # If both buy and sell orders exist, allow buy orders only if total quantities match
-    if side.upper() == "BUY" and has_buy and has_sell:
-        return total_buy_qty != total_sell_qty
-    
-    # Check for blocking orders of the same side
-    for o in orders:
-        if o.get("tradingsymbol") == symbol:
-            is_same_exchange = (o.get("exchange") or o.get("exchangeSegment") or "NSE") == exchange
-            # For BUY, block if ANY exchange has a BUY for this symbol
-            # For SELL, block only if THAT exchange has a SELL
-            if (side.upper() == "BUY") or (side.upper() == "SELL" and is_same_exchange):
-                if (o.get("transaction_type") or "").upper() == side.upper() and \
-                   (o.get("status") or "").upper() in blocking:
-                    return True
-    return False
+    try:
+        orders = fetch_order_book()
+    except Exception as e:
+        log_ok(f"⚠️ Order book snapshot failed: {e}")
+        return False
+    if orders is None:
+        return False
+    ORDER_BOOK.load(orders)
+
+    # A new fill since the last cycle changes positions: drop the cached view
+    filled = ORDER_BOOK.filled_count()
+    if filled != ORDER_BOOK_STATE.get("filled"):
+        if ORDER_BOOK_STATE.get("filled") is not None:
+            positions_service.invalidate()
+        ORDER_BOOK_STATE["filled"] = filled
+    return True
+
+def check_existing_orders(symbol: str, exchange: str, qty: int, side: str) -> bool:
+    if is_offline():
+        return False
+    if ORDER_BOOK.active:
+        return ORDER_BOOK.is_blocked(symbol, exchange, side)
+
+    # Outside a cycle (or snapshot unavailable): one-off live lookup
+    orders = fetch_order_book()
+    if orders is None:
+        return False
+    book = OrderBookSnapshot()
+    book.load(orders)
+    return book.is_blocked(symbol, exchange, side)
     
 def process_market_data(symbol, exchange, market_data, tf, instrument_token, live_positions_cache=None):
-    if SYMBOL_LOCKS.get(symbol, False):
-        return
-    SYMBOL_LOCKS[symbol] = True
+    lock = get_symbol_lock(symbol)
+    if not lock.acquire(blocking=False):
+        return  # Already being evaluated (e.g. tracked and managed under two exchanges)
     try:
         config_key = (symbol, exchange)
         if config_key not in config_dict:
@@ -2114,34 +2634,10 @@ def process_market_data(symbol, exchange, market_data, tf, instrument_token, liv
             return
         
         # Advanced Position Sizing (MVP1 Feature)
-        if config_qty > 0:
-            # METHOD A: Fixed quantity mode (from CSV)
-            qty = config_qty
-        else:
-            # DYNAMIC SIZING (Methods B or C)
-            if settings:
-                total_capital = settings.get("capital.total_capital", 50000)
-                sizing_type = settings.get("capital.max_per_stock_type", "percentage") # "percentage" or "fixed"
-                
-                if sizing_type == "percentage":
-                    # METHOD C: Portfolio Percentage
-                    per_trade_pct = settings.get("capital.max_per_stock_value", 10.0)
-                    per_trade_amount = total_capital * (per_trade_pct / 100)
-                else:
-                    # METHOD B: Fixed Capital Amount
-                    per_trade_amount = settings.get("capital.max_per_stock_fixed_amount", 5000)
-                
-                # Calculate quantity based on current price
-                qty = int(per_trade_amount / current_close)
-                
-                # Ensure minimum quantity of 1 for Penny stocks
-                qty = max(1, qty)
-                
-                # Risk Check: Max positions (handled in run_cycle but good to note)
-            else:
-                # Fallback if settings not available
-                qty = 1
-                log_ok(f"⚠️ Settings unavailable for {symbol}, using qty=1")
+        # METHOD A: fixed Quantity from config; B/C: fixed amount / portfolio percentage
+        qty = trade_rules.order_quantity(config_qty, current_close, settings)
+        if config_qty <= 0 and not settings:
+            log_ok(f"⚠️ Settings unavailable for {symbol}, using qty=1")
 
         timeframe_map = {
             "1T": "1m",
@@ -2206,8 +2702,8 @@ def process_market_data(symbol, exchange, market_data, tf, instrument_token, liv
         has_existing_position = False
         pos_rec = {}
         found_ex = None
-        for (s, e), p in live_positions_merged.items():
-            if s == symbol and (int(p.get("qty", 0)) - int(p.get("used_quantity", 0))) > 0:
+        for e, p in positions_for_symbol(live_positions_merged, symbol):
+            if (int(p.get("qty", 0)) - int(p.get("used_quantity", 0))) > 0:
                 has_existing_position = True
                 pos_rec = p
                 found_ex = e
@@ -2256,25 +2752,15 @@ def process_market_data(symbol, exchange, market_data, tf, instrument_token, liv
             #     should_sell = True
             #     sell_reason = f"Profit Target Hit ({profit_pct}%)"
 
-            # Check RSI Sell (Only for TRADE strategy)
-            if strategy_type == "TRADE":
-                # Explicit "Never Sell at Loss" check
-                is_never_sell_at_loss = settings.get('risk.never_sell_at_loss', False)
-                
-                # We only sell if RSI is overbought AND (Never Sell at Loss is off OR it's a profit)
-                is_profit = current_close > pos["price"]
-                
-                if last_rsi >= sell_rsi:
-                    if not is_never_sell_at_loss or is_profit:
-                        should_sell = True
-                        sell_reason = f"RSI Sell Signal ({last_rsi:.1f} >= {sell_rsi})"
-                    else:
-                        log_ok(f"🛡️ Never Sell at Loss: Prevented {symbol} RSI sell (LTP ₹{current_close} <= Entry ₹{pos['price']})")
-
-            # Accumulation Mode (INVEST): We SKIP RSI-based selling
-            elif strategy_type == "INVEST":
-                if last_rsi >= sell_rsi:
-                     log_ok(f"💎 INVEST MODE: Ignoring Sell Signal for {symbol} (RSI {last_rsi:.1f}). HODLing.")
+            # Check RSI Sell (TRADE only; INVEST accumulates and skips RSI-based selling).
+            # We only sell if RSI is overbought AND (Never Sell at Loss is off OR it's a profit)
+            is_never_sell_at_loss = SETTINGS_SNAPSHOT.never_sell_at_loss if strategy_type == "TRADE" else False
+            should_sell, sell_reason = trade_rules.rsi_sell_decision(
+                strategy_type, last_rsi, sell_rsi, current_close, pos["price"], is_never_sell_at_loss)
+            if sell_reason == trade_rules.SELL_BLOCKED_AT_LOSS:
+                log_ok(f"🛡️ Never Sell at Loss: Prevented {symbol} RSI sell (LTP ₹{current_close} <= Entry ₹{pos['price']})")
+            elif sell_reason == trade_rules.SELL_SKIPPED_INVEST:
+                log_ok(f"💎 INVEST MODE: Ignoring Sell Signal for {symbol} (RSI {last_rsi:.1f}). HODLing.")
 
             if should_sell and is_market_open_now_ist():
                 sell_qty = max(0, min(qty, available_qty))
@@ -2293,7 +2779,7 @@ def process_market_data(symbol, exchange, market_data, tf, instrument_token, liv
         if ignore_rsi:
              log_ok(f"🔍 DEBUG: {symbol} Ignore_RSI is ON. RSI={last_rsi:.1f}, Buy={buy_rsi}. MarketOpen={is_market_open_now_ist()}")
 
-        if (ignore_rsi or last_rsi <= buy_rsi) and is_market_open_now_ist() and not check_existing_orders(symbol, exchange, qty, "BUY"):
+        if trade_rules.rsi_buy_signal(last_rsi, buy_rsi, ignore_rsi) and is_market_open_now_ist() and not check_existing_orders(symbol, exchange, qty, "BUY"):
             need_qty = qty - max(0, available_qty)
             if need_qty > 0:
                 required_funds = need_qty * current_close
@@ -2302,11 +2788,9 @@ def process_market_data(symbol, exchange, market_data, tf, instrument_token, liv
                 can_afford, remaining = check_capital_safety(required_funds)
                 
                 # SMART CHECK 2: Portfolio Risk (Respect per-trade limit from settings)
-                per_trade_pct = 10.0 # Default fallback
-                if settings:
-                    per_trade_pct = float(settings.get("capital.per_trade_pct", 10.0))
+                per_trade_pct = SETTINGS_SNAPSHOT.per_trade_pct if settings else 10.0
                 
-                portfolio_risk_limit = ALLOCATED_CAPITAL * (per_trade_pct / 100)
+                portfolio_risk_limit = trade_rules.trade_limit(ALLOCATED_CAPITAL, per_trade_pct)
                 is_concentrated = (required_funds > portfolio_risk_limit)
                 
                 if not can_afford:
@@ -2319,7 +2803,7 @@ def process_market_data(symbol, exchange, market_data, tf, instrument_token, liv
         elif ignore_rsi:
              log_ok(f"⚠️ DEBUG: {symbol} Buy Logic Skipped. Reasons: MarketOpen={is_market_open_now_ist()}, ExistingOrder={check_existing_orders(symbol, exchange, qty, 'BUY')}")
     finally:
-        SYMBOL_LOCKS[symbol] = False
+        lock.release()
 
 # ---------------- Connectivity Monitor ----------------
 
@@ -2388,7 +2872,7 @@ def place_order(symbol, exchange, qty, side, instrument_token, price=0, use_amo=
         state_mgr.increment_trade_counter('attempts')
 
     # Check Paper Trading Mode
-    if settings and settings.get("app_settings.paper_trading_mode"):
+    if settings and SETTINGS_SNAPSHOT.paper_trading_mode:
         log_ok(f"🧪 PAPER TRADE: {side} {symbol} Qty: {qty} @ {price or 'MKT'}")
 
         # Log to database as a paper trade
@@ -2500,7 +2984,49 @@ def place_order(symbol, exchange, qty, side, instrument_token, price=0, use_amo=
 
 # ---------------- Runner ----------------
 
-def run_cycle():
+CYCLE_TIMINGS: Dict[str, float] = {}  # last cycle's wall-time per phase (ms)
+
+def concurrent_cycle_enabled() -> bool:
+    return SETTINGS_SNAPSHOT.concurrent_cycle if settings else False
+
+def _prefetch_symbol(symbol: str, ex: str):
+    """Worker: quote + RSI candles for one symbol (I/O only, no decisions)."""
+    if (symbol, ex) not in config_dict:
+        return
+    tf = config_dict[(symbol, ex)].get("Timeframe", "15T")
+    market_data, _ = fetch_market_data_once(symbol, ex)
+    instrument_token = instrument_token_for(symbol, ex, market_data)
+    if instrument_token:
+        CYCLE_CANDLES[(symbol, ex, tf)] = fetch_rsi_candles(symbol, ex, tf, instrument_token)
+
+def prefetch_cycle_data(keys) -> None:
+    """
+    Concurrent cycle mode: fetch quotes and candles for ``keys`` on a bounded
+    thread pool (app_settings.cycle_max_workers). The decision phase that
+    follows is unchanged and sequential, so it sees the same data in the same
+    order as the sequential mode and takes the same decisions.
+    """
+    max_workers = SETTINGS_SNAPSHOT.cycle_max_workers if settings else 8
+    with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="cycle-fetch") as pool:
+        futures = [pool.submit(_prefetch_symbol, symbol, ex) for symbol, ex in keys]
+        for (symbol, ex), fut in zip(keys, futures):
+            try:
+                fut.result()
+            except Exception as e:
+                if not is_offline():
+                    log_ok(f"⚠️ Prefetch failed for {symbol}:{ex}: {e}")
+
+def _cycle_phase(name: str, started: float) -> float:
+    now = time.perf_counter()
+    CYCLE_TIMINGS[name] = round((now - started) * 1000.0, 1)
+    return now
+
+def run_cycle(timeframes=None, risk=True):
+    """
+    One engine pass. ``timeframes``: strategy groups to evaluate (None = every
+    symbol; an empty set = risk checks only). ``risk``: run the RiskManager exits.
+    EngineScheduler ticks pass both; a bare call keeps the evaluate-everything pass.
+    """
     # ---------------- Persisted Stop Check ----------------
     global STOP_REQUESTED
     # log_ok(f"🔍 DEBUG: run_cycle called. Offline={is_offline()}", force=True) 
@@ -2518,6 +3044,9 @@ def run_cycle():
 
     if is_offline():
         return
+
+    # Per-symbol code reads this cycle's settings snapshot (rebuilt only if settings changed)
+    refresh_settings_snapshot()
         
     # Market Hours Check
     if not is_market_open_now_ist():
@@ -2525,9 +3054,28 @@ def run_cycle():
        log_ok(f"⏸️ Market Closed ({datetime.now().strftime('%H:%M')}). Waiting for next session...", force=True)
        wait_for_market_open()
        return # Ensure we return if waiting
+
+    CYCLE_TIMINGS.clear()
+    CYCLE_CANDLES.clear()
+    cycle_start = phase_start = time.perf_counter()
+
+    # ---------------- Batch Quotes ----------------
+    # One chunked OHLC call for every symbol this cycle touches, before any strategy logic
+    reset_cycle_quotes()
+    quote_keys = []
+    try:
+        quote_keys = collect_cycle_quote_keys(timeframes, risk)
+        prefetch_cycle_quotes(quote_keys)
+    except Exception as e:
+        log_ok(f"⚠️ Batch quote prefetch failed, falling back to per-symbol quotes: {e}")
+    phase_start = _cycle_phase("quotes", phase_start)
+
+    # One order-book fetch per cycle; duplicate-order checks read this snapshot
+    refresh_order_book_snapshot()
+    phase_start = _cycle_phase("orders", phase_start)
     
     # ---------------- Risk Manager Checks (Phase 0A) ----------------
-    if risk_mgr and db:
+    if risk and risk_mgr and db:
         try:
             # Check all positions for risk triggers before trading
             actions = risk_mgr.check_all_positions()
@@ -2543,7 +3091,7 @@ def run_cycle():
                 
                 # Get instrument token for sell order
                 market_data, _ = fetch_market_data_once(symbol, exchange)
-                instrument_token = market_data.get("instrument_token") if market_data else None
+                instrument_token = instrument_token_for(symbol, exchange, market_data)
                 
                 if instrument_token:
                     # Prevent redundant sells if an order is already open
@@ -2588,11 +3136,17 @@ def run_cycle():
                     log_ok(f"⚠️ Cannot execute risk-triggered sell: no instrument token for {symbol}", force=True)
         except Exception as e:
             log_ok(f"⚠️ Risk check failed: {e}", force=True)
+    phase_start = _cycle_phase("risk", phase_start)
+
+    if timeframes is not None and not timeframes:
+        # Risk-only tick: no bar closed, nothing to re-evaluate
+        _cycle_phase("total", cycle_start)
+        ORDER_BOOK.clear()
+        return
     
-    reset_cycle_quotes()
     log_ok(f"---------------------------------------------------------------------------------------------------------------{datetime.now()}")
     processed = set()
-    nifty_only = settings.get("app_settings.nifty_50_only", False) if settings else False
+    nifty_only = SETTINGS_SNAPSHOT.nifty_50_only if settings else False
 
     # CRITICAL OPTIMIZATION: Fetch positions ONCE for the entire cycle
     # This prevents hitting the API for every single symbol, avoiding timeouts/blocking
@@ -2601,6 +3155,13 @@ def run_cycle():
     except Exception as e:
         log_ok(f"⚠️ Failed to fetch positions snapshot, using empty default: {e}")
         positions_snapshot = {}
+    phase_start = _cycle_phase("positions", phase_start)
+
+    if concurrent_cycle_enabled():
+        tracked = set(SYMBOLS_TO_TRACK)
+        prefetch_keys = [k for k in quote_keys if not (nifty_only and k in tracked and k[0] not in NIFTY_50)]
+        prefetch_cycle_data(prefetch_keys)
+        phase_start = _cycle_phase("prefetch", phase_start)
 
     for symbol, ex in SYMBOLS_TO_TRACK:
         key = (symbol, ex)
@@ -2608,6 +3169,10 @@ def run_cycle():
             continue
         processed.add(key)
 
+        # Only groups whose bar just closed
+        if timeframes is not None and symbol_timeframe(key) not in timeframes:
+            continue
+
         # Nifty 50 Filter Check
         if nifty_only and symbol not in NIFTY_50:
             # We log this once per cycle to avoid spam, or check if we should even track it
@@ -2618,7 +3183,7 @@ def run_cycle():
         try:
             tf = config_dict.get((symbol, ex), {}).get("Timeframe", "15T")
             market_data, _ = fetch_market_data_once(symbol, ex)
-            instrument_token = market_data["instrument_token"] if market_data else None
+            instrument_token = instrument_token_for(symbol, ex, market_data) if market_data else None
             if not instrument_token:
                 log_ok(f"⚠️ No instrument token for {symbol}:{ex}")
                 continue
@@ -2630,6 +3195,8 @@ def run_cycle():
             if not is_offline():
                 log_ok(f"❌ Cycle error for {symbol}:{ex}: {e}")
 
+    phase_start = _cycle_phase("symbols", phase_start)
+
     # Heartbeat Log (Throttled to every 20 cycles)
     if not hasattr(run_cycle, "counter"): run_cycle.counter = 0
     run_cycle.counter += 1
@@ -2692,6 +3259,7 @@ def run_cycle():
                 
                 # Check if we already processed this in SYMBOLS_TO_TRACK
                 if (symbol, ex) in processed: continue
+                if timeframes is not None and symbol_timeframe((symbol, ex)) not in timeframes: continue
                 
                 # Process managed holding
                 tf = config_dict.get((symbol, ex), {}).get("Timeframe", "15T")
@@ -2708,7 +3276,7 @@ def run_cycle():
                         }
 
                 if market_data:
-                    instrument_token = market_data.get("instrument_token")
+                    instrument_token = instrument_token_for(symbol, ex, market_data)
                     if instrument_token:
                         # Pass cached positions here too
                         process_market_data(symbol, ex, market_data, tf, instrument_token, live_positions_cache=positions_snapshot)
@@ -2718,9 +3286,62 @@ def run_cycle():
 
             except Exception as e:
                 log_ok(f"⚠️ Error processing managed holding {key_str}: {e}")
+    phase_start = _cycle_phase("managed", phase_start)
     
     # ---------------- Save State (Phase 0A) ----------------
     save_state_snapshot()
+    _cycle_phase("snapshot", phase_start)
+    _cycle_phase("total", cycle_start)
+    CYCLE_CANDLES.clear()
+    ORDER_BOOK.clear()
+    if run_cycle.counter % 20 == 0:
+        mode = "concurrent" if concurrent_cycle_enabled() else "sequential"
+        breakdown = " | ".join(f"{k}={v:.0f}ms" for k, v in CYCLE_TIMINGS.items())
+        log_ok(f"⏱️ Cycle timing ({mode}): {breakdown}")
+
+# ---------------- Scheduler ----------------
+
+ENGINE_SCHEDULER: Optional[EngineScheduler] = None  # the launcher's scheduler (next wakes for status views)
+
+def engine_timeframes() -> set:
+    """Timeframe groups with something to evaluate: tracked symbols + enabled managed holdings."""
+    tfs = {symbol_timeframe(key) for key in SYMBOLS_TO_TRACK}
+    if state_mgr:
+        managed = state_mgr.state.get('managed_holdings', {})
+        if isinstance(managed, dict):
+            for key_str, is_enabled in managed.items():
+                parsed = _parse_managed_key(key_str) if is_enabled else None
+                if parsed:
+                    tfs.add(symbol_timeframe(parsed))
+    return tfs
+
+def build_engine_scheduler() -> EngineScheduler:
+    """
+    Scheduler for the engine loop: each timeframe group is evaluated at its bar
+    close (within MARKET_CALENDAR's session for the day, so holidays are
+    skipped and special sessions get their own bars) +
+    app_settings.bar_settle_seconds; daily groups and the last bar of the day
+    app_settings.close_eval_lead_seconds before the close; risk checks every
+    app_settings.risk_check_seconds. Initializes the engine first if needed.
+    """
+    global ENGINE_SCHEDULER
+    initialize()
+    settle = float(settings.get("app_settings.bar_settle_seconds", 3)) if settings else 3.0
+    risk_every = float(settings.get("app_settings.risk_check_seconds", 10)) if settings else 10.0
+    close_lead = float(settings.get("app_settings.close_eval_lead_seconds", 300)) if settings else 300.0
+    ENGINE_SCHEDULER = EngineScheduler(engine_timeframes, frame_minutes_for, settle_seconds=settle,
+                                       risk_interval_seconds=risk_every, clock=lambda: now_ist(),
+                                       session=lambda d: MARKET_CALENDAR.session(d),
+                                       close_lead_seconds=close_lead)
+    log_ok(f"🕒 Scheduler: bar close +{settle:.0f}s per timeframe (session-end bars {close_lead:.0f}s before the close), "
+           f"risk checks every {risk_every:.0f}s")
+    return ENGINE_SCHEDULER
+
+def run_scheduled_cycle(tick):
+    """run_cycle for one scheduler tick (only the groups whose bar closed)."""
+    refresh_settings_snapshot(check_file=True)
+    refresh_instrument_index()
+    run_cycle(timeframes=tick.timeframes, risk=tick.risk)
 
 def save_state_snapshot():
     """Save current bot state for crash recovery"""
@@ -2739,6 +3360,8 @@ def save_state_snapshot():
             log_ok(f"⚠️ State save failed: {e}")
 
 def main_loop():
+    initialize()
+
     # ---------------- Auto-Login (Phase 3) ----------------
     try:
         if perform_auto_login():
@@ -2758,14 +3381,14 @@ def main_loop():
         except Exception as e:
             log_ok(f"⚠️ State load failed: {e}", force=True)
     
-    log_ok("🕒 Scheduler started (continuous)", force=True)
+    log_ok("🕒 Scheduler started (bar-close)", force=True)
     if is_system_online():
         log_ok("🟢 Status: Online", force=True)
     
     # ---------------- Engine Started Notification (v2.4.0) ----------------
     if notifier:
         try:
-            is_paper = settings.get("app_settings.paper_trading_mode", False) if settings else False
+            is_paper = SETTINGS_SNAPSHOT.paper_trading_mode if settings else False
             notifier.send_engine_started({
                 'stocks_count': len(SYMBOLS_TO_TRACK),
                 'capital': ALLOCATED_CAPITAL,
@@ -2776,59 +3399,55 @@ def main_loop():
     
     # Track if daily summary was sent today
     daily_summary_sent_date = None
+
+    def cycle(tick):
+        nonlocal daily_summary_sent_date
+        # ---------------- Daily Summary at Market Close (v2.4.0) ----------------
+        now = now_ist()
+        market_close_time = now.replace(hour=15, minute=35, second=0, microsecond=0)
+        today_date = now.date()
+        
+        # Send daily summary once per day, just after market close (3:35 PM IST)
+        if (notifier and db and 
+            now >= market_close_time and 
+            daily_summary_sent_date != today_date):
+            try:
+                perf = db.get_performance_summary()
+                notifier.send_daily_summary({
+                    'total_pnl': perf.get('total_net_pnl', 0),
+                    'trades_today': perf.get('total_trades', 0),
+                    'wins': perf.get('winning_trades', 0),
+                    'losses': perf.get('losing_trades', 0),
+                    'open_positions': len(safe_get_live_positions_merged()),
+                    'portfolio_value': ALLOCATED_CAPITAL + perf.get('total_net_pnl', 0)
+                })
+                daily_summary_sent_date = today_date
+                log_ok("📊 Daily summary sent via Telegram", force=True)
+            except Exception as e:
+                log_ok(f"⚠️ Failed to send daily summary: {e}")
+            
+        run_scheduled_cycle(tick)
+
+    def on_error(e):
+        log_ok(f"❌ Main Loop Error: {e}", force=True)
+        time.sleep(1)
+
+    # Bar-close strategy ticks + risk ticks instead of back-to-back cycles
+    build_engine_scheduler().run(cycle, lambda: STOP_REQUESTED, on_error)
+
+    log_ok("🛑 Main Loop: Stop Requested. Exiting Loop.", force=True)
     
-    while True:
+    # ---------------- Engine Stopped Notification (v2.4.0) ----------------
+    if notifier and db:
         try:
-            if STOP_REQUESTED:
-                log_ok("🛑 Main Loop: Stop Requested. Exiting Loop.", force=True)
-                
-                # ---------------- Engine Stopped Notification (v2.4.0) ----------------
-                if notifier and db:
-                    try:
-                        perf = db.get_performance_summary()
-                        notifier.send_engine_stopped({
-                            'reason': 'Manual stop',
-                            'total_pnl': perf.get('total_net_pnl', 0),
-                            'trades_today': perf.get('total_trades', 0)
-                        })
-                    except Exception as e:
-                        log_ok(f"⚠️ Failed to send engine stop notification: {e}")
-                break
-            
-            # ---------------- Daily Summary at Market Close (v2.4.0) ----------------
-            now = now_ist()
-            market_close_time = now.replace(hour=15, minute=35, second=0, microsecond=0)
-            today_date = now.date()
-            
-            # Send daily summary once per day, just after market close (3:35 PM IST)
-            if (notifier and db and 
-                now >= market_close_time and 
-                daily_summary_sent_date != today_date):
-                try:
-                    perf = db.get_performance_summary()
-                    notifier.send_daily_summary({
-                        'total_pnl': perf.get('total_net_pnl', 0),
-                        'trades_today': perf.get('total_trades', 0),
-                        'wins': perf.get('winning_trades', 0),
-                        'losses': perf.get('losing_trades', 0),
-                        'open_positions': len(safe_get_live_positions_merged()),
-                        'portfolio_value': ALLOCATED_CAPITAL + perf.get('total_net_pnl', 0)
-                    })
-                    daily_summary_sent_date = today_date
-                    log_ok("📊 Daily summary sent via Telegram", force=True)
-                except Exception as e:
-                    log_ok(f"⚠️ Failed to send daily summary: {e}")
-                
-            run_cycle()  # Run cycles back-to-back
-            
-            # Use small sleep that breaks if stop requested
-            for _ in range(5): # 0.5s total
-                if STOP_REQUESTED: break
-                time.sleep(0.1)
-                
+            perf = db.get_performance_summary()
+            notifier.send_engine_stopped({
+                'reason': 'Manual stop',
+                'total_pnl': perf.get('total_net_pnl', 0),
+                'trades_today': perf.get('total_trades', 0)
+            })
         except Exception as e:
-            log_ok(f"❌ Main Loop Error: {e}", force=True)
-            time.sleep(1)
+            log_ok(f"⚠️ Failed to send engine stop notification: {e}")
 
 
 # -----------------------------------------------------------------------------
@@ -2837,6 +3456,7 @@ def main_loop():
 def reset_stop_flag():
     global STOP_REQUESTED
     STOP_REQUESTED = False
+    STOP_EVENT.clear()
     log_ok("🔄 STOP FLAG RESET - Engine Ready.")
     
     # Critical: Ensure persistent state is also cleared
@@ -2849,6 +3469,9 @@ def reset_stop_flag():
 if __name__ == "__main__":
     try:
         setup_logging()
+        initialize()
+        if not ACCESS_TOKEN and not handle_token_exception_and_refresh_token():
+            sys.exit(1)
         
         # Ensure we don't start in stopped state if running manually
         reset_stop_flag()
@@ -0,0 +1,153 @@
+"""
+Log Pipeline for ARUN Trading Bot
+Non-blocking hand-off of UI/capture log lines from the trading thread to a
+background writer that batches file writes and fans out to in-memory sinks.
+"""
+
+import atexit
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+DEFAULT_CAPACITY = 10000        # lines buffered before producers start dropping
+DEFAULT_BATCH_SIZE = 500        # lines handed to each sink per write
+DEFAULT_FLUSH_INTERVAL = 0.1    # seconds the writer idles when the ring is empty
+
+# A sink receives a batch of formatted lines on the writer thread and may
+# return how many of them it had to discard (e.g. a full dashboard queue).
+Sink = Callable[[List[str]], Optional[int]]
+
+
+def format_line(stamp: float, msg: str) -> str:
+    """``[HH:MM:SS] message`` - the format BotManager has always captured."""
+    return f"[{datetime.fromtimestamp(stamp).strftime('%H:%M:%S')}] {msg.strip()}"
+
+
+class LogPipeline:
+    """
+    Bounded ring of ``(timestamp, message)`` drained by one daemon thread.
+
+    ``submit()`` never blocks and takes no lock: a deque append/popleft is
+    atomic under the GIL. When the ring is full the new line is dropped and
+    counted, so a slow disk or UI consumer costs log lines, never order latency.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, batch_size: int = DEFAULT_BATCH_SIZE,
+                 flush_interval: float = DEFAULT_FLUSH_INTERVAL, name: str = "log-writer"):
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.name = name
+        self._ring: deque = deque()
+        self._sinks: Dict[str, Sink] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+        self._exit_hook = False
+        self._submitted = 0
+        self.stats = {"written": 0, "dropped": 0, "batches": 0, "max_batch": 0, "sinks": {}}
+
+    # ---------------- producer side ----------------
+
+    def submit(self, msg) -> bool:
+        """Queue a line for the writer. Returns False if it was dropped."""
+        if len(self._ring) >= self.capacity:
+            self.stats["dropped"] += 1
+            return False
+        self._ring.append((time.time(), str(msg)))
+        self._submitted += 1
+        return True
+
+    __call__ = submit  # usable directly as a kickstart log callback
+
+    # ---------------- sinks ----------------
+
+    def add_sink(self, name: str, sink: Sink):
+        """Register ``sink(batch)``; called on the writer thread, errors are counted."""
+        self._sinks[name] = sink
+        self.stats["sinks"].setdefault(name, {"batches": 0, "errors": 0, "dropped": 0, "last_error": None})
+
+    def remove_sink(self, name: str):
+        self._sinks.pop(name, None)
+
+    # ---------------- writer ----------------
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+        if not self._exit_hook:
+            atexit.register(self.stop)
+            self._exit_hook = True
+
+    def _drain(self) -> List[Tuple[float, str]]:
+        batch = []
+        pop = self._ring.popleft
+        try:
+            while len(batch) < self.batch_size:
+                batch.append(pop())
+        except IndexError:
+            pass
+        return batch
+
+    def _dispatch(self, batch: List[Tuple[float, str]]):
+        lines = [format_line(stamp, msg) for stamp, msg in batch]
+        for name, sink in list(self._sinks.items()):
+            sink_stats = self.stats["sinks"][name]
+            try:
+                dropped = sink(lines)
+                sink_stats["batches"] += 1
+                if dropped:
+                    sink_stats["dropped"] += dropped
+            except Exception as e:
+                sink_stats["errors"] += 1
+                sink_stats["last_error"] = str(e)
+        self.stats["batches"] += 1
+        self.stats["written"] += len(lines)
+        self.stats["max_batch"] = max(self.stats["max_batch"], len(lines))
+
+    def _run(self):
+        while True:
+            batch = self._drain()
+            if batch:
+                self._dispatch(batch)
+                continue
+            if self._stopping:
+                return
+            time.sleep(self.flush_interval)
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait until every line submitted so far reached the sinks."""
+        if self._thread is None or not self._thread.is_alive():
+            # No writer (not started / interpreter shutdown): drain inline
+            while True:
+                batch = self._drain()
+                if not batch:
+                    return True
+                self._dispatch(batch)
+        target = self._submitted
+        deadline = time.monotonic() + timeout
+        while self.stats["written"] < target:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.005)
+        return True
+
+    def stop(self, timeout: float = 5.0):
+        """Flush what is buffered and stop the writer thread."""
+        self._stopping = True
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self.flush(timeout)
+
+    def snapshot(self) -> dict:
+        """Counters plus current ring depth, for status endpoints."""
+        snap = {k: v for k, v in self.stats.items() if k != "sinks"}
+        snap["submitted"] = self._submitted
+        snap["pending"] = len(self._ring)
+        snap["capacity"] = self.capacity
+        snap["sinks"] = {name: dict(s) for name, s in self.stats["sinks"].items()}
+        return snap
@@ -0,0 +1,173 @@
+"""
+Log Store for ARUN Trading Bot
+Fixed-capacity ring of structured log records (id, timestamp, level, symbol,
+message) with "since cursor" reads and level/symbol secondary indexes.
+"""
+
+import re
+import threading
+import time
+from bisect import bisect_right
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+DEFAULT_CAPACITY = 2000
+
+# kickstart logs are free text with an emoji marker; map the markers to levels
+_LEVEL_MARKERS = (
+    ("ERROR", ("❌", "🚨", "CRITICAL", "ERROR")),
+    ("WARNING", ("⚠️", "WARNING")),
+)
+_STAMP = re.compile(r"^\[\d{2}:\d{2}:\d{2}\]\s*")
+_SYMBOL_PATTERNS = (
+    re.compile(r"\b(?:NSE|BSE)\s*:\s*([A-Z][A-Z0-9&\-]{0,19})\b"),                   # NSE:TCS
+    re.compile(r"^\W*([A-Z][A-Z0-9&\-]{1,19})(?::|\s+RSI\b)"),                      # TCS: ... / TCS RSI: ...
+    re.compile(r"(?:checking|Fetching →|Skipping)\s+([A-Z][A-Z0-9&\-]{1,19})\b"),   # checking TCS...
+)
+
+
+def classify(message: str) -> Tuple[str, Optional[str]]:
+    """Best-effort ``(level, symbol)`` for a kickstart log line."""
+    text = _STAMP.sub("", message)
+    level = "INFO"
+    for name, markers in _LEVEL_MARKERS:
+        if any(m in text for m in markers):
+            level = name
+            break
+    for pattern in _SYMBOL_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            return level, match.group(1)
+    return level, None
+
+
+class LogStore:
+    """
+    Ring buffer of log records with monotonically increasing ids.
+
+    Record ``id`` lives in slot ``(id - 1) % capacity``, so append and lookup
+    by id are O(1) and ``since`` reads touch only the returned records.
+    Per-level and per-symbol indexes hold ids in ascending order; the record
+    being evicted is always the oldest, so its index entries sit at the left
+    end and are dropped in O(1).
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self._slots: List[Optional[dict]] = [None] * capacity
+        self._next_id = 1
+        self._by_level: Dict[str, deque] = {}
+        self._by_symbol: Dict[str, deque] = {}
+        self._lock = threading.Lock()
+        self.stats = {"appended": 0, "evicted": 0}
+
+    @property
+    def last_id(self) -> int:
+        return self._next_id - 1
+
+    @property
+    def first_id(self) -> int:
+        """Oldest id still held (``last_id + 1`` when empty)."""
+        return max(1, self._next_id - self.capacity)
+
+    def __len__(self) -> int:
+        return self._next_id - self.first_id
+
+    def append(self, message: str, level: Optional[str] = None, symbol: Optional[str] = None,
+               ts: Optional[float] = None) -> dict:
+        """Store one line; level/symbol are derived from the text unless given."""
+        if level is None or symbol is None:
+            found_level, found_symbol = classify(message)
+            level = level or found_level
+            symbol = symbol or found_symbol
+        with self._lock:
+            record = {"id": self._next_id, "ts": ts if ts is not None else time.time(),
+                      "level": level.upper(), "symbol": symbol.upper() if symbol else None,
+                      "message": message}
+            slot = (record["id"] - 1) % self.capacity
+            old = self._slots[slot]
+            if old is not None:
+                self._unindex(old)
+                self.stats["evicted"] += 1
+            self._slots[slot] = record
+            self._by_level.setdefault(record["level"], deque()).append(record["id"])
+            if record["symbol"]:
+                self._by_symbol.setdefault(record["symbol"], deque()).append(record["id"])
+            self._next_id += 1
+            self.stats["appended"] += 1
+            return record
+
+    def extend(self, messages) -> int:
+        """Append several lines; returns how many older records were overwritten."""
+        before = self.stats["evicted"]
+        for message in messages:
+            self.append(message)
+        return self.stats["evicted"] - before
+
+    def _unindex(self, record: dict):
+        for index, key in ((self._by_level, record["level"]), (self._by_symbol, record["symbol"])):
+            ids = index.get(key)
+            if ids and ids[0] == record["id"]:
+                ids.popleft()
+                if not ids:
+                    del index[key]
+
+    def get(self, record_id: int) -> Optional[dict]:
+        if not self.first_id <= record_id <= self.last_id:
+            return None
+        return self._slots[(record_id - 1) % self.capacity]
+
+    def query(self, since: Optional[int] = None, level: Optional[str] = None,
+              symbol: Optional[str] = None, limit: int = 50) -> List[dict]:
+        """
+        Records matching the filters, oldest first.
+        With ``since``: the first ``limit`` records after that id (page forward
+        by passing the last returned id). Without: the latest ``limit``.
+        """
+        if limit <= 0:
+            return []
+        with self._lock:
+            candidates = self._candidates(level, symbol)
+            if candidates is None:
+                return []
+            if since is None:
+                return self._tail(candidates, level, symbol, limit)
+            return self._after(candidates, since, level, symbol, limit)
+
+    def _candidates(self, level, symbol):
+        """Smallest id sequence to scan: an index when filtering, else the id range."""
+        indexes = []
+        if level:
+            indexes.append(self._by_level.get(level.upper()))
+        if symbol:
+            indexes.append(self._by_symbol.get(symbol.upper()))
+        if not indexes:
+            return range(self.first_id, self._next_id)
+        if any(ids is None for ids in indexes):
+            return None
+        return min(indexes, key=len)
+
+    def _matches(self, record, level, symbol) -> bool:
+        return ((not level or record["level"] == level.upper())
+                and (not symbol or record["symbol"] == symbol.upper()))
+
+    def _tail(self, ids, level, symbol, limit):
+        out = []
+        for i in range(len(ids) - 1, -1, -1):
+            record = self._slots[(ids[i] - 1) % self.capacity]
+            if self._matches(record, level, symbol):
+                out.append(record)
+                if len(out) == limit:
+                    break
+        out.reverse()
+        return out
+
+    def _after(self, ids, since, level, symbol, limit):
+        out = []
+        for i in range(bisect_right(ids, since), len(ids)):
+            record = self._slots[(ids[i] - 1) % self.capacity]
+            if self._matches(record, level, symbol):
+                out.append(record)
+                if len(out) == limit:
+                    break
+        return out
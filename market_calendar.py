@@ -0,0 +1,152 @@
+"""
+Market Calendar for ARUN Trading Bot
+NSE/BSE equity sessions: regular 09:15-15:30 IST on weekdays, minus the
+exchange holidays, plus special sessions (Muhurat trading, weekend live
+sessions) from a local JSON table. Session open/close instants are
+precomputed per year, so ``is_open(ts)`` is a dict lookup and two compares.
+"""
+
+import bisect
+import json
+import os
+import threading
+import time
+from datetime import date, datetime, time as dtime, timedelta
+from typing import Dict, List, Optional, Tuple, Union
+
+import pytz
+
+DEFAULT_PATH = "market_calendar.json"
+IST = pytz.timezone("Asia/Kolkata")
+REGULAR_OPEN = dtime(9, 15)
+REGULAR_CLOSE = dtime(15, 30)
+
+Session = Tuple[float, float]  # (open, close) as epoch seconds
+Timestamp = Union[datetime, float, int]
+
+
+def _clock(value: str) -> dtime:
+    hour, minute = value.split(":")
+    return dtime(int(hour), int(minute))
+
+
+def _epoch(ts: Timestamp) -> float:
+    """Epoch seconds; naive datetimes are taken as IST."""
+    if isinstance(ts, datetime):
+        return (ts if ts.tzinfo else IST.localize(ts)).timestamp()
+    return float(ts)
+
+
+class MarketCalendar:
+    """
+    Trading sessions for NSE/BSE equities. A date in ``special_sessions``
+    trades only in that window (even on a weekend or holiday); a date in
+    ``holidays`` does not trade; any other weekday has the regular session.
+    Years are built on first use and cached.
+    """
+
+    def __init__(self, holidays: Optional[Dict[date, str]] = None,
+                 special_sessions: Optional[Dict[date, Tuple[dtime, dtime, str]]] = None,
+                 open_time: dtime = REGULAR_OPEN, close_time: dtime = REGULAR_CLOSE):
+        self.holidays = dict(holidays or {})
+        self.special_sessions = dict(special_sessions or {})
+        self.open_time = open_time
+        self.close_time = close_time
+        self._sessions: Dict[date, Session] = {}
+        self._opens: List[float] = []   # sorted session opens of all built years
+        self._days: List[date] = []     # trading day of each entry in _opens
+        self._years = set()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_PATH) -> "MarketCalendar":
+        """Calendar from the JSON table at ``path``; a missing file gives weekends-only closures."""
+        if not path or not os.path.exists(path):
+            return cls()
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        regular = data.get("regular_session", {})
+        holidays = {date.fromisoformat(d): name for d, name in data.get("holidays", {}).items()}
+        special = {
+            date.fromisoformat(d): (_clock(s["open"]), _clock(s["close"]), s.get("name", ""))
+            for d, s in data.get("special_sessions", {}).items()
+        }
+        return cls(holidays, special,
+                   _clock(regular["open"]) if "open" in regular else REGULAR_OPEN,
+                   _clock(regular["close"]) if "close" in regular else REGULAR_CLOSE)
+
+    def _day_window(self, d: date) -> Optional[Tuple[dtime, dtime]]:
+        special = self.special_sessions.get(d)
+        if special:
+            return special[0], special[1]
+        if d.weekday() >= 5 or d in self.holidays:
+            return None
+        return self.open_time, self.close_time
+
+    def _build_year(self, year: int):
+        with self._lock:
+            if year in self._years:
+                return
+            d, end = date(year, 1, 1), date(year + 1, 1, 1)
+            built = []
+            while d < end:
+                window = self._day_window(d)
+                if window:
+                    session = (IST.localize(datetime.combine(d, window[0])).timestamp(),
+                               IST.localize(datetime.combine(d, window[1])).timestamp())
+                    self._sessions[d] = session
+                    built.append((session[0], d))
+                d += timedelta(days=1)
+            merged = sorted(list(zip(self._opens, self._days)) + built)
+            self._opens = [o for o, _ in merged]
+            self._days = [day for _, day in merged]
+            self._years.add(year)
+
+    def session(self, d: date) -> Optional[Tuple[datetime, datetime]]:
+        """(open, close) of ``d`` in IST, or None if the exchange is closed that day."""
+        if d.year not in self._years:
+            self._build_year(d.year)
+        session = self._sessions.get(d)
+        if not session:
+            return None
+        return datetime.fromtimestamp(session[0], IST), datetime.fromtimestamp(session[1], IST)
+
+    def is_trading_day(self, d: date) -> bool:
+        if d.year not in self._years:
+            self._build_year(d.year)
+        return d in self._sessions
+
+    def is_open(self, ts: Timestamp) -> bool:
+        """True while a session is in progress (open and close minutes inclusive)."""
+        epoch = _epoch(ts)
+        d = datetime.fromtimestamp(epoch, IST).date()
+        if d.year not in self._years:
+            self._build_year(d.year)
+        session = self._sessions.get(d)
+        return session is not None and session[0] <= epoch <= session[1]
+
+    def next_open(self, ts: Timestamp) -> datetime:
+        """First session open strictly after ``ts`` (IST)."""
+        epoch = _epoch(ts)
+        year = datetime.fromtimestamp(epoch, IST).year
+        for y in (year, year + 1):
+            if y not in self._years:
+                self._build_year(y)
+        i = bisect.bisect_right(self._opens, epoch)
+        return datetime.fromtimestamp(self._opens[i], IST)
+
+    def sleep_until_next_session(self, stop_event: Optional[threading.Event] = None,
+                                 now: Optional[Timestamp] = None) -> bool:
+        """
+        Block until the next session opens, in a single wait. Returns True at
+        the open (or at once if a session is already in progress) and False if
+        ``stop_event`` was set first.
+        """
+        now = time.time() if now is None else _epoch(now)
+        if self.is_open(now):
+            return True
+        remaining = self.next_open(now).timestamp() - now
+        if stop_event is not None:
+            return not stop_event.wait(remaining)
+        time.sleep(remaining)
+        return True
@@ -0,0 +1,105 @@
+"""
+Positions Service for ARUN Trading Bot
+TTL-cached, single-flight merged positions view shared by the engine,
+RiskManager, state snapshots and the dashboard.
+"""
+
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+class PositionsView(dict):
+    """
+    Merged positions ``{(symbol, exchange): position}`` with a by-symbol index.
+    Shared between callers: treat as read-only.
+    """
+
+    def __init__(self, data=()):
+        super().__init__(data)
+        self.by_symbol: Dict[str, List[Tuple[str, dict]]] = {}
+        for (symbol, exchange), pos in self.items():
+            self.by_symbol.setdefault(symbol, []).append((exchange, pos))
+
+    def for_symbol(self, symbol: str) -> List[Tuple[str, dict]]:
+        """[(exchange, position), ...] for ``symbol`` in merge order."""
+        return self.by_symbol.get(symbol, [])
+
+
+def positions_for_symbol(positions: dict, symbol: str) -> List[Tuple[str, dict]]:
+    """Indexed lookup for a PositionsView, linear scan for a plain dict."""
+    if isinstance(positions, PositionsView):
+        return positions.for_symbol(symbol)
+    return [(ex, pos) for (sym, ex), pos in positions.items() if sym == symbol]
+
+
+class PositionsService:
+    """
+    Caches the merged positions for ``ttl`` seconds.
+    Concurrent callers during a load wait for that single load instead of
+    issuing their own broker calls (single-flight). ``invalidate()`` forces
+    the next ``get()`` to reload (e.g. after an order is placed or fills).
+    """
+
+    def __init__(self, loader: Callable[[], dict], ttl: float = 5.0):
+        self._loader = loader
+        self.ttl = ttl
+        self._cond = threading.Condition()
+        self._data: Optional[PositionsView] = None
+        self._loaded_at = 0.0
+        self._loading = False
+        self._generation = 0
+        self._fresh_generation = -1
+        self.stats = {"hits": 0, "loads": 0, "waits": 0, "invalidations": 0, "failures": 0}
+
+    def _is_fresh(self, max_age: float) -> bool:
+        return (self._data is not None
+                and self._fresh_generation == self._generation
+                and time.monotonic() - self._loaded_at <= max_age)
+
+    def get(self, max_age: Optional[float] = None) -> PositionsView:
+        """
+        Merged positions no older than ``max_age`` seconds (default: ttl).
+        Returns an empty view if the load fails and nothing is cached.
+        """
+        max_age = self.ttl if max_age is None else max_age
+        with self._cond:
+            while True:
+                if self._is_fresh(max_age):
+                    self.stats["hits"] += 1
+                    return self._data
+                if not self._loading:
+                    break
+                self.stats["waits"] += 1
+                self._cond.wait()
+            self._loading = True
+            generation = self._generation
+
+        data = None
+        try:
+            data = self._loader()
+        finally:
+            with self._cond:
+                self._loading = False
+                if data is not None:
+                    self._data = data if isinstance(data, PositionsView) else PositionsView(data)
+                    self._loaded_at = time.monotonic()
+                    # Invalidated while loading: usable now, but the next get() reloads
+                    self._fresh_generation = generation
+                    self.stats["loads"] += 1
+                else:
+                    self.stats["failures"] += 1
+                self._cond.notify_all()
+        if data is None:
+            return self._data if self._data is not None else PositionsView()
+        return self._data
+
+    def invalidate(self):
+        """Drop the cached view; the next get() reloads from the broker."""
+        with self._cond:
+            self._generation += 1
+            self.stats["invalidations"] += 1
+
+    def peek(self) -> Optional[PositionsView]:
+        """Last loaded view without triggering a load (may be stale or None)."""
+        return self._data
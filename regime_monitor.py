@@ -23,6 +23,8 @@ from typing import Dict, Optional
 import pandas as pd
 import numpy as np
 
+from candle_warehouse import CandleWarehouse, yahoo_period
+
 try:
     import yfinance as yf
     YFINANCE_AVAILABLE = True
@@ -57,15 +59,18 @@ class RegimeMonitor:
     Caches results to avoid excessive API calls (default: 1 hour)
     """
     
-    def __init__(self, index_symbol="^NSEI", cache_duration_minutes=60):
+    def __init__(self, index_symbol="^NSEI", cache_duration_minutes=60, warehouse: Optional[CandleWarehouse] = None):
         """
         Initialize Regime Monitor
         
         Args:
             index_symbol: Yahoo Finance symbol for Nifty 50 (^NSEI)
             cache_duration_minutes: How long to cache results (default 60 mins)
+            warehouse: Candle warehouse holding the index history
+                (app_settings.candle_warehouse_dir if None; no warehouse when that is empty)
         """
         self.index_symbol = index_symbol
+        self.warehouse = warehouse if warehouse is not None else CandleWarehouse.from_settings()
         self.cache_duration = timedelta(minutes=cache_duration_minutes)
         self.last_check = None
         self.cached_regime = None
@@ -133,7 +138,7 @@ class RegimeMonitor:
             return self._get_fallback_regime()
     
     def _fetch_index_data(self) -> Optional[pd.DataFrame]:
-        """Fetch 1 year of Nifty 50 daily data from Yahoo Finance"""
+        """1 year of Nifty 50 daily data: stored bars topped up from Yahoo Finance"""
         if not YFINANCE_AVAILABLE:
             self.logger.warning("yfinance not available, cannot fetch index data")
             return None
@@ -142,13 +147,28 @@ class RegimeMonitor:
             self.logger.info(f"Fetching Nifty 50 data from Yahoo Finance...")
             from utils import get_yfinance_session
             session = get_yfinance_session()
-            nifty = yf.download(
-                self.index_symbol, 
-                period='1y', 
-                interval='1d', 
-                progress=False,
-                session=session
-            )
+
+            def fetch(since):
+                df = yf.download(
+                    self.index_symbol, 
+                    period=yahoo_period(since, '1y'), 
+                    interval='1d', 
+                    progress=False,
+                    session=session
+                )
+                if isinstance(df.columns, pd.MultiIndex):
+                    df.columns = df.columns.get_level_values(0)
+                return df
+
+            start = pd.Timestamp.now().normalize() - pd.DateOffset(years=1)
+            if self.warehouse is None:
+                nifty = fetch(None)
+                nifty = None if nifty is None or nifty.empty else nifty
+            else:
+                nifty = self.warehouse.read_through(self.index_symbol, "YAHOO", "1d", fetch, start=start, tz=None)
+            if nifty is None:
+                return None
+            nifty = nifty.rename(columns=str.title)
             
             if len(nifty) < 200:
                 self.logger.warning(f"Insufficient data: only {len(nifty)} days available (need 200)")
@@ -109,66 +109,12 @@ class RiskManager:
             if current_price == 0:
                 continue
             
-            # Calculate P&L
             pnl_pct = ((current_price - entry_price) / entry_price) * 100
-            pnl_amount = (current_price - entry_price) * quantity
-            
             logging.info(f"  {symbol}: Entry ₹{entry_price:.2f} → Current ₹{current_price:.2f} = {pnl_pct:+.2f}%")
             
-            # Check catastrophic stop (ALWAYS takes priority)
-            if pnl_pct <=-self.catastrophic_stop_pct:
-                actions.append({
-                    'symbol': symbol,
-                    'exchange': exchange,
-                    'quantity': quantity,
-                    'action': 'SELL',
-                    'reason': f'🛑 CATASTROPHIC STOP ({pnl_pct:.1f}%)',
-                    'priority': 'CRITICAL',
-                    'pnl_pct': pnl_pct,
-                    'pnl_amount': pnl_amount,
-                    'current_price': current_price
-                })
-                logging.error(f"  🛑 CATASTROPHIC STOP: {symbol} down {pnl_pct:.1f}%!")
-                continue
-            
-            # Check stop-loss (with never-sell-at-loss override)
-            if pnl_pct <= -self.stop_loss_pct:
-                # Check if never-sell-at-loss is enabled
-                never_sell_at_loss = self.settings.get('risk.never_sell_at_loss', False)
-                
-                if never_sell_at_loss and pnl_pct < 0:
-                    logging.warning(f"  ⚠️ Stop-loss ignored for {symbol} ({pnl_pct:.1f}%) - Never Sell at Loss enabled")
-                    continue  # Skip stop-loss, position remains open
-                
-                # Proceed with normal stop-loss
-                actions.append({
-                    'symbol': symbol,
-                    'exchange': exchange,
-                    'quantity': quantity,
-                    'action': 'SELL',
-                    'reason': f'⛔ Stop Loss Hit ({pnl_pct:.1f}%)',
-                    'priority': 'HIGH',
-                    'pnl_pct': pnl_pct,
-                    'pnl_amount': pnl_amount,
-                    'current_price': current_price
-                })
-                logging.warning(f"  ⛔ STOP LOSS: {symbol} down {pnl_pct:.1f}%")
-                continue
-            
-            # Check profit target
-            if pnl_pct >= self.profit_target_pct:
-                actions.append({
-                    'symbol': symbol,
-                    'exchange': exchange,
-                    'quantity': quantity,
-                    'action': 'SELL',
-                    'reason': f'🎯 Profit Target Hit ({pnl_pct:.1f}%)',
-                    'priority': 'NORMAL',
-                    'pnl_pct': pnl_pct,
-                    'pnl_amount': pnl_amount,
-                    'current_price': current_price
-                })
-                logging.info(f"  🎯 PROFIT TARGET: {symbol} up {pnl_pct:.1f}%!")
+            action = self.evaluate_position(symbol, exchange, entry_price, quantity, current_price)
+            if action:
+                actions.append(action)
         
         if actions:
             logging.info(f"⚠️ Risk Manager found {len(actions)} positions to close")
@@ -177,6 +123,71 @@ class RiskManager:
         
         return actions
     
+    def evaluate_position(self, symbol: str, exchange: str, entry_price: float,
+                          quantity: int, current_price: float) -> Optional[Dict]:
+        """
+        Risk decision for one position at ``current_price``:
+        catastrophic stop, then stop-loss (unless never-sell-at-loss), then profit target.
+        Returns the SELL action dict or None. Pure apart from logging (shared with backtests).
+        """
+        # Calculate P&L
+        pnl_pct = ((current_price - entry_price) / entry_price) * 100
+        pnl_amount = (current_price - entry_price) * quantity
+        
+        # Check catastrophic stop (ALWAYS takes priority)
+        if pnl_pct <=-self.catastrophic_stop_pct:
+            logging.error(f"  🛑 CATASTROPHIC STOP: {symbol} down {pnl_pct:.1f}%!")
+            return {
+                'symbol': symbol,
+                'exchange': exchange,
+                'quantity': quantity,
+                'action': 'SELL',
+                'reason': f'🛑 CATASTROPHIC STOP ({pnl_pct:.1f}%)',
+                'priority': 'CRITICAL',
+                'pnl_pct': pnl_pct,
+                'pnl_amount': pnl_amount,
+                'current_price': current_price
+            }
+        
+        # Check stop-loss (with never-sell-at-loss override)
+        if pnl_pct <= -self.stop_loss_pct:
+            # Check if never-sell-at-loss is enabled
+            never_sell_at_loss = self.settings.get('risk.never_sell_at_loss', False)
+            
+            if never_sell_at_loss and pnl_pct < 0:
+                logging.warning(f"  ⚠️ Stop-loss ignored for {symbol} ({pnl_pct:.1f}%) - Never Sell at Loss enabled")
+                return None  # Skip stop-loss, position remains open
+            
+            # Proceed with normal stop-loss
+            logging.warning(f"  ⛔ STOP LOSS: {symbol} down {pnl_pct:.1f}%")
+            return {
+                'symbol': symbol,
+                'exchange': exchange,
+                'quantity': quantity,
+                'action': 'SELL',
+                'reason': f'⛔ Stop Loss Hit ({pnl_pct:.1f}%)',
+                'priority': 'HIGH',
+                'pnl_pct': pnl_pct,
+                'pnl_amount': pnl_amount,
+                'current_price': current_price
+            }
+        
+        # Check profit target
+        if pnl_pct >= self.profit_target_pct:
+            logging.info(f"  🎯 PROFIT TARGET: {symbol} up {pnl_pct:.1f}%!")
+            return {
+                'symbol': symbol,
+                'exchange': exchange,
+                'quantity': quantity,
+                'action': 'SELL',
+                'reason': f'🎯 Profit Target Hit ({pnl_pct:.1f}%)',
+                'priority': 'NORMAL',
+                'pnl_pct': pnl_pct,
+                'pnl_amount': pnl_amount,
+                'current_price': current_price
+            }
+        return None
+    
     def check_daily_loss_limit(self, current_portfolio_value: float) -> bool:
         """
         Check if daily loss limit has been hit
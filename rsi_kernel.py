@@ -0,0 +1,302 @@
+"""
+RSI Kernel for ARUN Trading Bot
+TradingView-exact Wilder RMA / RSI on raw float64 arrays.
+
+Shared by kickstart.py and getRSI.py. Values are identical to the previous
+pandas implementations (SMA seed computed exactly like
+``Series.rolling(length).mean()``, then ``alpha * x + (1 - alpha) * prev``).
+The recursion is inherently sequential, so it runs as a tight scalar loop
+(numba-compiled when numba is installed) instead of per-element pandas
+indexing; everything around it is vectorized NumPy.
+"""
+
+import math
+from typing import Optional
+
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    njit = None
+    NUMBA_AVAILABLE = False
+
+NAN = float("nan")
+
+
+def _sma_seed(x, length):
+    """
+    Find the first full-window SMA of ``x``.
+
+    Mirrors pandas' fixed-window rolling mean (Kahan-compensated running sum
+    with separate add/remove compensation) so the seed is bit-identical.
+    Returns (index, seed) or (-1, nan) if there is never a full window.
+    """
+    nobs = 0
+    neg_ct = 0
+    sum_x = 0.0
+    comp_add = 0.0
+    comp_rem = 0.0
+    same = 0
+    prev = NAN
+    for i in range(len(x)):
+        if i >= length:
+            old = x[i - length]
+            if old == old:
+                nobs -= 1
+                y = -old - comp_rem
+                t = sum_x + y
+                comp_rem = t - sum_x - y
+                sum_x = t
+                if math.copysign(1.0, old) < 0.0:
+                    neg_ct -= 1
+        val = x[i]
+        if val == val:
+            nobs += 1
+            y = val - comp_add
+            t = sum_x + y
+            comp_add = t - sum_x - y
+            sum_x = t
+            if math.copysign(1.0, val) < 0.0:
+                neg_ct += 1
+            if val == prev:
+                same += 1
+            else:
+                same = 1
+            prev = val
+        if nobs >= length:
+            seed = sum_x / nobs
+            if same >= nobs:
+                seed = prev
+            elif neg_ct == 0 and seed < 0.0:
+                seed = 0.0
+            elif neg_ct == nobs and seed > 0.0:
+                seed = 0.0
+            return i, seed
+    return -1, NAN
+
+
+def _rma_fill(x, length, out):
+    """Write the Wilder RMA of ``x`` into ``out`` (pre-filled with NaN)."""
+    first, seed = _sma_seed(x, length)
+    if first < 0:
+        return
+    alpha = 1.0 / float(length)
+    beta = 1.0 - alpha
+    prev = seed
+    out[first] = prev
+    for i in range(first + 1, len(x)):
+        prev = alpha * x[i] + beta * prev
+        out[i] = prev
+
+
+def _rma_last(x, length):
+    """Return only the final RMA value of ``x`` (NaN if never seeded)."""
+    first, seed = _sma_seed(x, length)
+    if first < 0:
+        return NAN
+    alpha = 1.0 / float(length)
+    beta = 1.0 - alpha
+    prev = seed
+    for i in range(first + 1, len(x)):
+        prev = alpha * x[i] + beta * prev
+    return prev
+
+
+if NUMBA_AVAILABLE:
+    _sma_seed = njit(cache=True)(_sma_seed)
+    _rma_fill_jit = njit(cache=True)(_rma_fill)
+    _rma_last_jit = njit(cache=True)(_rma_last)
+
+
+def as_float_array(values) -> np.ndarray:
+    """
+    Coerce a Series/list/array to a contiguous float64 array.
+    Non-numeric entries become NaN (same as ``pd.to_numeric(errors="coerce")``).
+    """
+    if isinstance(values, np.ndarray) and values.dtype == np.float64:
+        return np.ascontiguousarray(values)
+    try:
+        return np.ascontiguousarray(np.asarray(values, dtype=np.float64))
+    except (TypeError, ValueError):
+        import pandas as pd
+        return pd.to_numeric(pd.Series(values), errors="coerce").to_numpy(dtype=np.float64)
+
+
+def rma(values, length: int) -> np.ndarray:
+    """
+    Wilder's RMA (TradingView ``ta.rma``) seeded with an SMA.
+    Returns an array of the same length, NaN until the first full window.
+    """
+    x = as_float_array(values)
+    if NUMBA_AVAILABLE:
+        out = np.full(len(x), np.nan)
+        _rma_fill_jit(x, length, out)
+        return out
+    out = [NAN] * len(x)
+    _rma_fill(x.tolist(), length, out)
+    return np.array(out, dtype=np.float64)
+
+
+def gains_losses(close: np.ndarray):
+    """
+    Split bar-to-bar changes into (gain, loss) arrays.
+    The first element is NaN, like ``Series.diff()``.
+    """
+    ch = np.empty(len(close), dtype=np.float64)
+    if len(close):
+        ch[0] = np.nan
+        np.subtract(close[1:], close[:-1], out=ch[1:])
+    gain = np.maximum(ch, 0.0)
+    loss = np.maximum(-ch, 0.0)
+    return gain, loss
+
+
+def _rsi_from_averages(up, down):
+    """Vectorized RSI from average gain/loss arrays (TradingView edge cases)."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rs = up / down
+        out = 100.0 - (100.0 / (1.0 + rs))
+    out = np.where(down != 0, out, 100.0)
+    out = np.where(up != 0, out, 0.0)
+    return out
+
+
+def _rsi_scalar(up: float, down: float) -> float:
+    """Scalar counterpart of :func:`_rsi_from_averages`."""
+    if up != up or down != down:
+        return NAN
+    if up == 0:
+        return 0.0
+    if down == 0:
+        return 100.0
+    return 100.0 - (100.0 / (1.0 + up / down))
+
+
+def rsi(close, length: int = 14) -> np.ndarray:
+    """
+    Full TradingView RSI series for ``close``.
+    NaN until enough bars exist to seed the averages.
+    """
+    c = as_float_array(close)
+    gain, loss = gains_losses(c)
+    return _rsi_from_averages(rma(gain, length), rma(loss, length))
+
+
+def rsi_last(close, length: int = 14, last_price: Optional[float] = None) -> float:
+    """
+    Last TradingView RSI value of ``close``, optionally treating the final bar
+    as if it closed at ``last_price`` (live LTP on the forming bar).
+
+    Only the final averages are kept, no per-bar RSI series is built.
+    Returns NaN if there is not enough history to seed the averages.
+    """
+    c = as_float_array(close)
+    if last_price is not None and np.isfinite(last_price) and len(c):
+        c = c.copy()
+        c[-1] = float(last_price)
+    gain, loss = gains_losses(c)
+    if NUMBA_AVAILABLE:
+        up = _rma_last_jit(gain, length)
+        down = _rma_last_jit(loss, length)
+    else:
+        up = _rma_last(gain.tolist(), length)
+        down = _rma_last(loss.tolist(), length)
+    return _rsi_scalar(up, down)
+
+
+class RSIState:
+    """
+    Incremental Wilder RSI state for one (symbol, exchange, timeframe).
+
+    Holds the average gain/loss up to the last *closed* bar, so advancing by
+    a newly closed bar, or evaluating "RSI if the forming bar closed at LTP",
+    is O(1). The arithmetic is the same as the full recompute, so results
+    match :func:`rsi_last` on the same history.
+    """
+
+    __slots__ = ("length", "avg_gain", "avg_loss", "last_close", "last_stamp", "bars")
+
+    def __init__(self, length: int, avg_gain: float, avg_loss: float,
+                 last_close: float, last_stamp: Optional[int] = None, bars: int = 0):
+        self.length = length
+        self.avg_gain = avg_gain
+        self.avg_loss = avg_loss
+        self.last_close = last_close
+        self.last_stamp = last_stamp
+        self.bars = bars
+
+    @classmethod
+    def seed(cls, closes, stamps=None, length: int = 14) -> Optional["RSIState"]:
+        """
+        Build the state from closed-bar closes (oldest first).
+        Returns None if the history is too short (or has gaps) to seed RSI.
+        """
+        c = as_float_array(closes)
+        if len(c) < 2 or c[-1] != c[-1]:
+            return None
+        gain, loss = gains_losses(c)
+        if NUMBA_AVAILABLE:
+            up = _rma_last_jit(gain, length)
+            down = _rma_last_jit(loss, length)
+        else:
+            up = _rma_last(gain.tolist(), length)
+            down = _rma_last(loss.tolist(), length)
+        if up != up or down != down:
+            return None
+        last_stamp = int(stamps[-1]) if stamps is not None and len(stamps) else None
+        return cls(length, up, down, float(c[-1]), last_stamp, len(c))
+
+    def _step(self, close: float):
+        ch = close - self.last_close
+        gain = ch if ch >= 0.0 else 0.0
+        loss = -ch if -ch >= 0.0 else 0.0
+        alpha = 1.0 / float(self.length)
+        beta = 1.0 - alpha
+        return alpha * gain + beta * self.avg_gain, alpha * loss + beta * self.avg_loss
+
+    def advance(self, close: float, stamp: Optional[int] = None):
+        """Fold one newly closed bar into the averages."""
+        self.avg_gain, self.avg_loss = self._step(float(close))
+        self.last_close = float(close)
+        self.last_stamp = stamp
+        self.bars += 1
+
+    def what_if(self, price: float) -> float:
+        """RSI if the forming bar closed at ``price`` (state is not modified)."""
+        up, down = self._step(float(price))
+        return _rsi_scalar(up, down)
+
+    @property
+    def value(self) -> float:
+        """RSI as of the last closed bar."""
+        return _rsi_scalar(self.avg_gain, self.avg_loss)
+
+
+def sync_state(state: Optional[RSIState], closes, stamps, length: int = 14) -> Optional[RSIState]:
+    """
+    Bring ``state`` up to date with closed bars ``closes``/``stamps``
+    (ascending int64 timestamps).
+
+    - Same last closed bar: returned unchanged (O(1)).
+    - Newer bars after the state's bar: advanced over just those bars.
+    - Missing, revised or out-of-window state: re-seeded from ``closes``.
+
+    Returns the current state, or None if the history cannot seed RSI.
+    """
+    c = as_float_array(closes)
+    s = np.asarray(stamps, dtype=np.int64)
+    if not len(c):
+        return None
+    if state is not None and state.length == length and state.last_stamp is not None:
+        if state.last_stamp == s[-1] and state.last_close == c[-1]:
+            return state
+        pos = int(np.searchsorted(s, state.last_stamp))
+        if pos < len(s) and s[pos] == state.last_stamp and c[pos] == state.last_close:
+            new = c[pos + 1:]
+            if not np.isnan(new).any():
+                for i in range(len(new)):
+                    state.advance(new[i], int(s[pos + 1 + i]))
+                return state
+    return RSIState.seed(c, s, length)
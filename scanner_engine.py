@@ -2,8 +2,9 @@
 🔍 MACD SCANNER ENGINE - Optimized Batch V2
 ═══════════════════════════════════════════════════════════════════════════════
 
-High-Performance Batch Scanner using yf.download (Threaded)
-Scans 100+ stocks per batch to avoid API rate limits.
+High-Performance Scanner over Yahoo chart history (Threaded)
+Concurrent, token-bucket rate-limited downloads stream into the indicator
+calculation as they arrive.
 """
 
 import yfinance as yf
@@ -11,21 +12,111 @@ import pandas as pd
 import numpy as np
 from datetime import datetime
 import time
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Dict, Optional, List, Tuple
 import logging
 
+import requests
+from requests.adapters import HTTPAdapter
+
+from candle_warehouse import CandleWarehouse, yahoo_period
+from utils import TokenBucket, YAHOO_CHART_URL, YAHOO_HEADERS, yahoo_chart_frame
+
+REQUESTS_PER_SECOND = 5.0      # Yahoo chart requests/sec across all scan workers
+MAX_WORKERS = 8                # concurrent downloads
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+MAX_BACKOFF = 30.0             # seconds; caps backoff and Retry-After
+PROGRESS_EVERY = 5             # progress_callback every N symbols
+
+
+class RateLimitedFetcher:
+    """
+    Yahoo chart downloads shared by the scan workers: one keep-alive session,
+    a token bucket capping requests/sec across all threads, and retries with
+    jittered exponential backoff on 429/5xx (Retry-After is honoured up to
+    ``max_backoff``). Backoff waits end early on ``stop()``.
+    """
+
+    def __init__(self, requests_per_second: float = REQUESTS_PER_SECOND, max_workers: int = MAX_WORKERS,
+                 retries: int = 3, backoff: float = 0.5, session: Optional[requests.Session] = None,
+                 max_backoff: float = MAX_BACKOFF):
+        self.max_workers = max_workers
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.stopped = threading.Event()
+        self.bucket = TokenBucket(requests_per_second)
+        if session is None:
+            session = requests.Session()
+            session.headers.update(YAHOO_HEADERS)
+            adapter = HTTPAdapter(pool_connections=2, pool_maxsize=max_workers)
+            session.mount("https://", adapter)
+        self.session = session
+        self.stats = {"requests": 0, "retries": 0, "failures": 0, "throttled_s": 0.0}
+        self._lock = threading.Lock()
+
+    def _count(self, key, value=1):
+        with self._lock:
+            self.stats[key] += value
+
+    def stop(self):
+        """Abort pending backoff waits; in-flight downloads give up instead of retrying."""
+        self.stopped.set()
+
+    def reset(self):
+        self.stopped.clear()
+
+    def _retry_delay(self, attempt: int, resp) -> float:
+        retry_after = resp.headers.get("Retry-After") if resp is not None else None
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), self.max_backoff)
+        return min(self.backoff * (2 ** attempt) * random.uniform(0.5, 1.5), self.max_backoff)
+
+    def history(self, ticker: str, period: str = "3mo", interval: str = "1d") -> pd.DataFrame:
+        """Chart history for ``ticker``; empty DataFrame when unavailable."""
+        url = YAHOO_CHART_URL.format(symbol=ticker, period=period, interval=interval)
+        for attempt in range(self.retries + 1):
+            self._count("throttled_s", self.bucket.acquire())
+            self._count("requests")
+            resp = None
+            try:
+                resp = self.session.get(url, timeout=10)
+                if resp.status_code == 200:
+                    return yahoo_chart_frame(resp.json())
+                if resp.status_code not in RETRY_STATUSES:
+                    break
+            except (requests.ConnectionError, requests.Timeout):
+                pass
+            except Exception:
+                # Unparseable payload (e.g. unknown symbol)
+                break
+            if attempt < self.retries:
+                self._count("retries")
+                if self.stopped.wait(self._retry_delay(attempt, resp)):
+                    break
+        self._count("failures")
+        return pd.DataFrame()
+
+
 class MACDScanner:
     """
     Optimized Batch Scanner for Dashboard
     """
 
-    def __init__(self, progress_callback=None):
+    def __init__(self, progress_callback=None, warehouse: Optional[CandleWarehouse] = None,
+                 fetcher: Optional[RateLimitedFetcher] = None):
         self.progress_callback = progress_callback
+        # app_settings.candle_warehouse_dir; None when the setting disables the warehouse
+        self.warehouse = warehouse if warehouse is not None else CandleWarehouse.from_settings()
+        self.fetcher = fetcher if fetcher is not None else RateLimitedFetcher()
         self.stop_requested = False
         self.results = []
 
     def stop(self):
         self.stop_requested = True
+        self.fetcher.stop()
 
     def get_stock_list(self, mode="FULL") -> List[str]:
         """
@@ -113,207 +204,201 @@ class MACDScanner:
         
         for ticker in df_dict.columns.levels[0]: # Iterating 'Ticker' level
             try:
-                # Extract Single DF
-                df = df_dict[ticker].copy()
-                
-                # Check data sufficiency
-                if df.empty or len(df) < 50: 
-                    continue
-                
-                # Drop NAs
-                df.dropna(inplace=True)
-                close = df['Close']
-                
-                # 1. MACD (12, 26, 9)
-                ema12 = close.ewm(span=12, adjust=False).mean()
-                ema26 = close.ewm(span=26, adjust=False).mean()
-                macd_line = ema12 - ema26
-                signal_line = macd_line.ewm(span=9, adjust=False).mean()
-                
-                # 2. Moving Averages
-                ma20 = close.tail(25).rolling(window=20).mean() # optimize tail
-                ma50 = close.tail(55).rolling(window=50).mean()
-                
-                # 3. Detect Crossover (Latest day)
-                # Condition: MACD[-1] > Signal[-1] AND MACD[-2] <= Signal[-2]
-                curr_macd = macd_line.iloc[-1]
-                curr_sig = signal_line.iloc[-1]
-                prev_macd = macd_line.iloc[-2]
-                prev_sig = signal_line.iloc[-2]
-                
-                bullish_cross = (curr_macd > curr_sig) and (prev_macd <= prev_sig)
-                
-                # User asked for "CROSS DATE". 
-                # If specifically TODAY/LATEST, we output date.
-                # If they want historical scans, we'd loop back. 
-                # Assuming "Latest Scan" means "Recent signal".
-                
-                # Let's verify standard Bullish Trend (MACD > Signal)
-                # The user requirement: "MACD Line cross over the Signal line upwards... show the date it crossed"
-                
-                # We will search back up to 10 days for the crossover date
-                crossover_date = None
-                cross_found = False
-                
-                # Reverse loop last 15 candles
-                for i in range(1, 15):
-                    idx = -i
-                    m_curr = macd_line.iloc[idx]
-                    s_curr = signal_line.iloc[idx]
-                    m_prev = macd_line.iloc[idx-1]
-                    s_prev = signal_line.iloc[idx-1]
-                    
-                    if m_curr > s_curr and m_prev <= s_prev:
-                        # Found the cross
-                        crossover_date = df.index[idx].strftime('%d-%b-%Y')
-                        cross_found = True
-                        break
-                
-                # Filter: Only show if MACD is currently ABOVE signal (Trend is valid)
-                if not (curr_macd > curr_sig):
-                    continue # Downward trend currently, ignore old crosses?
-                    
-                if not cross_found:
-                     # It might have maintained bullish for > 15 days
-                     # We skip if no recent actionable cross
-                     continue
-                     
-                # 4. Check Strong Buy Conditions
-                curr_price = close.iloc[-1]
-                val_ma20 = ma20.iloc[-1]
-                val_ma50 = ma50.iloc[-1]
-                
-                above_20 = curr_price > val_ma20
-                above_50 = curr_price > val_ma50
-                
-                # Logic: STRONG BUY if above 20 OR above 50
-                if above_20 or above_50:
-                    signal = "STRONG BUY"
-                else:
-                    signal = "BUY"
-                    
-                # Format Result
-                res = {
-                    "SYMBOL": ticker.replace(".NS", ""), # Clean name
-                    "LTP": round(curr_price, 2),
-                    "SIGNAL": signal,
-                    "CROSS DATE": crossover_date,
-                    "20 DMA": "Yes" if above_20 else "No",
-                    "50 DMA": "Yes" if above_50 else "No",
-                    "timestamp": datetime.now()
-                }
-                batch_results.append(res)
-                
+                res = self.calculate_indicators(ticker, df_dict[ticker])
+                if res:
+                    batch_results.append(res)
             except Exception as e:
                 # logging.error(f"Error processing {ticker}: {e}")
                 pass
                 
         return batch_results
 
+    def calculate_indicators(self, ticker: str, df: pd.DataFrame) -> Optional[Dict]:
+        """MACD crossover / DMA signal for one ticker's daily bars (None if no signal)"""
+        df = df.copy()
+
+        # Check data sufficiency
+        if df.empty or len(df) < 50: 
+            return None
+
+        # Drop NAs
+        df.dropna(inplace=True)
+        close = df['Close']
+
+        # 1. MACD (12, 26, 9)
+        ema12 = close.ewm(span=12, adjust=False).mean()
+        ema26 = close.ewm(span=26, adjust=False).mean()
+        macd_line = ema12 - ema26
+        signal_line = macd_line.ewm(span=9, adjust=False).mean()
+
+        # 2. Moving Averages
+        ma20 = close.tail(25).rolling(window=20).mean() # optimize tail
+        ma50 = close.tail(55).rolling(window=50).mean()
+
+        # 3. Detect Crossover (Latest day)
+        # Condition: MACD[-1] > Signal[-1] AND MACD[-2] <= Signal[-2]
+        curr_macd = macd_line.iloc[-1]
+        curr_sig = signal_line.iloc[-1]
+        prev_macd = macd_line.iloc[-2]
+        prev_sig = signal_line.iloc[-2]
+
+        bullish_cross = (curr_macd > curr_sig) and (prev_macd <= prev_sig)
+
+        # User asked for "CROSS DATE". 
+        # If specifically TODAY/LATEST, we output date.
+        # If they want historical scans, we'd loop back. 
+        # Assuming "Latest Scan" means "Recent signal".
+
+        # Let's verify standard Bullish Trend (MACD > Signal)
+        # The user requirement: "MACD Line cross over the Signal line upwards... show the date it crossed"
+
+        # We will search back up to 10 days for the crossover date
+        crossover_date = None
+        cross_found = False
+
+        # Reverse loop last 15 candles
+        for i in range(1, 15):
+            idx = -i
+            m_curr = macd_line.iloc[idx]
+            s_curr = signal_line.iloc[idx]
+            m_prev = macd_line.iloc[idx-1]
+            s_prev = signal_line.iloc[idx-1]
+
+            if m_curr > s_curr and m_prev <= s_prev:
+                # Found the cross
+                crossover_date = df.index[idx].strftime('%d-%b-%Y')
+                cross_found = True
+                break
+
+        # Filter: Only show if MACD is currently ABOVE signal (Trend is valid)
+        if not (curr_macd > curr_sig):
+            return None # Downward trend currently, ignore old crosses?
+
+        if not cross_found:
+             # It might have maintained bullish for > 15 days
+             # We skip if no recent actionable cross
+             return None
+
+        # 4. Check Strong Buy Conditions
+        curr_price = close.iloc[-1]
+        val_ma20 = ma20.iloc[-1]
+        val_ma50 = ma50.iloc[-1]
+
+        above_20 = curr_price > val_ma20
+        above_50 = curr_price > val_ma50
+
+        # Logic: STRONG BUY if above 20 OR above 50
+        if above_20 or above_50:
+            signal = "STRONG BUY"
+        else:
+            signal = "BUY"
+
+        # Format Result
+        res = {
+            "SYMBOL": ticker.replace(".NS", ""), # Clean name
+            "LTP": round(curr_price, 2),
+            "SIGNAL": signal,
+            "CROSS DATE": crossover_date,
+            "20 DMA": "Yes" if above_20 else "No",
+            "50 DMA": "Yes" if above_50 else "No",
+            "timestamp": datetime.now()
+        }
+        return res
+
     def scan_market(self, max_stocks=None, mode="FULL") -> List[Dict]:
         """
-        Batch Scan Execution
+        Streaming Scan Execution: histories are fetched concurrently (rate
+        limited) and each one is evaluated as soon as it arrives.
         """
         stock_list = self.get_stock_list(mode)
         if max_stocks:
             stock_list = stock_list[:max_stocks]
             
         total = len(stock_list)
-        chunk_size = 20 # Safer batch size to avoid JSONDecodeError
-
         self.results = []
+        if not self.stop_requested:
+            self.fetcher.reset()  # a shared fetcher stopped by an earlier scan
         
         if self.progress_callback:
-            self.progress_callback(0, total, f"Starting Batch Scan ({total} symbols)...")
-            
-        # Chunk Looping
-        for i in range(0, total, chunk_size):
-            if self.stop_requested: break
-            
-            chunk = stock_list[i : i + chunk_size]
+            self.progress_callback(0, total, f"Starting Scan ({total} symbols)...")
             
-            try:
-                batch_str = " ".join(chunk)
-                
-                # 1. BATCH DOWNLOAD (SAFE MODE)
-                from utils import get_yfinance_session
-                session = get_yfinance_session()
-                
-                # FORCE SAFE MODE: BYPASS YFINANCE LIBRARY ENTIRELY
-                # User network/environment is blocking standard yf.download causing massive delays.
-                # We switch to pure 'utils.fetch_yahoo_history_direct' immediately.
-                
-                # print(f"🔍 Scanning Batch: {batch_str[:30]}...") 
-                
+        done = 0
+        for ticker, df in self.iter_histories(stock_list):
+            done += 1
+            if not df.empty:
                 try:
-                    data = self.download_batch_direct(chunk)
-                except Exception as fb_e:
-                    print(f"❌ Direct Download failed: {fb_e}")
-                    data = pd.DataFrame()
-
-                # Legacy yf.download block (DISABLED)
-                # try:
-                #     data = yf.download(..., session=session)
-                # except: ...
-                
-                if data.empty:
-                    continue
+                    res = self.calculate_indicators(ticker, df)
+                    if res:
+                        self.results.append(res)
+                except Exception as e:
+                    # logging.error(f"Error processing {ticker}: {e}")
+                    pass
                     
-                # 2. PROCESS CHUNK
-                processed = self.calculate_indicators_batch(data)
-                self.results.extend(processed)
-                
-                # 3. UPDATE UI
-                if self.progress_callback:
-                    self.progress_callback(min(i + chunk_size, total), total, f"Scanned {min(i + chunk_size, total)}/{total}...")
-                    
-            except Exception as e:
-                print(f"Batch Error: {e}")
-                
-            # Rate limit between batches
-            time.sleep(1.0) # Moderate delay
+            if self.progress_callback and (done % PROGRESS_EVERY == 0 or done == total):
+                self.progress_callback(done, total, f"Scanned {done}/{total}...")
             
         if self.progress_callback:
             self.progress_callback(total, total, f"✅ Done! Found {len(self.results)}")
             
         return self.results
 
+    def fetch_history(self, ticker: str) -> pd.DataFrame:
+        """
+        3 months of daily bars for ``ticker``: stored bars from the candle
+        warehouse plus only the sessions since the last stored one.
+        """
+        def fetch(since):
+            df = self.fetcher.history(ticker, period=yahoo_period(since, "3mo"), interval="1d")
+            if not df.empty:
+                df.index = df.index.normalize()  # one row per session (the forming day is stamped with its last trade)
+            return df
+
+        if self.warehouse is None:
+            df = fetch(None)
+            return pd.DataFrame() if df is None else df.rename(columns=str.title)
+        start = pd.Timestamp.now(tz="UTC").tz_localize(None).normalize() - pd.DateOffset(months=3)
+        df = self.warehouse.read_through(ticker, "YAHOO", "1d", fetch, start=start, tz=None)
+        return pd.DataFrame() if df is None else df.rename(columns=str.title)
+
+    def _fetch_ticker(self, ticker: str) -> Tuple[str, pd.DataFrame]:
+        if self.stop_requested:
+            return ticker, pd.DataFrame()
+        df = self.fetch_history(ticker)
+        # Try adding .NS if missing (fallback for badly formatted input)
+        if df.empty and not ticker.endswith(".NS") and not ticker.endswith(".BO"):
+            ticker = f"{ticker}.NS"
+            df = self.fetch_history(ticker)
+        return ticker, df
+
+    def iter_histories(self, tickers_list):
+        """
+        Yield ``(ticker, DataFrame)`` in completion order while up to
+        ``max_workers`` downloads run in parallel. Stops early on ``stop()``.
+        """
+        with ThreadPoolExecutor(max_workers=self.fetcher.max_workers, thread_name_prefix="scan") as pool:
+            futures = [pool.submit(self._fetch_ticker, t) for t in tickers_list]
+            try:
+                for future in as_completed(futures):
+                    if self.stop_requested:
+                        break
+                    try:
+                        yield future.result()
+                    except Exception as e:
+                        # logging.error(f"Fetch error: {e}")
+                        yield "", pd.DataFrame()
+            finally:
+                for future in futures:
+                    future.cancel()
+
     def download_batch_direct(self, tickers_list):
         """
-        Fallback method to download data loop-wise using direct requests.
+        Download ``tickers_list`` concurrently through the rate-limited fetcher.
         Returns DataFrame compatible with yf.download structure (MultiIndex columns).
         """
-        import pandas as pd
-        from utils import fetch_yahoo_history_direct
-        
-        frames = {}
-        successful = 0
-        
-        # print(f"  ↳ Switching to Sequential Direct Download for {len(tickers_list)} symbols...")
-        
-        for ticker in tickers_list:
-            # We assume it takes ~0.5s per request. Slower but robust.
-            df = fetch_yahoo_history_direct(ticker, period="3mo", interval="1d")
-            
-            if not df.empty and len(df) > 0:
-                frames[ticker] = df
-                successful += 1
-            else:
-                 # Try adding .NS if missing (fallback for badly formatted input)
-                 if not ticker.endswith(".NS") and not ticker.endswith(".BO"):
-                     df = fetch_yahoo_history_direct(f"{ticker}.NS", period="3mo", interval="1d")
-                     if not df.empty:
-                         frames[f"{ticker}.NS"] = df # Store with suffix
-                         successful += 1
-            
-            # Small delay between direct requests to be extra safe
-            time.sleep(0.2)
-        
+        frames = {ticker: df for ticker, df in self.iter_histories(tickers_list) if not df.empty}
         if not frames:
             return pd.DataFrame()
             
-        # print(f"  ↳ Direct Download Success: {successful}/{len(tickers_list)}")
-        
         # Combine into MultiIndex DataFrame (Ticker, PriceType)
         # keys=frames.keys() becomes level 0 (Ticker)
         # axis=1 columns
@@ -27,8 +27,9 @@ try:
     from settings_manager import SettingsManager
     from state_manager import state as state_mgr
     
-    # Reload config to ensure fresh access token from settings.json
-    reload_config()
+    # Engine setup (fresh settings/access token, DB, managers); kickstart does none of it on import
+    import kickstart
+    kickstart.initialize()
     # Import positions fetching from kickstart
     try:
         from kickstart import safe_get_live_positions_merged
@@ -211,7 +212,9 @@ class DashboardV2:
                 if positions:
                     # Cache holdings for next startup
                     state_mgr.cache_holdings(positions)
-                    self.data_queue.put(("positions", positions))
+                    # The merged view is shared with the engine (PositionsService); the UI
+                    # writes live LTPs into its rows, so it gets its own copies
+                    self.data_queue.put(("positions", {k: dict(v) for k, v in positions.items()}))
                     self.write_log(f"✅ Fetched {len(positions)} holdings from API\n")
                 else:
                     self.write_log("⚠️ No positions returned from API\n")
@@ -1740,18 +1743,15 @@ class DashboardV2:
             self.write_log(f"CRITICAL: Failed to import kickstart: {import_err}\n")
             return
         
-        while not self.stop_update_flag.is_set():
-            try:
-                if not self.running:
-                    break
-                kickstart.run_cycle()
-            except Exception as e:
-                import traceback
-                self.write_log(f"❌ Engine Cycle Error: {e}\n")
-            
-            # Use dynamic beat frequency from settings
-            beat = getattr(kickstart, 'ENGINE_BEAT_SECONDS', 2.0)
-            time.sleep(beat)
+        def on_error(e):
+            self.write_log(f"❌ Engine Cycle Error: {e}\n")
+
+        # Bar-close strategy ticks + risk ticks (see engine_scheduler)
+        kickstart.build_engine_scheduler().run(
+            kickstart.run_scheduled_cycle,
+            lambda: self.stop_update_flag.is_set() or not self.running,
+            on_error,
+        )
 
     def rsi_worker(self):
         # ... logic similar to previous ...
@@ -814,6 +814,7 @@ class SettingsGUI:
             try:
                 import kickstart
                 from kickstart import fetch_market_data_once
+                kickstart.initialize()
                 from symbol_validator import get_symbol_price
             except ImportError as e:
                 print("Import Error in Validation Worker")
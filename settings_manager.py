@@ -5,11 +5,61 @@ Handles loading, saving, and validating settings.json
 
 import json
 import os
-from typing import Dict, Any
+import itertools
+from dataclasses import dataclass, fields
+from typing import Dict, Any, Callable, Optional
 from pathlib import Path
 from cryptography.fernet import Fernet
 import base64
 
+# Process-wide, so versions keep increasing when a SettingsManager is replaced
+_VERSIONS = itertools.count(1)
+
+
+@dataclass(frozen=True, slots=True)
+class SettingsSnapshot:
+    """
+    Typed, immutable copy of the settings the engine reads per symbol / per cycle.
+    Built once per settings version; hot paths read attributes instead of
+    walking the JSON tree with dotted paths. Defaults match the ``get()`` fallbacks.
+    """
+    version: int = 0
+    paper_trading_mode: bool = False
+    rsi_stabilization: bool = True
+    rsi_validation_mode: bool = False
+    concurrent_cycle: bool = False
+    cycle_max_workers: int = 8
+    nifty_50_only: bool = False
+    per_trade_pct: float = 10.0
+    allocated_limit: float = 50000.0
+    never_sell_at_loss: bool = False
+
+    PATHS = {
+        "paper_trading_mode": "app_settings.paper_trading_mode",
+        "rsi_stabilization": "app_settings.rsi_stabilization",
+        "rsi_validation_mode": "app_settings.rsi_validation_mode",
+        "concurrent_cycle": "app_settings.concurrent_cycle",
+        "cycle_max_workers": "app_settings.cycle_max_workers",
+        "nifty_50_only": "app_settings.nifty_50_only",
+        "per_trade_pct": "capital.per_trade_pct",
+        "allocated_limit": "capital.allocated_limit",
+        "never_sell_at_loss": "risk.never_sell_at_loss",
+    }
+
+    @classmethod
+    def build(cls, get: Callable[[str, Any], Any], version: Optional[int] = None) -> "SettingsSnapshot":
+        """Snapshot from any ``get(path, default)`` (SettingsManager.get or a stand-in)."""
+        values = {}
+        for f in fields(cls):
+            if f.name not in cls.PATHS:
+                continue
+            value = get(cls.PATHS[f.name], f.default)
+            try:
+                values[f.name] = f.type(value) if value is not None else f.default
+            except (TypeError, ValueError):
+                values[f.name] = f.default
+        return cls(version=next(_VERSIONS) if version is None else version, **values)
+
 
 class SettingsManager:
     """
@@ -19,6 +69,9 @@ class SettingsManager:
     def __init__(self, settings_file: str = "settings.json"):
         self.settings_file = settings_file
         self.settings = {}
+        self.version = 0           # bumped on every load/save (see snapshot())
+        self._mtime = None         # settings file mtime at the last load/save
+        self._snapshot: Optional[SettingsSnapshot] = None
         self._encryption_key = self._get_or_create_encryption_key()
         self.load()
     
@@ -31,6 +84,7 @@ class SettingsManager:
             try:
                 with open(self.settings_file, 'r') as f:
                     self.settings = json.load(f)
+                self._changed()
                 print(f"✅ Settings loaded from {self.settings_file}")
                 return self.settings
             except json.JSONDecodeError as e:
@@ -61,9 +115,13 @@ class SettingsManager:
         Save current settings to JSON file and create a backup
         """
         try:
-            # Create backup before saving (or after, but let's do it on successful save)
-            with open(self.settings_file, 'w') as f:
+            # Write a temp file and swap it in, so readers (the engine's
+            # reload_if_changed) never see a truncated settings.json
+            tmp_file = f"{self.settings_file}.tmp"
+            with open(tmp_file, 'w') as f:
                 json.dump(self.settings, f, indent=2)
+            os.replace(tmp_file, self.settings_file)
+            self._changed()
             
             self._create_backup()
             print(f"✅ Settings saved to {self.settings_file}")
@@ -72,6 +130,47 @@ class SettingsManager:
             print(f"❌ Error saving settings: {e}")
             return False
 
+    def _changed(self):
+        self.version = next(_VERSIONS)
+        try:
+            self._mtime = os.path.getmtime(self.settings_file)
+        except OSError:
+            self._mtime = None
+
+    def snapshot(self) -> SettingsSnapshot:
+        """Frozen hot-path view of the current settings (rebuilt only when the version moved)."""
+        snap = self._snapshot
+        if snap is None or snap.version != self.version:
+            snap = self._snapshot = SettingsSnapshot.build(self.get, self.version)
+        return snap
+
+    def reload_if_changed(self) -> bool:
+        """
+        Reload when settings.json was modified outside this instance; True if it was.
+        A file that cannot be read or parsed (e.g. mid-write by another process)
+        keeps the current settings and is retried on the next call; unlike load(),
+        this never falls back to the defaults.
+        """
+        try:
+            mtime = os.path.getmtime(self.settings_file)
+        except OSError:
+            return False
+        if mtime == self._mtime:
+            return False
+        try:
+            with open(self.settings_file, 'r') as f:
+                settings = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Settings reload skipped, keeping current settings: {e}")
+            return False
+        if not isinstance(settings, dict):
+            return False
+        self.settings = settings
+        self._changed()
+        self._mtime = mtime  # the mtime we read against; a later write is picked up next call
+        print(f"✅ Settings reloaded from {self.settings_file}")
+        return True
+
     def _create_backup(self):
         """
         Create a timestamped backup of settings.json in the logs directory.
@@ -257,6 +356,24 @@ class SettingsManager:
             
         return self.settings.get('stocks', [])
 
+    @staticmethod
+    def csv_row_to_stock(row) -> Dict[str, Any]:
+        """
+        One config_table.csv row -> settings.json ``stocks`` entry
+        """
+        return {
+            "symbol": str(row.get('Symbol', '')).upper(),
+            "exchange": str(row.get('Exchange', 'NSE')).upper(),
+            "enabled": str(row.get('Enabled', 'False')).lower() == 'true',
+            "strategy": row.get('Strategy', 'TRADE'),
+            "timeframe": row.get('Timeframe', '15T'),
+            "buy_rsi": int(row.get('Buy RSI', 30)),
+            "sell_rsi": int(row.get('Sell RSI', 70)),
+            "Ignore_RSI": str(row.get('Skip RSI', 'False')).lower() in ('true', 'yes', '1'),
+            "quantity": int(row.get('Quantity', 0)),
+            "profit_target_pct": float(row.get('Profit Target %', 1.0))
+        }
+
     def migrate_stock_configs(self):
         """
         Migrate stocks from config_table.csv to settings.json
@@ -268,21 +385,7 @@ class SettingsManager:
 
         try:
             df = pd.read_csv(csv_path)
-            stocks = []
-            for _, row in df.iterrows():
-                stock = {
-                    "symbol": str(row.get('Symbol', '')).upper(),
-                    "exchange": str(row.get('Exchange', 'NSE')).upper(),
-                    "enabled": str(row.get('Enabled', 'False')).lower() == 'true',
-                    "strategy": row.get('Strategy', 'TRADE'),
-                    "timeframe": row.get('Timeframe', '15T'),
-                    "buy_rsi": int(row.get('Buy RSI', 30)),
-                    "sell_rsi": int(row.get('Sell RSI', 70)),
-                    "Ignore_RSI": str(row.get('Skip RSI', 'False')).lower() in ('true', 'yes', '1'),
-                    "quantity": int(row.get('Quantity', 0)),
-                    "profit_target_pct": float(row.get('Profit Target %', 1.0))
-                }
-                stocks.append(stock)
+            stocks = [self.csv_row_to_stock(row) for _, row in df.iterrows()]
             
             self.settings['stocks'] = stocks
             self.save()
@@ -347,8 +450,12 @@ class SettingsManager:
         }
 
 
-# Convenience instance
-settings = SettingsManager()
+# Convenience instance, created on first access (``from settings_manager import settings``)
+def __getattr__(name):
+    if name == "settings":
+        globals()["settings"] = SettingsManager()
+        return globals()["settings"]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 if __name__ == "__main__":
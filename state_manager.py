@@ -3,22 +3,44 @@ State Manager for ARUN Trading Bot
 Persists bot state to survive restarts and crashes
 """
 
+import atexit
 import json
 import os
+import threading
+import time
 from datetime import datetime
 from typing import Dict, Any, Optional
 import logging
 
+DEFAULT_FLUSH_INTERVAL_MS = 500  # coalesce state writes to at most one per interval
+
 
 class StateManager:
     """
     Manages persistent bot state
     Saves to JSON file for crash recovery
+
+    save() only marks the state dirty; a background flusher writes it at most
+    once per ``flush_interval_ms`` (temp file + os.replace, so a crash never
+    leaves a half-written file). Critical flags use save(force=True) to hit
+    disk before returning. ``flush_interval_ms=0`` writes synchronously.
     """
     
-    def __init__(self, state_file: str = "bot_state.json"):
+    def __init__(self, state_file: str = "bot_state.json", flush_interval_ms: int = DEFAULT_FLUSH_INTERVAL_MS):
         self.state_file = state_file
+        self.flush_interval = flush_interval_ms / 1000.0
+        self._lock = threading.RLock()
+        self._wake = threading.Event()
+        self._dirty = False
+        self._flusher: Optional[threading.Thread] = None
+        self.stats = {'saves': 0, 'writes': 0, 'forced': 0, 'errors': 0}
         self.state = self._load()
+        atexit.register(self.flush)
+    
+    def configure(self, flush_interval_ms: Optional[int] = None):
+        """Apply settings (app_settings.state_flush_ms) after they are loaded"""
+        if flush_interval_ms is not None:
+            self.flush_interval = max(0, flush_interval_ms) / 1000.0
     
     def _load(self) -> Dict[str, Any]:
         """
@@ -73,31 +95,73 @@ class StateManager:
             }
         }
     
-    def save(self):
-        """
-        Save current state to file
-        """
-        try:
-            self.state['last_update'] = datetime.now().isoformat()
-            
-            # Recursive function to stringify keys
-            def sanitize(obj):
-                if isinstance(obj, dict):
-                    return {str(k): sanitize(v) for k, v in obj.items()}
-                elif isinstance(obj, list):
-                    return [sanitize(i) for i in obj]
-                else:
-                    return obj
+    def save(self, force: bool = False):
+        """
+        Persist current state: debounced by default, immediately with force=True
+        """
+        self.state['last_update'] = datetime.now().isoformat()
+        self.stats['saves'] += 1
+        self._dirty = True
+        if force or self.flush_interval <= 0:
+            if force:
+                self.stats['forced'] += 1
+            self.flush()
+            return
+        self._ensure_flusher()
+        self._wake.set()
+    
+    def _ensure_flusher(self):
+        if self._flusher is None or not self._flusher.is_alive():
+            self._flusher = threading.Thread(target=self._flush_loop, name="state-flusher", daemon=True)
+            self._flusher.start()
+    
+    def _flush_loop(self):
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            # Coalesce: everything marked dirty within the interval goes in one write
+            time.sleep(self.flush_interval)
+            self.flush()
+    
+    def flush(self) -> bool:
+        """
+        Write the state now if it is dirty. Returns False if the write failed
+        (the state stays dirty and is retried on the next save).
+        """
+        with self._lock:
+            if not self._dirty:
+                return True
+            self._dirty = False
+            try:
+                # Recursive function to stringify keys
+                def sanitize(obj):
+                    if isinstance(obj, dict):
+                        return {str(k): sanitize(v) for k, v in obj.items()}
+                    elif isinstance(obj, list):
+                        return [sanitize(i) for i in obj]
+                    else:
+                        return obj
 
-            sanitized_state = sanitize(self.state)
-            
-            with open(self.state_file, 'w') as f:
-                json.dump(sanitized_state, f, indent=2)
-            
-            logging.debug(f"💾 State saved to {self.state_file}")
-            
-        except Exception as e:
-            logging.error(f"❌ Error saving state: {e}")
+                sanitized_state = sanitize(self.state)
+                payload = json.dumps(sanitized_state, indent=2)
+                
+                tmp_file = f"{self.state_file}.tmp"
+                with open(tmp_file, 'w') as f:
+                    f.write(payload)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_file, self.state_file)
+                
+                self.stats['writes'] += 1
+                logging.debug(f"💾 State saved to {self.state_file}")
+                return True
+                
+            except Exception as e:
+                # e.g. state mutated by another thread mid-snapshot: retry later
+                self._dirty = True
+                self.stats['errors'] += 1
+                logging.error(f"❌ Error saving state: {e}")
+                return False
     
     def update_position(self, symbol: str, data: Dict[str, Any]):
         """
@@ -141,7 +205,7 @@ class StateManager:
         Set circuit breaker status
         """
         self.state['circuit_breaker_active'] = active
-        self.save()
+        self.save(force=True)
     
     def is_circuit_breaker_active(self) -> bool:
         """
@@ -156,7 +220,7 @@ class StateManager:
         self.state['daily_start_capital'] = start_capital
         self.state['circuit_breaker_active'] = False
         self.state['total_trades_today'] = 0
-        self.save()
+        self.save(force=True)
         logging.info(f"🔄 Daily state reset. Start capital: ₹{start_capital:,.2f}")
     
     def increment_trade_count(self):
@@ -223,6 +287,23 @@ class StateManager:
             'failed': counters.get('failed', 0)
         }
     
+    def peek_trade_counters(self) -> Dict[str, int]:
+        """
+        Today's trade counters from memory, without the reset check's write.
+        Counters from a previous day read as zero (the next increment resets them).
+        For status payloads built on every status change.
+        """
+        import pytz
+        counters = self.state.get('trade_counters', {})
+        now_ist = datetime.now(pytz.timezone('Asia/Kolkata'))
+        if counters.get('last_reset_date', '') != now_ist.strftime('%Y-%m-%d') and now_ist.hour >= 1:
+            counters = {}
+        return {
+            'attempts': counters.get('attempts', 0),
+            'success': counters.get('success', 0),
+            'failed': counters.get('failed', 0)
+        }
+
     def get_summary(self) -> Dict[str, Any]:
         """
         Get state summary for display
@@ -363,7 +444,7 @@ class StateManager:
         Set the global stop flag in persistent state
         """
         self.state['stop_requested'] = requested
-        self.save()
+        self.save(force=True)
         logging.info(f"🛑 Persisted STOP_REQUESTED = {requested}")
 
     def is_stop_requested(self) -> bool:
@@ -14,13 +14,14 @@ class NiftySIPStrategy:
         self.sip_day = "Monday" # Can be 0 (Monday) to 4 (Friday)
         self.dip_threshold = 2.0 # % drop to trigger buy
         
-    def should_buy(self, current_price, last_buy_price=None):
+    def should_buy(self, current_price, last_buy_price=None, now=None):
         """
         Determine if we should buy today
         1. Is it the SIP day?
         2. Is the price significantly lower than last buy? (Buy the dip)
+        ``now`` defaults to the wall clock (backtests pass the bar time)
         """
-        now = datetime.now()
+        now = now or datetime.now()
         
         # 1. SIP Day Check (e.g., Buy every Monday)
         is_sip_day = now.strftime('%A') == self.sip_day
@@ -0,0 +1,142 @@
+import sys
+import os
+import sqlite3
+import threading
+import time
+
+import pytest
+
+# Add project root
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import kickstart
+from backend.query_cache import QueryCache
+from database.trades_db import TradesDatabase
+
+
+def buy(db, symbol, qty=1, price=100.0):
+    db.insert_trade(symbol=symbol, exchange="NSE", action="BUY", quantity=qty, price=price,
+                    gross_amount=qty * price, total_fees=0.0, net_amount=qty * price)
+
+
+def test_cache_serves_until_version_changes_or_ttl():
+    version = {"v": 1}
+    calls = []
+    cache = QueryCache(version_fn=lambda: version["v"], ttl=60)
+    compute = lambda: calls.append(1) or len(calls)
+
+    assert [cache.get("positions", compute) for _ in range(5)] == [1] * 5
+    version["v"] = 2
+    assert cache.get("positions", compute) == 2
+    assert cache.get(("history", 7), compute) == 3  # keyed by endpoint + params
+    assert cache.stats == {"hits": 4, "misses": 3, "version_errors": 0}
+
+    cache.ttl = 0.01
+    time.sleep(0.02)
+    assert cache.get("positions", compute) == 4
+
+
+def test_concurrent_misses_compute_once():
+    calls = []
+
+    def slow():
+        calls.append(1)
+        time.sleep(0.05)
+        return "rows"
+
+    cache = QueryCache(version_fn=lambda: 1, ttl=60)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get("pnl", slow))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert results == ["rows"] * 8
+    assert len(calls) == 1
+
+
+def test_readonly_replica_sees_writes_through_change_counter(tmp_path):
+    path = str(tmp_path / "trades.db")
+    writer = TradesDatabase(path)
+    reader = TradesDatabase(path, readonly=True)
+    assert reader.conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    with pytest.raises(sqlite3.OperationalError):
+        reader.conn.execute("DELETE FROM trades")
+
+    cache = QueryCache(version_fn=reader.get_data_version, ttl=60)
+    queries = []
+
+    def positions():
+        queries.append(1)
+        return reader.get_open_positions()
+
+    buy(writer, "AAA")
+    for _ in range(10):  # ten dashboard polls, one query
+        assert [p["symbol"] for p in cache.get("positions", positions)] == ["AAA"]
+    assert len(queries) == 1
+
+    buy(writer, "BBB")
+    assert sorted(p["symbol"] for p in cache.get("positions", positions)) == ["AAA", "BBB"]
+    assert len(queries) == 2
+
+    # Edits outside insert_trade bump the counter too (triggers)
+    writer.conn.execute("UPDATE trades SET strategy = 'MANUAL' WHERE symbol = 'AAA'")
+    writer.conn.commit()
+    cache.get("positions", positions)
+    assert len(queries) == 3
+    writer.close()
+    reader.close()
+
+
+def test_readonly_open_migrates_pre_upgrade_db(tmp_path):
+    path = str(tmp_path / "trades.db")
+    writer = TradesDatabase(path)
+    buy(writer, "AAA", qty=3)
+    writer.close()
+    # Roll the file back to a pre-ledger schema: trades only
+    conn = sqlite3.connect(path)
+    conn.executescript("DROP TABLE positions; DROP TABLE table_versions;")
+    conn.close()
+
+    reader = TradesDatabase(path, readonly=True)
+    assert [(p["symbol"], p["net_quantity"]) for p in reader.get_open_positions()] == [("AAA", 3)]
+    assert reader.get_data_version() is not None
+    reader.close()
+
+
+def test_api_endpoints_use_cache(tmp_path, monkeypatch):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    # Importing the API hooks BotManager into the kickstart callback; restore it afterwards
+    monkeypatch.setitem(kickstart._LOG_STATE, "callback", kickstart._LOG_STATE["callback"])
+    try:
+        from backend.api import routes
+        from backend.auth import get_current_user
+    except Exception as e:  # e.g. passlib/bcrypt version mismatch in this environment
+        pytest.skip(f"backend API not importable here: {e}")
+
+    path = str(tmp_path / "trades.db")
+    writer = TradesDatabase(path)
+    reader = TradesDatabase(path, readonly=True)
+    cache = QueryCache(version_fn=reader.get_data_version, ttl=60)
+    monkeypatch.setattr(routes, "db", reader)
+    monkeypatch.setattr(routes, "api_cache", cache)
+    monkeypatch.setattr(routes, "DB_AVAILABLE", True)
+
+    app = FastAPI()
+    app.include_router(routes.router, prefix="/api")
+    app.dependency_overrides[get_current_user] = lambda: "tester"
+    client = TestClient(app)
+
+    buy(writer, "AAA", qty=2)
+    for _ in range(3):
+        assert client.get("/api/positions").json()["count"] == 1
+        body = client.get("/api/pnl").json()
+        assert body["trades_count"] == 1 and "error" not in body
+    assert cache.stats["misses"] == 2
+
+    buy(writer, "BBB")
+    assert client.get("/api/positions").json()["count"] == 2
+    assert cache.stats["misses"] == 3
+    writer.close()
+    reader.close()
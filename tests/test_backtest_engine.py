@@ -0,0 +1,132 @@
+import sys
+import os
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Add project root
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import trade_rules
+from backtest_engine import (Backtester, CandleStore, MarketFrame, SimBroker, StaticSettings,
+                             TRADE_COLUMNS, write_trades)
+from database.trades_db import TradesDatabase
+
+SETTINGS = StaticSettings({
+    "capital": {"allocated_limit": 100000.0, "per_trade_pct": 50.0},
+    "risk_controls": {"default_stop_loss_pct": 5, "default_profit_target_pct": 10, "catastrophic_stop_pct": 20},
+})
+
+
+def candles(prices, start="2025-01-06 09:15", freq="15min"):
+    index = pd.date_range(start, periods=len(prices), freq=freq, name="timestamp")
+    return pd.DataFrame({"open": prices, "high": prices, "low": prices, "close": prices}, index=index)
+
+
+def dip_and_recover(n_chop=20, base=100.0):
+    """Choppy (RSI ~50), a steady slide (RSI -> 0), then a climb above the start (RSI -> 100)."""
+    return ([base + (0.1 if i % 2 else -0.1) for i in range(n_chop)]
+            + [base - i * 0.5 for i in range(1, 16)] + [base - 7.5 + i * 0.6 for i in range(1, 31)])
+
+
+def test_cnc_fees_match_live_formula():
+    fees, breakdown = trade_rules.cnc_fees(100000.0, "SELL")
+    assert breakdown == {"brokerage": 30.0, "stt": 100.0, "exchange_charges": 3.45, "gst": 5.4,
+                         "sebi_charges": 0.1, "stamp_duty": 0}
+    assert fees == pytest.approx(30 + 100 + 3.45 + 5.4 + 0.1)
+    assert trade_rules.cnc_fees(1000.0, "BUY")[1]["brokerage"] == 20  # ₹20 minimum
+    assert trade_rules.net_amount(1000.0, 25.0, "BUY") == 1025.0
+
+
+def test_rsi_rules():
+    assert trade_rules.rsi_buy_signal(25, 30) and not trade_rules.rsi_buy_signal(float("nan"), 30)
+    assert trade_rules.rsi_sell_decision("TRADE", 75, 70, 110, 100)[0]
+    assert trade_rules.rsi_sell_decision("TRADE", 75, 70, 90, 100, never_sell_at_loss=True) == \
+        (False, trade_rules.SELL_BLOCKED_AT_LOSS)
+    assert trade_rules.rsi_sell_decision("INVEST", 75, 70, 110, 100) == (False, trade_rules.SELL_SKIPPED_INVEST)
+    assert trade_rules.order_quantity(0, 250.0, StaticSettings({"capital": {"total_capital": 50000}})) == 20
+
+
+def test_replay_buys_dip_and_sells_on_rsi():
+    stock = {"symbol": "TCS", "exchange": "NSE", "buy_rsi": 30, "sell_rsi": 70, "quantity": 100}
+    frame = MarketFrame.from_candles({("TCS", "NSE"): candles(dip_and_recover())})
+    result = Backtester([stock], SETTINGS, use_risk=False).run(frame)
+
+    buy, sell = result.trades
+    assert (buy[3], sell[3]) == ("BUY", "SELL")
+    assert buy[4] == sell[4] == 100
+    assert sell[5] > buy[5] and sell[16].startswith("RSI Sell Signal")
+    row = dict(zip(TRADE_COLUMNS, sell))
+    assert row["net_amount"] == pytest.approx(row["gross_amount"] - row["total_fees"])
+    summary = result.summary()
+    assert summary["final_equity"] == pytest.approx(100000.0 + row["pnl_net"], abs=0.01)
+    assert summary["win_rate_pct"] == 100.0
+
+
+def test_risk_manager_stop_loss_exits():
+    # Dip buys, then the slide continues past the 5% stop-loss
+    prices = [100.0 + (0.1 if i % 2 else -0.1) for i in range(20)] + [100 - i * 0.5 for i in range(1, 30)]
+    stock = {"symbol": "INFY", "exchange": "NSE", "buy_rsi": 30, "sell_rsi": 70, "quantity": 5}
+    frame = MarketFrame.from_candles({("INFY", "NSE"): candles(prices)})
+    result = Backtester([stock], SETTINGS).run(frame)
+
+    sells = [t for t in result.trades if t[3] == "SELL"]
+    assert sells and "Stop Loss Hit" in sells[0][16]
+    assert result.stats["risk_exits"] >= 1
+
+
+def test_capital_and_trade_limits_gate_entries():
+    settings = StaticSettings({"capital": {"allocated_limit": 1500.0, "per_trade_pct": 100.0}})
+    stocks = [{"symbol": s, "exchange": "NSE", "buy_rsi": 30, "sell_rsi": 99, "quantity": 10} for s in ("A", "B")]
+    frame = MarketFrame.from_candles({("A", "NSE"): candles(dip_and_recover()),
+                                      ("B", "NSE"): candles(dip_and_recover())})
+    result = Backtester(stocks, settings, use_risk=False).run(frame)
+    assert [t[1] for t in result.trades] == ["A"]  # B's ~₹970 would exceed the ₹1500 bot capital
+    assert result.stats["skipped_capital"] > 0
+
+
+def test_sip_buys_once_on_sip_day():
+    index_days = pd.date_range("2025-01-06 09:15", periods=3 * 25, freq="15min")  # Monday onwards
+    df = pd.DataFrame({"close": np.full(len(index_days), 250.0)}, index=index_days.rename("timestamp"))
+    stock = {"symbol": "NIFTYBEES", "exchange": "NSE", "strategy": "SIP", "quantity": 4}
+    result = Backtester([stock], SETTINGS).run(MarketFrame.from_candles({("NIFTYBEES", "NSE"): df}))
+    assert len(result.trades) == 1 and result.trades[0][0].startswith("2025-01-06")
+
+
+def test_store_alignment_and_database_compatibility(tmp_path):
+    store = CandleStore(str(tmp_path / "candles"))
+    store.save("TCS", "NSE", "15T", candles(dip_and_recover()))
+    store.save("SBIN", "NSE", "15T", candles([500.0] * 10, start="2025-01-06 10:00"))
+    stocks = [{"symbol": "TCS", "exchange": "NSE", "buy_rsi": 30, "sell_rsi": 70, "quantity": 10},
+              {"symbol": "SBIN", "exchange": "NSE", "buy_rsi": 30, "sell_rsi": 70, "quantity": 1}]
+    frame = MarketFrame.from_store(store, stocks)
+    assert frame.close.shape == (2, len(dip_and_recover()))
+    assert np.isnan(frame.close[1, 0]) and frame.close[1, 3] == 500.0
+
+    result = Backtester(stocks, SETTINGS, use_risk=False).run(frame)
+    db = TradesDatabase(str(tmp_path / "backtest.db"))
+    assert write_trades(db, result.trades) == 2
+    stored = db.conn.execute("SELECT action, pnl_net FROM trades ORDER BY id").fetchall()
+    assert [r["action"] for r in stored] == ["BUY", "SELL"]
+
+    # Same two fills through insert_trade give the same P&L
+    live = TradesDatabase(str(tmp_path / "live.db"))
+    for row in map(lambda r: dict(zip(TRADE_COLUMNS, r)), result.trades):
+        live.insert_trade(row["symbol"], row["exchange"], row["action"], row["quantity"], row["price"],
+                          row["gross_amount"], row["total_fees"], row["net_amount"])
+    live_pnl = live.conn.execute("SELECT pnl_net FROM trades WHERE action = 'SELL'").fetchone()[0]
+    assert stored[1]["pnl_net"] == pytest.approx(live_pnl)
+    assert db.get_open_positions() == []
+    db.close()
+    live.close()
+
+
+def test_sim_broker_mirrors_ledger_average():
+    broker = SimBroker(cash=10000)
+    stamp = datetime(2025, 1, 6, 10, 0)
+    broker.execute(("X", "NSE"), "BUY", 2, 100.0, stamp, "TRADE", "t")
+    broker.execute(("X", "NSE"), "BUY", 6, 200.0, stamp, "TRADE", "t")
+    assert broker.avg_price(("X", "NSE")) == 175.0  # broker: quantity-weighted
+    assert broker.ledger_entry(("X", "NSE")) == (8, 150.0)  # ledger: mean of buy prices
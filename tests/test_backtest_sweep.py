@@ -0,0 +1,79 @@
+import sys
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Add project root
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import backtest_sweep
+from backtest_engine import Backtester, MarketFrame, StaticSettings
+from tests.test_backtest_engine import candles, dip_and_recover
+
+SETTINGS = {
+    "capital": {"allocated_limit": 100000.0, "per_trade_pct": 50.0},
+    "risk_controls": {"default_stop_loss_pct": 5, "default_profit_target_pct": 10, "catastrophic_stop_pct": 20},
+}
+STOCKS = [{"symbol": "TCS", "exchange": "NSE", "buy_rsi": 30, "sell_rsi": 70, "quantity": 100},
+          {"symbol": "INFY", "exchange": "NSE", "buy_rsi": 30, "sell_rsi": 70, "quantity": 50}]
+
+
+@pytest.fixture
+def frames_dir(tmp_path):
+    frame = MarketFrame.from_candles({("TCS", "NSE"): candles(dip_and_recover()),
+                                      ("INFY", "NSE"): candles(dip_and_recover(base=200.0))})
+    backtest_sweep.SharedFrames.publish({"15T": frame}, str(tmp_path / "frames"))
+    return str(tmp_path / "frames"), frame
+
+
+def test_grid_and_random_samples():
+    space = {"buy_rsi": [30, 40, 70], "sell_rsi": [60, 70]}
+    combos = backtest_sweep.grid(space)
+    assert {"buy_rsi": 70, "sell_rsi": 60} not in combos and len(combos) == 4
+
+    sampled = backtest_sweep.random_samples(space, 3, seed=7)
+    assert len(sampled) == 3 and all(c in combos for c in sampled)
+    assert len({tuple(c.values()) for c in sampled}) == 3
+    assert sampled == backtest_sweep.random_samples(space, 3, seed=7)
+    assert len(backtest_sweep.random_samples(space, 50)) == 4  # capped at the valid grid
+
+
+def test_shared_frames_are_memory_mapped(frames_dir):
+    directory, frame = frames_dir
+    shared = backtest_sweep.SharedFrames(directory).frame("15T")
+    assert isinstance(shared.close, np.memmap) and isinstance(shared.rsi, np.memmap)
+    assert shared.keys == frame.keys and shared.timeline.equals(frame.timeline)
+    np.testing.assert_array_equal(shared.rsi, frame.rsi)
+
+
+def test_sweep_matches_direct_backtest_in_pool(frames_dir):
+    directory, frame = frames_dir
+    combos = backtest_sweep.grid({"buy_rsi": [30, 45], "sell_rsi": [70], "profit_target_pct": [2, 10]})
+    serial = backtest_sweep.run_sweep(directory, STOCKS, combos, SETTINGS, workers=1)
+    pooled = backtest_sweep.run_sweep(directory, STOCKS, combos, SETTINGS, workers=2)
+    pd.testing.assert_frame_equal(serial, pooled)
+
+    settings = {**SETTINGS, "risk_controls": {**SETTINGS["risk_controls"], "default_profit_target_pct": 2}}
+    direct = Backtester([dict(s, buy_rsi=45) for s in STOCKS], StaticSettings(settings)).run(frame).summary()
+    row = serial[(serial.buy_rsi == 45) & (serial.profit_target_pct == 2)].iloc[0]
+    assert row["net_pnl"] == direct["net_pnl"] and row["trades"] == direct["trades"]
+
+
+def test_per_symbol_ranking_and_results_file(frames_dir, tmp_path):
+    directory, _ = frames_dir
+    combos = backtest_sweep.grid({"buy_rsi": [20, 30], "sell_rsi": [60, 70]})
+    df = backtest_sweep.run_sweep(directory, STOCKS, combos, SETTINGS, per_symbol=True, workers=1,
+                                  use_risk=False)
+    assert len(df) == 8 and set(df.symbol) == {"TCS", "INFY"}
+
+    best = backtest_sweep.rank(df)
+    assert list(best.symbol).count("TCS") == 1 and len(best) == 2
+    assert best.net_pnl.iloc[0] == df.net_pnl.max()
+
+    path = backtest_sweep.write_results(df, str(tmp_path / "sweep"))
+    assert path.endswith(".npz")
+    loaded = backtest_sweep.read_results(path)
+    assert list(loaded.columns) == list(df.columns)
+    np.testing.assert_allclose(loaded.net_pnl, df.net_pnl)
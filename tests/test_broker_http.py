@@ -0,0 +1,41 @@
+import sys
+import os
+
+# Add project root
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from broker_http import BrokerHTTPClient, LatencyHistogram, endpoint_of
+
+
+def test_endpoint_names_strip_ids():
+    base = "https://api.mstock.trade/openapi/typea"
+    assert endpoint_of(f"{base}/instruments/historical/NSE/2885/15minute?from=x") == "instruments/historical"
+    assert endpoint_of(f"{base}/instruments/quote/ohlc") == "instruments/quote"
+    assert endpoint_of(f"{base}/orders") == "orders"
+
+
+def test_per_endpoint_timeouts():
+    client = BrokerHTTPClient()
+    assert client.timeout_for("instruments/historical") == (5, 30)
+    assert client.timeout_for("orders/regular") == (5, 10)
+    assert client.timeout_for("something/else") == (5, 15)
+
+
+def test_latency_histogram_percentiles():
+    hist = LatencyHistogram()
+    for ms in [3] * 90 + [300] * 10:
+        hist.record(ms)
+    hist.record(4000, error=True)
+    snap = hist.snapshot()
+    assert snap["count"] == 101 and snap["errors"] == 1
+    assert snap["p50_ms"] == 5
+    assert snap["p95_ms"] == 500
+    assert snap["buckets"]["5"] == 90
+
+
+def test_configure_sets_pool_and_default_headers():
+    client = BrokerHTTPClient(pool_size=7, retries=1)
+    adapter = client.session.get_adapter("https://api.mstock.trade")
+    assert adapter._pool_maxsize == 7
+    assert adapter.max_retries.connect == 1
+    assert "User-Agent" in client.session.headers
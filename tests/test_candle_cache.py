@@ -0,0 +1,133 @@
+import sys
+import os
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Add project root
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import kickstart
+from candle_warehouse import CandleWarehouse
+from engine_scheduler import EngineScheduler
+
+
+IDX = pd.date_range("2026-03-02 09:15", periods=600, freq="15min", tz="Asia/Kolkata")
+CLOSES = np.round(1500 + np.cumsum(np.random.default_rng(3).normal(0, 1, len(IDX))), 2)
+FULL = pd.DataFrame({"open": CLOSES, "high": CLOSES, "low": CLOSES, "close": CLOSES}, index=IDX)
+
+
+class FakeBroker:
+    """Serves FULL up to the bar forming at ``now``; records every request."""
+
+    def __init__(self):
+        self.now = IDX[450].to_pydatetime() + timedelta(minutes=3)
+        self.calls = []
+        self.drop_after = None  # simulate missing bars after this timestamp
+
+    def fetch(self, symbol, exchange, tf, token, days=None, since=None):
+        self.calls.append(since)
+        df = FULL[FULL.index <= self.now]
+        if since is not None:
+            df = df[df.index >= since]
+            if self.drop_after is not None:
+                df = df[df.index > self.drop_after]
+        return df.copy()
+
+
+@pytest.fixture
+def broker(monkeypatch):
+    fb = FakeBroker()
+    monkeypatch.setattr(kickstart, "fetch_historical_data", fb.fetch)
+    monkeypatch.setattr(kickstart, "now_ist", lambda: fb.now)
+    monkeypatch.setattr(kickstart, "CANDLE_WAREHOUSE", None)
+    kickstart.CANDLE_CACHE.clear()
+    kickstart.CANDLE_NEXT_FETCH.clear()
+    kickstart.RSI_STATE.clear()
+    for k in kickstart.CANDLE_CACHE_STATS:
+        kickstart.CANDLE_CACHE_STATS[k] = 0
+    yield fb
+    kickstart.CANDLE_CACHE.clear()
+    kickstart.CANDLE_NEXT_FETCH.clear()
+    kickstart.RSI_STATE.clear()
+
+
+def test_no_fetch_between_bar_closes(broker):
+    df = kickstart.get_cached_candles("ABC", "NSE", "15T", "1")
+    assert len(df) == kickstart.CANDLE_CACHE_MAX_BARS
+    for _ in range(5):
+        broker.now += timedelta(minutes=1)
+        kickstart.get_cached_candles("ABC", "NSE", "15T", "1")
+    assert broker.calls == [None]
+    assert kickstart.CANDLE_CACHE_STATS["hits"] == 5
+
+
+def test_partial_fetch_after_boundary_matches_full_fetch(broker):
+    kickstart.get_cached_candles("ABC", "NSE", "15T", "1")
+    broker.now += timedelta(minutes=15)
+    df = kickstart.get_cached_candles("ABC", "NSE", "15T", "1")
+    assert broker.calls[-1] == IDX[450].to_pydatetime()
+    assert kickstart.CANDLE_CACHE_STATS["partial_fetches"] == 1
+    expected = FULL[FULL.index <= broker.now].tail(kickstart.CANDLE_CACHE_MAX_BARS)
+    pd.testing.assert_frame_equal(df, expected, check_freq=False)
+
+
+def test_gap_triggers_reseed(broker):
+    kickstart.get_cached_candles("ABC", "NSE", "15T", "1")
+    broker.now += timedelta(minutes=60)
+    broker.drop_after = IDX[452]
+    kickstart.get_cached_candles("ABC", "NSE", "15T", "1")
+    assert kickstart.CANDLE_CACHE_STATS["gaps"] == 1
+    assert kickstart.CANDLE_CACHE_STATS["reseeds"] == 2
+    assert kickstart.CANDLE_CACHE[("ABC", "NSE", "15T")].index[-1] == IDX[454]
+
+
+def test_unpublished_bar_retries_shortly_in_session(broker, monkeypatch):
+    monkeypatch.setattr(kickstart, "MARKET_CALENDAR", type("Open", (), {"is_open": lambda self, ts: True})())
+    kickstart.get_cached_candles("ABC", "NSE", "15T", "1")
+    # Bar close + 3 s: the broker still ends at the bar that just closed
+    clock = IDX[451].to_pydatetime() + timedelta(seconds=3)
+    scheduler = EngineScheduler(lambda: ["15T"], lambda tf: 15, clock=lambda: clock)
+    scheduler.next_eval["15T"] = IDX[452].to_pydatetime() + timedelta(seconds=3)
+    monkeypatch.setattr(kickstart, "ENGINE_SCHEDULER", scheduler)
+    monkeypatch.setattr(kickstart, "now_ist", lambda: clock)
+    df = kickstart.get_cached_candles("ABC", "NSE", "15T", "1")
+    assert df.index[-1] == IDX[450]
+    key = ("ABC", "NSE", "15T")
+    assert kickstart.CANDLE_NEXT_FETCH[key] == clock + timedelta(seconds=kickstart.CANDLE_RETRY_SECONDS)
+    assert scheduler.next_eval["15T"] == kickstart.CANDLE_NEXT_FETCH[key]  # group re-evaluated at the retry
+
+    # Published by the retry: back to one fetch per bar
+    clock += timedelta(seconds=kickstart.CANDLE_RETRY_SECONDS)
+    broker.now = clock
+    df = kickstart.get_cached_candles("ABC", "NSE", "15T", "1")
+    assert df.index[-1] == IDX[451]
+    assert kickstart.CANDLE_NEXT_FETCH[key] == IDX[452].to_pydatetime()
+
+
+def test_lru_eviction(broker, monkeypatch):
+    monkeypatch.setattr(kickstart, "CANDLE_CACHE_MAX_KEYS", 2)
+    for sym in ("A", "B"):
+        kickstart.get_cached_candles(sym, "NSE", "15T", "1")
+    kickstart.get_cached_candles("A", "NSE", "15T", "1")  # touch A
+    kickstart.get_cached_candles("C", "NSE", "15T", "1")
+    assert list(kickstart.CANDLE_CACHE) == [("A", "NSE", "15T"), ("C", "NSE", "15T")]
+    assert kickstart.CANDLE_CACHE_STATS["evictions"] == 1
+
+
+def test_restart_seeds_from_warehouse(broker, monkeypatch, tmp_path):
+    monkeypatch.setattr(kickstart, "CANDLE_WAREHOUSE", CandleWarehouse(str(tmp_path)))
+    kickstart.get_cached_candles("ABC", "NSE", "15T", "1")
+    broker.now += timedelta(minutes=15)
+    kickstart.get_cached_candles("ABC", "NSE", "15T", "1")  # partial fetch is stored too
+
+    # Restart: empty memory cache, history comes from disk plus one partial fetch
+    kickstart.CANDLE_CACHE.clear()
+    kickstart.CANDLE_NEXT_FETCH.clear()
+    broker.now += timedelta(minutes=15)
+    df = kickstart.get_cached_candles("ABC", "NSE", "15T", "1")
+    assert broker.calls == [None, IDX[450].to_pydatetime(), IDX[451].to_pydatetime()]
+    expected = FULL[FULL.index <= broker.now].tail(kickstart.CANDLE_CACHE_MAX_BARS)
+    pd.testing.assert_frame_equal(df, expected, check_freq=False, check_names=False, check_index_type=False)
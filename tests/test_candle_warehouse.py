@@ -0,0 +1,137 @@
+import sys
+import os
+import threading
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+# Add project root
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from backtest_engine import MarketFrame
+from candle_warehouse import CandleWarehouse
+
+# Two months of 15-minute session bars
+IDX = pd.DatetimeIndex([ts for day in pd.bdate_range("2026-01-26", "2026-02-06")
+                        for ts in pd.date_range(day + pd.Timedelta("09:15:00"), periods=25, freq="15min")],
+                       tz="Asia/Kolkata")
+CLOSES = np.round(1000 + np.cumsum(np.random.default_rng(5).normal(0, 1, len(IDX))), 2)
+FULL = pd.DataFrame({"open": CLOSES, "high": CLOSES + 1, "low": CLOSES - 1, "close": CLOSES}, index=IDX)
+
+
+def test_ingest_dedups_appends_and_backfills(tmp_path):
+    wh = CandleWarehouse(str(tmp_path))
+    assert wh.ingest("ABC", "NSE", "15T", FULL.iloc[100:200]) == 100
+    assert wh.ingest("ABC", "NSE", "15T", FULL.iloc[150:250]) == 50  # 50 already stored
+    assert wh.stats["bars_updated"] == 50 and wh.stats["rewrites"] == 0
+    assert wh.ingest("ABC", "NSE", "15T", FULL.iloc[:120]) == 100  # back-fill
+    assert wh.months("ABC", "NSE", "15T") == ["2026-01", "2026-02"]
+
+    df = wh.read("ABC", "NSE", "15T")
+    pd.testing.assert_index_equal(df.index, IDX, check_names=False, exact=False)
+    np.testing.assert_array_equal(df["close"], CLOSES)
+    assert df["volume"].isna().all()
+
+
+def test_forming_bar_is_updated_in_place(tmp_path):
+    wh = CandleWarehouse(str(tmp_path))
+    wh.ingest("ABC", "NSE", "15T", FULL.iloc[:10])
+    final = FULL.iloc[9:11].copy()
+    final.iloc[0, final.columns.get_loc("close")] = 1.0
+    assert wh.ingest("ABC", "NSE", "15T", final) == 1
+    df = wh.read("ABC", "NSE", "15T")
+    assert len(df) == 11 and df["close"].iloc[9] == 1.0
+
+
+def test_range_reads(tmp_path):
+    wh = CandleWarehouse(str(tmp_path))
+    wh.ingest("ABC", "NSE", "15T", FULL)
+    ts, ohlcv = wh.read_arrays("ABC", "NSE", "15T", start=IDX[40], end=IDX[160])
+    assert len(ts) == 121 and ohlcv.shape == (121, 5)
+    np.testing.assert_array_equal(ohlcv[:, 3], CLOSES[40:161])
+    assert wh.read("ABC", "NSE", "15T", start=IDX[-1] + timedelta(days=1)).empty
+    assert wh.last_timestamp("ABC", "NSE", "15T") == IDX[-1]
+
+    # Backtests read it like a CandleStore (IST wall clock)
+    frame = MarketFrame.from_store(wh, [{"symbol": "ABC", "exchange": "NSE", "timeframe": "15T"}])
+    assert frame.timeline[0] == pd.Timestamp("2026-01-26 09:15")
+    np.testing.assert_array_equal(frame.close[0], CLOSES)
+
+
+def test_read_through_fetches_only_new_bars(tmp_path):
+    wh = CandleWarehouse(str(tmp_path))
+    calls = []
+    available = {"upto": 200}
+
+    def fetch(since):
+        calls.append(since)
+        df = FULL.iloc[:available["upto"]]
+        return df if since is None else df[df.index >= since]
+
+    start = IDX[0] - timedelta(days=2)
+    df = wh.read_through("ABC", "NSE", "15T", fetch, start=start, columns=("close",))
+    assert calls == [None] and len(df) == 200
+
+    available["upto"] = 230
+    df = wh.read_through("ABC", "NSE", "15T", fetch, start=start, columns=("close",))
+    assert calls[1] == IDX[199] and len(df) == 230
+    np.testing.assert_array_equal(df["close"], CLOSES[:230])
+
+    # Fresh enough: served from disk without a fetch
+    wh.read_through("ABC", "NSE", "15T", fetch, start=start, max_age=timedelta(days=36500))
+    assert len(calls) == 2
+
+    # Earlier start than the stored coverage: full fetch
+    wh.read_through("ABC", "NSE", "15T", fetch, start=start - timedelta(days=30))
+    assert calls[-1] is None
+
+
+def test_read_through_gap_refetches_and_keeps_stored_on_failure(tmp_path):
+    wh = CandleWarehouse(str(tmp_path))
+    wh.read_through("ABC", "NSE", "15T", lambda since: FULL.iloc[:100])
+    calls = []
+
+    def gapped(since):
+        calls.append(since)
+        return FULL.iloc[120:150] if since is not None else FULL.iloc[:150]
+
+    assert len(wh.read_through("ABC", "NSE", "15T", gapped)) == 150
+    assert calls == [IDX[99], None]
+    assert len(wh.read_through("ABC", "NSE", "15T", lambda since: None)) == 150
+
+
+def test_reader_never_sees_half_swapped_backfill(tmp_path, monkeypatch):
+    wh = CandleWarehouse(str(tmp_path))
+    wh.ingest("ABC", "NSE", "15T", FULL.iloc[50:100])
+    seen = []
+    real_replace = os.replace
+
+    def replace(src, dst):
+        real_replace(src, dst)
+        if dst.endswith(".ohlcv"):  # new values in place, timestamps not yet
+            reader = threading.Thread(target=lambda: seen.append(wh.read("ABC", "NSE", "15T")))
+            reader.start()
+            reader.join(0.2)
+            seen.append(reader)
+
+    monkeypatch.setattr("candle_warehouse.os.replace", replace)
+    wh.ingest("ABC", "NSE", "15T", FULL.iloc[:60])  # back-fill rewrites January
+    reader = seen[0]
+    reader.join(2)
+    df = seen[1]
+    assert len(df) == 100
+    np.testing.assert_array_equal(df["close"], CLOSES[:100])
+    pd.testing.assert_index_equal(df.index, IDX[:100], check_names=False, exact=False)
+
+
+def test_from_settings_honours_the_configured_dir(tmp_path):
+    class Settings:
+        def __init__(self, value):
+            self.value = value
+
+        def get(self, key, default=None):
+            return self.value if key == "app_settings.candle_warehouse_dir" else default
+
+    assert CandleWarehouse.from_settings(Settings(str(tmp_path))).root == str(tmp_path)
+    assert CandleWarehouse.from_settings(Settings("")) is None  # empty disables it
@@ -0,0 +1,113 @@
+import sys
+import os
+import threading
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Add project root
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import kickstart
+
+
+SYMBOLS = [(f"SYM{i}", "NSE") for i in range(12)]
+IDX = pd.date_range("2026-03-02 09:15", periods=300, freq="15min", tz="Asia/Kolkata")
+NOW = IDX[-1].to_pydatetime() + timedelta(minutes=2)
+
+
+class FakeSettings:
+    def __init__(self, **overrides):
+        self.values = {"app_settings.rsi_stabilization": True, "capital.per_trade_pct": 100.0}
+        self.values.update(overrides)
+
+    def get(self, key, default=None):
+        return self.values.get(key, default)
+
+
+class FakeResponse:
+    status_code = 200
+    text = ""
+
+    def __init__(self, payload):
+        self._payload = payload
+
+    def json(self):
+        return self._payload
+
+
+def fake_history(symbol, exchange, tf, token, days=None, since=None):
+    seed = int(symbol[3:])
+    closes = 1000 + np.cumsum(np.random.default_rng(seed).normal(0, 2, len(IDX)))
+    df = pd.DataFrame({"open": closes, "high": closes, "low": closes, "close": closes}, index=IDX)
+    return df[df.index >= since] if since is not None else df
+
+
+def fake_quotes(method, url, **kwargs):
+    data = {}
+    for _, inst in kwargs.get("params", []):
+        sym = inst.split(":")[1]
+        data[inst] = {"last_price": 1000.0 + int(sym[3:]), "instrument_token": sym}
+    return FakeResponse({"status": "success", "data": data})
+
+
+def run_one_cycle(monkeypatch, concurrent):
+    orders = []
+    threads = set()
+
+    def record_history(*args, **kwargs):
+        threads.add(threading.current_thread().name)
+        return fake_history(*args, **kwargs)
+
+    monkeypatch.setattr(kickstart, "settings", FakeSettings(**{"app_settings.concurrent_cycle": concurrent,
+                                                               "app_settings.cycle_max_workers": 4}))
+    monkeypatch.setattr(kickstart, "state_mgr", None)
+    monkeypatch.setattr(kickstart, "risk_mgr", None)
+    monkeypatch.setattr(kickstart, "notifier", None)
+    monkeypatch.setattr(kickstart, "STOP_REQUESTED", False)
+    monkeypatch.setitem(kickstart.OFFLINE, "active", False)
+    monkeypatch.setattr(kickstart, "is_market_open_now_ist", lambda: True)
+    monkeypatch.setattr(kickstart, "now_ist", lambda: NOW)
+    monkeypatch.setattr(kickstart, "safe_request", fake_quotes)
+    monkeypatch.setattr(kickstart, "fetch_historical_data", record_history)
+    monkeypatch.setattr(kickstart, "CANDLE_WAREHOUSE", None)
+    monkeypatch.setattr(kickstart, "safe_get_live_positions_merged", lambda: {})
+    monkeypatch.setattr(kickstart, "save_state_snapshot", lambda: None)
+    monkeypatch.setattr(kickstart, "check_existing_orders", lambda *a, **k: False)
+    monkeypatch.setattr(kickstart, "check_capital_safety", lambda amount: (True, 1e9))
+    monkeypatch.setattr(kickstart, "safe_place_order_when_open",
+                        lambda symbol, ex, qty, side, token, price, rsi=None, **k: orders.append((symbol, side, qty, rsi)))
+    monkeypatch.setattr(kickstart, "SYMBOLS_TO_TRACK", list(SYMBOLS))
+    monkeypatch.setattr(kickstart, "config_dict", {
+        key: {"Timeframe": "15T", "RSI_Buy_Threshold": 50, "RSI_Sell_Threshold": 70, "Quantity": 1}
+        for key in SYMBOLS
+    })
+    kickstart.CANDLE_CACHE.clear()
+    kickstart.CANDLE_NEXT_FETCH.clear()
+    kickstart.RSI_STATE.clear()
+    kickstart.portfolio_state.clear()
+
+    kickstart.run_cycle()
+    return orders, threads, dict(kickstart.CYCLE_TIMINGS)
+
+
+def test_concurrent_cycle_matches_sequential(monkeypatch):
+    sequential, seq_threads, _ = run_one_cycle(monkeypatch, concurrent=False)
+    concurrent, con_threads, timings = run_one_cycle(monkeypatch, concurrent=True)
+
+    assert sequential  # some symbols must trade for the comparison to mean anything
+    assert concurrent == sequential
+    assert all(name.startswith("cycle-fetch") for name in con_threads)
+    assert seq_threads == {threading.current_thread().name}
+    assert {"quotes", "positions", "prefetch", "symbols", "managed", "total"} <= set(timings)
+
+
+def test_symbol_lock_skips_reentrant_evaluation(monkeypatch):
+    lock = kickstart.get_symbol_lock("LOCKED")
+    assert kickstart.get_symbol_lock("LOCKED") is lock
+    with lock:
+        # Already held: evaluation is skipped instead of running twice
+        assert kickstart.process_market_data("LOCKED", "NSE", {"last_price": 1.0}, "15T", "1") is None
+    assert not lock.locked()
@@ -0,0 +1,110 @@
+import sys
+import os
+from datetime import datetime, timedelta
+
+# Add project root
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import kickstart
+from engine_scheduler import EngineScheduler, Tick, next_bar_close, next_evaluation
+from tests.test_concurrent_cycle import NOW, SYMBOLS, FakeSettings, fake_history, fake_quotes
+
+DAY = datetime(2026, 3, 2)
+
+
+def at(hh, mm, ss=0, days=0):
+    return DAY.replace(hour=hh, minute=mm, second=ss) + timedelta(days=days)
+
+
+def test_next_bar_close_aligns_to_session():
+    assert next_bar_close(at(9, 15), 15) == at(9, 30)
+    assert next_bar_close(at(9, 29, 59), 15) == at(9, 30)
+    assert next_bar_close(at(10, 0), 60) == at(10, 15)
+    assert next_bar_close(at(15, 20), 60) == at(15, 30)  # last bar cut at the close
+    assert next_bar_close(at(8, 0), 5) == at(9, 20)
+    assert next_bar_close(at(16, 0), 15) == at(9, 30, days=1)
+    assert next_bar_close(at(11, 0), 1440) == at(15, 30)  # bar close; evaluated earlier (next_evaluation)
+    assert next_bar_close(at(15, 30), 1440) == at(15, 30, days=1)
+
+
+def test_session_end_bars_are_evaluated_before_the_close():
+    settle, lead = timedelta(seconds=3), timedelta(minutes=5)
+    assert next_evaluation(at(11, 0), 1440, settle, lead) == at(15, 25)
+    assert next_evaluation(at(15, 25), 1440, settle, lead) == at(15, 25, days=1)
+    assert next_evaluation(at(8, 0), 1440, settle, lead) == at(15, 25)
+    assert next_evaluation(at(14, 30), 60, settle, lead) == at(15, 15, 3)
+    assert next_evaluation(at(15, 15, 3), 60, settle, lead) == at(15, 25)  # last (cut) bar, in session
+    assert next_evaluation(at(15, 25), 60, settle, lead) == at(10, 15, 3, days=1)
+    assert next_evaluation(at(15, 25, 3), 5, settle, lead) == at(9, 20, 3, days=1)  # 15:25 already passed
+
+
+def test_due_wakes_each_group_at_its_bar_close():
+    clock = {"now": at(9, 31)}
+    minutes = {"15T": 15, "1H": 60}
+    sched = EngineScheduler(lambda: minutes, minutes.get, settle_seconds=3, risk_interval_seconds=10,
+                            clock=lambda: clock["now"])
+
+    assert sched.due() == Tick(frozenset({"15T", "1H"}), True)  # first sight: evaluate at once
+    assert sched.next_wakes() == {"15T": at(9, 45, 3).isoformat(), "1H": at(10, 15, 3).isoformat(),
+                                  "risk": at(9, 31, 10).isoformat()}
+    assert not sched.due(at(9, 31, 5))
+    assert sched.due(at(9, 31, 10)) == Tick(frozenset(), True)  # risk-only tick
+    assert sched.next_wake() == at(9, 31, 20)
+    assert sched.due(at(9, 45, 3)) == Tick(frozenset({"15T"}), True)
+    assert sched.due(at(10, 15, 3)).timeframes == {"15T", "1H"}
+    assert sched.stats == {"ticks": 4, "evaluations": 5, "risk_checks": 4}
+
+    del minutes["1H"]  # group removed from the config
+    sched.due(at(10, 16))
+    assert "1H" not in sched.next_wakes()
+
+
+def test_run_stops_and_reports_errors(monkeypatch):
+    monkeypatch.setattr("engine_scheduler.time.sleep", lambda s: None)
+    sched = EngineScheduler(lambda: ["15T"], lambda tf: 15, clock=lambda: at(10, 0))
+    ticks, errors = [], []
+
+    def cycle(tick):
+        ticks.append(tick)
+        raise RuntimeError("boom")
+
+    sched.run(cycle, lambda: len(errors) >= 1, on_error=errors.append)
+    assert ticks == [Tick(frozenset({"15T"}), True)]
+    assert str(errors[0]) == "boom"
+
+
+def test_run_cycle_only_evaluates_due_timeframes(monkeypatch):
+    fetched = []
+
+    def record_history(symbol, *args, **kwargs):
+        fetched.append(symbol)
+        return fake_history(symbol, *args, **kwargs)
+
+    monkeypatch.setattr(kickstart, "settings", FakeSettings())
+    monkeypatch.setattr(kickstart, "state_mgr", None)
+    monkeypatch.setattr(kickstart, "risk_mgr", None)
+    monkeypatch.setattr(kickstart, "notifier", None)
+    monkeypatch.setattr(kickstart, "STOP_REQUESTED", False)
+    monkeypatch.setitem(kickstart.OFFLINE, "active", False)
+    monkeypatch.setattr(kickstart, "is_market_open_now_ist", lambda: True)
+    monkeypatch.setattr(kickstart, "now_ist", lambda: NOW)
+    monkeypatch.setattr(kickstart, "safe_request", fake_quotes)
+    monkeypatch.setattr(kickstart, "fetch_historical_data", record_history)
+    monkeypatch.setattr(kickstart, "CANDLE_WAREHOUSE", None)
+    monkeypatch.setattr(kickstart, "safe_get_live_positions_merged", lambda: {})
+    monkeypatch.setattr(kickstart, "save_state_snapshot", lambda: None)
+    monkeypatch.setattr(kickstart, "safe_place_order_when_open", lambda *a, **k: None)
+    monkeypatch.setattr(kickstart, "SYMBOLS_TO_TRACK", list(SYMBOLS[:4]))
+    monkeypatch.setattr(kickstart, "config_dict", {
+        key: {"Timeframe": "15T" if i % 2 else "1H", "RSI_Buy_Threshold": 0, "RSI_Sell_Threshold": 100,
+              "Quantity": 1}
+        for i, key in enumerate(SYMBOLS[:4])
+    })
+    kickstart.CANDLE_CACHE.clear()
+    kickstart.CANDLE_NEXT_FETCH.clear()
+
+    assert kickstart.engine_timeframes() == {"15T", "1H"}
+    kickstart.run_cycle(timeframes=frozenset(), risk=True)
+    assert fetched == []
+    kickstart.run_cycle(timeframes=frozenset({"1H"}), risk=False)
+    assert sorted(fetched) == ["SYM0", "SYM2"]
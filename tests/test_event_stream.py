@@ -0,0 +1,111 @@
+import sys
+import os
+import asyncio
+import json
+import threading
+
+# Add project root
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import kickstart
+from backend.event_stream import EventBus, format_sse, sse_events
+from database.trades_db import TradesDatabase
+
+
+def parse(frame):
+    fields = dict(line.split(": ", 1) for line in frame.strip().splitlines())
+    return fields["event"], int(fields["id"]), json.loads(fields["data"])["data"]
+
+
+def test_since_resumes_and_flags_gap():
+    bus = EventBus(backlog=3)
+    for i in range(5):
+        bus.publish("log", f"line {i}")
+    events, gap = bus.since(3)
+    assert [e["data"] for e in events] == ["line 3", "line 4"] and not gap
+    assert bus.since(5) == ([], False)
+    events, gap = bus.since(1)  # seq 2 already evicted
+    assert gap and [e["seq"] for e in events] == [3, 4, 5]
+
+
+def test_publish_from_thread_wakes_async_waiter():
+    bus = EventBus()
+
+    async def main():
+        waiter = asyncio.ensure_future(bus.wait(0, timeout=2))
+        await asyncio.sleep(0.01)
+        threading.Thread(target=bus.publish, args=("status", {"status": "RUNNING"})).start()
+        assert await waiter
+        assert not await bus.wait(bus.last_seq, timeout=0.01)
+
+    asyncio.run(main())
+
+
+def test_sse_snapshot_then_live_events_and_reset():
+    bus = EventBus(backlog=2)
+    bus.publish("log", "old")
+
+    async def collect(since, count, publish=()):
+        frames = []
+        gen = sse_events(bus, since, lambda: {"status": "RUNNING"}, lambda: asyncio.sleep(0, False), keepalive=0.01)
+        for item in publish:
+            bus.publish(*item)
+        async for frame in gen:
+            frames.append(frame)
+            if len(frames) == count:
+                break
+        await gen.aclose()
+        return frames
+
+    # New client: snapshot at the current seq, then what happens next
+    frames = asyncio.run(collect(None, 2))
+    assert parse(frames[0]) == ("snapshot", 1, {"status": "RUNNING"})
+    assert frames[1] == ": keepalive\n\n"
+    frames = asyncio.run(collect(1, 2, publish=[("log", "a"), ("cycle", {})]))
+    assert [parse(f)[:2] for f in frames] == [("log", 2), ("cycle", 3)]
+
+    # Fell behind the backlog -> reset snapshot instead of silently skipping
+    frames = asyncio.run(collect(0, 1, publish=[("log", "b"), ("log", "c")]))
+    assert parse(frames[0])[0] == "reset" and bus.stats["resets"] == 1
+    assert format_sse({"seq": 9, "type": "log", "ts": 0, "data": "x"}).startswith("id: 9\nevent: log\n")
+
+
+def test_bot_manager_publishes_logs_status_and_position_deltas(tmp_path, monkeypatch):
+    # Importing BotManager hooks it into the kickstart callback; restore it afterwards
+    monkeypatch.setitem(kickstart._LOG_STATE, "callback", kickstart._LOG_STATE["callback"])
+    from backend.bot_manager import bot_manager
+
+    bus = EventBus()
+    trades = TradesDatabase(str(tmp_path / "trades.db"))
+    monkeypatch.setattr(bot_manager, "event_bus", bus)
+    monkeypatch.setattr(bot_manager, "echo_console", False)
+    monkeypatch.setattr(bot_manager, "capture_path", str(tmp_path / "capture.txt"))
+    monkeypatch.setattr(bot_manager, "_positions", {})
+    monkeypatch.setattr(bot_manager, "_positions_version", None)
+    monkeypatch.setattr(kickstart, "db", trades)
+    monkeypatch.setattr(bot_manager, "status", bot_manager.status)
+    import state_manager  # keep the repo's bot_state.json out of it
+    monkeypatch.setattr(state_manager, "state", state_manager.StateManager(str(tmp_path / "bot_state.json"),
+                                                                           flush_interval_ms=0))
+
+    bot_manager.log_capture("hello stream")
+    bot_manager.log_pipeline.flush(timeout=2.0)
+    bot_manager._set_status("RUNNING")
+    trades.insert_trade(symbol="AAA", exchange="NSE", action="BUY", quantity=2, price=100.0,
+                        gross_amount=200.0, total_fees=0.0, net_amount=200.0)
+    bot_manager._publish_cycle()
+    bot_manager._publish_cycle()  # unchanged trades -> no second positions event
+    trades.insert_trade(symbol="AAA", exchange="NSE", action="SELL", quantity=2, price=110.0,
+                        gross_amount=220.0, total_fees=0.0, net_amount=220.0)
+    bot_manager._publish_cycle()
+
+    events, _ = bus.since(0)
+    types = [e["type"] for e in events]
+    assert types == ["log", "status", "cycle", "positions", "cycle", "cycle", "positions"]
+    assert events[0]["data"].endswith("hello stream")
+    assert events[1]["data"]["status"] == "RUNNING"
+    assert events[1]["data"]["counters"] == {"attempts": 0, "success": 0, "failed": 0}
+    assert not os.path.exists(tmp_path / "bot_state.json")  # status payload does no state-file I/O
+    assert events[3]["data"]["changed"]["AAA:NSE"]["net_quantity"] == 2
+    assert events[6]["data"] == {"changed": {}, "removed": ["AAA:NSE"]}
+    trades.close()
@@ -0,0 +1,92 @@
+import sys
+import os
+from datetime import date
+
+# Add project root
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import kickstart
+from instrument_index import InstrumentIndex, parse_scrip_master
+
+MASTER = (
+    "\ufeffinstrument_token,exchange_token,tradingsymbol,name,last_price,expiry,strike,tick_size,lot_size,"
+    "instrument_type,segment,exchange\n"
+    "2885,11536,RELIANCE,RELIANCE INDUSTRIES,0,,0,0.05,1,EQ,NSE,NSE\n"
+    "500325,1953,RELIANCE,RELIANCE INDUSTRIES,0,,0,0.05,1,EQ,BSE,BSE\n"
+    "11536,3045,TCS-EQ,TATA CONSULTANCY,0,,0,0.05,1,EQ,NSE,NSE\n"
+    ",,BROKEN,,,,,,,,,NSE\n"
+)
+
+
+def test_parse_and_lookup_after_reload(tmp_path):
+    rows = parse_scrip_master(MASTER)
+    assert {(r[0], r[1]) for r in rows} == {("NSE", "RELIANCE"), ("BSE", "RELIANCE"), ("NSE", "TCS-EQ"),
+                                           ("NSE", "TCS")}
+    path = str(tmp_path / "instruments.db")
+    assert InstrumentIndex(path).import_rows(rows, date(2026, 3, 2)) == 4
+
+    index = InstrumentIndex(path)  # restart: served from disk
+    assert index.load() == 4 and index.refreshed_on == date(2026, 3, 2)
+    assert index.token("reliance", "nse") == "2885" and index.token("RELIANCE", "BSE") == "500325"
+    assert index.token("TCS", "NSE") == "11536" and index.token("INFY", "NSE") is None
+
+
+def test_refresh_once_per_day_and_keeps_index_on_failure(tmp_path):
+    index = InstrumentIndex(str(tmp_path / "instruments.db"))
+    downloads = []
+
+    def download():
+        downloads.append(1)
+        return MASTER
+
+    assert index.refresh(download, date(2026, 3, 2))
+    assert not index.refresh(download, date(2026, 3, 2))  # same day: no download
+    assert len(downloads) == 1
+
+    assert not index.refresh(lambda: None, date(2026, 3, 3))
+    assert index.token("RELIANCE", "NSE") == "2885" and index.is_stale(date(2026, 3, 3))
+    assert not index.refresh(download, date(2026, 3, 3))  # failed attempt: retry later
+    assert index.refresh(download, date(2026, 3, 3), retry_seconds=0)
+
+
+def test_tokens_resolve_without_quote_call(tmp_path, monkeypatch):
+    index = InstrumentIndex(str(tmp_path / "instruments.db"))
+    index.import_rows(parse_scrip_master(MASTER), date(2026, 3, 2))
+    monkeypatch.setattr(kickstart, "INSTRUMENT_INDEX", index)
+    monkeypatch.setattr(kickstart, "config_dict", {("TCS", "NSE"): {"instrument_token": None}})
+
+    def no_network(*args, **kwargs):
+        raise AssertionError("quote API called")
+
+    monkeypatch.setattr(kickstart, "safe_request", no_network)
+    assert kickstart.resolve_instrument_token("RELIANCE", "BSE") == "500325"
+    assert kickstart.instrument_token_for("RELIANCE", "NSE", market_data=None) == "2885"
+    assert kickstart.instrument_token_for("INFY", "NSE", {"instrument_token": "1594"}) == "1594"
+    kickstart.fill_config_tokens()
+    assert kickstart.config_dict[("TCS", "NSE")]["instrument_token"] == "11536"
+
+
+def test_scheduler_ticks_start_no_idle_refresh_threads(tmp_path, monkeypatch):
+    index = InstrumentIndex(str(tmp_path / "instruments.db"))
+    monkeypatch.setattr(kickstart, "INSTRUMENT_INDEX", index)
+    monkeypatch.setattr(kickstart, "ACCESS_TOKEN", "token")
+    monkeypatch.setitem(kickstart.OFFLINE, "active", False)
+    monkeypatch.setattr(kickstart, "download_scrip_master", lambda: None)  # failing download
+    started = []
+    real_thread = kickstart.threading.Thread
+    monkeypatch.setattr(kickstart.threading, "Thread",
+                        lambda *a, **k: started.append(k.get("name")) or real_thread(*a, **k))
+
+    assert index.should_refresh(date.today())
+    for _ in range(5):  # risk ticks
+        kickstart.refresh_instrument_index()
+        for t in kickstart.threading.enumerate():
+            if t.name == "instrument-index":
+                t.join(2)
+    assert started == ["instrument-index"]  # one attempt, then the retry window
+    assert not index.should_refresh(date.today())
+
+    monkeypatch.setattr(kickstart, "ACCESS_TOKEN", None)  # before login: nothing attempted
+    index.last_attempt = None
+    kickstart.refresh_instrument_index()
+    assert started == ["instrument-index"] and index.should_refresh(date.today())
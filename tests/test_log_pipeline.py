@@ -0,0 +1,103 @@
+import sys
+import os
+import threading
+import time
+
+# Add project root
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import kickstart
+from log_pipeline import LogPipeline
+from log_store import LogStore
+
+
+def test_lines_reach_sinks_in_order_and_batched():
+    batches = []
+    pipeline = LogPipeline(batch_size=64, flush_interval=0.01)
+    pipeline.add_sink("collect", batches.append)
+    pipeline.start()
+    try:
+        for i in range(300):
+            assert pipeline.submit(f"line {i}\n")
+        assert pipeline.flush(timeout=5)
+    finally:
+        pipeline.stop()
+
+    lines = [line for batch in batches for line in batch]
+    assert [line.split("] ", 1)[1] for line in lines] == [f"line {i}" for i in range(300)]
+    assert all(len(batch) <= 64 for batch in batches)
+    assert pipeline.snapshot()["written"] == 300
+
+
+def test_slow_sink_drops_instead_of_blocking_producer():
+    release = threading.Event()
+    pipeline = LogPipeline(capacity=10, batch_size=1, flush_interval=0.01)
+    pipeline.add_sink("stalled", lambda lines: release.wait(5))
+    pipeline.start()
+    try:
+        start = time.perf_counter()
+        accepted = sum(pipeline.submit(f"msg {i}") for i in range(100))
+        assert time.perf_counter() - start < 0.5
+        snap = pipeline.snapshot()
+        assert snap["dropped"] == 100 - accepted
+        assert accepted <= 11  # ring capacity plus the batch in the sink
+    finally:
+        release.set()
+        pipeline.stop()
+    assert pipeline.snapshot()["written"] == accepted
+
+
+def test_failing_sink_is_counted_and_others_still_run():
+    seen = []
+
+    def broken(lines):
+        raise OSError("disk full")
+
+    pipeline = LogPipeline(flush_interval=0.01)
+    pipeline.add_sink("broken", broken)
+    pipeline.add_sink("ok", seen.extend)
+    pipeline.start()
+    try:
+        pipeline.submit("hello")
+        pipeline.submit("world")
+        assert pipeline.flush(timeout=5)
+    finally:
+        pipeline.stop()
+    sinks = pipeline.snapshot()["sinks"]
+    assert sinks["broken"]["errors"] >= 1 and sinks["broken"]["last_error"] == "disk full"
+    assert len(seen) == 2
+
+
+def test_log_ok_feeds_pipeline(monkeypatch):
+    seen = []
+    pipeline = LogPipeline(flush_interval=0.01)
+    pipeline.add_sink("collect", seen.extend)
+    pipeline.start()
+    monkeypatch.setitem(kickstart._LOG_STATE, "callback", pipeline.submit)
+    try:
+        kickstart.log_ok("🔔 pipeline check")
+        assert pipeline.flush(timeout=5)
+    finally:
+        pipeline.stop()
+    assert seen and seen[-1].endswith("🔔 pipeline check")
+
+
+def test_bot_manager_fans_out_and_counts_evictions(monkeypatch, tmp_path):
+    # Importing BotManager hooks the kickstart callback; restore it afterwards
+    monkeypatch.setitem(kickstart._LOG_STATE, "callback", kickstart._LOG_STATE["callback"])
+    from backend.bot_manager import bot_manager
+
+    capture = tmp_path / "capture.txt"
+    monkeypatch.setattr(bot_manager, "echo_console", False)
+    monkeypatch.setattr(bot_manager, "capture_path", str(capture))
+    monkeypatch.setattr(bot_manager, "log_store", LogStore(capacity=200))
+    before = bot_manager.get_log_stats()["sinks"]["memory"]["dropped"]
+
+    for i in range(250):
+        bot_manager.log_capture(f"entry {i}")
+    assert bot_manager.log_pipeline.flush(timeout=5)
+
+    assert capture.read_text(encoding="utf-8").count("\n") == 250
+    assert bot_manager.get_logs(5)[-1].endswith("entry 249")
+    assert len(bot_manager.log_store) == 200
+    assert bot_manager.get_log_stats()["sinks"]["memory"]["dropped"] - before == 50
@@ -0,0 +1,77 @@
+import sys
+import os
+
+import pytest
+
+# Add project root
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import kickstart
+from log_store import LogStore, classify
+
+
+@pytest.mark.parametrize("line, expected", [
+    ("[09:15:01] 📊 TCS RSI: 28.10 | Buy<30", ("INFO", "TCS")),
+    ("[09:15:01] ❌ Missing token for NSE:INFY — boom", ("ERROR", "INFY")),
+    ("⚠️ Skipping M&M: Missing instrument", ("WARNING", "M&M")),
+    ("➡️ checking HDFCBANK...", ("INFO", "HDFCBANK")),
+    ("💓 Bot Loop Heartbeat", ("INFO", None)),
+    ("❌ CRITICAL ERROR in Bot Loop: boom", ("ERROR", None)),
+])
+def test_classify_kickstart_lines(line, expected):
+    assert classify(line) == expected
+
+
+def test_ring_evicts_oldest_and_keeps_ids_monotonic():
+    store = LogStore(capacity=3)
+    assert store.extend(f"line {i}" for i in range(5)) == 2
+    assert (store.first_id, store.last_id, len(store)) == (3, 5, 3)
+    assert store.get(2) is None and store.get(5)["message"] == "line 4"
+    assert [r["id"] for r in store.query(limit=10)] == [3, 4, 5]
+    assert [r["id"] for r in store.query(limit=2)] == [4, 5]
+
+
+def test_since_cursor_pages_forward():
+    store = LogStore(capacity=100)
+    store.extend(f"line {i}" for i in range(10))
+    page = store.query(since=0, limit=4)
+    assert [r["id"] for r in page] == [1, 2, 3, 4]
+    page = store.query(since=page[-1]["id"], limit=4)
+    assert [r["id"] for r in page] == [5, 6, 7, 8]
+    assert store.query(since=10) == []
+
+
+def test_filters_use_indexes_and_survive_eviction():
+    store = LogStore(capacity=4)
+    store.append("📊 TCS RSI: 25")          # 1
+    store.append("❌ Order failed for NSE:TCS")  # 2
+    store.append("❌ Order failed for NSE:INFY")  # 3
+    store.append("💓 Bot Loop Heartbeat")  # 4
+    assert [r["id"] for r in store.query(symbol="tcs")] == [1, 2]
+    assert [r["id"] for r in store.query(level="error")] == [2, 3]
+    assert [r["id"] for r in store.query(level="ERROR", symbol="TCS")] == [2]
+    assert store.query(symbol="SBIN") == []
+
+    store.append("💓 Bot Loop Heartbeat")  # 5 evicts 1
+    store.append("💓 Bot Loop Heartbeat")  # 6 evicts 2
+    assert store.query(symbol="TCS") == [] and "TCS" not in store._by_symbol
+    assert [r["id"] for r in store.query(level="ERROR", since=0)] == [3]
+    assert [r["id"] for r in store.query(level="INFO", since=4)] == [5, 6]
+
+
+def test_bot_manager_query_logs(monkeypatch, tmp_path):
+    # Importing BotManager hooks the kickstart callback; restore it afterwards
+    monkeypatch.setitem(kickstart._LOG_STATE, "callback", kickstart._LOG_STATE["callback"])
+    from backend.bot_manager import bot_manager
+
+    monkeypatch.setattr(bot_manager, "echo_console", False)
+    monkeypatch.setattr(bot_manager, "capture_path", str(tmp_path / "capture.txt"))
+    monkeypatch.setattr(bot_manager, "log_store", LogStore(capacity=50))
+    for line in ("📊 TCS RSI: 25", "❌ Order failed for NSE:TCS", "💓 Bot Loop Heartbeat"):
+        bot_manager.log_capture(line)
+    assert bot_manager.log_pipeline.flush(timeout=5)
+
+    records = bot_manager.query_logs(symbol="TCS", level="ERROR")
+    assert len(records) == 1 and records[0]["message"].endswith("Order failed for NSE:TCS")
+    assert [r["id"] for r in bot_manager.query_logs(since=1)] == [2, 3]
+    assert bot_manager.get_logs(1)[0].endswith("Heartbeat")
@@ -0,0 +1,117 @@
+import sys
+import os
+import json
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+# Add project root
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import kickstart
+from engine_scheduler import EngineScheduler, Tick, next_bar_close
+from market_calendar import IST, MarketCalendar
+
+TABLE = {
+    "regular_session": {"open": "09:15", "close": "15:30"},
+    "holidays": {"2026-11-10": "Diwali Balipratipada", "2026-12-25": "Christmas"},
+    "special_sessions": {"2026-11-08": {"open": "18:00", "close": "19:00", "name": "Muhurat Trading"}},
+}
+
+
+def ist(*args):
+    return IST.localize(datetime(*args))
+
+
+def load(tmp_path):
+    path = tmp_path / "market_calendar.json"
+    path.write_text(json.dumps(TABLE))
+    return MarketCalendar.load(str(path))
+
+
+def test_holidays_and_special_sessions(tmp_path):
+    cal = load(tmp_path)
+    assert cal.is_open(ist(2026, 11, 9, 9, 15)) and cal.is_open(ist(2026, 11, 9, 15, 30))
+    assert not cal.is_open(ist(2026, 11, 9, 15, 31)) and not cal.is_open(ist(2026, 11, 9, 9, 14))
+    assert not cal.is_trading_day(date(2026, 11, 10)) and not cal.is_open(ist(2026, 11, 10, 11, 0))
+    assert not cal.is_trading_day(date(2026, 11, 7))  # Saturday
+    # Sunday Muhurat session trades only in its window
+    assert cal.is_open(ist(2026, 11, 8, 18, 30)) and not cal.is_open(ist(2026, 11, 8, 11, 0))
+    assert cal.session(date(2026, 11, 8))[0] == ist(2026, 11, 8, 18, 0)
+    assert cal.is_open(ist(2026, 11, 9, 12, 0).timestamp())
+
+    assert cal.next_open(ist(2026, 11, 6, 16, 0)) == ist(2026, 11, 8, 18, 0)
+    assert cal.next_open(ist(2026, 11, 9, 16, 0)) == ist(2026, 11, 11, 9, 15)  # skips the holiday
+    assert cal.next_open(ist(2026, 12, 31, 16, 0)) == ist(2027, 1, 1, 9, 15)  # next year built on demand
+    assert cal.next_open(datetime(2026, 12, 24, 20, 0)) == ist(2026, 12, 28, 9, 15)  # naive = IST
+
+
+def test_sleep_until_next_session_waits_once(tmp_path):
+    cal = load(tmp_path)
+    assert cal.sleep_until_next_session(now=ist(2026, 11, 9, 10, 0))  # already open: no wait
+
+    waits = []
+
+    class Stop(threading.Event):
+        def wait(self, timeout=None):
+            waits.append(timeout)
+            return True
+
+    assert not cal.sleep_until_next_session(Stop(), now=ist(2026, 11, 9, 15, 45))
+    assert waits == [ist(2026, 11, 11, 9, 15).timestamp() - ist(2026, 11, 9, 15, 45).timestamp()]
+
+
+def test_bar_closes_follow_calendar_sessions(tmp_path):
+    cal = load(tmp_path)
+    # Friday after the close: the weekend's only session is the Sunday Muhurat hour
+    assert next_bar_close(ist(2026, 11, 6, 16, 0), 15, cal.session) == ist(2026, 11, 8, 18, 15)
+    assert next_bar_close(ist(2026, 11, 8, 18, 20), 15, cal.session) == ist(2026, 11, 8, 18, 30)
+    assert next_bar_close(ist(2026, 11, 8, 18, 50), 15, cal.session) == ist(2026, 11, 8, 19, 0)  # cut at its close
+    assert next_bar_close(ist(2026, 11, 8, 18, 20), 1440, cal.session) == ist(2026, 11, 8, 19, 0)
+    assert next_bar_close(ist(2026, 11, 9, 15, 30), 60, cal.session) == ist(2026, 11, 11, 10, 15)  # holiday skipped
+
+    clock = {"now": ist(2026, 11, 8, 18, 0, 30)}
+    sched = EngineScheduler(lambda: ["15T"], lambda tf: 15, settle_seconds=3, risk_interval_seconds=10,
+                            clock=lambda: clock["now"], session=cal.session)
+    assert sched.due() == Tick(frozenset({"15T"}), True)
+    ticks = []
+    while clock["now"] < ist(2026, 11, 8, 19, 5):
+        clock["now"] += timedelta(seconds=10)
+        tick = sched.due()
+        if tick.timeframes:
+            ticks.append(clock["now"].strftime("%H:%M"))
+    # Every bar of the special session gets a strategy tick (the last one before the close),
+    # then the next one is Monday's
+    assert ticks == ["18:15", "18:30", "18:45", "18:55"]
+    assert sched.next_eval["15T"] == ist(2026, 11, 9, 9, 30, 3)
+
+
+def test_daily_group_ticks_inside_every_session():
+    cal = MarketCalendar.load(os.path.join(os.path.dirname(__file__), "..", "market_calendar.json"))
+    clock = {"now": ist(2026, 11, 6, 9, 20)}  # Friday; Tuesday 10 Nov is a holiday
+    sched = EngineScheduler(lambda: ["1D"], lambda tf: 1440, risk_interval_seconds=3600, clock=lambda: clock["now"],
+                            session=cal.session)
+    ticks = []
+    while clock["now"] < ist(2026, 11, 14):
+        if sched.due().timeframes:
+            ticks.append(clock["now"])
+        clock["now"] = sched.next_wake()
+    assert all(cal.is_open(t) for t in ticks)
+    assert [t.strftime("%a %H:%M") for t in ticks] == [
+        "Fri 09:20", "Fri 15:25", "Mon 15:25", "Wed 15:25", "Thu 15:25", "Fri 15:25"]
+
+
+def test_kickstart_market_hours_follow_calendar(monkeypatch, tmp_path):
+    monkeypatch.setattr(kickstart, "settings", None)  # no paper-mode 24/7 override
+    monkeypatch.setattr(kickstart, "MARKET_CALENDAR", load(tmp_path))
+    monkeypatch.setattr(kickstart, "now_ist", lambda: ist(2026, 12, 25, 11, 0))
+    assert not kickstart.is_market_open_now_ist()
+    assert kickstart.next_market_open_dt_ist() == ist(2026, 12, 28, 9, 15)
+
+    monkeypatch.setattr(kickstart, "state_mgr", None)
+    kickstart.reset_stop_flag()
+    kickstart.request_stop()  # a stop during the wait returns at once
+    started = time.monotonic()
+    kickstart.wait_for_market_open()
+    assert time.monotonic() - started < 1
+    kickstart.reset_stop_flag()
@@ -0,0 +1,100 @@
+import sys
+import os
+import random
+
+import pytest
+
+# Add project root
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import kickstart
+
+
+def legacy_check(orders, symbol, exchange, qty, side):
+    """The previous linear-scan check_existing_orders body."""
+    blocking = {"OPEN", "PENDING", "TRIGGERED"}
+    has_buy = has_sell = False
+    total_buy_qty = total_sell_qty = 0
+    for o in orders:
+        is_same_exchange = (o.get("exchange") or o.get("exchangeSegment") or "NSE") == exchange
+        if o.get("tradingsymbol") == symbol:
+            transaction_type = (o.get("transaction_type") or "").upper()
+            status = (o.get("status") or "").upper()
+            order_qty = o.get("quantity", 0) if isinstance(o.get("quantity"), (int, float)) else 0
+            if side.upper() == "BUY" or is_same_exchange:
+                if transaction_type == "BUY" and status in blocking:
+                    has_buy = True
+                    total_buy_qty += order_qty
+                elif transaction_type == "SELL" and status in blocking:
+                    has_sell = True
+                    total_sell_qty += order_qty
+    if side.upper() == "BUY" and has_buy and has_sell:
+        return total_buy_qty != total_sell_qty
+    for o in orders:
+        if o.get("tradingsymbol") == symbol:
+            is_same_exchange = (o.get("exchange") or o.get("exchangeSegment") or "NSE") == exchange
+            if (side.upper() == "BUY") or (side.upper() == "SELL" and is_same_exchange):
+                if (o.get("transaction_type") or "").upper() == side.upper() and \
+                   (o.get("status") or "").upper() in blocking:
+                    return True
+    return False
+
+
+def _random_orders(rng, n):
+    orders = []
+    for _ in range(n):
+        o = {
+            "tradingsymbol": rng.choice(["AAA", "BBB", "CCC"]),
+            "transaction_type": rng.choice(["BUY", "SELL", "buy", None]),
+            "status": rng.choice(["OPEN", "PENDING", "TRIGGERED", "COMPLETE", "REJECTED", "open"]),
+            "quantity": rng.choice([1, 2, 5, "3", None]),
+        }
+        where = rng.choice(["exchange", "exchangeSegment", None])
+        if where:
+            o[where] = rng.choice(["NSE", "BSE"])
+        orders.append(o)
+    return orders
+
+
+def test_snapshot_matches_linear_scan():
+    rng = random.Random(7)
+    for _ in range(300):
+        orders = _random_orders(rng, rng.randint(0, 12))
+        book = kickstart.OrderBookSnapshot()
+        book.load(orders)
+        for symbol in ("AAA", "BBB", "ZZZ"):
+            for exchange in ("NSE", "BSE"):
+                for side in ("BUY", "SELL", "sell"):
+                    assert book.is_blocked(symbol, exchange, side) == legacy_check(orders, symbol, exchange, 1, side)
+
+
+class FakeResponse:
+    status_code = 200
+
+    def __init__(self, orders):
+        self._orders = orders
+
+    def json(self):
+        return {"data": self._orders}
+
+
+def test_one_fetch_per_cycle_and_local_patch(monkeypatch):
+    calls = []
+    orders = [{"tradingsymbol": "AAA", "exchange": "NSE", "transaction_type": "BUY", "status": "OPEN", "quantity": 1}]
+    monkeypatch.setitem(kickstart.OFFLINE, "active", False)
+    monkeypatch.setattr(kickstart, "safe_request", lambda *a, **k: calls.append(a) or FakeResponse(orders))
+
+    assert kickstart.refresh_order_book_snapshot()
+    try:
+        for _ in range(5):
+            assert kickstart.check_existing_orders("AAA", "BSE", 1, "BUY")
+            assert not kickstart.check_existing_orders("BBB", "NSE", 1, "SELL")
+        kickstart.ORDER_BOOK.record_placed("BBB", "NSE", "SELL", 2)
+        assert kickstart.check_existing_orders("BBB", "NSE", 2, "SELL")
+        assert len(calls) == 1
+    finally:
+        kickstart.ORDER_BOOK.clear()
+
+    # Without a cycle snapshot the check does a live lookup
+    assert kickstart.check_existing_orders("AAA", "NSE", 1, "BUY")
+    assert len(calls) == 2
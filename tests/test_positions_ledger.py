@@ -0,0 +1,102 @@
+import sys
+import os
+import random
+import sqlite3
+
+import pytest
+
+# Add project root
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from database.trades_db import TradesDatabase
+
+
+def insert(db, symbol, action, qty, price, broker="mstock", exchange="NSE", strategy="RSI"):
+    return db.insert_trade(symbol=symbol, exchange=exchange, action=action, quantity=qty, price=price,
+                           gross_amount=qty * price, total_fees=1.0, net_amount=qty * price + 1.0,
+                           strategy=strategy, broker=broker)
+
+
+def by_key(rows):
+    return {(r["symbol"], r["exchange"]): r for r in rows}
+
+
+def test_ledger_matches_group_by_for_random_history(tmp_path):
+    db = TradesDatabase(str(tmp_path / "trades.db"))
+    rng = random.Random(11)
+    held = {}
+    for _ in range(400):
+        symbol = rng.choice(["AAA", "BBB", "CCC", "DDD"])
+        exchange = rng.choice(["NSE", "BSE"])
+        broker = rng.choice(["mstock", "PAPER"])
+        key = (symbol, exchange, broker)
+        if held.get(key, 0) > 0 and rng.random() < 0.4:
+            qty = rng.randint(1, held[key])
+            insert(db, symbol, "SELL", qty, rng.uniform(90, 110), broker, exchange)
+            held[key] -= qty
+        else:
+            qty = rng.randint(1, 5)
+            insert(db, symbol, "BUY", qty, rng.uniform(90, 110), broker, exchange)
+            held[key] = held.get(key, 0) + qty
+
+    assert db.verify_positions() == []
+    for is_paper in (False, True):
+        ledger = by_key(db.get_open_positions(is_paper))
+        legacy = by_key(db._aggregate_open_positions(is_paper))
+        assert set(ledger) == set(legacy)
+        for key, row in ledger.items():
+            assert row["net_quantity"] == legacy[key]["net_quantity"]
+            assert row["first_buy_time"] == legacy[key]["first_buy_time"]
+            assert row["avg_entry_price"] == pytest.approx(legacy[key]["avg_entry_price"])
+            assert row["total_invested"] == pytest.approx(legacy[key]["total_invested"])
+    db.close()
+
+
+def test_closed_positions_drop_out_and_books_stay_separate(tmp_path):
+    db = TradesDatabase(str(tmp_path / "trades.db"))
+    insert(db, "AAA", "BUY", 10, 100.0)
+    insert(db, "AAA", "BUY", 5, 110.0, broker="PAPER")
+    insert(db, "AAA", "SELL", 10, 120.0)
+
+    assert db.get_open_positions(is_paper=False) == []
+    paper = db.get_open_positions(is_paper=True)
+    assert len(paper) == 1 and paper[0]["net_quantity"] == 5 and paper[0]["broker"] == "PAPER"
+    db.close()
+
+
+def test_existing_database_is_backfilled_and_rebuild_repairs_drift(tmp_path):
+    path = str(tmp_path / "trades.db")
+    db = TradesDatabase(path)
+    insert(db, "AAA", "BUY", 10, 100.0, strategy="RSI")
+    insert(db, "AAA", "BUY", 4, 104.0, strategy="MANUAL")
+    insert(db, "BBB", "BUY", 3, 50.0)
+    db.conn.execute("DROP TABLE positions")  # database created before the ledger existed
+    db.conn.commit()
+    db.close()
+
+    db = TradesDatabase(path)
+    assert db.verify_positions() == []
+    aaa = by_key(db.get_open_positions())[("AAA", "NSE")]
+    assert aaa["net_quantity"] == 14 and aaa["avg_entry_price"] == pytest.approx(102.0)
+    assert aaa["strategy"] == "MANUAL"  # latest trade, as insert_trade maintains it
+
+    # Trades edited outside insert_trade: verify flags it, rebuild fixes it
+    db.conn.execute("DELETE FROM trades WHERE symbol = 'BBB'")
+    db.conn.commit()
+    assert [m["symbol"] for m in db.verify_positions()] == ["BBB"]
+    db.rebuild_positions()
+    assert db.verify_positions() == []
+    db.close()
+
+
+def test_failed_ledger_update_rolls_back_trade(tmp_path, monkeypatch):
+    db = TradesDatabase(str(tmp_path / "trades.db"))
+
+    def broken(*args, **kwargs):
+        raise sqlite3.OperationalError("ledger locked")
+
+    monkeypatch.setattr(db, "_apply_to_ledger", broken)
+    with pytest.raises(sqlite3.OperationalError):
+        insert(db, "AAA", "BUY", 1, 100.0)
+    assert db.conn.execute("SELECT COUNT(*) FROM trades").fetchone()[0] == 0
+    db.close()
@@ -0,0 +1,65 @@
+import sys
+import os
+import logging
+
+import pytest
+
+# Add project root
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import kickstart
+
+
+class FakeResponse:
+    status_code = 200
+    text = ""
+
+    def __init__(self, payload):
+        self._payload = payload
+
+    def json(self):
+        return self._payload
+
+
+@pytest.fixture
+def broker(monkeypatch):
+    rows = [{"tradingsymbol": f"SYM{i}", "quantity": 5, "used_quantity": 0, "price": 10.0,
+             "last_price": 11.0, "exchange": "NSE"} for i in range(50)]
+    orders = [{"tradingsymbol": "SYM1", "exchange": "NSE", "transaction_type": "SELL",
+               "quantity": 5, "average_price": 11.0, "status": "COMPLETE"}]
+
+    def fake_request(method, url, **kwargs):
+        if url.endswith("/portfolio/holdings"):
+            return FakeResponse({"data": rows})
+        if url.endswith("/portfolio/positions"):
+            return FakeResponse({"data": []})
+        return FakeResponse({"data": orders})
+
+    messages = []
+    monkeypatch.setattr(kickstart, "safe_request", fake_request)
+    monkeypatch.setattr(kickstart, "settings", None)
+    monkeypatch.setattr(kickstart, "db", None)
+    monkeypatch.setattr(kickstart, "state_mgr", None)
+    monkeypatch.setattr(kickstart, "ACCESS_TOKEN", "token")
+    monkeypatch.setitem(kickstart.OFFLINE, "active", False)
+    monkeypatch.setitem(kickstart._LOG_STATE, "callback", messages.append)
+    root = logging.getLogger()
+    level = root.level
+    yield messages
+    root.setLevel(level)
+
+
+def test_merge_emits_one_summary_at_info(broker):
+    logging.getLogger().setLevel(logging.INFO)
+    merged = kickstart.merge_positions_and_orders()
+    assert len(merged) == 49  # SYM1 sold out today
+    assert len(broker) == 1 and broker[0].startswith("✅ Merged result: 49 active positions")
+    assert kickstart.LAST_MERGE_SUMMARY["closed"] == 1
+    assert kickstart.LAST_MERGE_SUMMARY["holdings"] == 50
+
+
+def test_merge_per_row_detail_at_debug(broker):
+    logging.getLogger().setLevel(logging.DEBUG)
+    kickstart.merge_positions_and_orders()
+    assert any(m.startswith("  → SYM7:") for m in broker)
+    assert any("Position closed: SYM1:NSE" in m for m in broker)
@@ -0,0 +1,84 @@
+import sys
+import os
+import threading
+import time
+
+# Add project root
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from positions_service import PositionsService, PositionsView, positions_for_symbol
+
+
+class SlowLoader:
+    def __init__(self, delay=0.05):
+        self.calls = 0
+        self.delay = delay
+        self.fail = False
+
+    def __call__(self):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.fail:
+            return None
+        return {("AAA", "NSE"): {"qty": self.calls}, ("AAA", "BSE"): {"qty": 0}, ("BBB", "NSE"): {"qty": 1}}
+
+
+def test_single_flight_concurrent_callers():
+    loader = SlowLoader()
+    svc = PositionsService(loader, ttl=60)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(svc.get())) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert loader.calls == 1
+    assert all(r is results[0] for r in results)
+    assert svc.stats["loads"] == 1
+
+
+def test_ttl_and_invalidation():
+    loader = SlowLoader(delay=0)
+    svc = PositionsService(loader, ttl=60)
+    first = svc.get()
+    assert svc.get() is first and loader.calls == 1
+    svc.invalidate()
+    assert svc.get()[("AAA", "NSE")]["qty"] == 2
+    assert svc.get(max_age=0)[("AAA", "NSE")]["qty"] == 3
+
+
+def test_failed_reload_keeps_last_view():
+    loader = SlowLoader(delay=0)
+    svc = PositionsService(loader, ttl=0)
+    good = svc.get()
+    loader.fail = True
+    assert svc.get() is good
+    assert svc.stats["failures"] == 1
+    assert PositionsService(lambda: None).get() == {}
+
+
+def test_by_symbol_index_matches_scan():
+    data = {("AAA", "NSE"): {"qty": 1}, ("BBB", "NSE"): {"qty": 2}, ("AAA", "BSE"): {"qty": 3}}
+    view = PositionsView(data)
+    assert view.for_symbol("AAA") == [("NSE", data[("AAA", "NSE")]), ("BSE", data[("AAA", "BSE")])]
+    assert positions_for_symbol(view, "AAA") == positions_for_symbol(data, "AAA")
+    assert positions_for_symbol(view, "ZZZ") == []
+
+
+def test_square_off_reads_fresh_positions(monkeypatch):
+    import kickstart
+    loader = SlowLoader(delay=0)
+    svc = PositionsService(loader, ttl=60)
+    svc.get()  # cached view: AAA:NSE qty 1
+    monkeypatch.setattr(kickstart, "positions_service", svc)
+    monkeypatch.setattr(kickstart, "ACCESS_TOKEN", "token")
+    monkeypatch.setitem(kickstart.OFFLINE, "active", False)
+    monkeypatch.setattr(kickstart, "fetch_market_data_once", lambda symbol, exchange: ({}, None))
+    monkeypatch.setattr(kickstart, "instrument_token_for", lambda symbol, exchange, md: "1")
+    orders = []
+    monkeypatch.setattr(kickstart, "place_order",
+                        lambda symbol, exchange, qty, side, token, price=0: orders.append((symbol, exchange, qty)))
+
+    assert kickstart.square_off_all_positions() == 2
+    assert loader.calls == 2  # reloaded despite the 60 s TTL
+    assert sorted(orders) == [("AAA", "NSE", 2), ("BBB", "NSE", 1)]
@@ -0,0 +1,82 @@
+import sys
+import os
+
+import pytest
+
+# Add project root
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import kickstart
+
+
+class FakeResponse:
+    def __init__(self, payload, status_code=200):
+        self._payload = payload
+        self.status_code = status_code
+        self.text = str(payload)
+
+    def json(self):
+        return self._payload
+
+
+class FakeQuoteAPI:
+    """Answers multi-instrument OHLC calls; EMBASSY only exists on BSE."""
+
+    def __init__(self):
+        self.calls = []
+
+    def request(self, method, url, **kwargs):
+        instruments = [v for k, v in kwargs.get("params", []) if k == "i"] \
+            if isinstance(kwargs.get("params"), list) else [kwargs["params"]["i"]]
+        self.calls.append(instruments)
+        data = {}
+        for inst in instruments:
+            ex, sym = inst.split(":")
+            if sym == "EMBASSY" and ex == "NSE":
+                continue
+            if sym == "UNKNOWN":
+                continue
+            data[inst] = {"last_price": 100.0, "instrument_token": f"{ex}-{sym}"}
+        return FakeResponse({"status": "success", "data": data})
+
+
+@pytest.fixture
+def api(monkeypatch):
+    fake = FakeQuoteAPI()
+    monkeypatch.setattr(kickstart, "safe_request", fake.request)
+    monkeypatch.setattr(kickstart, "QUOTE_BATCH_SIZE", 3)
+    monkeypatch.setitem(kickstart.OFFLINE, "active", False)
+    kickstart.reset_cycle_quotes()
+    yield fake
+    kickstart.reset_cycle_quotes()
+
+
+def test_batch_chunks_and_serves_cycle_quotes(api):
+    keys = [(f"S{i}", "NSE") for i in range(7)]
+    assert kickstart.prefetch_cycle_quotes(keys) == 7
+    assert [len(c) for c in api.calls] == [3, 3, 1]
+
+    md, ex = kickstart.fetch_market_data_once("S5", "NSE")
+    assert md["instrument_token"] == "NSE-S5" and ex == "NSE"
+    assert len(api.calls) == 3  # no per-symbol request
+
+
+def test_reit_prefers_bse_and_misses_are_not_refetched(api):
+    kickstart.prefetch_cycle_quotes([("EMBASSY", "NSE"), ("UNKNOWN", "NSE")])
+    assert api.calls == [["BSE:EMBASSY", "NSE:EMBASSY", "NSE:UNKNOWN"]]
+
+    md, ex = kickstart.fetch_market_data_once("EMBASSY", "NSE")
+    assert md["instrument_token"] == "BSE-EMBASSY" and ex == "BSE"
+    assert kickstart.fetch_market_data_once("UNKNOWN", "NSE") == (None, "NSE")
+    assert len(api.calls) == 1
+
+
+def test_failed_batch_falls_back_to_per_symbol(api, monkeypatch):
+    monkeypatch.setattr(kickstart, "safe_request", lambda *a, **k: FakeResponse({}, 500))
+    assert kickstart.prefetch_cycle_quotes([("S1", "NSE")]) == 0
+    assert "NSE:S1" not in kickstart.CYCLE_QUOTE_MISSES
+
+    monkeypatch.setattr(kickstart, "safe_request", api.request)
+    md, _ = kickstart.fetch_market_data_once("S1", "NSE")
+    assert md["last_price"] == 100.0
+    assert api.calls == [["NSE:S1"]]
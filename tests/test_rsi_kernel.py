@@ -0,0 +1,127 @@
+import sys
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Add project root
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import rsi_kernel
+
+
+# ----------------- Reference (previous pandas implementation) -----------------
+
+def legacy_tv_rma(src: pd.Series, length: int) -> pd.Series:
+    x = pd.to_numeric(src, errors="coerce")
+    alpha = 1.0 / float(length)
+    sma = x.rolling(length, min_periods=length).mean()
+    rma = pd.Series(np.nan, index=x.index)
+    first = sma.first_valid_index()
+    if first is None:
+        return rma
+    rma.loc[first] = sma.loc[first]
+    for i in range(x.index.get_loc(first) + 1, len(x)):
+        rma.iloc[i] = alpha * x.iloc[i] + (1.0 - alpha) * rma.iloc[i - 1]
+    return rma
+
+
+def legacy_tv_rsi(close: pd.Series, length: int = 14) -> pd.Series:
+    c = pd.to_numeric(close, errors="coerce")
+    ch = c.diff()
+    up = legacy_tv_rma(ch.clip(lower=0), length)
+    down = legacy_tv_rma((-ch).clip(lower=0), length)
+    rsi = 100.0 - (100.0 / (1.0 + up / down))
+    rsi = rsi.where(down != 0, 100.0)
+    rsi = rsi.where(up != 0, 0.0)
+    return rsi
+
+
+def _random_walk(n, seed, tick=0.05):
+    rng = np.random.default_rng(seed)
+    steps = rng.choice([-3, -2, -1, 0, 0, 1, 2, 3], size=n) * tick
+    return pd.Series(np.round(1500.0 + np.cumsum(steps), 2))
+
+
+# ----------------- Exactness -----------------
+
+@pytest.mark.parametrize("n,seed", [(15, 1), (60, 2), (400, 3), (5000, 4)])
+def test_rsi_bit_identical_to_legacy(n, seed):
+    close = _random_walk(n, seed)
+    expected = legacy_tv_rsi(close).to_numpy()
+    actual = rsi_kernel.rsi(close.to_numpy())
+    assert np.array_equal(expected, actual, equal_nan=True)
+
+
+def test_rma_bit_identical_with_gaps():
+    close = _random_walk(300, 7)
+    close.iloc[[40, 41, 120]] = np.nan
+    gain = close.diff().clip(lower=0)
+    expected = legacy_tv_rma(gain, 14).to_numpy()
+    actual = rsi_kernel.rma(gain.to_numpy(), 14)
+    assert np.array_equal(expected, actual, equal_nan=True)
+
+
+def test_flat_and_monotonic_edge_cases():
+    flat = pd.Series([100.0] * 40)
+    up = pd.Series(np.arange(100.0, 140.0))
+    for s in (flat, up, -up + 300):
+        assert np.array_equal(legacy_tv_rsi(s).to_numpy(), rsi_kernel.rsi(s.to_numpy()), equal_nan=True)
+
+
+def test_rsi_last_matches_full_series_with_live_price():
+    close = _random_walk(400, 11)
+    adj = close.copy()
+    adj.iloc[-1] = 1499.35
+    expected = float(legacy_tv_rsi(adj).dropna().iloc[-1])
+    raw = close.to_numpy()
+    before = raw.copy()
+    assert rsi_kernel.rsi_last(raw, 14, last_price=1499.35) == expected
+    # The caller's array must not be modified by the live-price overwrite
+    assert np.array_equal(raw, before)
+
+
+def test_rsi_last_insufficient_history_is_nan():
+    assert np.isnan(rsi_kernel.rsi_last(np.array([1.0, 2.0, 3.0]), 14))
+
+
+# ----------------- Incremental state -----------------
+
+def test_state_advance_matches_full_recompute():
+    close = _random_walk(500, 21).to_numpy()
+    stamps = np.arange(len(close), dtype=np.int64) * 60_000_000_000
+    state = None
+    # Bars close one by one; the last bar of each window is the forming bar
+    for end in range(300, len(close) + 1, 7):
+        window = close[:end]
+        state = rsi_kernel.sync_state(state, window[:-1], stamps[:end - 1])
+        ltp = float(window[-1]) + 0.35
+        assert state.what_if(ltp) == rsi_kernel.rsi_last(window, 14, ltp)
+    assert state.bars == end - 1
+
+
+def test_state_reseeds_on_revision_and_gap():
+    close = _random_walk(200, 5).to_numpy()
+    stamps = np.arange(len(close), dtype=np.int64)
+    state = rsi_kernel.sync_state(None, close[:150], stamps[:150])
+
+    revised = close[:160].copy()
+    revised[149] += 1.0  # last closed bar was revised by the broker
+    fresh = rsi_kernel.sync_state(state, revised, stamps[:160])
+    assert fresh is not state
+    assert fresh.value == rsi_kernel.rsi_last(revised, 14)
+
+    # Window no longer contains the state's bar (e.g. long outage): re-seed
+    later = rsi_kernel.sync_state(fresh, close[170:], stamps[170:])
+    assert later is not fresh
+    assert later.value == rsi_kernel.rsi_last(close[170:], 14)
+
+
+def test_state_what_if_does_not_mutate():
+    close = _random_walk(100, 9).to_numpy()
+    state = rsi_kernel.RSIState.seed(close, np.arange(100))
+    snapshot = (state.avg_gain, state.avg_loss, state.last_close, state.bars)
+    state.what_if(close[-1] + 5)
+    assert (state.avg_gain, state.avg_loss, state.last_close, state.bars) == snapshot
+    assert rsi_kernel.RSIState.seed(close[:5]) is None
@@ -0,0 +1,144 @@
+import sys
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+# Add project root
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from candle_warehouse import CandleWarehouse
+from scanner_engine import MACDScanner, RateLimitedFetcher
+from utils import TokenBucket
+
+
+def daily_bars(rising: bool) -> pd.DataFrame:
+    """60 sessions; ``rising`` ends with a rebound that crosses MACD over its signal."""
+    index = pd.bdate_range(end=pd.Timestamp.now().normalize(), periods=60) + pd.Timedelta("3h45m")
+    tail = np.arange(1, 11) * (2.0 if rising else -1.0)
+    close = np.concatenate([200 - np.arange(50.0), 150 + tail])
+    return pd.DataFrame({"Open": close, "High": close + 1, "Low": close - 1, "Close": close, "Volume": 1000},
+                        index=index)
+
+
+class FakeFetcher:
+    max_workers = 4
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.calls = []
+        self.threads = set()
+        self._lock = threading.Lock()
+
+    def stop(self):
+        pass
+
+    def reset(self):
+        pass
+
+    def history(self, ticker, period="3mo", interval="1d"):
+        with self._lock:
+            self.calls.append((ticker, period))
+            self.threads.add(threading.current_thread().name)
+        time.sleep(self.delay)
+        if ticker.startswith("MISSING"):
+            return pd.DataFrame()
+        return daily_bars(rising=ticker.startswith("UP"))
+
+
+class FakeResponse:
+    def __init__(self, status, payload=None, headers=None):
+        self.status_code = status
+        self._payload = payload
+        self.headers = headers or {}
+
+    def json(self):
+        return self._payload
+
+
+class FakeSession:
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.urls = []
+
+    def get(self, url, timeout=None):
+        self.urls.append(url)
+        return self.responses.pop(0)
+
+
+CHART = {"chart": {"result": [{"timestamp": [1767000000, 1767086400],
+                               "indicators": {"quote": [{"open": [1, 2], "high": [1, 2], "low": [1, 2],
+                                                          "close": [1.5, 2.5], "volume": [10, 20]}]}}]}}
+
+
+def test_token_bucket_limits_rate():
+    bucket = TokenBucket(rate=50, capacity=1)
+    started = time.monotonic()
+    threads = [threading.Thread(target=bucket.acquire) for _ in range(11)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert time.monotonic() - started >= 0.19  # 10 tokens beyond the burst at 50/s
+
+
+def test_fetcher_retries_on_429_and_5xx():
+    session = FakeSession([FakeResponse(429, headers={"Retry-After": "0"}), FakeResponse(503),
+                           FakeResponse(200, CHART)])
+    fetcher = RateLimitedFetcher(requests_per_second=1000, retries=3, backoff=0.0, session=session)
+    df = fetcher.history("TCS.NS")
+    assert list(df["Close"]) == [1.5, 2.5]
+    assert fetcher.stats["requests"] == 3 and fetcher.stats["retries"] == 2
+    assert "TCS.NS?range=3mo&interval=1d" in session.urls[0]
+
+    missing = RateLimitedFetcher(requests_per_second=1000, backoff=0.0, session=FakeSession([FakeResponse(404)]))
+    assert missing.history("NOPE.NS").empty and missing.stats["failures"] == 1
+
+
+def test_retry_after_is_capped_and_stop_interrupts_backoff():
+    fetcher = RateLimitedFetcher(requests_per_second=1000, max_backoff=5.0)
+    assert fetcher._retry_delay(0, FakeResponse(429, headers={"Retry-After": "3600"})) == 5.0
+
+    session = FakeSession([FakeResponse(429, headers={"Retry-After": "3600"})] * 4)
+    fetcher = RateLimitedFetcher(requests_per_second=1000, session=session, max_backoff=3600)
+    threading.Timer(0.1, fetcher.stop).start()
+    started = time.monotonic()
+    assert fetcher.history("TCS.NS").empty
+    assert time.monotonic() - started < 2 and fetcher.stats["requests"] == 1
+
+
+def test_scan_streams_concurrently_with_progress(tmp_path):
+    tickers = [f"UP{i}.NS" for i in range(8)] + [f"DOWN{i}.NS" for i in range(7)] + ["MISSING.NS"]
+    fetcher = FakeFetcher()
+    scanner = MACDScanner(progress_callback=None, warehouse=CandleWarehouse(str(tmp_path)), fetcher=fetcher)
+    scanner.get_stock_list = lambda mode="FULL": tickers
+    progress = []
+    scanner.progress_callback = lambda current, total, message: progress.append((current, total))
+
+    started = time.monotonic()
+    results = scanner.scan_market()
+    assert time.monotonic() - started < len(tickers) * fetcher.delay  # fetched in parallel
+    assert len(fetcher.threads) > 1
+
+    assert sorted(r["SYMBOL"] for r in results) == sorted(t.replace(".NS", "") for t in tickers[:8])
+    assert progress[0] == (0, 16) and progress[-1] == (16, 16)
+    assert [p[0] for p in progress] == sorted(p[0] for p in progress)
+
+    # Same signals as the batch path; the rescan only asks Yahoo for the latest sessions
+    batch = scanner.calculate_indicators_batch(scanner.download_batch_direct(tickers))
+    assert sorted(r["SYMBOL"] for r in batch) == sorted(r["SYMBOL"] for r in results)
+    assert {period for ticker, period in fetcher.calls[len(tickers):] if ticker != "MISSING.NS"} == {"5d"}
+
+
+def test_scanner_without_warehouse_when_setting_is_empty(monkeypatch):
+    import settings_manager
+    disabled = {"app_settings.candle_warehouse_dir": ""}
+    stub = type("S", (), {"get": lambda self, key, default=None: disabled.get(key, default)})()
+    monkeypatch.setattr(settings_manager, "settings", stub, raising=False)
+    fetcher = FakeFetcher(delay=0)
+    scanner = MACDScanner(fetcher=fetcher)
+    assert scanner.warehouse is None
+    assert len(scanner.fetch_history("UP1.NS")) == 60
+    assert fetcher.calls == [("UP1.NS", "3mo")]
@@ -0,0 +1,89 @@
+import sys
+import os
+import json
+import dataclasses
+
+import pytest
+from cryptography.fernet import Fernet
+
+# Add project root
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import kickstart
+from settings_manager import SettingsManager, SettingsSnapshot
+
+
+@pytest.fixture
+def manager(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # backups go to ./logs
+    monkeypatch.setenv("ARUN_ENCRYPTION_KEY", Fernet.generate_key().decode())
+    path = tmp_path / "settings.json"
+    path.write_text(json.dumps({"app_settings": {"paper_trading_mode": False, "cycle_max_workers": 4},
+                                "capital": {"per_trade_pct": 25}}))
+    return SettingsManager(str(path))
+
+
+def rewrite(manager, **app_settings):
+    with open(manager.settings_file) as f:
+        data = json.load(f)
+    data["app_settings"].update(app_settings)
+    with open(manager.settings_file, "w") as f:
+        json.dump(data, f)
+    os.utime(manager.settings_file, ns=(0, os.stat(manager.settings_file).st_mtime_ns + 10**9))
+
+
+def test_snapshot_is_typed_frozen_and_versioned(manager):
+    snap = manager.snapshot()
+    assert manager.snapshot() is snap  # cached until the settings change
+    assert snap.cycle_max_workers == 4 and snap.per_trade_pct == 25.0 and isinstance(snap.per_trade_pct, float)
+    assert snap.rsi_stabilization is True  # missing keys take the get() defaults
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        snap.paper_trading_mode = True
+    assert not hasattr(snap, "__dict__")
+
+    manager.set("app_settings.paper_trading_mode", True)
+    new = manager.snapshot()
+    assert new.paper_trading_mode and not snap.paper_trading_mode
+    assert new.version > snap.version
+
+    assert not manager.reload_if_changed()
+    rewrite(manager, cycle_max_workers=2)
+    assert manager.reload_if_changed()
+    assert manager.snapshot().cycle_max_workers == 2
+
+
+def test_engine_swaps_snapshot_on_change(manager, monkeypatch):
+    monkeypatch.setattr(kickstart, "settings", manager)
+    snap = kickstart.refresh_settings_snapshot()
+    assert kickstart.SETTINGS_SNAPSHOT is snap and not snap.paper_trading_mode
+    assert kickstart.refresh_settings_snapshot(check_file=True) is snap  # unchanged: no rebuild
+
+    rewrite(manager, paper_trading_mode=True)
+    assert kickstart.refresh_settings_snapshot() is snap  # file only checked when asked
+    assert kickstart.refresh_settings_snapshot(check_file=True).paper_trading_mode
+    assert kickstart.is_market_open_now_ist()
+
+    # Any object with get() (tests, stand-ins) is snapshotted too
+    monkeypatch.setattr(kickstart, "settings", type("S", (), {"get": lambda self, k, d=None: d})())
+    assert kickstart.refresh_settings_snapshot().version > snap.version
+    monkeypatch.setattr(kickstart, "settings", None)
+    assert kickstart.refresh_settings_snapshot() == SettingsSnapshot()
+
+
+def test_reload_keeps_settings_when_file_is_mid_write(manager):
+    snap = manager.snapshot()
+    with open(manager.settings_file, "w") as f:
+        f.write('{"app_settings": {"paper_tr')  # truncated, as seen by a reader during a non-atomic save
+    os.utime(manager.settings_file, ns=(0, os.stat(manager.settings_file).st_mtime_ns + 10**9))
+
+    assert not manager.reload_if_changed()
+    assert manager.snapshot() is snap and manager.get("app_settings.cycle_max_workers") == 4
+    with open(manager.settings_file) as f:
+        assert f.read().startswith('{"app_settings": {"paper_tr')  # not overwritten with defaults
+
+    manager.settings["app_settings"]["cycle_max_workers"] = 2
+    assert manager.save()  # atomic: no temp file left behind
+    assert not os.path.exists(manager.settings_file + ".tmp")
+    assert not manager.reload_if_changed()
+    with open(manager.settings_file) as f:
+        assert json.load(f)["app_settings"]["cycle_max_workers"] == 2
@@ -0,0 +1,106 @@
+import sys
+import os
+import threading
+
+import pytest
+
+# Add project root
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from database.order_attempts_db import OrderAttemptsDB
+from database.trades_db import TradesDatabase
+
+
+@pytest.fixture
+def trades_db(tmp_path):
+    db = TradesDatabase(str(tmp_path / "trades.db"))
+    for i in range(20):
+        db.insert_trade(symbol=f"SYM{i % 4}", exchange="NSE", action="BUY" if i % 3 else "SELL",
+                        quantity=1, price=100.0 + i, gross_amount=100.0, total_fees=1.0, net_amount=101.0,
+                        broker="PAPER" if i % 5 == 0 else "mstock")
+    db.conn.execute("ANALYZE")
+    yield db
+    db.close()
+
+
+def captured_plans(conn, call):
+    """Run ``call`` and return {sql: query plan details} for every statement it issued."""
+    statements = []
+    conn.set_trace_callback(statements.append)
+    try:
+        call()
+    finally:
+        conn.set_trace_callback(None)
+    plans = {}
+    for sql in statements:
+        if sql.lstrip().upper().startswith("SELECT"):
+            plans[sql] = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}").fetchall()]
+    assert plans, "no SELECT captured"
+    return plans
+
+
+def assert_no_full_scan(plans, table, ordered_limit=False):
+    """
+    Filtered queries must SEARCH an index. ``ordered_limit`` queries (ORDER BY
+    timestamp DESC LIMIT n) may walk an index, since they stop after n rows.
+    A DATE()/datetime() predicate shows up as "SCAN <table> [USING INDEX ...]".
+    """
+    for sql, details in plans.items():
+        for detail in details:
+            if detail.startswith(f"SCAN {table}"):
+                assert ordered_limit and "USING INDEX" in detail, f"{detail}\n{sql}"
+
+
+@pytest.mark.parametrize("table,call", [
+    ("trades", lambda db: db.get_today_trades(is_paper=False)),
+    ("trades", lambda db: db.get_today_trades(is_paper=True)),
+    ("trades", lambda db: db.get_trade_history(days=7)),
+    ("trades", lambda db: db.get_trade_history(days=7, symbol="SYM1")),
+    ("positions", lambda db: db.get_open_positions(is_paper=False)),
+    ("trades", lambda db: db.insert_trade("SYM1", "NSE", "SELL", 1, 120.0, 120.0, 1.0, 119.0)),
+])
+def test_dashboard_queries_use_indexes(trades_db, table, call):
+    assert_no_full_scan(captured_plans(trades_db.conn, lambda: call(trades_db)), table)
+
+
+def test_recent_trades_walks_timestamp_index(trades_db):
+    plans = captured_plans(trades_db.conn, lambda: trades_db.get_recent_trades(limit=5, is_paper=False))
+    assert_no_full_scan(plans, "trades", ordered_limit=True)
+
+
+def test_performance_summary_is_covered_by_index(trades_db):
+    plans = captured_plans(trades_db.conn, lambda: trades_db.get_performance_summary(days=30))
+    details = [d for ds in plans.values() for d in ds]
+    assert any("COVERING INDEX idx_trades_action_pnl" in d for d in details), details
+
+
+def test_performance_summary_matches_rows(trades_db):
+    summary = trades_db.get_performance_summary(days=30)
+    sells = [dict(r) for r in trades_db.conn.execute("SELECT * FROM trades WHERE action = 'SELL'")]
+    assert summary["total_trades"] == len(sells)
+    assert summary["net_profit"] == pytest.approx(round(sum(r["pnl_net"] or 0 for r in sells), 2))
+    assert summary["total_fees"] == pytest.approx(round(sum(r["total_fees"] for r in sells), 2))
+
+
+def test_order_attempt_queries_use_indexes(tmp_path):
+    db = OrderAttemptsDB(str(tmp_path / "order_attempts.db"))
+    for status in ("SUCCESS", "FAILED", "SKIPPED"):
+        db.log_attempt("AAA", "NSE", "BUY", 1, 10.0, status, "test")
+    assert_no_full_scan(captured_plans(db.conn, lambda: db.get_attempts_by_status("FAILED", 10)), "order_attempts")
+    assert_no_full_scan(captured_plans(db.conn, lambda: db.get_recent_attempts(10)), "order_attempts",
+                        ordered_limit=True)
+    db.close()
+
+
+def test_wal_and_one_connection_per_thread(trades_db):
+    conn = trades_db.conn
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+    assert trades_db.conn is conn
+
+    seen = []
+    worker = threading.Thread(target=lambda: seen.append((trades_db.conn, len(trades_db.get_open_positions()))))
+    worker.start()
+    worker.join()
+    assert seen[0][0] is not conn
+    assert seen[0][1] == len(trades_db.get_open_positions())
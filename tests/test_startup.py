@@ -0,0 +1,48 @@
+import sys
+import os
+import json
+import subprocess
+
+# Add project root
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(ROOT)
+
+import kickstart
+
+IMPORT_BUDGET_SECONDS = 3.0  # pandas/numpy/requests dominate; the engine itself must add no setup work
+
+PROBE = (
+    "import io, json, os, sys, time, contextlib\n"
+    f"sys.path.insert(0, {ROOT!r})\n"
+    "t = time.perf_counter()\n"
+    "with contextlib.redirect_stdout(io.StringIO()):\n"
+    "    import kickstart\n"
+    "elapsed = time.perf_counter() - t\n"
+    "print(json.dumps({'elapsed': elapsed, 'yfinance': 'yfinance' in sys.modules,\n"
+    "                  'initialized': kickstart.ENGINE.initialized, 'settings': kickstart.settings is not None,\n"
+    "                  'db': kickstart.db is not None, 'files': sorted(os.listdir('.'))}))\n"
+)
+
+
+def test_import_is_cheap_and_side_effect_free(tmp_path):
+    proc = subprocess.run([sys.executable, "-c", PROBE], cwd=tmp_path, capture_output=True, text=True, timeout=60)
+    assert proc.returncode == 0, proc.stderr
+    probe = json.loads(proc.stdout.strip().splitlines()[-1])
+    assert not probe["yfinance"]
+    assert not probe["initialized"] and not probe["settings"] and not probe["db"]
+    assert ".encryption_key" not in probe["files"] and "database" not in probe["files"]
+    assert probe["elapsed"] < IMPORT_BUDGET_SECONDS
+
+
+def test_engine_initialize_runs_steps_once():
+    calls = []
+    engine = kickstart.Engine()
+    engine.STEPS = (("first", lambda: calls.append("first")), ("second", lambda: calls.append("second")))
+
+    assert engine.initialize() is engine
+    engine.initialize()
+    assert calls == ["first", "second"] and engine.initialized
+    assert set(engine.init_ms) == {"first", "second"}
+
+    engine.initialize(force=True)
+    assert calls == ["first", "second"] * 2
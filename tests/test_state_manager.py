@@ -0,0 +1,79 @@
+import sys
+import os
+import json
+import time
+
+# Add project root
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import state_manager
+from state_manager import StateManager
+
+
+def read_state(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline
+        time.sleep(0.02)
+
+
+def test_mutations_are_coalesced_into_few_writes(tmp_path):
+    path = str(tmp_path / "bot_state.json")
+    mgr = StateManager(path, flush_interval_ms=200)
+    for _ in range(100):
+        mgr.increment_trade_counter("attempts")
+        mgr.mark_token_validated()
+    assert mgr.stats["saves"] >= 200
+    assert mgr.stats["writes"] == 0  # nothing hits disk until the interval elapses
+
+    wait_for(lambda: os.path.exists(path) and read_state(path)["trade_counters"]["attempts"] == 100)
+    assert mgr.stats["writes"] <= 2
+    assert not os.path.exists(path + ".tmp")
+
+
+def test_critical_flags_flush_immediately(tmp_path):
+    path = str(tmp_path / "bot_state.json")
+    mgr = StateManager(path, flush_interval_ms=60_000)
+    mgr.update_portfolio_value(123.0)
+    assert not os.path.exists(path)  # debounced
+
+    mgr.set_stop_requested(True)
+    state = read_state(path)
+    assert state["stop_requested"] is True
+    assert state["portfolio_value"] == 123.0  # pending changes ride along
+
+    mgr.set_circuit_breaker(True)
+    assert read_state(path)["circuit_breaker_active"] is True
+    assert mgr.stats["forced"] == 2
+
+
+def test_failed_write_keeps_previous_file_intact(tmp_path, monkeypatch):
+    path = str(tmp_path / "bot_state.json")
+    mgr = StateManager(path, flush_interval_ms=0)
+    mgr.update_position("AAA", {"qty": 1})
+    before = read_state(path)
+
+    def broken_replace(src, dst):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(state_manager.os, "replace", broken_replace)
+    mgr.update_position("BBB", {"qty": 2})
+    assert mgr.stats["errors"] == 1
+    assert read_state(path) == before
+
+    monkeypatch.undo()
+    assert mgr.flush()  # still dirty, retried
+    assert set(read_state(path)["positions"]) == {"AAA", "BBB"}
+
+
+def test_tuple_keys_survive_round_trip(tmp_path):
+    path = str(tmp_path / "bot_state.json")
+    mgr = StateManager(path, flush_interval_ms=0)
+    mgr.state["positions"] = {("AAA", "NSE"): {"qty": 3}}
+    mgr.save()
+    assert StateManager(path, flush_interval_ms=0).state["positions"] == {"('AAA', 'NSE')": {"qty": 3}}
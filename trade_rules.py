@@ -0,0 +1,104 @@
+"""
+Trade Rules for ARUN Trading Bot
+Pure decision functions (position sizing, RSI entry/exit, capital limits,
+CNC fee model) shared by the live engine and the backtester.
+"""
+
+from typing import Dict, Optional, Tuple
+
+# rsi_sell_decision() reasons when an RSI sell signal is deliberately not acted on
+SELL_BLOCKED_AT_LOSS = "never_sell_at_loss"
+SELL_SKIPPED_INVEST = "invest_hold"
+
+
+def order_quantity(config_qty: int, price: float, settings=None) -> int:
+    """
+    Shares per order: fixed ``Quantity`` from the stock config when set,
+    otherwise a percentage of capital or a fixed amount (settings ``capital.*``).
+    """
+    if config_qty > 0:
+        return config_qty
+    if not settings:
+        return 1
+    total_capital = settings.get("capital.total_capital", 50000)
+    if settings.get("capital.max_per_stock_type", "percentage") == "percentage":
+        per_trade_amount = total_capital * (settings.get("capital.max_per_stock_value", 10.0) / 100)
+    else:
+        per_trade_amount = settings.get("capital.max_per_stock_fixed_amount", 5000)
+    # Minimum of 1 so penny-priced stocks still trade
+    return max(1, int(per_trade_amount / price))
+
+
+def rsi_buy_signal(last_rsi: float, buy_rsi: float, ignore_rsi: bool = False) -> bool:
+    """Entry condition for TRADE/INVEST symbols (NaN RSI never buys)."""
+    return bool(ignore_rsi or last_rsi <= buy_rsi)
+
+
+def rsi_sell_decision(strategy_type: str, last_rsi: float, sell_rsi: float, price: float,
+                      entry_price: float, never_sell_at_loss: bool = False) -> Tuple[bool, str]:
+    """
+    Exit decision for a held position.
+    Returns ``(should_sell, reason)``; when a signal is suppressed the reason is
+    SELL_BLOCKED_AT_LOSS or SELL_SKIPPED_INVEST, otherwise "".
+    """
+    if not last_rsi >= sell_rsi:
+        return False, ""
+    if strategy_type == "INVEST":
+        return False, SELL_SKIPPED_INVEST
+    if strategy_type != "TRADE":
+        return False, ""
+    if never_sell_at_loss and not price > entry_price:
+        return False, SELL_BLOCKED_AT_LOSS
+    return True, f"RSI Sell Signal ({last_rsi:.1f} >= {sell_rsi})"
+
+
+def trade_limit(allocated_capital: float, per_trade_pct: float) -> float:
+    """Largest single buy (₹) allowed by the per-trade portfolio risk limit."""
+    return allocated_capital * (per_trade_pct / 100)
+
+
+def cnc_fees(gross_amount: float, side: str) -> Tuple[float, Dict[str, float]]:
+    """
+    mStock CNC (delivery) charges for one order.
+    Returns ``(total_fees, breakdown)`` with the breakdown rounded to paise.
+    """
+    is_sell = side.upper() == "SELL"
+    brokerage = max(20, gross_amount * 0.0003)  # 0.03% or ₹20, whichever is higher
+    stt = gross_amount * 0.001 if is_sell else 0  # 0.1% on sell only
+    exchange_fee = gross_amount * 0.0000345  # ~0.00345%
+    gst = brokerage * 0.18  # 18% on brokerage
+    sebi = gross_amount * 0.000001  # ₹10 per crore
+    stamp = gross_amount * 0.00015 if not is_sell else 0  # 0.015% on buy only
+
+    total_fees = brokerage + stt + exchange_fee + gst + sebi + stamp
+    breakdown = {
+        "brokerage": round(brokerage, 2),
+        "stt": round(stt, 2),
+        "exchange_charges": round(exchange_fee, 2),
+        "gst": round(gst, 2),
+        "sebi_charges": round(sebi, 2),
+        "stamp_duty": round(stamp, 2)
+    }
+    return total_fees, breakdown
+
+
+def net_amount(gross_amount: float, total_fees: float, side: str) -> float:
+    """Cash out for a BUY (price + fees), cash in for a SELL (price - fees)."""
+    return gross_amount + total_fees if side.upper() == "BUY" else gross_amount - total_fees
+
+
+def trade_pnl(buy_price: float, buy_net: float, buy_qty: int, sell_price: float,
+              sell_net: float, quantity: int) -> Dict[str, Optional[float]]:
+    """
+    P&L of a SELL against the last BUY, exactly as TradesDatabase.insert_trade
+    computes it (per-unit net amounts, so fees on both legs are included).
+    """
+    buy_net_per_unit = buy_net / buy_qty
+    pnl_gross = (sell_price - buy_price) * quantity
+    pnl_net = (sell_net / quantity - buy_net_per_unit) * quantity
+    return {
+        "pnl_gross": pnl_gross,
+        "pnl_net": pnl_net,
+        "pnl_pct_gross": (pnl_gross / (buy_price * quantity)) * 100 if buy_price > 0 else None,
+        "pnl_pct_net": (pnl_net / (buy_net_per_unit * quantity)) * 100 if buy_net_per_unit > 0 else None,
+    }
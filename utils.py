@@ -5,6 +5,7 @@ Retry logic, decorators, and helpers
 
 import time
 import logging
+import threading
 from functools import wraps
 from typing import Callable, Any
 
@@ -199,47 +200,73 @@ def yf_rate_limit(seconds=0.5):
     """Simple global rate limit helper for yfinance calls"""
     time.sleep(seconds)
 
-def fetch_yahoo_history_direct(symbol, period="1d", interval="1d"):
+class TokenBucket:
+    """
+    Thread-safe token bucket: ``rate`` requests per second on average, bursts
+    of up to ``capacity``. ``acquire()`` reserves a token and sleeps (outside
+    the lock) until it is due, so concurrent callers are served in order.
+    """
+
+    def __init__(self, rate: float, capacity: float = None):
+        self.rate = float(rate)
+        self.capacity = float(capacity or max(1.0, self.rate))
+        self._tokens = self.capacity
+        self._stamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """Take ``tokens``; returns the seconds waited."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._stamp) * self.rate)
+            self._stamp = now
+            self._tokens -= tokens
+            delay = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+YAHOO_CHART_URL = "https://query2.finance.yahoo.com/v8/finance/chart/{symbol}?range={period}&interval={interval}"
+YAHOO_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+    "Referer": "https://finance.yahoo.com/",
+    "Connection": "keep-alive"
+}
+
+def yahoo_chart_frame(data: dict):
+    """Yahoo v8 chart JSON -> DataFrame compatible with yfinance.history() output."""
+    import pandas as pd
+
+    result = data['chart']['result'][0]
+    timestamp = result['timestamp']
+    quote = result['indicators']['quote'][0]
+    df = pd.DataFrame({
+        'Open': quote.get('open', []),
+        'High': quote.get('high', []),
+        'Low': quote.get('low', []),
+        'Close': quote.get('close', []),
+        'Volume': quote.get('volume', [])
+    })
+    df.index = pd.to_datetime(timestamp, unit='s')
+    return df
+
+def fetch_yahoo_history_direct(symbol, period="1d", interval="1d", session=None):
     """
     Direct fallback for fetching Yahoo Finance history when yfinance library fails.
     Returns a pandas DataFrame compatible with yfinance.history() output.
+    Pass a ``requests.Session`` to reuse its keep-alive connections.
     """
     import requests
     import pandas as pd
-    import numpy as np
-    from datetime import datetime
     
-    # Map period/interval to range
-    # range=1d, interval=1m etc.
-    url = f"https://query2.finance.yahoo.com/v8/finance/chart/{symbol}?range={period}&interval={interval}"
-    
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-        "Referer": "https://finance.yahoo.com/",
-        "Connection": "keep-alive"
-    }
+    url = YAHOO_CHART_URL.format(symbol=symbol, period=period, interval=interval)
     
     try:
-        resp = requests.get(url, headers=headers, timeout=10)
+        resp = (session or requests).get(url, headers=YAHOO_HEADERS, timeout=10)
         if resp.status_code != 200:
             return pd.DataFrame()
-            
-        data = resp.json()
-        result = data['chart']['result'][0]
-        timestamp = result['timestamp']
-        quote = result['indicators']['quote'][0]
-        
-        df = pd.DataFrame({
-            'Open': quote.get('open', []),
-            'High': quote.get('high', []),
-            'Low': quote.get('low', []),
-            'Close': quote.get('close', []),
-            'Volume': quote.get('volume', [])
-        })
-        df.index = pd.to_datetime(timestamp, unit='s')
-        
-        return df
+        return yahoo_chart_frame(resp.json())
     except Exception as e:
         print(f"Direct History Fallback Error for {symbol}: {e}")
         return pd.DataFrame()